@@ -0,0 +1,55 @@
+"""
+Benchmark filter expressions on a synthetic collection.
+
+Compares indexed selection (SeriesQueryIndex) against a list-comprehension
+scan of every series.
+
+Usage:
+    python3 benchmarks/bench_query.py [--series 100000] [--repeat 5]
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bench_stats import best_of, synthetic_collection
+from comic_file_organizer.mylar3_query import SeriesQueryIndex
+
+QUERIES = [
+    ("publisher=Publisher 0042", lambda s: s.publisher == "Publisher 0042"),
+    ("status=Continuing and completion<50 and publisher=Publisher 0001 and year>=2010",
+     lambda s: s.status == "Continuing" and s.completion_percentage < 50
+     and s.publisher == "Publisher 0001" and s.year >= 2010),
+    ("year>=2020 and missing>250", lambda s: s.year >= 2020 and s.missing_issues > 250),
+    ("comicid=99999", lambda s: s.comicid == 99999),
+]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark indexed series selection')
+    parser.add_argument('--series', type=int, default=100000, help='Number of series (default: 100000)')
+    parser.add_argument('--publishers', type=int, default=200, help='Number of publishers (default: 200)')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per query, best is reported')
+    args = parser.parse_args(argv)
+
+    results = synthetic_collection(args.series, args.publishers)
+    index = SeriesQueryIndex(results)
+    start = time.perf_counter()
+    for where, _ in QUERIES:
+        index.select(where)  # builds the indexes the queries use
+    print(f"{args.series:,} series; indexes built in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    for where, predicate in QUERIES:
+        expected = [s for s in results.series if predicate(s)]
+        assert index.select(where) == expected, where
+        scan = best_of(lambda: [s for s in results.series if predicate(s)], args.repeat)
+        indexed = best_of(lambda: index.select(where), args.repeat)
+        print(f"  {where}")
+        print(f"    {len(expected):6,} rows  scan {scan * 1000:7.2f} ms  indexed {indexed * 1000:7.3f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""
+Benchmark rendering the publisher detail report for a large publisher.
+
+Compares the TextReport rendering (row layouts built once, output
+buffered and written in 64KB chunks) against the previous renderer,
+which called print() several times per series and built the totals
+with print(..., end="").
+
+Both write to os.devnull through a line-buffered text stream, as a
+pipe would be; the number of write calls reaching the stream is shown
+alongside the time.
+
+Usage:
+    python3 benchmarks/bench_report.py [--series 20000] [--repeat 5]
+"""
+import io
+import os
+import sys
+import argparse
+import contextlib
+from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bench_stats import best_of, synthetic_collection
+from comic_file_organizer.mylar3_cli import format_size, print_publisher_detail_report
+from comic_file_organizer.mylar3_query import SeriesQueryIndex
+from comic_file_organizer.report_output import TextReport
+
+
+class CountingStream(io.TextIOWrapper):
+    """Line-buffered devnull stream that counts write calls"""
+
+    def __init__(self):
+        super().__init__(open(os.devnull, 'wb'), line_buffering=True)
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+def legacy_publisher_detail_report(publisher_series, publisher_name):
+    """The print()-based renderer, kept for comparison"""
+    total_by_type = defaultdict(int)
+    total_size_by_type = defaultdict(int)
+    for series in publisher_series:
+        for file_type, count in series.file_type_counts.items():
+            total_by_type[file_type] += count
+        for file_type, size in series.file_type_sizes.items():
+            total_size_by_type[file_type] += size
+
+    print("=" * 70)
+    print(f"PUBLISHER DETAIL REPORT: {publisher_name}")
+    print("=" * 70)
+    print()
+    print(f"{'Publisher':<20} | {'Series':>5}")
+    print("-" * 70)
+    print(f"{publisher_name:<20} | {len(publisher_series):>5}")
+    print()
+    for series in publisher_series:
+        series_display = series.series_name
+        if series.year:
+            series_display += f" ({series.year})"
+        file_types = sorted(set(series.file_type_counts.keys()) | set(series.file_type_sizes.keys()))
+        if not file_types:
+            print(f"  {series_display}")
+            print("    (no comic files)")
+            print()
+            continue
+        print(f"  {series_display}")
+        for file_type in file_types:
+            count = series.file_type_counts.get(file_type, 0)
+            size_str = format_size(series.file_type_sizes.get(file_type, 0))
+            print(f"    {'':>20} | {file_type:>3} | {count:>5} | {size_str:>10}")
+        print(f"    {'':>20} {'TTL':>3} {'':>5} {format_size(series.total_size_bytes):>10}")
+        print()
+    print("-" * 70)
+    all_types = sorted(set(total_by_type.keys()) | set(total_size_by_type.keys()))
+    if all_types:
+        print(f"{'Publisher Totals':>20} |", end="")
+        for file_type in all_types:
+            print(f" {file_type:>3} |", end="")
+        print(f" {'Total':>10}")
+        print(f"{'':>20} |", end="")
+        for file_type in all_types:
+            print(f" {total_by_type.get(file_type, 0):>5} |", end="")
+        print()
+        print(f"{'':>20} |", end="")
+        for file_type in all_types:
+            print(f" {format_size(total_size_by_type.get(file_type, 0)):>10} |", end="")
+        print(f" {format_size(sum(total_size_by_type.values())):>10}")
+    print("=" * 70)
+    print()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark publisher detail report rendering')
+    parser.add_argument('--series', type=int, default=20000, help='Series in the publisher (default: 20000)')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per renderer, best is reported')
+    args = parser.parse_args(argv)
+
+    # A single publisher holding every series
+    results = synthetic_collection(args.series, 1)
+    for i, series in enumerate(results.series):
+        if i % 3 == 0 and series.issues_owned:
+            series.file_type_counts = {'CBR': 1, 'CBZ': series.issues_owned - 1}
+            series.file_type_sizes = {'CBR': 25 * 1024 * 1024, 'CBZ': series.total_size_bytes}
+    publisher = results.publishers[0]
+    index = SeriesQueryIndex(results)
+    publisher_series = sorted(index.lookup('publisher', publisher), key=lambda s: s.series_name.lower())
+    print(f"Rendering {len(publisher_series):,} series for one publisher\n")
+
+    def legacy(stream):
+        with contextlib.redirect_stdout(stream):
+            legacy_publisher_detail_report(publisher_series, publisher)
+        stream.flush()
+
+    def buffered(stream):
+        with TextReport(stream) as report:
+            print_publisher_detail_report(results, publisher, index, report=report)
+
+    for label, render in (('print() per line', legacy), ('TextReport', buffered)):
+        stream = CountingStream()
+        render(stream)
+        writes = stream.writes
+        elapsed = best_of(lambda: render(stream), args.repeat)
+        stream.close()
+        print(f"  {label:<18} {elapsed * 1000:8.1f} ms  {writes:>9,} writes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
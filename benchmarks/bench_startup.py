@@ -0,0 +1,109 @@
+"""
+Benchmark command line startup cost.
+
+Runs the interpreter with -X importtime and sums the per-module import
+times, for a bare interpreter, the lazy dispatcher
+(python -m comic_file_organizer) and the eager import of mylar3_cli the
+package entry point used to do. Wall time per invocation is shown too.
+
+Exits non-zero when the dispatcher's imports (on top of the bare
+interpreter) exceed --budget-ms, when those of `stats --help` (the path
+shell hooks take) exceed --stats-budget-ms, or when `stats --help`
+imports one of the optional feature modules, so it can guard startup
+time in CI.
+
+Usage:
+    python3 benchmarks/bench_startup.py [--repeat 10] [--budget-ms 20] [--stats-budget-ms 120]
+"""
+import os
+import sys
+import time
+import argparse
+import subprocess
+from typing import List, Tuple
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Imported only by the stats options that use them (--history/--trend,
+# --estimate, --parallel, --progress, --profile), never by a plain run
+FEATURE_MODULES = (
+    'comic_file_organizer.mylar3_history',
+    'comic_file_organizer.mylar3_estimate',
+    'comic_file_organizer.scan_scheduler',
+    'comic_file_organizer.progress',
+    'comic_file_organizer.profiling',
+)
+
+CASES = [
+    ("bare interpreter", ['-c', 'pass']),
+    ("dispatcher --help", ['-m', 'comic_file_organizer', '--help']),
+    ("dispatcher stats --help", ['-m', 'comic_file_organizer', 'stats', '--help']),
+    ("eager mylar3_cli import", ['-c', 'import comic_file_organizer.mylar3_cli']),
+]
+
+
+def parse_importtime(stderr: str) -> List[Tuple[int, int, str]]:
+    """(self us, cumulative us, module) for every line of -X importtime output"""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # header
+        modules.append((int(fields[0]), int(fields[1]), fields[2].strip()))
+    return modules
+
+
+def measure(args: List[str], repeat: int) -> Tuple[float, float, List[Tuple[int, int, str]]]:
+    """Best (import ms, wall ms) over `repeat` runs, with the modules of the fastest run"""
+    best_import, best_wall, best_modules = None, None, []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, '-X', 'importtime'] + args, cwd=REPO_ROOT,
+                              capture_output=True, text=True)
+        wall = (time.perf_counter() - start) * 1000
+        modules = parse_importtime(proc.stderr)
+        import_ms = sum(m[0] for m in modules) / 1000
+        if best_import is None or import_ms < best_import:
+            best_import, best_modules = import_ms, modules
+        best_wall = wall if best_wall is None else min(best_wall, wall)
+    return best_import, best_wall, best_modules
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark command line startup time')
+    parser.add_argument('--repeat', type=int, default=10, help='Runs per case, best is reported')
+    parser.add_argument('--budget-ms', type=float, default=20.0,
+                        help='Allowed dispatcher import time on top of the bare interpreter (default: 20)')
+    parser.add_argument('--stats-budget-ms', type=float, default=120.0,
+                        help='Allowed stats --help import time on top of the bare interpreter (default: 120)')
+    args = parser.parse_args(argv)
+
+    results = {}
+    print(f"{'':<26} {'imports':>10} {'wall':>10}")
+    for label, case_args in CASES:
+        import_ms, wall_ms, modules = measure(case_args, args.repeat)
+        results[label] = (import_ms, modules)
+        print(f"  {label:<24} {import_ms:8.1f}ms {wall_ms:8.1f}ms")
+
+    baseline = results["bare interpreter"][0]
+    dispatch_ms, modules = results["dispatcher --help"]
+    print("\nSlowest dispatcher imports (cumulative):")
+    for _, cumulative, name in sorted(modules, key=lambda m: m[1], reverse=True)[:5]:
+        print(f"  {cumulative / 1000:8.1f}ms  {name}")
+
+    overhead = dispatch_ms - baseline
+    print(f"\nDispatcher overhead: {overhead:.1f}ms (budget {args.budget_ms:g}ms)")
+
+    stats_ms, stats_modules = results["dispatcher stats --help"]
+    stats_overhead = stats_ms - baseline
+    print(f"stats --help overhead: {stats_overhead:.1f}ms (budget {args.stats_budget_ms:g}ms)")
+    eager = sorted({name for _, _, name in stats_modules} & set(FEATURE_MODULES))
+    if eager:
+        print(f"stats --help imports optional feature modules: {', '.join(eager)}")
+    return 0 if overhead <= args.budget_ms and stats_overhead <= args.stats_budget_ms and not eager else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""
+Benchmark calculate_statistics() on a synthetic collection.
+
+Compares the single-pass StatsAccumulator against the previous
+implementation (six walks per publisher, plus a re-walk of the whole
+collection on every access to the derived collection averages).
+
+Also times the top-N series queries a report makes (full sorts before,
+shared heap-selected indexes now) and the columnar dashboard aggregates
+(NumPy backend when installed, pure-Python columns otherwise), and an
+incremental update of 10 changed series against a full recompute.
+
+Usage:
+    python3 benchmarks/bench_stats.py [--series 100000] [--publishers 200] [--repeat 5]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import dataclasses
+from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from comic_file_organizer.mylar3_scanner import ScanResults, SeriesInfo
+from comic_file_organizer.mylar3_columnar import SeriesColumns, numpy_available
+from comic_file_organizer.mylar3_stats import calculate_statistics
+
+
+def synthetic_collection(series_count: int, publisher_count: int, seed: int = 1) -> ScanResults:
+    """Build ScanResults with a realistic mix of complete, partial and followed-only series"""
+    rng = random.Random(seed)
+    publishers = [f"Publisher {i:04d}" for i in range(publisher_count)]
+    results = ScanResults(destination_dir='/synthetic', publishers=list(publishers))
+    for i in range(series_count):
+        publisher = publishers[int(rng.paretovariate(1.2)) % publisher_count]
+        total = rng.randint(1, 300)
+        owned = rng.choice((0, total, rng.randint(0, total)))
+        size = owned * rng.randint(20, 80) * 1024 * 1024
+        results.series.append(SeriesInfo(
+            publisher=publisher,
+            series_name=f"Series {i}",
+            series_path=f"/synthetic/{publisher}/Series {i}",
+            year=rng.randint(1960, 2025),
+            total_issues=total,
+            issues_owned=owned,
+            comicid=i,
+            status=rng.choice(('Continuing', 'Ended')),
+            file_type_counts={'CBZ': owned} if owned else {},
+            file_type_sizes={'CBZ': size} if owned else {},
+        ))
+    return results
+
+
+def legacy_statistics(scan_results: ScanResults):
+    """The pre-accumulator algorithm, kept for comparison"""
+    publisher_series = defaultdict(list)
+    for series in scan_results.series:
+        publisher_series[series.publisher].append(series)
+    publishers = {}
+    for name, series_list in publisher_series.items():
+        with_issues = sum(1 for s in series_list if s.issues_owned > 0)
+        publishers[name] = (
+            len(series_list),
+            with_issues,
+            sum(1 for s in series_list if s.is_followed_only),
+            sum(1 for s in series_list if s.is_complete),
+            sum(s.issues_owned for s in series_list),
+            sum(s.missing_issues for s in series_list),
+            sum(s.completion_percentage for s in series_list if s.issues_owned > 0) / with_issues
+            if with_issues else 0.0,
+        )
+    return publishers
+
+
+def legacy_report(scan_results: ScanResults):
+    """Aggregates a summary report reads, computed the way the old properties did"""
+    publishers = legacy_statistics(scan_results)
+    series = scan_results.series
+    total_series = len(series)
+    with_issues = sum(1 for s in series if s.issues_owned > 0)
+    followed = sum(1 for s in series if s.is_followed_only)
+    complete = sum(1 for s in series if s.is_complete)
+    owned = sum(s.issues_owned for s in series)
+    missing = sum(s.missing_issues for s in series)
+    expected = sum(s.total_issues for s in series)
+    owning = [s for s in series if s.issues_owned > 0]
+    average = sum(s.issues_owned for s in owning) / len(owning) if owning else 0.0
+    return publishers, (total_series, with_issues, followed, complete, owned, missing,
+                        owned / expected * 100.0 if expected else 0.0, average)
+
+
+def new_report(scan_results: ScanResults):
+    stats = calculate_statistics(scan_results)
+    return stats.publishers, (stats.total_series, stats.series_with_issues, stats.series_followed_only,
+                              stats.complete_series, stats.total_issues_owned, stats.total_missing_issues,
+                              stats.overall_completion_percentage, stats.average_issues_per_series)
+
+
+def legacy_top_lists(scan_results: ScanResults, limit: int = 10):
+    series = scan_results.series
+    with_issues = [s for s in series if s.issues_owned > 0]
+    return (
+        sorted([s for s in with_issues if not s.is_complete], key=lambda s: s.completion_percentage,
+               reverse=True)[:limit],
+        sorted(with_issues, key=lambda s: s.missing_issues, reverse=True)[:limit],
+        sorted(with_issues, key=lambda s: s.issues_owned)[:limit],
+        sorted(series, key=lambda s: (s.publisher, s.series_name))[:limit * 2],
+    )
+
+
+def new_top_lists(stats, limit: int = 10):
+    return (
+        stats.get_most_complete_series(limit),
+        stats.get_most_incomplete_series(limit),
+        stats.get_recently_started_series(limit),
+        stats.get_series_by_name(limit * 2),
+    )
+
+
+def object_dashboard(scan_results: ScanResults):
+    """Dashboard aggregates computed with per-object loops"""
+    completion = defaultdict(list)
+    decades = defaultdict(int)
+    types = defaultdict(int)
+    histogram = [0] * 10
+    for s in scan_results.series:
+        if s.issues_owned > 0:
+            completion[s.publisher].append(s.completion_percentage)
+            histogram[min(int(s.completion_percentage / 10), 9)] += 1
+        if s.year:
+            decades[s.year // 10 * 10] += s.total_size_bytes
+        for file_type, count in s.file_type_counts.items():
+            types[file_type] += count
+    return ({p: sum(v) / len(v) for p, v in completion.items()}, dict(decades), dict(types), histogram)
+
+
+def columnar_dashboard(columns: SeriesColumns):
+    return (columns.completion_by_publisher(), columns.size_by_decade(),
+            columns.file_type_ratio(), columns.completion_histogram())
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark collection statistics')
+    parser.add_argument('--series', type=int, default=100000, help='Number of series (default: 100000)')
+    parser.add_argument('--publishers', type=int, default=200, help='Number of publishers (default: 200)')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per implementation, best is reported')
+    args = parser.parse_args(argv)
+
+    results = synthetic_collection(args.series, args.publishers)
+
+    # Sanity check: both implementations agree
+    legacy_pubs, legacy_totals = legacy_report(results)
+    new_pubs, new_totals = new_report(results)
+    assert legacy_totals[:6] == new_totals[:6], (legacy_totals, new_totals)
+    for name, row in legacy_pubs.items():
+        pub = new_pubs[name]
+        assert row[:6] == (pub.total_series, pub.series_with_issues, pub.series_followed_only,
+                           pub.complete_series, pub.total_issues_owned, pub.total_missing_issues), name
+        assert abs(row[6] - pub.average_completion) < 1e-6, name
+
+    legacy = best_of(lambda: legacy_report(results), args.repeat)
+    new = best_of(lambda: new_report(results), args.repeat)
+    print(f"{args.series:,} series, {len(new_pubs)} publishers (best of {args.repeat})")
+    print(f"  legacy:      {legacy * 1000:8.1f} ms")
+    print(f"  single-pass: {new * 1000:8.1f} ms  ({legacy / new:.1f}x)")
+
+    assert legacy_top_lists(results) == new_top_lists(calculate_statistics(results))
+    legacy = best_of(lambda: legacy_top_lists(results), args.repeat)
+    stats = calculate_statistics(results)
+    start = time.perf_counter()
+    new_top_lists(stats)
+    first = time.perf_counter() - start
+    repeat = best_of(lambda: new_top_lists(stats), args.repeat)
+    print("Top-N queries (4 lists)")
+    print(f"  full sort:   {legacy * 1000:8.1f} ms")
+    print(f"  heap, first: {first * 1000:8.1f} ms  ({legacy / first:.1f}x)")
+    print(f"  heap, again: {repeat * 1000:8.3f} ms")
+
+    legacy = best_of(lambda: object_dashboard(results), args.repeat)
+    build = best_of(lambda: SeriesColumns(results.series), 1)
+    columns = SeriesColumns(results.series)
+    query = best_of(lambda: columnar_dashboard(columns), args.repeat)
+    print(f"Dashboard aggregates (columnar backend: {columns.backend})")
+    print(f"  per-object:  {legacy * 1000:8.1f} ms")
+    print(f"  columns:     {query * 1000:8.1f} ms  (+{build * 1000:.1f} ms to build once)")
+    if not numpy_available():
+        print("  (install numpy for the vectorized backend)")
+
+    stats = calculate_statistics(results)
+    changed = [dataclasses.replace(s, issues_owned=s.total_issues) for s in results.series[:10]]
+    start = time.perf_counter()
+    stats.apply_delta(changed=changed)
+    delta = time.perf_counter() - start
+    full = best_of(lambda: calculate_statistics(results), args.repeat)
+    print("Refresh after 10 changed series")
+    print(f"  recompute:   {full * 1000:8.1f} ms")
+    print(f"  apply_delta: {delta * 1000:8.3f} ms  (includes building the path index once)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,16 @@
 """
-Enable running comic_file_organizer modules via python -m
+Enable running comic_file_organizer via python -m
 
 Usage:
-    python3 -m comic_file_organizer.mylar3_cli /path/to/config.ini
+    python3 -m comic_file_organizer <command> [options]
+    python3 -m comic_file_organizer stats /path/to/config.ini
+
+Commands are dispatched by comic_file_organizer.cli, which imports a
+command's modules only when it runs.
 """
-from comic_file_organizer.mylar3_cli import main
+import sys
+
+from comic_file_organizer.cli import main
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -1,2 +1,83 @@
-def main():
-    print('comic-file-organizer CLI stub')
+"""
+Unified command line for comic-file-organizer.
+
+Usage:
+    python3 -m comic_file_organizer <command> [options]
+    python3 -m comic_file_organizer stats /path/to/mylar3/config.ini
+    python3 -m comic_file_organizer dfa /path/to/directory
+
+Only this module is imported at startup. Each command's modules (scanner,
+statistics, database, ...) are imported when that command runs, so the
+dispatcher itself costs next to nothing when called from shell hooks.
+"""
+import os
+import sys
+
+
+# command -> (module, entry point, summary); modules are imported on use
+COMMANDS = {
+    'stats': ('comic_file_organizer.mylar3_cli', 'main', 'Collection statistics and reports'),
+    'serve': ('comic_file_organizer.mylar3_server', 'main', 'Serve collection statistics as JSON over HTTP'),
+    'queue': ('comic_file_organizer.mylar3_queue', 'main', 'Distributed scans: queue chunks, run workers, merge results'),
+    'rename': ('comic_file_organizer.mylar3_rename', 'main', 'Plan or apply renames to match Mylar3 naming templates'),
+    'import': ('comic_file_organizer.import_daemon', 'main', 'Watch an incoming folder and import new comics'),
+    'convert': ('comic_file_organizer.convert', 'main', 'Convert CBR and mislabelled archives to CBZ'),
+    'cache': ('comicvine_cache', 'main', 'Inspect the ComicVine metadata cache'),
+    'dfa': ('main', 'main', 'Disk-Folder-File Analyzer: file types and sizes under a directory'),
+}
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# sys.path entries a command's modules need
+COMMAND_PATHS = {
+    'cache': os.path.dirname(PACKAGE_DIR),  # comicvine_cache.py sits at the repository root
+    'dfa': os.path.join(PACKAGE_DIR, 'dfa'),  # DFA modules import each other by bare name
+}
+
+PROG = "python3 -m comic_file_organizer"
+
+
+def usage() -> str:
+    lines = [f"usage: {PROG} <command> [options]", "", "commands:"]
+    lines += [f"  {name:<9} {summary}" for name, (_, _, summary) in COMMANDS.items()]
+    lines += ["", f"Run '{PROG} <command> --help' for the options of a command.",
+              f"Arguments not starting with a command go to the stats command, "
+              f"as in '{PROG} /path/to/config.ini'.", ""]
+    return "\n".join(lines)
+
+
+def run(command: str, args) -> int:
+    """Import a command's module and call its entry point with args"""
+    import importlib
+
+    module_name, entry_point, _ = COMMANDS[command]
+    path = COMMAND_PATHS.get(command)
+    if path is not None and path not in sys.path:
+        sys.path.insert(0, path)
+    module = importlib.import_module(module_name)
+    # argparse takes the program name shown in --help from sys.argv[0]
+    sys.argv = [f"{PROG} {command}"] + list(args)
+    return getattr(module, entry_point)(list(args)) or 0
+
+
+def main(argv=None) -> int:
+    """Dispatch to a subcommand"""
+    args = sys.argv[1:] if argv is None else list(argv)
+    if not args or args[0] in ('-h', '--help', 'help'):
+        sys.stdout.write(usage())
+        return 0 if args else 2
+    if args[0] == '--version':
+        from comic_file_organizer import __version__
+        print(f"comic-file-organizer {__version__}")
+        return 0
+
+    command, rest = args[0], args[1:]
+    if command not in COMMANDS:
+        # Options or a config path: the original stats invocation, which
+        # existing shell hooks still use
+        command, rest = 'stats', args
+    return run(command, rest)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""
+Archive sniffing and CBR -> CBZ conversion for comic-file-organizer.
+
+File extensions on downloaded comics are unreliable (plenty of '.cbr'
+files are really ZIPs), so the archive type is sniffed from magic bytes.
+Real RAR archives are repacked into a ZIP (stored, since comic pages are
+already compressed images); mislabelled ZIPs are only renamed.
+
+RAR support needs the optional 'rarfile' package (see requirements.txt)
+and an unrar/unar backend on the system.
+"""
+import os
+import sys
+import shutil
+import argparse
+import logging
+import zipfile
+from typing import Optional
+try:
+    from comic_file_organizer.journal import Journal
+except ModuleNotFoundError:
+    from journal import Journal
+
+try:
+    import rarfile
+except ImportError:  # optional dependency
+    rarfile = None
+
+
+logger = logging.getLogger(__name__)
+
+# Leading bytes identifying each archive type
+MAGIC = [
+    (b'PK\x03\x04', 'zip'),
+    (b'PK\x05\x06', 'zip'),  # empty zip
+    (b'Rar!\x1a\x07', 'rar'),
+    (b'7z\xbc\xaf\x27\x1c', '7z'),
+    (b'%PDF', 'pdf'),
+]
+MAGIC_LENGTH = max(len(m) for m, _ in MAGIC)
+
+# Comic extension matching each sniffed archive type
+EXTENSION_FOR_KIND = {'zip': '.cbz', 'rar': '.cbr', '7z': '.cb7', 'pdf': '.pdf'}
+
+
+def sniff_archive(path: str) -> str:
+    """
+    Identify an archive by its magic bytes.
+
+    Returns:
+        'zip', 'rar', '7z', 'pdf' or 'unknown'
+    """
+    with open(path, 'rb') as f:
+        head = f.read(MAGIC_LENGTH)
+    for magic, kind in MAGIC:
+        if head.startswith(magic):
+            return kind
+    return 'unknown'
+
+
+def rar_supported() -> bool:
+    """Whether the optional rarfile dependency is available"""
+    return rarfile is not None
+
+
+def convert_to_cbz(src: str, dst: Optional[str] = None, kind: Optional[str] = None,
+                   journal: Optional[Journal] = None, fsync: bool = True) -> str:
+    """
+    Convert a comic archive to CBZ.
+
+    ZIPs (whatever their extension) are renamed; RARs are repacked. The new
+    archive is written to a temporary name, synced and atomically renamed
+    before the source is removed, and the whole operation is journaled when
+    a journal is given. An existing file at dst is never replaced.
+
+    Args:
+        src: Source archive
+        dst: Target .cbz path (default: src with a .cbz extension)
+        kind: Pre-sniffed archive type (sniffed if None)
+        journal: Write-ahead journal to log the conversion in
+        fsync: Disable to skip fsync (tests)
+
+    Returns:
+        Path of the CBZ file
+
+    Raises:
+        ValueError: If the archive type cannot be converted
+        RuntimeError: If a RAR must be repacked but rarfile is not installed
+        FileExistsError: If another file already exists at dst
+    """
+    dst = dst or os.path.splitext(src)[0] + '.cbz'
+    kind = kind or sniff_archive(src)
+
+    if kind == 'zip':
+        if src == dst:
+            return dst
+        _check_target(src, dst)
+        op_id = _journal_begin(journal, 'rename', src, dst)
+        os.rename(src, dst)
+        _journal_commit(journal, op_id)
+        return dst
+
+    if kind != 'rar':
+        raise ValueError(f"Cannot convert {kind} archive to CBZ: {src}")
+    if rarfile is None:
+        raise RuntimeError("Converting CBR files requires the 'rarfile' package")
+    _check_target(src, dst)
+
+    tmp = os.path.join(os.path.dirname(dst), f".{os.path.basename(dst)}.partial")
+    op_id = _journal_begin(journal, 'convert', src, dst, tmp)
+    try:
+        with rarfile.RarFile(src) as rf, zipfile.ZipFile(tmp, 'w', zipfile.ZIP_STORED) as zf:
+            for info in sorted(rf.infolist(), key=lambda i: i.filename):
+                if info.is_dir():
+                    continue
+                with rf.open(info) as fsrc, zf.open(info.filename, 'w') as fdst:
+                    shutil.copyfileobj(fsrc, fdst, 1024 * 1024)
+        if fsync:
+            with open(tmp, 'rb') as f:
+                os.fsync(f.fileno())
+        # Checked again: another file may have appeared while repacking
+        _check_target(src, dst)
+        os.rename(tmp, dst)
+    except Exception:
+        if os.path.lexists(tmp):
+            os.unlink(tmp)
+        if journal and op_id is not None:
+            journal.abort([op_id])
+        raise
+    os.unlink(src)
+    _journal_commit(journal, op_id)
+    logger.info(f"Converted {src} -> {dst}")
+    return dst
+
+
+def _check_target(src: str, dst: str) -> None:
+    """Refuse to replace an existing dst (unless it is src under another case)"""
+    if os.path.lexists(dst) and not _same_file(src, dst):
+        raise FileExistsError(f"Not converting {src}: {dst} already exists")
+
+
+def _same_file(a: str, b: str) -> bool:
+    try:
+        return os.path.samefile(a, b)
+    except OSError:
+        return False
+
+
+def _journal_begin(journal: Optional[Journal], kind: str, src: str, dst: str,
+                   tmp: Optional[str] = None) -> Optional[int]:
+    if journal is None:
+        return None
+    op_id = journal.begin(kind, src, dst, tmp=tmp)
+    journal.sync()
+    return op_id
+
+
+def _journal_commit(journal: Optional[Journal], op_id: Optional[int]) -> None:
+    if journal is not None and op_id is not None:
+        journal.commit([op_id])
+
+
+def main(argv=None):
+    """CLI entry point: sniff and convert each file to CBZ"""
+    parser = argparse.ArgumentParser(
+        description="Convert CBR and mislabelled archives to CBZ",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s "Saga #001.cbr"
+  %(prog)s /downloads/comics/*.cbr
+        """
+    )
+    parser.add_argument('files', nargs='+', metavar='FILE', help='Archive to convert')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Enable verbose logging')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO,
+                        format='%(levelname)s: %(message)s')
+    status = 0
+    for path in args.files:
+        kind = None
+        try:
+            kind = sniff_archive(path)
+            print(f"{path}: {kind} -> {convert_to_cbz(path, kind=kind)}")
+        except (ValueError, RuntimeError, OSError) as e:
+            print(f"{path}: {kind or 'error'}: {e}")
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,12 +12,52 @@ from pathlib import Path
 from typing import Optional
 from typing import Union
 import signal
+from contextlib import nullcontext
 
 from config import ConfigManager
 from scanner import DirectoryScanner
 from stats import StatisticsCalculator
 from output import OutputManager
 
+# Progress reporting and profiling live in the comic_file_organizer
+# package; they are available when DFA runs through
+# `python -m comic_file_organizer dfa`. Without the package --profile
+# falls back to plain cProfile (PREFIX.pstats only, no phases).
+try:
+    from comic_file_organizer.progress import ProgressReporter
+    from comic_file_organizer.profiling import PROFILE_MODES, Profiler, profile_phase, write_profile
+except ModuleNotFoundError:
+    import cProfile
+    
+    ProgressReporter = None
+    PROFILE_MODES = ('cprofile',)
+    
+    class Profiler(cProfile.Profile):
+        """Plain cProfile of the whole run"""
+        
+        def __init__(self, mode: str = 'cprofile'):
+            super().__init__()
+        
+        def start(self) -> None:
+            self.enable()
+    
+    def profile_phase(profiler, name):
+        return nullcontext()
+    
+    def write_profile(profiler, prefix: str, stream=None) -> bool:
+        """Stop profiler and write PREFIX.pstats; a failed write is reported, not raised"""
+        stream = sys.stderr if stream is None else stream
+        profiler.disable()
+        path = f"{prefix}.pstats"
+        try:
+            profiler.dump_stats(path)
+        except OSError as e:
+            print(f"Error: Cannot write profile {prefix}: {e}", file=stream)
+            return False
+        print(f"Profile written to {path} (no {prefix}.collapsed or phase times: "
+              f"run as python3 -m comic_file_organizer dfa for those)", file=stream)
+        return True
+
 # Global variables for graceful shutdown
 interrupted: bool = False
 # scanner will be an instance of DirectoryScanner or None
@@ -188,6 +228,28 @@ Examples:
         help='Enable verbose output (INFO level logging to console)'
     )
     
+    parser.add_argument(
+        '--progress',
+        action='store_true',
+        help='Show scan progress with rates and ETA (periodic log lines when not on a terminal)'
+    )
+    
+    parser.add_argument(
+        '--profile',
+        metavar='PREFIX',
+        help='Profile the run and write PREFIX.pstats and PREFIX.collapsed (flamegraph input), '
+             'with time split into scan (including statistics) and render phases; '
+             'run directly as python3 main.py, only PREFIX.pstats is written'
+    )
+    
+    parser.add_argument(
+        '--profile-mode',
+        choices=PROFILE_MODES,
+        default='cprofile',
+        help='cprofile: exact calls; sample: low-overhead stack sampling, needs the '
+             'comic_file_organizer package (default: cprofile)'
+    )
+    
     parser.add_argument(
         '--debug',
         action='store_true',
@@ -207,7 +269,7 @@ Examples:
     
     return parser
 
-def main() -> int:
+def main(argv=None) -> int:
     """Main application entry point."""
     global scanner, interrupted
     
@@ -217,7 +279,7 @@ def main() -> int:
     
     # Parse command line arguments
     parser = create_argument_parser()
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     try:
         # Load configuration
@@ -248,11 +310,21 @@ def main() -> int:
         use_extension_filter = args.extension_filter or config.get("use_extension_list", False)
         extension_list = config.get("extension_list", [])
         
+        # Progress reporter (optional)
+        progress = None
+        if args.progress:
+            if ProgressReporter is None:
+                logging.warning("--progress needs the comic_file_organizer package "
+                                "(run as: python3 -m comic_file_organizer dfa)")
+            else:
+                progress = ProgressReporter()
+        
         # Create scanner
         scanner = DirectoryScanner(
             exclude_hidden=exclude_hidden,
             extension_filter=extension_list,
-            use_filter=use_extension_filter
+            use_filter=use_extension_filter,
+            progress=progress
         )
         
         # Create statistics calculator
@@ -276,14 +348,23 @@ def main() -> int:
         if use_extension_filter:
             print(f"Using extension filter: {', '.join(extension_list)}")
         
+        # Profiler (optional)
+        profiler = None
+        if args.profile:
+            profiler = Profiler(args.profile_mode)
+            profiler.start()
+        
         # Perform analysis
         print("Scanning files...")
         
         try:
-            stats = calculator.process_files_streaming(
-                scanner.scan_directory(sanitized_directory),
-                sanitized_directory
-            )
+            # Statistics are gathered while the scan streams files, so
+            # stats.py frames show up under the scan phase
+            with profile_phase(profiler, 'scan'):
+                stats = calculator.process_files_streaming(
+                    scanner.scan_directory(sanitized_directory),
+                    sanitized_directory
+                )
             
             if interrupted:
                 print("\nAnalysis interrupted.")
@@ -292,12 +373,13 @@ def main() -> int:
             # Display results
             print("\nAnalysis complete!\n")
             
-            output_manager.display_results(
-                stats,
-                sort_by=args.sort,
-                show_summary=not args.no_summary,
-                max_extensions=args.max_extensions
-            )
+            with profile_phase(profiler, 'render'):
+                output_manager.display_results(
+                    stats,
+                    sort_by=args.sort,
+                    show_summary=not args.no_summary,
+                    max_extensions=args.max_extensions
+                )
             
             # Log scan statistics
             scan_stats = scanner.get_scan_stats()
@@ -315,6 +397,9 @@ def main() -> int:
             logging.error(f"Error during analysis: {e}", exc_info=True)
             print(f"Error during analysis: {e}")
             return 1
+        finally:
+            if profiler is not None:
+                write_profile(profiler, args.profile)
     
     except Exception as e:
         # Set up basic logging if setup failed
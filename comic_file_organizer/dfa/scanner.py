@@ -34,7 +34,8 @@ class FileInfo:
 class DirectoryScanner:
     """Scans directories recursively and collects file information."""
     
-    def __init__(self, exclude_hidden: bool = True, extension_filter: Optional[List[str]] = None, use_filter: bool = False):
+    def __init__(self, exclude_hidden: bool = True, extension_filter: Optional[List[str]] = None, use_filter: bool = False,
+                 progress=None):
         """
         Initialize directory scanner.
         
@@ -42,10 +43,14 @@ class DirectoryScanner:
             exclude_hidden: Whether to exclude hidden files/directories
             extension_filter: List of extensions to filter by
             use_filter: Whether to use the extension filter
+            progress: Optional progress reporter with start(total, unit),
+                update(units, files, size_bytes) and finish(); work is
+                estimated as the number of top-level directories
         """
         self.exclude_hidden = exclude_hidden
         self.extension_filter = set(extension_filter) if extension_filter else set()
         self.use_filter = use_filter
+        self.progress = progress
         self.stats = {
             'total_files': 0,
             'total_size': 0,
@@ -168,6 +173,11 @@ class DirectoryScanner:
             
         logger.info(f"Starting directory scan: {sanitized_path}")
         
+        progress = self.progress
+        in_top_level = False
+        if progress is not None:
+            progress.start(self._count_top_level(sanitized_path), 'directories')
+        
         try:
             # followlinks=True allows os.walk to traverse symlinked directories
             for root, dirs, files in os.walk(sanitized_path, followlinks=True):
@@ -204,6 +214,15 @@ class DirectoryScanner:
                 
                 self.stats['directories_scanned'] += 1
                 
+                # Progress units are top-level directories: entering the next
+                # one means the previous one is done
+                if progress is not None and root_path.parent == sanitized_path:
+                    if in_top_level:
+                        progress.update(1)
+                    in_top_level = True
+                files_before = self.stats['total_files']
+                size_before = self.stats['total_size']
+                
                 if self.stats['directories_scanned'] % 100 == 0:
                     logger.debug(f"Scanned {self.stats['directories_scanned']} directories, found {self.stats['total_files']} files")
                 
@@ -232,6 +251,10 @@ class DirectoryScanner:
                         self.stats['total_files'] += 1
                         self.stats['total_size'] += file_info.size
                         yield file_info
+                
+                if progress is not None:
+                    progress.update(0, self.stats['total_files'] - files_before,
+                                    self.stats['total_size'] - size_before)
                         
         except KeyboardInterrupt:
             logger.info("Scan interrupted by user")
@@ -240,12 +263,28 @@ class DirectoryScanner:
             logger.error(f"Error during directory scan: {e}")
             raise
         
+        if progress is not None:
+            if in_top_level:
+                progress.update(1)
+            progress.finish()
         logger.info(f"Scan completed. Processed {self.stats['total_files']} files in {self.stats['directories_scanned']} directories")
         if self.stats['skipped_files'] > 0:
             logger.info(f"Skipped {self.stats['skipped_files']} files based on filters")
         if self.stats['errors'] > 0:
             logger.warning(f"Encountered {self.stats['errors']} errors during scan")
     
+    def _count_top_level(self, path: Path) -> int:
+        """Top-level directories under path (the progress estimate), from one listing"""
+        try:
+            with os.scandir(path) as entries:
+                return sum(
+                    1 for entry in entries
+                    if entry.is_dir() and not (self.exclude_hidden and entry.name.startswith('.'))
+                )
+        except OSError as e:
+            logger.warning(f"Cannot list {path} for progress estimate: {e}")
+            return 0
+    
     def get_scan_stats(self) -> Dict[str, int]:
         """Get scanning statistics."""
         return self.stats.copy()
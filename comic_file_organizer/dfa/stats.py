@@ -4,7 +4,7 @@ Statistics calculation module for Disk-Folder-File Analyzer (DFA)
 Processes file data and calculates totals, largest/smallest files by extension.
 """
 
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 from collections import defaultdict
 import logging
 from dataclasses import dataclass, field
@@ -38,6 +38,34 @@ class ExtensionStats:
         if self.smallest_file is None or file_info.size < self.smallest_file.size:
             self.smallest_file = file_info
     
+    def merge(self, other: 'ExtensionStats') -> 'ExtensionStats':
+        """
+        Fold another partial result for the same extension into this one.
+        
+        Associative; when self holds the files seen first, ties on
+        largest/smallest keep the earlier file exactly as add_file does.
+        
+        Args:
+            other: Statistics of the same extension over other files
+            
+        Returns:
+            self
+        """
+        if other.extension != self.extension:
+            raise ValueError(f"Cannot merge statistics of {other.extension} into {self.extension}")
+        self.files.extend(other.files)
+        self.file_count += other.file_count
+        self.total_size += other.total_size
+        
+        if other.largest_file is not None and (
+                self.largest_file is None or other.largest_file.size > self.largest_file.size):
+            self.largest_file = other.largest_file
+            
+        if other.smallest_file is not None and (
+                self.smallest_file is None or other.smallest_file.size < self.smallest_file.size):
+            self.smallest_file = other.smallest_file
+        return self
+    
     @property
     def average_size(self) -> float:
         """Calculate average file size."""
@@ -53,6 +81,43 @@ class ScanStatistics:
     smallest_file_overall: Optional[FileInfo] = None
     scan_path: str = ""
     
+    def merge(self, other: 'ScanStatistics') -> 'ScanStatistics':
+        """
+        Fold another partial scan (e.g. of a subtree, or from another
+        worker process) into this one.
+        
+        Associative, so partial results can be combined in any grouping.
+        Merging the parts in file order gives exactly the statistics of
+        processing all files serially.
+        
+        Args:
+            other: Statistics over other files
+            
+        Returns:
+            self
+        """
+        self.total_files += other.total_files
+        self.total_size += other.total_size
+        
+        if other.largest_file_overall is not None and (
+                self.largest_file_overall is None
+                or other.largest_file_overall.size > self.largest_file_overall.size):
+            self.largest_file_overall = other.largest_file_overall
+            
+        if other.smallest_file_overall is not None and (
+                self.smallest_file_overall is None
+                or other.smallest_file_overall.size < self.smallest_file_overall.size):
+            self.smallest_file_overall = other.smallest_file_overall
+        
+        for extension, ext_stats in other.extension_stats.items():
+            if extension not in self.extension_stats:
+                self.extension_stats[extension] = ExtensionStats(extension=extension)
+            self.extension_stats[extension].merge(ext_stats)
+        
+        if not self.scan_path:
+            self.scan_path = other.scan_path
+        return self
+    
     def get_sorted_extensions(self, sort_by: str = 'size') -> List[str]:
         """
         Get extensions sorted by specified criteria.
@@ -136,6 +201,29 @@ class StatisticsCalculator:
         
         return self.stats
     
+    def process_partials(self, parts: Iterable[ScanStatistics], scan_path: str = "") -> ScanStatistics:
+        """
+        Combine partial statistics computed elsewhere (per worker process
+        or per subtree) into one result.
+        
+        Args:
+            parts: Partial ScanStatistics, in file order for results
+                identical to processing all files serially
+            scan_path: Path that was scanned
+            
+        Returns:
+            ScanStatistics object with combined statistics; the parts are
+            left unchanged
+        """
+        self.stats = ScanStatistics(scan_path=scan_path)
+        
+        for part in parts:
+            self.stats.merge(part)
+            
+        logger.info(f"Statistics combined for {self.stats.total_files} files with {len(self.stats.extension_stats)} different extensions")
+        
+        return self.stats
+    
     def _process_single_file(self, file_info: FileInfo) -> None:
         """
         Process a single file and update statistics.
@@ -0,0 +1,46 @@
+"""
+Tests for --profile when DFA runs standalone (python3 main.py).
+
+Without the comic_file_organizer package, --profile falls back to plain
+cProfile instead of silently writing nothing.
+
+Tests included:
+- test_standalone_profile_writes_pstats: PREFIX.pstats is written and loads with pstats
+- test_standalone_sample_mode_rejected: sample mode needs the package, so it is a usage error
+
+Run with: pytest -q
+"""
+from pathlib import Path
+import os
+import pstats
+import subprocess
+import sys
+
+MAIN = Path(__file__).resolve().parent.parent / "main.py"
+
+
+def run_standalone(cwd: Path, *args: str) -> subprocess.CompletedProcess:
+    env = {key: value for key, value in os.environ.items() if key != "PYTHONPATH"}
+    return subprocess.run([sys.executable, str(MAIN), *args], cwd=cwd, env=env,
+                          capture_output=True, text=True)
+
+
+def test_standalone_profile_writes_pstats(tmp_path: Path):
+    library = tmp_path / "library"
+    library.mkdir()
+    (library / "a.cbz").write_bytes(b"x" * 100)
+    prefix = tmp_path / "run"
+
+    result = run_standalone(tmp_path, str(library), "--profile", str(prefix))
+
+    assert result.returncode == 0, result.stderr
+    assert f"Profile written to {prefix}.pstats" in result.stderr
+    assert pstats.Stats(f"{prefix}.pstats").total_calls > 0
+    assert not Path(f"{prefix}.collapsed").exists()
+
+
+def test_standalone_sample_mode_rejected(tmp_path: Path):
+    result = run_standalone(tmp_path, str(tmp_path), "--profile", str(tmp_path / "run"),
+                            "--profile-mode", "sample")
+    assert result.returncode == 2
+    assert "invalid choice: 'sample'" in result.stderr
@@ -0,0 +1,100 @@
+"""
+Unit tests for merging partial DFA statistics.
+
+Partial results (per worker or per subtree) merged in file order must be
+identical to processing every file serially, including which file wins
+ties for largest/smallest.
+
+Tests included:
+- test_merge_in_file_order_matches_serial: split points anywhere give the serial result
+- test_merge_is_associative: grouping of the merges does not matter
+- test_ties_keep_first_file: equal sizes keep the earlier file, as add_file does
+- test_merge_empty_parts: empty partial results are neutral
+- test_process_partials_leaves_parts_unchanged: combining does not mutate the inputs
+- test_extension_mismatch_rejected: ExtensionStats only merge the same extension
+
+Run with: pytest -q
+"""
+from pathlib import Path
+import pytest
+
+from scanner import FileInfo
+from stats import ExtensionStats, ScanStatistics, StatisticsCalculator
+
+
+def make_file(name: str, size: int) -> FileInfo:
+    return FileInfo(path=Path("/lib") / name, name=name, extension=Path(name).suffix,
+                    size=size, is_hidden=False)
+
+
+FILES = [
+    make_file("a.cbz", 300),
+    make_file("b.cbr", 100),
+    make_file("c.cbz", 300),
+    make_file("notes", 5),
+    make_file("d.cbr", 100),
+    make_file("e.pdf", 700),
+    make_file("f.cbz", 5),
+    make_file("g.pdf", 700),
+]
+
+
+def partial(files) -> ScanStatistics:
+    return StatisticsCalculator().process_files(files)
+
+
+def summary(stats: ScanStatistics):
+    """Everything a report reads, with files identified by name"""
+    def name(f):
+        return f.name if f else None
+    return (
+        stats.total_files, stats.total_size, name(stats.largest_file_overall),
+        name(stats.smallest_file_overall),
+        [(ext, s.file_count, s.total_size, name(s.largest_file), name(s.smallest_file),
+          [f.name for f in s.files]) for ext, s in stats.extension_stats.items()],
+    )
+
+
+def test_merge_in_file_order_matches_serial():
+    serial = summary(partial(FILES))
+    for split in range(len(FILES) + 1):
+        merged = partial(FILES[:split]).merge(partial(FILES[split:]))
+        assert summary(merged) == serial
+
+
+def test_merge_is_associative():
+    a, b, c = FILES[:3], FILES[3:5], FILES[5:]
+    left = partial(a).merge(partial(b)).merge(partial(c))
+    right = partial(a).merge(partial(b).merge(partial(c)))
+    assert summary(left) == summary(right) == summary(partial(FILES))
+
+
+def test_ties_keep_first_file():
+    merged = partial(FILES[:1]).merge(partial(FILES[1:]))
+    assert merged.largest_file_overall.name == "e.pdf"
+    assert merged.smallest_file_overall.name == "notes"
+    assert merged.extension_stats[".cbz"].largest_file.name == "a.cbz"
+    assert merged.extension_stats[".cbr"].smallest_file.name == "b.cbr"
+
+
+def test_merge_empty_parts():
+    merged = ScanStatistics().merge(partial(FILES)).merge(ScanStatistics())
+    assert summary(merged) == summary(partial(FILES))
+
+
+def test_process_partials_leaves_parts_unchanged():
+    parts = [partial(FILES[i:i + 3]) for i in range(0, len(FILES), 3)]
+    before = [summary(p) for p in parts]
+
+    calculator = StatisticsCalculator()
+    combined = calculator.process_partials(parts, scan_path="/lib")
+
+    assert [summary(p) for p in parts] == before
+    assert summary(combined) == summary(partial(FILES))
+    assert combined.scan_path == "/lib"
+    assert calculator.get_summary()['total_files'] == len(FILES)
+
+
+def test_extension_mismatch_rejected():
+    with pytest.raises(ValueError):
+        ExtensionStats(extension=".cbz").merge(ExtensionStats(extension=".cbr"))
@@ -0,0 +1,493 @@
+"""
+Staged import daemon for comic-file-organizer.
+
+Watches an incoming folder and runs each new comic through the import
+pipeline:
+
+    detect -> sniff -> convert -> tag -> move -> update
+
+Every stage is a pool of worker threads; stages are connected by bounded
+queues, so a slow stage applies backpressure upstream instead of letting
+work pile up in memory. Per-stage throughput, utilization and queue depth
+are logged periodically (and optionally written to a JSON metrics file).
+
+Usage:
+    python3 -m comic_file_organizer.import_daemon /path/to/config.ini --incoming /downloads/comics
+    python3 -m comic_file_organizer.import_daemon /path/to/config.ini --incoming /downloads/comics --once
+"""
+import os
+import re
+import sys
+import json
+import time
+import queue
+import signal
+import logging
+import argparse
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+try:
+    from comic_file_organizer.mylar3_config import load_config
+    from comic_file_organizer.mylar3_scanner import Mylar3Scanner, ScanResults, SeriesInfo
+    from comic_file_organizer.mylar3_templates import NamingTemplates
+    from comic_file_organizer.mylar3_rename import RenameExecutor, RenameResult, parse_issue_filename, partial_path, JOURNAL_NAME
+    from comic_file_organizer.journal import Journal
+    from comic_file_organizer.convert import sniff_archive, convert_to_cbz
+    from comic_file_organizer.mylar3_db import Mylar3DatabaseUpdater, default_database_path
+except ModuleNotFoundError:
+    from mylar3_config import load_config
+    from mylar3_scanner import Mylar3Scanner, ScanResults, SeriesInfo
+    from mylar3_templates import NamingTemplates
+    from mylar3_rename import RenameExecutor, RenameResult, parse_issue_filename, partial_path, JOURNAL_NAME
+    from journal import Journal
+    from convert import sniff_archive, convert_to_cbz
+    from mylar3_db import Mylar3DatabaseUpdater, default_database_path
+
+
+logger = logging.getLogger(__name__)
+
+STAGES = ('detect', 'sniff', 'convert', 'tag', 'move', 'update')
+
+DEFAULT_WORKERS = {
+    'sniff': 2,
+    'convert': os.cpu_count() or 2,
+    'tag': 2,
+    'move': 4,
+    'update': 1,
+}
+
+INCOMING_EXTENSIONS = {'.cbz', '.cbr', '.zip', '.rar'}
+
+_STOP = object()
+_NORMALIZE = re.compile(r'[^a-z0-9]+')
+
+
+@dataclass
+class ImportItem:
+    """A comic file moving through the import pipeline"""
+    path: str
+    size: int = 0
+    kind: str = ''
+    fields: Dict[str, Any] = field(default_factory=dict)
+    series: Optional[SeriesInfo] = None
+    target: Optional[str] = None
+
+
+class StageMetrics:
+    """Throughput and utilization counters for one stage"""
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.processed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.busy_seconds = 0.0
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, duration: float, outcome: str = 'processed') -> None:
+        with self._lock:
+            self.busy_seconds += duration
+            if outcome == 'processed':
+                self.processed += 1
+            elif outcome == 'failed':
+                self.failed += 1
+            else:
+                self.dropped += 1
+
+    def snapshot(self, input_queue: Optional["queue.Queue"] = None) -> Dict[str, Any]:
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        with self._lock:
+            data = {
+                'workers': self.workers,
+                'processed': self.processed,
+                'failed': self.failed,
+                'dropped': self.dropped,
+                'items_per_second': round(self.processed / elapsed, 2),
+                'utilization': round(self.busy_seconds / (elapsed * self.workers), 3),
+            }
+        if input_queue is not None:
+            data['queue_depth'] = input_queue.qsize()
+            data['queue_capacity'] = input_queue.maxsize
+        return data
+
+
+class Stage:
+    """A worker pool reading from one bounded queue and writing to the next"""
+
+    def __init__(self, name: str, func: Callable[[ImportItem], Optional[ImportItem]], workers: int,
+                 input_queue: "queue.Queue", output_queue: Optional["queue.Queue"]):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.input_queue = input_queue
+        self.output_queue = output_queue
+        self.metrics = StageMetrics(name, self.workers)
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"import-{self.name}-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        """Let workers finish queued items, then exit"""
+        for _ in self._threads:
+            self.input_queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+
+    def _run(self) -> None:
+        while True:
+            item = self.input_queue.get()
+            if item is _STOP:
+                return
+            start = time.monotonic()
+            try:
+                result = self.func(item)
+            except Exception as e:
+                self.metrics.record(time.monotonic() - start, 'failed')
+                logger.error(f"[{self.name}] {item.path}: {e}")
+                continue
+            self.metrics.record(time.monotonic() - start, 'processed' if result is not None else 'dropped')
+            if result is not None and self.output_queue is not None:
+                # Blocks when the next stage is saturated (backpressure)
+                self.output_queue.put(result)
+
+
+class SeriesIndex:
+    """Library series looked up by normalized name"""
+
+    def __init__(self, series_list: List[SeriesInfo]):
+        self._by_name: Dict[str, List[SeriesInfo]] = {}
+        for series in series_list:
+            self._by_name.setdefault(normalize_name(series.series_name), []).append(series)
+
+    def find(self, name: str, year: Optional[int] = None) -> Optional[SeriesInfo]:
+        """Best library match: same normalized name, latest series starting no later than year"""
+        candidates = self._by_name.get(normalize_name(name))
+        if not candidates:
+            return None
+        if year:
+            started = [s for s in candidates if s.year and s.year <= year]
+            if started:
+                return max(started, key=lambda s: s.year)
+        return max(candidates, key=lambda s: s.year or 0)
+
+
+def normalize_name(name: str) -> str:
+    return _NORMALIZE.sub('', name.lower())
+
+
+class ImportDaemon:
+    """Watches an incoming folder and imports comics through a staged pipeline"""
+
+    def __init__(self, incoming_dir: str, library: ScanResults, templates: NamingTemplates,
+                 journal: Optional[Journal] = None, workers: Optional[Dict[str, int]] = None,
+                 queue_size: int = 64, poll_interval: float = 5.0,
+                 updaters: Optional[List[Callable[[ImportItem], None]]] = None, fsync: bool = True):
+        """
+        Args:
+            incoming_dir: Folder to watch for new downloads
+            library: Scan of the collection (used to match series folders)
+            templates: Naming templates for imported files
+            journal: Write-ahead journal for converts and moves
+            workers: Per-stage worker counts (see DEFAULT_WORKERS)
+            queue_size: Capacity of each inter-stage queue
+            poll_interval: Seconds between incoming folder polls
+            updaters: Callables run by the update stage for each imported item;
+                those with a flush() method (e.g. Mylar3DatabaseUpdater) are
+                flushed at every metrics interval and on shutdown
+            fsync: Disable to skip fsync (tests)
+        """
+        self.incoming_dir = incoming_dir
+        self.index = SeriesIndex(library.series)
+        self.templates = templates
+        self.journal = journal
+        self.poll_interval = poll_interval
+        self.updaters = updaters or []
+        self.fsync = fsync
+        self.imported: List[ImportItem] = []
+        self._imported_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._seen: Dict[str, Tuple[int, float]] = {}
+        self._pending: Dict[str, Tuple[int, float]] = {}
+        self._executors = threading.local()
+        # Targets being moved to; parallel move workers must not pick the same one
+        self._reserved: Set[str] = set()
+        self._reserved_lock = threading.Lock()
+
+        counts = dict(DEFAULT_WORKERS, **(workers or {}))
+        funcs = {
+            'sniff': self.sniff,
+            'convert': self.convert,
+            'tag': self.tag,
+            'move': self.move,
+            'update': self.update,
+        }
+        self.queues: Dict[str, "queue.Queue"] = {name: queue.Queue(maxsize=queue_size) for name in funcs}
+        self.detect_metrics = StageMetrics('detect', 1)
+        self.stages: List[Stage] = []
+        names = list(funcs)
+        for i, name in enumerate(names):
+            output = self.queues[names[i + 1]] if i + 1 < len(names) else None
+            self.stages.append(Stage(name, funcs[name], counts[name], self.queues[name], output))
+
+    # -- pipeline stages -------------------------------------------------
+
+    def detect(self, once: bool = False) -> int:
+        """
+        Poll the incoming folder and queue files whose size and mtime were
+        stable since the previous poll (or immediately, in once mode).
+
+        Returns:
+            Number of files queued
+        """
+        queued = 0
+        current: Dict[str, Tuple[int, float]] = {}
+        for root, dirs, files in os.walk(self.incoming_dir):
+            dirs[:] = [d for d in dirs if not d.startswith('.')]
+            for name in files:
+                if name.startswith('.') or os.path.splitext(name)[1].lower() not in INCOMING_EXTENSIONS:
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                current[path] = (st.st_size, st.st_mtime)
+
+        for path, signature in current.items():
+            if self._seen.get(path) == signature:
+                continue
+            if once or self._pending.get(path) == signature:
+                start = time.monotonic()
+                self._seen[path] = signature
+                # Blocks when sniff is saturated (backpressure reaches the watcher)
+                self.queues['sniff'].put(ImportItem(path=path, size=signature[0]))
+                self.detect_metrics.record(time.monotonic() - start)
+                queued += 1
+        self._pending = current
+        return queued
+
+    def sniff(self, item: ImportItem) -> Optional[ImportItem]:
+        item.kind = sniff_archive(item.path)
+        if item.kind not in ('zip', 'rar'):
+            logger.warning(f"Skipping {item.path}: not a comic archive ({item.kind})")
+            return None
+        return item
+
+    def convert(self, item: ImportItem) -> Optional[ImportItem]:
+        if item.kind == 'rar' or not item.path.lower().endswith('.cbz'):
+            item.path = convert_to_cbz(item.path, kind=item.kind, journal=self.journal, fsync=self.fsync)
+            item.kind = 'zip'
+        return item
+
+    def tag(self, item: ImportItem) -> Optional[ImportItem]:
+        fields = parse_issue_filename(self.templates, os.path.basename(item.path))
+        if fields is None or 'series' not in fields:
+            logger.warning(f"Cannot identify series/issue for {item.path}; leaving in place")
+            return None
+        series = self.index.find(fields['series'], fields.get('year'))
+        if series is None:
+            logger.warning(f"No library series matches '{fields['series']}' for {item.path}; leaving in place")
+            return None
+        fields['series'] = series.series_name
+        item.fields = fields
+        item.series = series
+        item.target = os.path.join(series.series_path, self.templates.render_file(fields, '.cbz'))
+        return item
+
+    def move(self, item: ImportItem) -> Optional[ImportItem]:
+        executor = getattr(self._executors, 'executor', None)
+        if executor is None:
+            executor = self._executors.executor = RenameExecutor(fsync=self.fsync)
+        with self._reserved_lock:
+            if item.target in self._reserved or os.path.lexists(item.target):
+                logger.warning(f"Target already exists, not importing {item.path}: {item.target}")
+                return None
+            self._reserved.add(item.target)
+        try:
+            return self._move(executor, item)
+        finally:
+            with self._reserved_lock:
+                self._reserved.discard(item.target)
+
+    def _move(self, executor: RenameExecutor, item: ImportItem) -> ImportItem:
+        op_id = None
+        if self.journal:
+            op_id = self.journal.begin('move', item.path, item.target, tmp=partial_path(item.target))
+            # Group commit: concurrent move workers share one fsync
+            self.journal.sync()
+        result = RenameResult()
+        try:
+            executor.move(item.path, item.target, result)
+            executor.flush(result)
+        except OSError:
+            if op_id is not None:
+                self.journal.abort([op_id])
+            raise
+        if op_id is not None:
+            self.journal.commit([op_id])
+        item.path = item.target
+        return item
+
+    def update(self, item: ImportItem) -> Optional[ImportItem]:
+        for updater in self.updaters:
+            updater(item)
+        with self._imported_lock:
+            self.imported.append(item)
+        return item
+
+    # -- lifecycle -------------------------------------------------------
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Per-stage throughput, utilization and queue depth"""
+        data = {'detect': self.detect_metrics.snapshot()}
+        for stage in self.stages:
+            data[stage.name] = stage.metrics.snapshot(stage.input_queue)
+        return data
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def flush_updaters(self) -> None:
+        for updater in self.updaters:
+            flush = getattr(updater, 'flush', None)
+            if flush is not None:
+                try:
+                    flush()
+                except Exception as e:
+                    logger.error(f"Updater flush failed: {e}")
+
+    def run(self, once: bool = False, metrics_interval: float = 30.0,
+            metrics_file: Optional[str] = None) -> None:
+        """
+        Run the pipeline until stop() (or, in once mode, until the current
+        contents of the incoming folder have been processed).
+        """
+        if self.journal:
+            self.journal.recover()
+        for stage in self.stages:
+            stage.start()
+
+        reporter = threading.Thread(target=self._report_loop, args=(metrics_interval, metrics_file),
+                                    name="import-metrics", daemon=True)
+        reporter.start()
+        try:
+            if once:
+                self.detect(once=True)
+            else:
+                while not self._stop.is_set():
+                    self.detect()
+                    self._stop.wait(self.poll_interval)
+        finally:
+            # Drain stage by stage so nothing queued is lost
+            for stage in self.stages:
+                stage.stop()
+            self._stop.set()
+            reporter.join()
+            self.flush_updaters()
+            self._write_metrics(metrics_file)
+            if self.journal:
+                self.journal.checkpoint()
+
+    def _report_loop(self, interval: float, metrics_file: Optional[str]) -> None:
+        while not self._stop.wait(interval):
+            self.flush_updaters()
+            self._write_metrics(metrics_file)
+            if self.journal:
+                self.journal.checkpoint()
+
+    def _write_metrics(self, metrics_file: Optional[str]) -> None:
+        metrics = self.metrics()
+        logger.info("Import pipeline: " + ", ".join(
+            f"{name} {m['processed']} ({m['items_per_second']}/s, q={m.get('queue_depth', '-')})"
+            for name, m in metrics.items()
+        ))
+        if metrics_file:
+            tmp = metrics_file + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(metrics, f, indent=2)
+            os.replace(tmp, metrics_file)
+
+
+def parse_worker_counts(values: List[str]) -> Dict[str, int]:
+    """Parse ['convert=8', 'move=2'] into a worker count mapping"""
+    counts: Dict[str, int] = {}
+    for value in values or []:
+        name, _, count = value.partition('=')
+        if name not in DEFAULT_WORKERS or not count.isdigit():
+            raise ValueError(f"Invalid --workers value '{value}' (expected STAGE=N, STAGE one of {', '.join(DEFAULT_WORKERS)})")
+        counts[name] = int(count)
+    return counts
+
+
+def main(argv=None):
+    """CLI entry point for the import daemon"""
+    parser = argparse.ArgumentParser(
+        description="Watch an incoming folder and import comics into the Mylar3 collection",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s /path/to/mylar3/config.ini --incoming /downloads/comics
+  %(prog)s /path/to/mylar3/config.ini --incoming /downloads/comics --once
+  %(prog)s /path/to/mylar3/config.ini --incoming /downloads/comics --workers convert=8 --metrics-file metrics.json
+        """
+    )
+    parser.add_argument('config_path', help='Path to Mylar3 config.ini file')
+    parser.add_argument('--incoming', required=True, help='Folder to watch for new comics')
+    parser.add_argument('--once', action='store_true', help='Import what is there now, then exit')
+    parser.add_argument('--workers', action='append', metavar='STAGE=N',
+                        help='Worker count for a stage (repeatable)')
+    parser.add_argument('--queue-size', type=int, default=64, help='Capacity of each stage queue (default: 64)')
+    parser.add_argument('--poll-interval', type=float, default=5.0, help='Seconds between polls (default: 5)')
+    parser.add_argument('--metrics-interval', type=float, default=30.0,
+                        help='Seconds between metrics reports (default: 30)')
+    parser.add_argument('--metrics-file', help='Write per-stage metrics JSON to this file')
+    parser.add_argument('--journal', help=f'Write-ahead journal path (default: <destination_dir>/{JOURNAL_NAME})')
+    parser.add_argument('--mylar-db', help='Mylar3 database to update (default: mylar.db next to config.ini, if present)')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Enable verbose logging')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format='%(asctime)s %(levelname)s: %(message)s'
+    )
+
+    try:
+        config = load_config(args.config_path)
+        if not os.path.isdir(args.incoming):
+            raise ValueError(f"Incoming folder is not a directory: {args.incoming}")
+        workers = parse_worker_counts(args.workers)
+        library = Mylar3Scanner(config.destination_dir).scan()
+        journal = Journal(args.journal or os.path.join(config.destination_dir, JOURNAL_NAME))
+        updaters = []
+        db_path = args.mylar_db or default_database_path(args.config_path)
+        if args.mylar_db or os.path.exists(db_path):
+            updaters.append(Mylar3DatabaseUpdater(db_path, auto_flush=True))
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    daemon = ImportDaemon(
+        args.incoming, library, NamingTemplates.from_config(config),
+        journal=journal, workers=workers, queue_size=args.queue_size,
+        poll_interval=args.poll_interval, updaters=updaters
+    )
+    signal.signal(signal.SIGINT, lambda signum, frame: daemon.stop())
+    signal.signal(signal.SIGTERM, lambda signum, frame: daemon.stop())
+
+    daemon.run(once=args.once, metrics_interval=args.metrics_interval, metrics_file=args.metrics_file)
+    journal.close()
+    for updater in updaters:
+        updater.close()
+    print(f"Imported {len(daemon.imported)} issues")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,308 @@
+"""
+Write-ahead journal for file mutations performed by comic-file-organizer.
+
+Every convert, rename, move and delete is logged as an intent before it
+touches the filesystem and marked committed afterwards. Intents are
+appended with group commit: concurrent writers share a single write+fsync,
+and batch callers log many intents per fsync.
+
+After a crash, recover() looks only at intents without a commit/abort
+record and either finishes (replays) or undoes (rolls back) each one based
+on what is on disk, so the tree never needs a full rescan to be trusted.
+
+Journal format: one JSON object per line
+    {"type": "begin", "id": 12, "kind": "move", "src": "...", "dst": "...", "tmp": "..."}
+    {"type": "commit", "ids": [12, 13, 14]}
+    {"type": "abort", "ids": [15]}
+"""
+import os
+import json
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+KINDS = {'convert', 'rename', 'move', 'delete'}
+
+
+@dataclass
+class JournalEntry:
+    """A logged file mutation intent"""
+    id: int
+    kind: str
+    src: str
+    dst: Optional[str] = None
+    tmp: Optional[str] = None
+
+
+@dataclass
+class RecoveryReport:
+    """What recover() did with each incomplete intent"""
+    replayed: List[JournalEntry] = field(default_factory=list)
+    rolled_back: List[JournalEntry] = field(default_factory=list)
+    unresolved: List[str] = field(default_factory=list)
+
+    @property
+    def total(self) -> int:
+        return len(self.replayed) + len(self.rolled_back) + len(self.unresolved)
+
+
+class Journal:
+    """Append-only, group-committed write-ahead journal"""
+
+    def __init__(self, path: str, fsync: bool = True):
+        """
+        Args:
+            path: Journal file path (created if missing)
+            fsync: Disable to skip fsync (tests, throwaway trees)
+        """
+        self.path = path
+        self.fsync = fsync
+        self._lock = threading.Lock()        # guards buffer, sequence numbers
+        self._flush_lock = threading.Lock()  # one writer flushes for everyone waiting
+        self._buffer: List[str] = []
+        self._next_id = 1
+        self._appended_seq = 0
+        self._durable_seq = 0
+        self._file = open(path, 'a', encoding='utf-8')
+        self._next_id = self._scan_max_id() + 1
+
+    def _scan_max_id(self) -> int:
+        max_id = 0
+        for record in self._read_records():
+            if record.get('type') == 'begin':
+                max_id = max(max_id, int(record['id']))
+        return max_id
+
+    def close(self) -> None:
+        try:
+            self.sync()
+            self._file.close()
+        except Exception:
+            pass
+
+    def __enter__(self) -> "Journal":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _append(self, record: Dict) -> int:
+        line = json.dumps(record, separators=(',', ':')) + '\n'
+        with self._lock:
+            self._buffer.append(line)
+            self._appended_seq += 1
+            return self._appended_seq
+
+    def begin(self, kind: str, src: str, dst: Optional[str] = None, tmp: Optional[str] = None) -> int:
+        """
+        Log a mutation intent (buffered; call sync() before mutating).
+
+        Returns:
+            Journal id used to commit or abort the operation
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Unknown journal operation kind: {kind}")
+        with self._lock:
+            op_id = self._next_id
+            self._next_id += 1
+        record = {'type': 'begin', 'id': op_id, 'kind': kind, 'src': src}
+        if dst is not None:
+            record['dst'] = dst
+        if tmp is not None:
+            record['tmp'] = tmp
+        self._append(record)
+        return op_id
+
+    def commit(self, ids: Iterable[int]) -> None:
+        """Mark operations complete (buffered; durable with the next sync)"""
+        ids = list(ids)
+        if ids:
+            self._append({'type': 'commit', 'ids': ids})
+
+    def abort(self, ids: Iterable[int]) -> None:
+        """Mark operations abandoned with nothing left on disk to undo"""
+        ids = list(ids)
+        if ids:
+            self._append({'type': 'abort', 'ids': ids})
+
+    def sync(self) -> None:
+        """
+        Make everything appended so far durable.
+
+        Group commit: if another thread's flush already covered our records
+        we return without writing; otherwise we flush the whole buffer,
+        covering every waiter with a single fsync.
+        """
+        with self._lock:
+            target = self._appended_seq
+        if self._durable_seq >= target:
+            return
+        with self._flush_lock:
+            if self._durable_seq >= target:
+                return
+            with self._lock:
+                lines, self._buffer = self._buffer, []
+                covered = self._appended_seq
+            if lines:
+                self._file.write(''.join(lines))
+                self._file.flush()
+                if self.fsync:
+                    os.fsync(self._file.fileno())
+            self._durable_seq = covered
+
+    def _read_records(self) -> Iterable[Dict]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        # Torn final write from a crash: the intent never became durable
+                        logger.warning(f"Ignoring truncated journal record in {self.path}")
+        except FileNotFoundError:
+            return
+
+    def incomplete(self) -> List[JournalEntry]:
+        """Intents that were logged but never committed or aborted"""
+        self.sync()
+        return self._incomplete_on_disk()
+
+    def _incomplete_on_disk(self) -> List[JournalEntry]:
+        pending: Dict[int, JournalEntry] = {}
+        for record in self._read_records():
+            record_type = record.get('type')
+            if record_type == 'begin':
+                pending[record['id']] = JournalEntry(
+                    id=record['id'], kind=record['kind'], src=record['src'],
+                    dst=record.get('dst'), tmp=record.get('tmp')
+                )
+            elif record_type in ('commit', 'abort'):
+                for op_id in record.get('ids', []):
+                    pending.pop(op_id, None)
+        return list(pending.values())
+
+    def recover(self) -> RecoveryReport:
+        """
+        Resolve every incomplete intent, then checkpoint the journal.
+
+        - move/rename/convert: if the target exists the operation reached its
+          commit point (targets only appear via an atomic rename after the
+          data was synced), so any leftover source is removed (replay).
+          Otherwise a partial temp file is removed and the source is kept
+          (roll back).
+        - delete: a still-present path is deleted (replay).
+
+        Unresolvable entries are reported and left in the journal.
+        """
+        report = RecoveryReport()
+        committed: List[int] = []
+        aborted: List[int] = []
+        for entry in self.incomplete():
+            try:
+                outcome = self._resolve(entry)
+            except OSError as e:
+                report.unresolved.append(f"{entry.kind} {entry.src}: {e}")
+                continue
+            if outcome == 'replayed':
+                report.replayed.append(entry)
+                committed.append(entry.id)
+            elif outcome == 'rolled_back':
+                report.rolled_back.append(entry)
+                aborted.append(entry.id)
+            else:
+                report.unresolved.append(f"{entry.kind} {entry.src}: {outcome}")
+        self.commit(committed)
+        self.abort(aborted)
+        self.sync()
+        if not report.unresolved:
+            self.checkpoint()
+        if report.total:
+            logger.info(f"Journal recovery: {len(report.replayed)} replayed, "
+                        f"{len(report.rolled_back)} rolled back, {len(report.unresolved)} unresolved")
+        return report
+
+    def _resolve(self, entry: JournalEntry) -> str:
+        if entry.kind == 'delete':
+            if os.path.lexists(entry.src):
+                os.unlink(entry.src)
+            return 'replayed'
+
+        if entry.dst and os.path.lexists(entry.dst):
+            if os.path.lexists(entry.src) and entry.src != entry.dst:
+                # A case-only rename on a case-insensitive filesystem: both
+                # names resolve to the one file, which must not be unlinked
+                if _same_file(entry.src, entry.dst):
+                    return 'replayed'
+                if entry.kind != 'convert' and not _same_size(entry.src, entry.dst):
+                    return "source and target both exist with different sizes"
+                os.unlink(entry.src)
+            if entry.tmp and os.path.lexists(entry.tmp):
+                os.unlink(entry.tmp)
+            return 'replayed'
+
+        if os.path.lexists(entry.src):
+            if entry.tmp and os.path.lexists(entry.tmp):
+                os.unlink(entry.tmp)
+            return 'rolled_back'
+
+        return "neither source nor target exists"
+
+    def checkpoint(self) -> bool:
+        """
+        Truncate the journal if nothing on disk is in flight.
+
+        Safe to call while other threads are logging: records only reach
+        the file under the flush lock, which is held across the check and
+        the truncation; records still buffered are written afterwards.
+
+        Returns:
+            True if the journal was truncated
+        """
+        self.sync()
+        with self._flush_lock:
+            if self._incomplete_on_disk():
+                return False
+            self._file.close()
+            self._file = open(self.path, 'w', encoding='utf-8')
+            if self.fsync:
+                os.fsync(self._file.fileno())
+        return True
+
+
+def _same_file(a: str, b: str) -> bool:
+    try:
+        return os.path.samefile(a, b)
+    except OSError:
+        return False
+
+
+def _same_size(a: str, b: str) -> bool:
+    try:
+        return os.path.getsize(a) == os.path.getsize(b)
+    except OSError:
+        return False
+
+
+if __name__ == "__main__":
+    import sys
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+
+    if len(sys.argv) < 2:
+        print("Usage: python3 -m comic_file_organizer.journal /path/to/journal [--recover]")
+        sys.exit(1)
+
+    journal = Journal(sys.argv[1])
+    pending = journal.incomplete()
+    print(f"Incomplete operations: {len(pending)}")
+    for entry in pending:
+        print(f"  #{entry.id} {entry.kind}: {entry.src} -> {entry.dst or ''}")
+    if '--recover' in sys.argv[2:]:
+        report = journal.recover()
+        print(f"Replayed {len(report.replayed)}, rolled back {len(report.rolled_back)}, "
+              f"unresolved {len(report.unresolved)}")
+    journal.close()
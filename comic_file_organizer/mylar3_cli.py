@@ -3,21 +3,39 @@ CLI for Mylar3 collection statistics.
 
 Usage:
     python3 -m comic_file_organizer.mylar3_cli /path/to/config.ini
+    python3 -m comic_file_organizer.mylar3_cli /path/to/config.ini --report full=nightly.txt --report summary=summary.json
+    python3 -m comic_file_organizer.mylar3_cli serve /path/to/config.ini --port 8765
 """
+import os
 import sys
 import argparse
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional
 from collections import defaultdict
+from contextlib import nullcontext
 try:
     from comic_file_organizer.mylar3_config import load_config
-    from comic_file_organizer.mylar3_scanner import Mylar3Scanner, SeriesInfo
-    from comic_file_organizer.mylar3_stats import calculate_statistics
+    from comic_file_organizer.mylar3_scanner import Mylar3Scanner, ScanResults, SeriesInfo
+    from comic_file_organizer.mylar3_stats import DistributionStats, calculate_statistics
+    from comic_file_organizer.mylar3_query import GROUP_FIELDS, SeriesQueryIndex
+    from comic_file_organizer.report_output import FORMATS, TextReport, TextTable, make_emitter, text_report
 except ModuleNotFoundError:
     from mylar3_config import load_config
-    from mylar3_scanner import Mylar3Scanner, SeriesInfo
-    from mylar3_stats import calculate_statistics
+    from mylar3_scanner import Mylar3Scanner, ScanResults, SeriesInfo
+    from mylar3_stats import DistributionStats, calculate_statistics
+    from mylar3_query import GROUP_FIELDS, SeriesQueryIndex
+    from report_output import FORMATS, TextReport, TextTable, make_emitter, text_report
+
+# History (sqlite3), estimates, device scheduling, progress and profiling
+# are imported by the options that use them, so plain runs and --help
+# skip them. Their option values are mirrored here (tests keep them in sync).
+TREND_PERIODS = ('day', 'month', 'week')  # mylar3_history.PERIODS
+DEVICE_KINDS = ('rotational', 'ssd', 'network', 'unknown')  # scan_scheduler.DEVICE_KINDS
+DEFAULT_FRACTION = 0.05  # mylar3_estimate.DEFAULT_FRACTION
+PROFILE_MODES = ('cprofile', 'sample')  # profiling.PROFILE_MODES
 
 
 def format_table_row(columns, widths):
@@ -54,7 +72,7 @@ def format_size(size_bytes: int) -> str:
     return f"{size_bytes:.1f}PB"
 
 
-def print_publisher_detail_report(scan_results, publisher_name: str):
+def print_publisher_detail_report(scan_results, publisher_name: str, index=None, report=None):
     """
     Print detailed report for a specific publisher showing file types and sizes per series.
     
@@ -65,249 +83,820 @@ def print_publisher_detail_report(scan_results, publisher_name: str):
       Spider-man  | CBR |   14 | 250MB |  TTL
                           | CBZ |  122| 2.8GB    | 3.1GB
     """
-    # Find publisher (case-insensitive)
-    publisher_lower = publisher_name.lower()
-    matching_publisher = None
-    for pub in scan_results.publishers:
-        if pub.lower() == publisher_lower:
-            matching_publisher = pub
-            break
-    
-    if not matching_publisher:
-        print(f"Error: Publisher '{publisher_name}' not found in collection.")
-        print(f"Available publishers: {', '.join(sorted(scan_results.publishers))}")
-        return
-    
-    # Get all series for this publisher
-    publisher_series = [s for s in scan_results.series if s.publisher.lower() == publisher_lower]
-    publisher_series.sort(key=lambda s: s.series_name.lower())
-    
-    if not publisher_series:
-        print(f"No series found for publisher '{matching_publisher}'")
-        return
-    
-    # Calculate totals
-    total_series = len(publisher_series)
-    total_by_type: Dict[str, int] = defaultdict(int)  # Count by type
-    total_size_by_type: Dict[str, int] = defaultdict(int)  # Size by type
-    
-    for series in publisher_series:
-        for file_type, count in series.file_type_counts.items():
-            total_by_type[file_type] += count
-        for file_type, size in series.file_type_sizes.items():
-            total_size_by_type[file_type] += size
-    
-    # Print header
-    print("=" * 70)
-    print(f"PUBLISHER DETAIL REPORT: {matching_publisher}")
-    print("=" * 70)
-    print()
-    
-    # Print publisher summary line (matches example style)
-    print(f"{'Publisher':<20} | {'Series':>5}")
-    print("-" * 70)
-    print(f"{matching_publisher:<20} | {total_series:>5}")
-    print()
-    
-    # Print each series with file type breakdown
-    for series in publisher_series:
-        # Series name line
-        series_display = series.series_name
-        if series.year:
-            series_display += f" ({series.year})"
-        
-        # Get all file types for this series, sorted
-        file_types = sorted(set(series.file_type_counts.keys()) | set(series.file_type_sizes.keys()))
-        
-        if not file_types:
-            print(f"  {series_display}")
-            print("    (no comic files)")
-            print()
-            continue
-        
-        # Print series name
-        print(f"  {series_display}")
-        
-        # Print file type rows (indented, matching example style)
-        for file_type in file_types:
-            count = series.file_type_counts.get(file_type, 0)
-            size_bytes = series.file_type_sizes.get(file_type, 0)
-            size_str = format_size(size_bytes)
-            print(f"    {'':>20} | {file_type:>3} | {count:>5} | {size_str:>10}")
-        
-        # Print series total (TTL)
-        series_total = series.total_size_bytes
-        series_total_str = format_size(series_total)
-        print(f"    {'':>20} {'TTL':>3} {'':>5} {series_total_str:>10}")
-        print()
-    
-    # Print publisher totals
-    print("-" * 70)
-    all_types = sorted(set(total_by_type.keys()) | set(total_size_by_type.keys()))
-    
-    if all_types:
-        # Print header for totals
-        print(f"{'Publisher Totals':>20} |", end="")
-        for file_type in all_types:
-            print(f" {file_type:>3} |", end="")
-        print(f" {'Total':>10}")
-        
-        # Print counts
-        print(f"{'':>20} |", end="")
-        for file_type in all_types:
-            count = total_by_type.get(file_type, 0)
-            print(f" {count:>5} |", end="")
-        print()
-        
-        # Print sizes
-        print(f"{'':>20} |", end="")
-        for file_type in all_types:
-            size_bytes = total_size_by_type.get(file_type, 0)
-            size_str = format_size(size_bytes)
-            print(f" {size_str:>10} |", end="")
-        
-        # Grand total
-        grand_total = sum(total_size_by_type.values())
-        grand_total_str = format_size(grand_total)
-        print(f" {grand_total_str:>10}")
-    
-    print("=" * 70)
-    print()
-
-
-def print_summary(stats):
+    with text_report(report) as out:
+        # Find publisher (case-insensitive)
+        publisher_lower = publisher_name.lower()
+        matching_publisher = None
+        for pub in scan_results.publishers:
+            if pub.lower() == publisher_lower:
+                matching_publisher = pub
+                break
+        
+        if not matching_publisher:
+            out.line(f"Error: Publisher '{publisher_name}' not found in collection.")
+            out.line(f"Available publishers: {', '.join(sorted(scan_results.publishers))}")
+            return
+        
+        # Get all series for this publisher
+        index = index or SeriesQueryIndex(scan_results)
+        publisher_series = index.lookup('publisher', publisher_lower)
+        publisher_series.sort(key=lambda s: s.series_name.lower())
+        
+        if not publisher_series:
+            out.line(f"No series found for publisher '{matching_publisher}'")
+            return
+        
+        # Calculate totals
+        total_series = len(publisher_series)
+        total_by_type: Dict[str, int] = defaultdict(int)  # Count by type
+        total_size_by_type: Dict[str, int] = defaultdict(int)  # Size by type
+        
+        for series in publisher_series:
+            for file_type, count in series.file_type_counts.items():
+                total_by_type[file_type] += count
+            for file_type, size in series.file_type_sizes.items():
+                total_size_by_type[file_type] += size
+        
+        # Header and publisher summary line (matches example style)
+        out.banner(f"PUBLISHER DETAIL REPORT: {matching_publisher}")
+        out.line(f"{'Publisher':<20} | {'Series':>5}")
+        out.line("-" * 70)
+        out.line(f"{matching_publisher:<20} | {total_series:>5}")
+        out.line()
+        
+        # Row layouts for the file type breakdown, built once for every series
+        pad = " " * 20
+        file_type_row = f"    {pad} | {{:>3}} | {{:>5}} | {{:>10}}\n".format
+        series_total_row = f"    {pad} TTL {' ' * 5} {{:>10}}\n\n".format
+        
+        # Each series with its file type rows and total (TTL)
+        write = out.write
+        for series in publisher_series:
+            series_display = series.series_name
+            if series.year:
+                series_display += f" ({series.year})"
+            write(f"  {series_display}\n")
+            
+            file_types = sorted(set(series.file_type_counts.keys()) | set(series.file_type_sizes.keys()))
+            if not file_types:
+                write("    (no comic files)\n\n")
+                continue
+            
+            for file_type in file_types:
+                count = series.file_type_counts.get(file_type, 0)
+                size_bytes = series.file_type_sizes.get(file_type, 0)
+                write(file_type_row(file_type, count, format_size(size_bytes)))
+            write(series_total_row(format_size(series.total_size_bytes)))
+        
+        # Publisher totals: a column per file type, then the grand total
+        out.line("-" * 70)
+        all_types = sorted(set(total_by_type.keys()) | set(total_size_by_type.keys()))
+        
+        if all_types:
+            out.line(f"{'Publisher Totals':>20} |"
+                     + "".join(f" {file_type:>3} |" for file_type in all_types)
+                     + f" {'Total':>10}")
+            out.line(f"{'':>20} |"
+                     + "".join(f" {total_by_type.get(file_type, 0):>5} |" for file_type in all_types))
+            grand_total = sum(total_size_by_type.values())
+            out.line(f"{'':>20} |"
+                     + "".join(f" {format_size(total_size_by_type.get(file_type, 0)):>10} |"
+                               for file_type in all_types)
+                     + f" {format_size(grand_total):>10}")
+        
+        out.line("=" * 70)
+        out.line()
+
+
+def print_summary(stats, report=None):
     """Print collection summary"""
-    print("=" * 70)
-    print("MYLAR3 COLLECTION STATISTICS")
-    print("=" * 70)
-    print()
-    
-    print(f"Collection Path: {stats.scan_results.destination_dir}")
-    print()
-    
-    # Publisher stats
-    print(f"Total Publishers: {stats.total_publishers}")
-    if stats.total_publishers > 0:
-        print(f"  {', '.join(sorted(stats.publishers.keys()))}")
-    print()
-    
-    # Series stats
-    print(f"Total Series: {stats.total_series}")
-    print(f"  Series with issues: {stats.series_with_issues}")
-    print(f"  Series followed only: {stats.series_followed_only}")
-    print(f"  Complete series: {stats.complete_series}")
-    print()
-    
-    # Issue stats
-    print(f"Total Issues Owned: {stats.total_issues_owned:,}")
-    print(f"Total Missing Issues: {stats.total_missing_issues:,}")
-    print(f"Overall Completion: {stats.overall_completion_percentage:.1f}%")
-    if stats.series_with_issues > 0:
-        print(f"Average Issues per Series: {stats.average_issues_per_series:.1f}")
-    print()
-
-
-def print_publisher_breakdown(stats):
+    with text_report(report) as out:
+        out.banner("MYLAR3 COLLECTION STATISTICS")
+        
+        out.line(f"Collection Path: {stats.scan_results.destination_dir}")
+        out.line()
+        
+        # Publisher stats
+        out.line(f"Total Publishers: {stats.total_publishers}")
+        if stats.total_publishers > 0:
+            out.line(f"  {', '.join(sorted(stats.publishers.keys()))}")
+        out.line()
+        
+        # Series stats
+        out.line(f"Total Series: {stats.total_series}")
+        out.line(f"  Series with issues: {stats.series_with_issues}")
+        out.line(f"  Series followed only: {stats.series_followed_only}")
+        out.line(f"  Complete series: {stats.complete_series}")
+        out.line()
+        
+        # Issue stats
+        out.line(f"Total Issues Owned: {stats.total_issues_owned:,}")
+        out.line(f"Total Missing Issues: {stats.total_missing_issues:,}")
+        out.line(f"Overall Completion: {stats.overall_completion_percentage:.1f}%")
+        if stats.series_with_issues > 0:
+            out.line(f"Average Issues per Series: {stats.average_issues_per_series:.1f}")
+        out.line()
+
+
+def print_publisher_breakdown(stats, report=None):
     """Print per-publisher statistics table"""
     if not stats.publishers:
         return
     
-    print("=" * 70)
-    print("BY PUBLISHER")
-    print("=" * 70)
-    print()
-    
-    # Table headers
-    headers = ["Publisher", "Series", "With Issues", "Complete", "Issues Owned", "Missing"]
-    widths = [20, 8, 12, 9, 13, 10]
-    
-    print(format_table_row(headers, widths))
-    print(format_separator(widths))
-    
-    # Sort publishers by name
-    for pub_name in sorted(stats.publishers.keys()):
-        pub_stats = stats.publishers[pub_name]
-        row = [
-            pub_name,
-            pub_stats.total_series,
-            pub_stats.series_with_issues,
-            pub_stats.complete_series,
-            f"{pub_stats.total_issues_owned:,}",
-            f"{pub_stats.total_missing_issues:,}"
-        ]
-        print(format_table_row(row, widths))
-    print()
-
-
-def print_series_details(stats, limit=20):
+    with text_report(report) as out:
+        out.banner("BY PUBLISHER")
+        
+        # Sort publishers by name
+        headers = ["Publisher", "Series", "With Issues", "Complete", "Issues Owned", "Missing"]
+        out.table(TextTable([20, 8, 12, 9, 13, 10]), headers, (
+            [
+                pub_name,
+                pub_stats.total_series,
+                pub_stats.series_with_issues,
+                pub_stats.complete_series,
+                f"{pub_stats.total_issues_owned:,}",
+                f"{pub_stats.total_missing_issues:,}"
+            ]
+            for pub_name, pub_stats in sorted(stats.publishers.items())
+        ))
+        out.line()
+
+
+def print_series_details(stats, limit=20, report=None):
     """Print detailed series information"""
-    print("=" * 70)
-    print(f"SERIES DETAILS (showing first {limit})")
-    print("=" * 70)
-    print()
+    with text_report(report) as out:
+        out.banner(f"SERIES DETAILS (showing first {limit})")
+        
+        def rows():
+            # First `limit` series by publisher, then series name
+            for series in stats.get_series_by_name(limit):
+                # Truncate long series names
+                name = series.series_name
+                yield [
+                    name[:33] + "..." if len(name) > 35 else name,
+                    series.year or "?",
+                    series.issues_owned,
+                    series.total_issues,
+                    f"{series.completion_percentage:.1f}%",
+                    series.status or "Unknown"
+                ]
+        
+        headers = ["Series", "Year", "Owned", "Total", "Complete", "Status"]
+        out.table(TextTable([35, 6, 7, 7, 9, 12]), headers, rows())
+        
+        if stats.total_series > limit:
+            out.line(f"\n... and {stats.total_series - limit} more series")
+        out.line()
+
+
+def _series_entries(series_list):
+    """Numbered two-line entries used by the top lists"""
+    for i, series in enumerate(series_list, 1):
+        yield f"{i:2}. {series.series_name} ({series.year})"
+        yield (f"    {series.issues_owned}/{series.total_issues} owned, {series.missing_issues} missing "
+               f"({series.completion_percentage:.1f}%)")
+
+
+def print_top_lists(stats, report=None):
+    """Print top incomplete and most complete series"""
+    with text_report(report) as out:
+        out.banner("MOST INCOMPLETE SERIES (by missing issue count)")
+        incomplete = stats.get_most_incomplete_series(10)
+        if incomplete:
+            out.lines(_series_entries(incomplete))
+        else:
+            out.line("  No series with issues found")
+        out.line()
+        
+        out.banner("CLOSEST TO COMPLETION (not yet complete)")
+        near_complete = stats.get_most_complete_series(10)
+        if near_complete:
+            out.lines(_series_entries(near_complete))
+        else:
+            out.line("  No incomplete series found")
+        out.line()
+
+
+def print_group_by(groups, field_name: str, report=None):
+    """Print aggregate counters per group (e.g. per decade)"""
+    with text_report(report) as out:
+        out.banner(f"BY {field_name.upper()}")
+        
+        def rows():
+            # Unknown values (None) sort last
+            for key in sorted(groups, key=lambda k: (k is None, k if k is not None else 0)):
+                counts = groups[key]
+                label = "Unknown" if key is None else (f"{key}s" if field_name == 'decade' else str(key))
+                yield [
+                    label[:20],
+                    counts.total_series,
+                    counts.series_with_issues,
+                    counts.complete_series,
+                    f"{counts.total_issues_owned:,}",
+                    f"{counts.total_missing_issues:,}",
+                    f"{counts.completion_percentage:.1f}%",
+                ]
+        
+        headers = [field_name.capitalize(), "Series", "With Issues", "Complete", "Issues Owned", "Missing", "Completion"]
+        out.table(TextTable([20, 8, 11, 8, 12, 9, 10]), headers, rows())
+        out.line()
+
+
+# Size histogram edges in bytes for --distributions
+MB = 1024 ** 2
+GB = 1024 * MB
+ISSUE_SIZE_EDGES = (10 * MB, 25 * MB, 50 * MB, 100 * MB)
+SERIES_SIZE_EDGES = (100 * MB, 500 * MB, GB, 5 * GB)
+
+
+def size_ranges(edges):
+    """
+    Labels and record keys of the ranges LogHistogramSketch.histogram(edges) counts.
     
-    # Table headers
-    headers = ["Series", "Year", "Owned", "Total", "Complete", "Status"]
-    widths = [35, 6, 7, 7, 9, 12]
+    Returns:
+        [(label, key)], e.g. ("<10MB", "under_10MB"), ("10MB-25MB", "10MB_25MB"),
+        ("100MB+", "100MB_up")
+    """
+    sizes = [f"{edge // GB}GB" if edge % GB == 0 else f"{edge // MB}MB" for edge in edges]
+    ranges = [(f"<{sizes[0]}", f"under_{sizes[0]}")]
+    ranges += [(f"{low}-{high}", f"{low}_{high}") for low, high in zip(sizes, sizes[1:])]
+    ranges.append((f"{sizes[-1]}+", f"{sizes[-1]}_up"))
+    return ranges
+
+
+def print_distributions(distributions, report=None):
+    """Print median/p90/p99 of file sizes, series sizes and completion, and size histograms"""
+    def sizes(sketch):
+        if not sketch.count:
+            return "-"
+        return " / ".join(format_size(int(v)) for v in sketch.quantiles().values())
     
-    print(format_table_row(headers, widths))
-    print(format_separator(widths))
+    def percents(sketch):
+        if not sketch.count:
+            return "-"
+        return " / ".join(f"{v:.0f}%" for v in sketch.quantiles().values())
     
-    # Sort by publisher, then series name
-    sorted_series = sorted(stats.scan_results.series, key=lambda s: (s.publisher, s.series_name))
+    def row(name, sketches):
+        return [name[:20], sizes(sketches.file_size), sizes(sketches.series_size), percents(sketches.completion)]
     
-    for series in sorted_series[:limit]:
-        # Truncate long series names
-        series_display = series.series_name[:33] + "..." if len(series.series_name) > 35 else series.series_name
+    with text_report(report) as out:
+        out.banner("DISTRIBUTIONS (median / p90 / p99)")
+        
+        table = TextTable([20, 24, 24, 20])
+        collection = distributions.collection()
+        out.table(table, ["Publisher", "Issue Size", "Series Size", "Completion"], (
+            row(name, distributions.publishers[name]) for name in sorted(distributions.publishers)
+        ))
+        out.line(table.rule)
+        out.line(table.row(row("All publishers", collection)))
+        out.line()
+        
+        # Completion histogram, 10% buckets
+        histogram = collection.completion.histogram(10)
+        peak = max(histogram) or 1
+        out.line("Completion (series with issues):")
+        for i, count in enumerate(histogram):
+            label = f"{i * 10:>3}-{i * 10 + 10}%"
+            out.line(f"  {label:>8} | {'#' * round(count / peak * 40):<40} {count:,}")
+        out.line()
+        
+        # Issue and series size histograms, per publisher and for the collection
+        for title, metric, edges in (("Issue Size", 'file_size', ISSUE_SIZE_EDGES),
+                                     ("Series Size", 'series_size', SERIES_SIZE_EDGES)):
+            labels = [label for label, _ in size_ranges(edges)]
+            table = TextTable([20] + [11] * len(labels), '<' + '>' * len(labels))
+            
+            def counts(name, sketches):
+                return [name[:20]] + [f"{count:,}" for count in getattr(sketches, metric).histogram(edges)]
+            
+            out.table(table, [title] + labels, (
+                counts(name, distributions.publishers[name]) for name in sorted(distributions.publishers)
+            ))
+            out.line(table.rule)
+            out.line(table.row(counts("All publishers", collection)))
+            out.line()
+
+
+def print_trend(points, period: str, publisher: str = None, report=None):
+    """Print growth per period from the statistics history"""
+    scope = publisher or "Collection"
+    with text_report(report) as out:
+        out.banner(f"TREND BY {period.upper()}: {scope}")
         
-        row = [
-            series_display,
-            series.year or "?",
-            series.issues_owned,
-            series.total_issues,
-            f"{series.completion_percentage:.1f}%",
-            series.status or "Unknown"
-        ]
-        print(format_table_row(row, widths))
+        if not points:
+            out.line("  No history recorded yet (run with --history to record)")
+            out.line()
+            return
+        
+        def rows():
+            previous = None
+            for point in points:
+                if previous is None:
+                    issues_change, size_change = "", ""
+                else:
+                    issues_change = f"{point.issues_owned - previous.issues_owned:+,}"
+                    size_delta = point.total_bytes - previous.total_bytes
+                    size_change = ("-" if size_delta < 0 else "+") + format_size(abs(size_delta))
+                yield [
+                    point.period,
+                    f"{point.total_series:,}",
+                    f"{point.issues_owned:,}",
+                    issues_change,
+                    f"{point.completion_percentage:.1f}%",
+                    format_size(point.total_bytes),
+                    size_change,
+                ]
+                previous = point
+        
+        headers = ["Period", "Series", "Issues Owned", "Change", "Complete", "Disk Usage", "Change"]
+        out.table(TextTable([10, 7, 12, 8, 8, 10, 10]), headers, rows())
+        out.line()
+
+
+# Estimated metrics: (label, CollectionEstimate attribute, value format)
+ESTIMATE_METRICS = [
+    ("Series", 'series', lambda v: f"{v:,.0f}"),
+    ("Series with issues", 'series_with_issues', lambda v: f"{v:,.0f}"),
+    ("Complete series", 'complete_series', lambda v: f"{v:,.0f}"),
+    ("Issues owned", 'issues_owned', lambda v: f"{v:,.0f}"),
+    ("Missing issues", 'missing_issues', lambda v: f"{v:,.0f}"),
+    ("Total size", 'size_bytes', lambda v: format_size(int(v))),
+    ("Completion", 'completion_percentage', lambda v: f"{v:.1f}%"),
+]
+
+
+def print_estimate(estimate, report=None):
+    """Print sampled estimates with their confidence intervals"""
+    with text_report(report) as out:
+        out.banner("ESTIMATED COLLECTION STATISTICS")
+        
+        out.line(f"Collection Path: {estimate.destination_dir}")
+        share = estimate.sampled / estimate.population * 100 if estimate.population else 0.0
+        out.line(f"Sampled {estimate.sampled:,} of {estimate.population:,} series directories "
+                 f"({share:.1f}%) in {estimate.elapsed_seconds:.1f}s")
+        out.line()
+        
+        def rows(metrics):
+            for label, estimate_value, fmt in metrics:
+                yield [label, fmt(estimate_value.value),
+                       f"{fmt(estimate_value.low)} - {fmt(estimate_value.high)}"]
+        
+        confidence = f"{estimate.confidence:.0%} interval"
+        table = TextTable([20, 12, 27], align='<><')
+        out.table(table, ["Metric", "Estimate", confidence], rows(
+            (label, getattr(estimate, name), fmt) for label, name, fmt in ESTIMATE_METRICS
+        ))
+        out.line()
+        
+        if estimate.size_by_file_type:
+            out.banner("ESTIMATED BY FILE TYPE")
+            out.table(table, ["File Type", "Estimate", confidence], rows(
+                [(f"{file_type} files", estimate.count_by_file_type[file_type], lambda v: f"{v:,.0f}")
+                 for file_type in estimate.size_by_file_type]
+                + [(f"{file_type} size", estimate.size_by_file_type[file_type], lambda v: format_size(int(v)))
+                   for file_type in estimate.size_by_file_type]
+            ))
+            out.line()
+
+
+# Structured output (--format json/ndjson/csv): one record per row, sizes in bytes
+
+def summary_record(stats) -> dict:
+    """Collection summary as a flat record"""
+    return {
+        'destination_dir': stats.scan_results.destination_dir,
+        'total_publishers': stats.total_publishers,
+        'total_series': stats.total_series,
+        'series_with_issues': stats.series_with_issues,
+        'series_followed_only': stats.series_followed_only,
+        'complete_series': stats.complete_series,
+        'total_issues_owned': stats.total_issues_owned,
+        'total_missing_issues': stats.total_missing_issues,
+        'overall_completion_percentage': round(stats.overall_completion_percentage, 2),
+        'average_issues_per_series': round(stats.average_issues_per_series, 2),
+    }
+
+
+def publisher_record(pub_stats) -> dict:
+    return {
+        'publisher': pub_stats.name,
+        'total_series': pub_stats.total_series,
+        'series_with_issues': pub_stats.series_with_issues,
+        'series_followed_only': pub_stats.series_followed_only,
+        'complete_series': pub_stats.complete_series,
+        'total_issues_owned': pub_stats.total_issues_owned,
+        'total_missing_issues': pub_stats.total_missing_issues,
+    }
+
+
+def series_record(series: SeriesInfo) -> dict:
+    return {
+        'publisher': series.publisher,
+        'series': series.series_name,
+        'year': series.year,
+        'comicid': series.comicid,
+        'status': series.status,
+        'issues_owned': series.issues_owned,
+        'total_issues': series.total_issues,
+        'missing_issues': series.missing_issues,
+        'completion_percentage': round(series.completion_percentage, 2),
+        'size_bytes': series.total_size_bytes,
+    }
+
+
+def group_record(field_name: str, key, counts) -> dict:
+    return {
+        field_name: key,
+        'total_series': counts.total_series,
+        'series_with_issues': counts.series_with_issues,
+        'complete_series': counts.complete_series,
+        'total_issues_owned': counts.total_issues_owned,
+        'total_missing_issues': counts.total_missing_issues,
+        'completion_percentage': round(counts.completion_percentage, 2),
+        'size_bytes': counts.total_size_bytes,
+    }
+
+
+def distribution_records(distributions):
+    """
+    Median/p90/p99 and size histogram counts per publisher, then one row
+    for the whole collection
+    """
+    collection = distributions.collection()
+    rows = [(name, distributions.publishers[name]) for name in sorted(distributions.publishers)]
+    issue_ranges = [key for _, key in size_ranges(ISSUE_SIZE_EDGES)]
+    series_ranges = [key for _, key in size_ranges(SERIES_SIZE_EDGES)]
+    for name, sketches in rows + [(None, collection)]:
+        record = {'publisher': name}
+        for metric, sketch in (('issue_size', sketches.file_size),
+                               ('series_size', sketches.series_size),
+                               ('completion', sketches.completion)):
+            for q, value in sketch.quantiles().items():
+                record[f"{metric}_p{round(q * 100)}"] = None if value is None else round(value, 2)
+        for metric, keys, sketch, edges in (('issue_size', issue_ranges, sketches.file_size, ISSUE_SIZE_EDGES),
+                                            ('series_size', series_ranges, sketches.series_size, SERIES_SIZE_EDGES)):
+            for key, count in zip(keys, sketch.histogram(edges)):
+                record[f"{metric}_{key}"] = count
+        yield record
+
+
+def estimate_records(estimate):
+    """One record per estimated metric (collection-wide, then per file type)"""
+    def record(metric, file_type, value, digits=None):
+        return {'metric': metric, 'file_type': file_type, 'estimate': round(value.value, digits),
+                'low': round(value.low, digits), 'high': round(value.high, digits)}
     
-    if len(sorted_series) > limit:
-        print(f"\n... and {len(sorted_series) - limit} more series")
-    print()
+    for _, name, _ in ESTIMATE_METRICS:
+        yield record(name, None, getattr(estimate, name), 2 if name == 'completion_percentage' else None)
+    for file_type, value in estimate.count_by_file_type.items():
+        yield record('issues_owned', file_type, value)
+    for file_type, value in estimate.size_by_file_type.items():
+        yield record('size_bytes', file_type, value)
 
 
-def print_top_lists(stats):
-    """Print top incomplete and most complete series"""
-    print("=" * 70)
-    print("MOST INCOMPLETE SERIES (by missing issue count)")
-    print("=" * 70)
-    print()
-    
-    incomplete = stats.get_most_incomplete_series(10)
-    if incomplete:
-        for i, series in enumerate(incomplete, 1):
-            print(f"{i:2}. {series.series_name} ({series.year})")
-            print(f"    {series.issues_owned}/{series.total_issues} owned, {series.missing_issues} missing ({series.completion_percentage:.1f}%)")
+def emit_publisher_detail_report(emitter, scan_results, publisher_names, index=None) -> bool:
+    """
+    Structured counterpart of print_publisher_detail_report: one
+    publisher_series row per series and file type, then publisher_totals
+    per publisher and file type.
+    
+    Args:
+        publisher_names: A publisher name or a list of them (case-insensitive)
+    
+    Returns:
+        False if a publisher is not in the collection
+    """
+    if isinstance(publisher_names, str):
+        publisher_names = [publisher_names]
+    by_lower = {p.lower(): p for p in scan_results.publishers}
+    missing = [name for name in publisher_names if name.lower() not in by_lower]
+    if missing:
+        for name in missing:
+            print(f"Error: Publisher '{name}' not found in collection.", file=sys.stderr)
+        print(f"Available publishers: {', '.join(sorted(scan_results.publishers))}", file=sys.stderr)
+        return False
+    
+    index = index or SeriesQueryIndex(scan_results)
+    publishers = list(dict.fromkeys(by_lower[name.lower()] for name in publisher_names))
+    totals: Dict[tuple, list] = {}  # (publisher, file type) -> [count, size]
+    
+    def series_rows():
+        for publisher in publishers:
+            publisher_series = index.lookup('publisher', publisher)
+            publisher_series.sort(key=lambda s: s.series_name.lower())
+            for series in publisher_series:
+                for file_type in sorted(set(series.file_type_counts) | set(series.file_type_sizes)):
+                    count = series.file_type_counts.get(file_type, 0)
+                    size_bytes = series.file_type_sizes.get(file_type, 0)
+                    total = totals.setdefault((publisher, file_type), [0, 0])
+                    total[0] += count
+                    total[1] += size_bytes
+                    yield {
+                        'publisher': publisher,
+                        'series': series.series_name,
+                        'year': series.year,
+                        'file_type': file_type,
+                        'count': count,
+                        'size_bytes': size_bytes,
+                    }
+    
+    emitter.emit('publisher_series', series_rows())
+    emitter.emit('publisher_totals', (
+        {'publisher': publisher, 'file_type': file_type, 'count': count, 'size_bytes': size_bytes}
+        for (publisher, file_type), (count, size_bytes) in sorted(
+            totals.items(), key=lambda item: (publishers.index(item[0][0]), item[0][1])
+        )
+    ))
+    return True
+
+
+def emit_report(emitter, stats, series_limit=None, details=True, top_lists=True,
+                groups=None, group_field=None, distributions=None):
+    """Write the statistics report sections shown by the text output"""
+    emitter.emit_object('summary', summary_record(stats))
+    emitter.emit('publishers', (publisher_record(stats.publishers[name]) for name in sorted(stats.publishers)))
+    
+    if groups is not None:
+        emitter.emit(f"by_{group_field}", (
+            group_record(group_field, key, groups[key])
+            for key in sorted(groups, key=lambda k: (k is None, k if k is not None else 0))
+        ))
+    
+    if details:
+        emitter.emit('series', (series_record(s) for s in stats.get_series_by_name(series_limit)))
+    
+    if top_lists:
+        emitter.emit('most_incomplete', (series_record(s) for s in stats.get_most_incomplete_series(10)))
+        emitter.emit('closest_to_completion', (series_record(s) for s in stats.get_most_complete_series(10)))
+    
+    if distributions is not None:
+        emitter.emit('distributions', distribution_records(distributions))
+
+
+def print_full_report(stats, index, series_limit=20, details=True, top_lists=True,
+                      group_field=None, distributions=None, report=None):
+    """Print the default statistics report (every section the options ask for)"""
+    with text_report(report) as out:
+        print_summary(stats, report=out)
+        print_publisher_breakdown(stats, report=out)
+        
+        if group_field:
+            print_group_by(index.group_by(group_field), group_field, report=out)
+        
+        if details:
+            print_series_details(stats, limit=series_limit, report=out)
+        
+        if top_lists:
+            print_top_lists(stats, report=out)
+        
+        if distributions is not None:
+            print_distributions(distributions, report=out)
+
+
+def print_errors(errors, report=None):
+    """Print the scan errors section"""
+    with text_report(report) as out:
+        out.line("=" * 70)
+        out.line(f"ERRORS ENCOUNTERED ({len(errors)})")
+        out.line("=" * 70)
+        out.lines(f"  - {error}" for error in errors)
+        out.line()
+
+
+# --report kinds: kind -> (argument, description)
+REPORT_KINDS = {
+    'full': (None, 'the default report, shaped by the other options'),
+    'summary': (None, 'collection summary and the per-publisher table'),
+    'series': (None, 'series details (--series-limit)'),
+    'top': (None, 'most incomplete and closest to completion'),
+    'group': ('FIELD', 'breakdown by a field, e.g. group:decade'),
+    'distributions': (None, 'size and completion quantiles per publisher'),
+    'publisher': ('NAME', 'publisher detail report, e.g. publisher:Marvel'),
+}
+
+# SeriesInfo fields read by the reports that need less than a full scan
+# (see Mylar3Scanner fields); other reports read every field
+REPORT_FIELDS = {
+    'summary': frozenset({'total_issues', 'issues_owned'}),
+    'publisher': frozenset({'series_name', 'year', 'file_type_counts', 'file_type_sizes'}),
+}
+
+# Output file extension -> --format; anything else is text
+REPORT_EXTENSIONS = {'.json': 'json', '.ndjson': 'ndjson', '.jsonl': 'ndjson', '.csv': 'csv'}
+
+
+@dataclass(frozen=True)
+class ReportSpec:
+    """One --report: what to render and where"""
+    kind: str
+    arg: Optional[str]
+    path: str  # '-' for stdout
+    format: str
+
+
+def parse_report_spec(value: str) -> ReportSpec:
+    """
+    Parse KIND[:ARG]=PATH (e.g. "publisher:Marvel=marvel.csv").
+    
+    The output format follows the file extension (.json, .ndjson/.jsonl,
+    .csv, otherwise text); a PATH of '-' writes to stdout in --format.
+    
+    Raises:
+        argparse.ArgumentTypeError: If the spec is malformed
+    """
+    spec, sep, path = value.partition('=')
+    kind, _, arg = spec.partition(':')
+    kind = kind.strip().lower()
+    if not sep or not path:
+        raise argparse.ArgumentTypeError(f"invalid report '{value}' (expected KIND[:ARG]=PATH)")
+    if kind not in REPORT_KINDS:
+        raise argparse.ArgumentTypeError(
+            f"unknown report kind '{kind}' (choose from {', '.join(REPORT_KINDS)})"
+        )
+    takes_arg = REPORT_KINDS[kind][0]
+    if takes_arg and not arg:
+        raise argparse.ArgumentTypeError(f"report '{kind}' needs an argument ({kind}:{takes_arg}=PATH)")
+    if not takes_arg and arg:
+        raise argparse.ArgumentTypeError(f"report '{kind}' takes no argument")
+    if kind == 'group' and arg not in GROUP_FIELDS:
+        raise argparse.ArgumentTypeError(
+            f"unknown group field '{arg}' (choose from {', '.join(sorted(GROUP_FIELDS))})"
+        )
+    fmt = REPORT_EXTENSIONS.get(Path(path).suffix.lower(), 'text') if path != '-' else None
+    return ReportSpec(kind, arg or None, path, fmt)
+
+
+def required_fields(args) -> Optional[frozenset]:
+    """
+    SeriesInfo fields the requested reports read, so the scan can skip the
+    rest (None: every field).
+    """
+    # Filters, recorded history and estimates can touch any field
+    if args.where or args.history or args.distributions or args.estimate is not None:
+        return None
+    if args.report:
+        kinds = [spec.kind for spec in args.report]
     else:
-        print("  No series with issues found")
-    print()
-    
-    print("=" * 70)
-    print("CLOSEST TO COMPLETION (not yet complete)")
-    print("=" * 70)
-    print()
-    
-    near_complete = stats.get_most_complete_series(10)
-    if near_complete:
-        for i, series in enumerate(near_complete, 1):
-            print(f"{i:2}. {series.series_name} ({series.year})")
-            print(f"    {series.issues_owned}/{series.total_issues} owned, {series.missing_issues} missing ({series.completion_percentage:.1f}%)")
+        kinds = ['publisher'] if args.publisher else ['full']
+    fields = set()
+    for kind in kinds:
+        if kind == 'full' and args.no_details and args.no_top_lists and not args.group_by:
+            kind = 'summary'  # nothing left but the summary and publisher table
+        if kind not in REPORT_FIELDS:
+            return None
+        fields |= REPORT_FIELDS[kind]
+    return frozenset(fields)
+
+
+def write_text_report(spec: ReportSpec, report, scan_results, stats, index, options, distributions=None) -> bool:
+    """Render one --report as text; returns False if it could not be produced"""
+    if spec.kind == 'full':
+        print_full_report(stats, index, series_limit=options.series_limit or 20,
+                          details=not options.no_details, top_lists=not options.no_top_lists,
+                          group_field=options.group_by,
+                          distributions=distributions if options.distributions else None,
+                          report=report)
+    elif spec.kind == 'summary':
+        print_summary(stats, report=report)
+        print_publisher_breakdown(stats, report=report)
+    elif spec.kind == 'series':
+        print_series_details(stats, limit=options.series_limit or 20, report=report)
+    elif spec.kind == 'top':
+        print_top_lists(stats, report=report)
+    elif spec.kind == 'group':
+        print_group_by(index.group_by(spec.arg), spec.arg, report=report)
+    elif spec.kind == 'distributions':
+        print_distributions(distributions, report=report)
+    elif spec.kind == 'publisher':
+        if spec.arg.lower() not in {p.lower() for p in scan_results.publishers}:
+            return False
+        print_publisher_detail_report(scan_results, spec.arg, index, report=report)
+    if scan_results.errors:
+        print_errors(scan_results.errors, report=report)
+    return True
+
+
+def write_structured_report(spec: ReportSpec, emitter, scan_results, stats, index, options,
+                            distributions=None) -> bool:
+    """Render one --report as json/ndjson/csv; returns False if it could not be produced"""
+    if spec.kind == 'full':
+        emit_report(emitter, stats, series_limit=options.series_limit,
+                    details=not options.no_details, top_lists=not options.no_top_lists,
+                    groups=index.group_by(options.group_by) if options.group_by else None,
+                    group_field=options.group_by,
+                    distributions=distributions if options.distributions else None)
+    elif spec.kind == 'summary':
+        emitter.emit_object('summary', summary_record(stats))
+        emitter.emit('publishers', (publisher_record(stats.publishers[name]) for name in sorted(stats.publishers)))
+    elif spec.kind == 'series':
+        emitter.emit('series', (series_record(s) for s in stats.get_series_by_name(options.series_limit)))
+    elif spec.kind == 'top':
+        emitter.emit('most_incomplete', (series_record(s) for s in stats.get_most_incomplete_series(10)))
+        emitter.emit('closest_to_completion', (series_record(s) for s in stats.get_most_complete_series(10)))
+    elif spec.kind == 'group':
+        groups = index.group_by(spec.arg)
+        emitter.emit(f"by_{spec.arg}", (
+            group_record(spec.arg, key, groups[key])
+            for key in sorted(groups, key=lambda k: (k is None, k if k is not None else 0))
+        ))
+    elif spec.kind == 'distributions':
+        emitter.emit('distributions', distribution_records(distributions))
+    elif spec.kind == 'publisher':
+        if not emit_publisher_detail_report(emitter, scan_results, spec.arg, index):
+            return False
+    if scan_results.errors:
+        emitter.emit('errors', ({'error': error} for error in scan_results.errors))
+    return True
+
+
+def write_report(spec: ReportSpec, scan_results, stats, index, options, distributions=None) -> bool:
+    """
+    Render one --report to its file (or stdout).
+    
+    Files are written next to their destination and renamed into place,
+    so readers never see a half-written report.
+    """
+    fmt = spec.format or options.format
+    if spec.path == '-':
+        stream, tmp = sys.stdout, None
     else:
-        print("  No incomplete series found")
-    print()
+        tmp = f"{spec.path}.tmp"
+        stream = open(tmp, 'w', encoding='utf-8', newline='' if fmt == 'csv' else None)
+    ok = False
+    try:
+        if fmt == 'text':
+            with TextReport(stream) as report:
+                ok = write_text_report(spec, report, scan_results, stats, index, options, distributions)
+        else:
+            with make_emitter(fmt, stream) as emitter:
+                ok = write_structured_report(spec, emitter, scan_results, stats, index, options, distributions)
+    finally:
+        if tmp is not None:
+            stream.close()
+            if ok:
+                os.replace(tmp, spec.path)
+            else:
+                os.unlink(tmp)
+    return ok
 
 
-def main():
+def run_reports(specs, scan_results, stats, index, options, distributions=None, jobs: int = 4) -> int:
+    """
+    Render every --report from one scan, up to `jobs` at a time.
+    
+    Reports only read the shared statistics, so they can render
+    concurrently; rankings are built on first use under their own locks.
+    
+    Returns:
+        Number of reports that failed
+    """
+    index.hash_index('publisher')
+    
+    def render(spec):
+        try:
+            ok = write_report(spec, scan_results, stats, index, options, distributions)
+        except Exception as e:
+            print(f"Error: report '{spec.path}' failed: {e}", file=sys.stderr)
+            return False
+        if not ok:
+            print(f"Error: report '{spec.path}' not written", file=sys.stderr)
+        return ok
+    
+    if jobs <= 1 or len(specs) == 1:
+        results = [render(spec) for spec in specs]
+    else:
+        with ThreadPoolExecutor(max_workers=min(jobs, len(specs)), thread_name_prefix="report") as pool:
+            results = list(pool.map(render, specs))
+    return results.count(False)
+
+
+def profile_phase(profiler, name: str):
+    """profiler.phase(name), or a no-op context when not profiling"""
+    return profiler.phase(name) if profiler is not None else nullcontext()
+
+
+def record_history(args, stats, publishers=None) -> None:
+    """Record a run in the --history database, under the scope it covered"""
+    try:
+        from comic_file_organizer.mylar3_history import StatsHistory, run_scope
+    except ModuleNotFoundError:
+        from mylar3_history import StatsHistory, run_scope
+    # Narrowed runs are never taken for full ones
+    with StatsHistory(args.history) as history:
+        history.record(stats, scope=run_scope(publishers, args.series, args.where))
+
+
+def main(argv=None):
     """Main CLI entry point"""
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv[:1] == ['serve']:
+        # Imported here: the server builds on this module's report records
+        try:
+            from comic_file_organizer.mylar3_server import main as serve_main
+        except ModuleNotFoundError:
+            from mylar3_server import main as serve_main
+        return serve_main(argv[1:])
+    
     parser = argparse.ArgumentParser(
         description="Analyze Mylar3 comic collection and display statistics",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -317,6 +906,18 @@ Examples:
   %(prog)s /path/to/mylar3/config.ini --verbose
   %(prog)s /path/to/mylar3/config.ini --series-limit 50
   %(prog)s /path/to/mylar3/config.ini --publisher Marvel
+  %(prog)s /path/to/mylar3/config.ini --publisher Marvel --publisher "DC Comics" --series "batman*"
+  %(prog)s /path/to/mylar3/config.ini --where "status=Continuing and completion<50"
+  %(prog)s /path/to/mylar3/config.ini --where "publisher=Marvel and year>=2010" --group-by decade
+  %(prog)s /path/to/mylar3/config.ini --history stats_history.db
+  %(prog)s /path/to/mylar3/config.ini --history stats_history.db --trend month
+  %(prog)s /path/to/mylar3/config.ini --format ndjson > collection.ndjson
+  %(prog)s /path/to/mylar3/config.ini --publisher Marvel --format csv > marvel.csv
+  %(prog)s /path/to/mylar3/config.ini --estimate 0.02 --seed 7
+  %(prog)s /path/to/mylar3/config.ini --parallel --device-limit rotational=1 --device-limit network=16
+  %(prog)s /path/to/mylar3/config.ini --report full=nightly.txt --report summary=summary.json \
+      --report publisher:Marvel=marvel.csv --report "publisher:DC Comics=dc.txt"
+  %(prog)s serve /path/to/mylar3/config.ini --port 8765 --refresh 60
         """
     )
     
@@ -334,8 +935,9 @@ Examples:
     parser.add_argument(
         '--series-limit',
         type=int,
-        default=20,
-        help='Maximum number of series to display in detail (default: 20)'
+        default=None,
+        help='Maximum number of series to display in detail '
+             '(default: 20 for text, every series for --format json/ndjson/csv)'
     )
     
     parser.add_argument(
@@ -353,11 +955,167 @@ Examples:
     parser.add_argument(
         '--publisher',
         type=str,
-        help='Generate detailed report for a specific publisher (case-insensitive)'
+        action='append',
+        help='Generate detailed report for a specific publisher (case-insensitive, repeatable); '
+             'only that publisher directory is scanned'
+    )
+    
+    parser.add_argument(
+        '--series',
+        metavar='GLOB',
+        action='append',
+        help='Only scan series whose directory name matches this glob '
+             '(case-insensitive, repeatable), e.g. "spider-man*"'
     )
     
-    args = parser.parse_args()
+    parser.add_argument(
+        '--where',
+        metavar='EXPR',
+        help='Only report series matching a filter, e.g. "status=Continuing and completion<50" '
+             '(fields: publisher, series, status, comicid, year, decade, completion, owned, '
+             'total, missing, size; operators: = != < <= > >= ~)'
+    )
+    
+    parser.add_argument(
+        '--group-by',
+        choices=sorted(GROUP_FIELDS),
+        help='Add a breakdown of the (filtered) series by this field'
+    )
+    
+    parser.add_argument(
+        '--distributions',
+        action='store_true',
+        help='Show median/p90/p99 issue sizes, series sizes and completion per publisher '
+             '(not with --where)'
+    )
     
+    parser.add_argument(
+        '--history',
+        metavar='DB',
+        help='SQLite statistics history: record this run in it (or read it with --trend)'
+    )
+    
+    parser.add_argument(
+        '--trend',
+        choices=sorted(TREND_PERIODS),
+        help='Show growth per day/week/month from --history instead of scanning '
+             '(limited to one publisher with --publisher)'
+    )
+    
+    parser.add_argument(
+        '--trend-periods',
+        type=int,
+        default=12,
+        help='Number of most recent periods in the trend report (default: 12)'
+    )
+    
+    parser.add_argument(
+        '--progress',
+        action='store_true',
+        help='Show scan progress with rates and ETA on stderr '
+             '(periodic log lines when stderr is not a terminal)'
+    )
+    
+    parser.add_argument(
+        '--parallel',
+        action='store_true',
+        help='Scan series directories concurrently, with a worker pool per device '
+             '(few workers for spinning disks, more for SSD and network mounts)'
+    )
+    
+    parser.add_argument(
+        '--device-limit',
+        metavar='KIND=N',
+        action='append',
+        help=f"Workers per device of a kind with --parallel, KIND one of {', '.join(DEVICE_KINDS)} "
+             '(repeatable; defaults: rotational=2, ssd=8, network=8, unknown=4)'
+    )
+    
+    parser.add_argument(
+        '--estimate',
+        metavar='FRACTION',
+        type=float,
+        nargs='?',
+        const=DEFAULT_FRACTION,
+        help='Estimate totals with confidence intervals from a random sample of each publisher\'s '
+             f'series instead of scanning them all (default fraction: {DEFAULT_FRACTION})'
+    )
+    
+    parser.add_argument(
+        '--seed',
+        type=int,
+        help='Random seed for --estimate, for repeatable samples'
+    )
+    
+    parser.add_argument(
+        '--format',
+        choices=FORMATS,
+        default='text',
+        help='Output format: text tables, or json/ndjson/csv for other tools (default: text)'
+    )
+    
+    parser.add_argument(
+        '--report',
+        metavar='KIND[:ARG]=PATH',
+        type=parse_report_spec,
+        action='append',
+        help='Write a report to PATH instead of stdout (repeatable; every report comes from one scan). '
+             'KIND: ' + '; '.join(f"{kind}{':' + arg if arg else ''} - {text}"
+                                 for kind, (arg, text) in REPORT_KINDS.items())
+             + '. Format follows the extension (.json, .ndjson, .csv, otherwise text); '
+               'PATH - is stdout in --format'
+    )
+    
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=4,
+        help='Reports rendered at once with --report (default: 4)'
+    )
+    
+    parser.add_argument(
+        '--profile',
+        metavar='PREFIX',
+        help='Profile the run and write PREFIX.pstats and PREFIX.collapsed (flamegraph input), '
+             'with time split into scan, stats and render phases'
+    )
+    
+    parser.add_argument(
+        '--profile-mode',
+        choices=PROFILE_MODES,
+        default='cprofile',
+        help='cprofile: exact calls, main thread only; sample: low-overhead stack sampling '
+             'of every thread, for long or --parallel runs (default: cprofile)'
+    )
+    
+    args = parser.parse_args(argv)
+    structured = args.format != 'text'
+    
+    if args.trend and not args.history:
+        parser.error("--trend requires --history")
+    if args.trend and args.publisher and len(args.publisher) > 1:
+        parser.error("--trend takes a single --publisher")
+    if args.estimate is not None:
+        if not 0 < args.estimate <= 1:
+            parser.error("--estimate fraction must be in (0, 1]")
+        conflicts = [option for option, value in (('--report', args.report), ('--trend', args.trend),
+                                                  ('--where', args.where), ('--history', args.history),
+                                                  ('--group-by', args.group_by),
+                                                  ('--distributions', args.distributions)) if value]
+        if conflicts:
+            parser.error(f"--estimate cannot be combined with {', '.join(conflicts)}")
+    if args.report:
+        if args.trend:
+            parser.error("--report cannot be combined with --trend")
+        paths = [spec.path for spec in args.report]
+        duplicates = sorted({path for path in paths if paths.count(path) > 1})
+        if duplicates:
+            parser.error(f"--report paths must be distinct: {', '.join(duplicates)}")
+    if args.where and (args.distributions or any(spec.kind == 'distributions' for spec in args.report or ())):
+        # File sizes stream into the sketches during the scan and cannot be
+        # filtered afterwards
+        parser.error("--where cannot be combined with distributions")
+
     # Setup logging
     log_level = logging.DEBUG if args.verbose else logging.WARNING
     logging.basicConfig(
@@ -365,40 +1123,210 @@ Examples:
         format='%(levelname)s: %(message)s'
     )
     
+    profiler = None
+    if args.profile:
+        try:
+            from comic_file_organizer.profiling import Profiler, write_profile
+        except ModuleNotFoundError:
+            from profiling import Profiler, write_profile
+        profiler = Profiler(args.profile_mode)
+        profiler.start()
+    
     try:
+        # Trend reports come from the history alone, no scan needed; only
+        # runs over this library with the same --series/--where scope count
+        if args.trend:
+            try:
+                from comic_file_organizer.mylar3_history import StatsHistory, run_scope
+            except ModuleNotFoundError:
+                from mylar3_history import StatsHistory, run_scope
+            config = load_config(args.config_path)
+            with StatsHistory(args.history) as history:
+                trend_publisher = args.publisher[0] if args.publisher else None
+                points = history.trend(args.trend, publisher=trend_publisher, limit=args.trend_periods,
+                                       destination_dir=config.destination_dir,
+                                       scope=run_scope(series=args.series, where=args.where))
+            if structured:
+                with make_emitter(args.format, sys.stdout) as emitter:
+                    emitter.emit('trend', (
+                        {'period': p.period, 'recorded_at': p.recorded_at, 'total_series': p.total_series,
+                         'series_with_issues': p.series_with_issues, 'complete_series': p.complete_series,
+                         'issues_owned': p.issues_owned, 'issues_expected': p.issues_expected,
+                         'missing_issues': p.missing_issues, 'size_bytes': p.total_bytes,
+                         'completion_percentage': round(p.completion_percentage, 2)}
+                        for p in points
+                    ))
+            else:
+                print_trend(points, args.trend, trend_publisher)
+            return 0
+        
         # Load configuration
         config = load_config(args.config_path)
         
+        # Publisher reports need only their publishers scanned, unless
+        # another report covers the whole collection
+        report_publishers = [spec.arg for spec in args.report or () if spec.kind == 'publisher']
+        scan_publishers = args.publisher
+        if args.report and not scan_publishers and len(report_publishers) == len(args.report):
+            scan_publishers = report_publishers
+        
         # Scan collection
-        scanner = Mylar3Scanner(config.destination_dir)
-        scan_results = scanner.scan()
+        wants_distributions = args.distributions or any(
+            spec.kind == 'distributions' for spec in args.report or ()
+        )
+        distributions = DistributionStats() if wants_distributions else None
+        progress = None
+        if args.progress:
+            try:
+                from comic_file_organizer.progress import ProgressReporter
+            except ModuleNotFoundError:
+                from progress import ProgressReporter
+            progress = ProgressReporter()
+            if not progress.tty:
+                logging.getLogger(ProgressReporter.__module__).setLevel(logging.INFO)
+        scheduler = None
+        if args.parallel:
+            try:
+                from comic_file_organizer.scan_scheduler import DeviceScheduler, parse_device_limits
+            except ModuleNotFoundError:
+                from scan_scheduler import DeviceScheduler, parse_device_limits
+            scheduler = DeviceScheduler(parse_device_limits(args.device_limit))
+        scanner = Mylar3Scanner(
+            config.destination_dir,
+            distributions=distributions,
+            publishers=scan_publishers,
+            series_patterns=args.series,
+            progress=progress,
+            fields=required_fields(args),
+            scheduler=scheduler
+        )
         
-        # Check if detailed publisher report requested
-        if args.publisher:
-            print_publisher_detail_report(scan_results, args.publisher)
-        else:
-            # Calculate statistics
-            stats = calculate_statistics(scan_results)
-            
-            # Display results
-            print_summary(stats)
-            print_publisher_breakdown(stats)
+        # Publisher reports only walk the requested publisher directories,
+        # so unknown names are caught from the top-level listing
+        if args.publisher or report_publishers:
+            available = scanner.publisher_directories()
+            known = {p.lower() for p in available}
+            requested = (args.publisher or []) + report_publishers
+            if args.publisher:
+                # Publisher reports must fall inside an explicitly scoped scan
+                known &= {p.lower() for p in args.publisher}
+            missing = [p for p in dict.fromkeys(requested) if p.lower() not in known]
+            if missing:
+                for name in missing:
+                    print(f"Error: Publisher '{name}' not found in collection.", file=sys.stderr)
+                print(f"Available publishers: {', '.join(sorted(available))}", file=sys.stderr)
+                return 1
+        
+        if args.estimate is not None:
+            try:
+                from comic_file_organizer.mylar3_estimate import estimate_collection
+            except ModuleNotFoundError:
+                from mylar3_estimate import estimate_collection
+            with profile_phase(profiler, 'scan'):
+                estimate = estimate_collection(scanner, fraction=args.estimate, seed=args.seed)
+            if structured:
+                with make_emitter(args.format, sys.stdout) as emitter:
+                    emitter.emit_object('estimate', {
+                        'destination_dir': estimate.destination_dir,
+                        'confidence': estimate.confidence,
+                        'fraction': estimate.fraction,
+                        'population': estimate.population,
+                        'sampled': estimate.sampled,
+                        'elapsed_s': round(estimate.elapsed_seconds, 3),
+                    })
+                    emitter.emit('estimates', estimate_records(estimate))
+            else:
+                print_estimate(estimate)
+            return 0
+        
+        with profile_phase(profiler, 'scan'):
+            if scheduler is not None:
+                with scheduler:
+                    scan_results = scanner.scan()
+                for device in scheduler.summary():
+                    logging.info(f"Device {device['device']} ({device['mount_point']}, {device['fstype']}): "
+                                 f"{device['kind']}, {device['workers']} workers, {device['tasks']} series")
+            else:
+                scan_results = scanner.scan()
+        
+        with profile_phase(profiler, 'stats'):
+            index = SeriesQueryIndex(scan_results)
             
-            if not args.no_details:
-                print_series_details(stats, limit=args.series_limit)
+            if args.where:
+                selected = index.select(args.where)
+                selected_publishers = {s.publisher for s in selected}
+                scan_results = ScanResults(
+                    destination_dir=scan_results.destination_dir,
+                    publishers=[p for p in scan_results.publishers if p in selected_publishers],
+                    series=selected,
+                    errors=scan_results.errors
+                )
+                index = SeriesQueryIndex(scan_results)
+        
+        if args.report:
+            stats = None
+            if any(spec.kind != 'publisher' for spec in args.report):
+                with profile_phase(profiler, 'stats'):
+                    stats = calculate_statistics(scan_results)
+                if args.history:
+                    record_history(args, stats, scan_publishers)
+            with profile_phase(profiler, 'render'):
+                failed = run_reports(args.report, scan_results, stats, index, args,
+                                     distributions=distributions, jobs=args.jobs)
+            return 1 if failed or scan_results.errors else 0
+        
+        if structured:
+            with profile_phase(profiler, 'render'), make_emitter(args.format, sys.stdout) as emitter:
+                if args.publisher:
+                    if not emit_publisher_detail_report(emitter, scan_results, args.publisher, index):
+                        return 1
+                else:
+                    with profile_phase(profiler, 'stats'):
+                        stats = calculate_statistics(scan_results)
+                    emit_report(
+                        emitter, stats,
+                        series_limit=args.series_limit,
+                        details=not args.no_details,
+                        top_lists=not args.no_top_lists,
+                        groups=index.group_by(args.group_by) if args.group_by else None,
+                        group_field=args.group_by,
+                        distributions=distributions
+                    )
+                    if args.history:
+                        record_history(args, stats, scan_publishers)
+                if scan_results.errors:
+                    emitter.emit('errors', ({'error': error} for error in scan_results.errors))
+            return 1 if scan_results.errors else 0
+        
+        # All text sections share one buffered report on stdout
+        with profile_phase(profiler, 'render'), TextReport() as report:
+            # Check if detailed publisher report requested
+            if args.publisher:
+                for publisher in dict.fromkeys(p.lower() for p in args.publisher):
+                    print_publisher_detail_report(scan_results, publisher, index, report=report)
+            else:
+                # Calculate statistics
+                with profile_phase(profiler, 'stats'):
+                    stats = calculate_statistics(scan_results)
+                
+                # Display results
+                print_full_report(
+                    stats, index,
+                    series_limit=args.series_limit or 20,
+                    details=not args.no_details,
+                    top_lists=not args.no_top_lists,
+                    group_field=args.group_by,
+                    distributions=distributions,
+                    report=report
+                )
+                
+                if args.history:
+                    record_history(args, stats, scan_publishers)
             
-            if not args.no_top_lists:
-                print_top_lists(stats)
-        
-        # Report errors if any
-        if scan_results.errors:
-            print("=" * 70)
-            print(f"ERRORS ENCOUNTERED ({len(scan_results.errors)})")
-            print("=" * 70)
-            for error in scan_results.errors:
-                print(f"  - {error}")
-            print()
-            return 1
+            # Report errors if any
+            if scan_results.errors:
+                print_errors(scan_results.errors, report=report)
+                return 1
         
         return 0
         
@@ -414,6 +1342,9 @@ Examples:
             import traceback
             traceback.print_exc()
         return 1
+    finally:
+        if profiler is not None:
+            write_profile(profiler, args.profile)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,292 @@
+"""
+Columnar view of a Mylar3 scan for vectorized statistics.
+
+SeriesColumns turns the list of SeriesInfo objects into parallel columns
+(owned, total, year, publisher code, size and file count per file type)
+so group-bys and histograms run as whole-column operations instead of
+per-object Python loops.
+
+NumPy is optional: with it installed the columns are arrays and every
+aggregate is vectorized (bincount/histogram style); without it the same
+aggregates are computed over plain lists, with identical results.
+"""
+import logging
+from typing import Dict, Iterable, List, Optional
+try:
+    from comic_file_organizer.mylar3_scanner import SeriesInfo
+except ModuleNotFoundError:
+    from mylar3_scanner import SeriesInfo
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+
+logger = logging.getLogger(__name__)
+
+# Stored in the year column for series without a year
+UNKNOWN_YEAR = -1
+
+
+def numpy_available() -> bool:
+    """Whether the optional NumPy backend can be used"""
+    return np is not None
+
+
+class SeriesColumns:
+    """Parallel columns over a list of series, with vectorized aggregates"""
+
+    def __init__(self, series: Iterable[SeriesInfo], use_numpy: Optional[bool] = None):
+        """
+        Args:
+            series: Series to index (normally ScanResults.series)
+            use_numpy: Force the NumPy (True) or pure-Python (False) backend;
+                default is NumPy when installed
+        """
+        if use_numpy is None:
+            use_numpy = numpy_available()
+        elif use_numpy and not numpy_available():
+            raise RuntimeError("The columnar NumPy backend requires the 'numpy' package")
+        self.backend = 'numpy' if use_numpy else 'python'
+
+        publisher_codes: Dict[str, int] = {}
+        codes: List[int] = []
+        owned: List[int] = []
+        total: List[int] = []
+        years: List[int] = []
+        sizes: Dict[str, List[int]] = {}
+        counts: Dict[str, List[int]] = {}
+        row = 0
+        for s in series:
+            code = publisher_codes.get(s.publisher)
+            if code is None:
+                code = publisher_codes[s.publisher] = len(publisher_codes)
+            codes.append(code)
+            owned.append(s.issues_owned)
+            total.append(s.total_issues)
+            years.append(s.year if isinstance(s.year, int) else UNKNOWN_YEAR)
+            for file_type, size in s.file_type_sizes.items():
+                column = sizes.get(file_type)
+                if column is None:
+                    column = sizes[file_type] = [0] * row
+                column.append(size)
+            for file_type, count in s.file_type_counts.items():
+                column = counts.get(file_type)
+                if column is None:
+                    column = counts[file_type] = [0] * row
+                column.append(count)
+            row += 1
+            # Pad file types this series doesn't have
+            for column in sizes.values():
+                if len(column) < row:
+                    column.append(0)
+            for column in counts.values():
+                if len(column) < row:
+                    column.append(0)
+
+        self.publishers: List[str] = list(publisher_codes)
+        self.file_types: List[str] = sorted(set(sizes) | set(counts))
+        for file_type in self.file_types:
+            sizes.setdefault(file_type, [0] * row)
+            counts.setdefault(file_type, [0] * row)
+
+        if use_numpy:
+            self.publisher_codes = np.asarray(codes, dtype=np.int64)
+            self.owned = np.asarray(owned, dtype=np.int64)
+            self.total = np.asarray(total, dtype=np.int64)
+            self.years = np.asarray(years, dtype=np.int64)
+            self.sizes = {t: np.asarray(c, dtype=np.int64) for t, c in sizes.items()}
+            self.counts = {t: np.asarray(c, dtype=np.int64) for t, c in counts.items()}
+        else:
+            self.publisher_codes = codes
+            self.owned = owned
+            self.total = total
+            self.years = years
+            self.sizes = sizes
+            self.counts = counts
+        self.rows = row
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def _sum(self, column) -> int:
+        return int(column.sum()) if self.backend == 'numpy' else sum(column)
+
+    def _completion(self):
+        """Completion percentage per series (0 when total is unknown)"""
+        if self.backend == 'numpy':
+            total = np.where(self.total > 0, self.total, 1)
+            return np.where(self.total > 0, self.owned / total * 100.0, 0.0)
+        return [o / t * 100.0 if t else 0.0 for o, t in zip(self.owned, self.total)]
+
+    def totals(self) -> Dict[str, int]:
+        """Collection-wide owned, expected and missing issue counts"""
+        if self.backend == 'numpy':
+            return {
+                'owned': int(self.owned.sum()),
+                'expected': int(self.total.sum()),
+                'missing': int(np.maximum(self.total - self.owned, 0).sum()),
+            }
+        return {
+            'owned': sum(self.owned),
+            'expected': sum(self.total),
+            'missing': sum(max(0, t - o) for o, t in zip(self.owned, self.total)),
+        }
+
+    def group_totals(self, codes=None, groups: int = 1) -> List[Dict[str, float]]:
+        """
+        Per-group counters, the whole-column form of AggregateCounts.add.
+
+        Args:
+            codes: Group number (0 to groups - 1) of every row, e.g.
+                publisher_codes; default puts every row in group 0
+            groups: Number of groups
+
+        Returns:
+            One dict of AggregateCounts field values per group
+        """
+        if self.backend == 'numpy':
+            codes = np.zeros(self.rows, dtype=np.int64) if codes is None else np.asarray(codes, dtype=np.int64)
+            owned, total = self.owned, self.total
+            size = sum(self.sizes.values()) if self.sizes else np.zeros(self.rows, dtype=np.int64)
+            with_issues = owned > 0
+            complete = owned >= total
+            completion = np.where(with_issues & (total > 0), self._completion(), 0.0)
+
+            def sums(values):
+                out = np.zeros(groups, dtype=np.int64)
+                np.add.at(out, codes, values)
+                return out
+
+            columns = {
+                'total_series': np.bincount(codes, minlength=groups),
+                'series_with_issues': sums(with_issues),
+                'series_followed_only': sums(~with_issues),
+                'complete_series': sums(complete),
+                'total_issues_owned': sums(owned),
+                'total_issues_expected': sums(total),
+                'total_missing_issues': sums(np.where(complete, 0, total - owned)),
+                'total_size_bytes': sums(size),
+            }
+            result = [{name: int(column[g]) for name, column in columns.items()} for g in range(groups)]
+            completion_sums = np.bincount(codes, weights=completion, minlength=groups)
+            for g, totals in enumerate(result):
+                totals['completion_sum'] = float(completion_sums[g])
+            return result
+
+        result = [dict(total_series=0, series_with_issues=0, series_followed_only=0, complete_series=0,
+                       total_issues_owned=0, total_issues_expected=0, total_missing_issues=0,
+                       total_size_bytes=0, completion_sum=0.0) for _ in range(groups)]
+        columns = list(self.sizes.values())
+        for row, (owned, total) in enumerate(zip(self.owned, self.total)):
+            totals = result[0 if codes is None else codes[row]]
+            totals['total_series'] += 1
+            totals['total_issues_owned'] += owned
+            totals['total_issues_expected'] += total
+            totals['total_size_bytes'] += sum(column[row] for column in columns)
+            if owned > 0:
+                totals['series_with_issues'] += 1
+                if total:
+                    totals['completion_sum'] += owned / total * 100.0
+            else:
+                totals['series_followed_only'] += 1
+            if owned >= total:
+                totals['complete_series'] += 1
+            else:
+                totals['total_missing_issues'] += total - owned
+        return result
+
+    def completion_by_publisher(self) -> Dict[str, float]:
+        """Average completion percentage of each publisher's series with issues"""
+        completion = self._completion()
+        if self.backend == 'numpy':
+            with_issues = self.owned > 0
+            n = len(self.publishers)
+            sums = np.bincount(self.publisher_codes, weights=np.where(with_issues, completion, 0.0), minlength=n)
+            counts = np.bincount(self.publisher_codes, weights=with_issues, minlength=n)
+            averages = np.divide(sums, counts, out=np.zeros(n), where=counts > 0)
+            return {name: float(averages[code]) for code, name in enumerate(self.publishers)}
+
+        sums = [0.0] * len(self.publishers)
+        counts = [0] * len(self.publishers)
+        for code, owned, pct in zip(self.publisher_codes, self.owned, completion):
+            if owned > 0:
+                sums[code] += pct
+                counts[code] += 1
+        return {name: sums[code] / counts[code] if counts[code] else 0.0
+                for code, name in enumerate(self.publishers)}
+
+    def size_by_decade(self) -> Dict[Optional[int], int]:
+        """Total bytes of comic files per decade of series start year (None: unknown year)"""
+        if self.backend == 'numpy':
+            size = sum(self.sizes.values()) if self.sizes else np.zeros(self.rows, dtype=np.int64)
+            decades = np.where(self.years == UNKNOWN_YEAR, UNKNOWN_YEAR, self.years // 10 * 10)
+            keys, inverse = np.unique(decades, return_inverse=True)
+            sums = np.zeros(len(keys), dtype=np.int64)
+            np.add.at(sums, inverse, size)
+            return {(None if key == UNKNOWN_YEAR else int(key)): int(total)
+                    for key, total in zip(keys, sums) if total}
+
+        result: Dict[Optional[int], int] = {}
+        columns = list(self.sizes.values())
+        for row, year in enumerate(self.years):
+            size = sum(column[row] for column in columns)
+            if size:
+                decade = None if year == UNKNOWN_YEAR else year // 10 * 10
+                result[decade] = result.get(decade, 0) + size
+        return result
+
+    def size_by_file_type(self) -> Dict[str, int]:
+        """Total bytes per file type (e.g. CBR, CBZ)"""
+        return {t: self._sum(self.sizes[t]) for t in self.file_types}
+
+    def file_type_ratio(self) -> Dict[str, float]:
+        """Share of comic files of each type (e.g. {'CBR': 0.1, 'CBZ': 0.9})"""
+        counts = {t: self._sum(self.counts[t]) for t in self.file_types}
+        files = sum(counts.values())
+        if files == 0:
+            return {t: 0.0 for t in self.file_types}
+        return {t: count / files for t, count in counts.items()}
+
+    def completion_histogram(self, bins: int = 10) -> List[int]:
+        """
+        Number of series with issues per completion bucket.
+
+        Buckets are equal slices of 0-100%; 100% (and over-complete
+        series) fall in the last bucket.
+        """
+        completion = self._completion()
+        if self.backend == 'numpy':
+            values = completion[self.owned > 0]
+            buckets = np.minimum((values * bins / 100.0).astype(np.int64), bins - 1)
+            return [int(n) for n in np.bincount(buckets, minlength=bins)]
+
+        histogram = [0] * bins
+        for owned, pct in zip(self.owned, completion):
+            if owned > 0:
+                histogram[min(int(pct * bins / 100.0), bins - 1)] += 1
+        return histogram
+
+
+if __name__ == "__main__":
+    # Test columnar statistics
+    import sys
+    from mylar3_config import load_config
+    from mylar3_scanner import Mylar3Scanner
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+
+    if len(sys.argv) < 2:
+        print("Usage: python3 mylar3_columnar.py /path/to/mylar3/config.ini")
+        sys.exit(1)
+
+    config = load_config(sys.argv[1])
+    columns = SeriesColumns(Mylar3Scanner(config.destination_dir).scan().series)
+    print(f"Backend: {columns.backend} ({len(columns)} series)")
+    print(f"Totals: {columns.totals()}")
+    print(f"File types: {columns.file_type_ratio()}")
+    print(f"Size by decade: {columns.size_by_decade()}")
+    print(f"Completion histogram: {columns.completion_histogram()}")
+    for publisher, pct in sorted(columns.completion_by_publisher().items()):
+        print(f"  {publisher}: {pct:.1f}%")
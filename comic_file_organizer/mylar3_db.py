@@ -0,0 +1,319 @@
+"""
+Batched, transactional updates to Mylar3's mylar.db.
+
+After issues are moved, renamed or converted, Mylar3 needs to know their
+new locations (issues.Location holds the filename, comics.ComicLocation
+the series folder), sizes and statuses. Changes are collected in memory
+and applied with executemany() inside large transactions so the database
+is write-locked for a few short bursts instead of once per file.
+
+Coexisting with a running Mylar3:
+- the database is switched to WAL mode, so Mylar3 keeps reading while we write
+- transactions start with BEGIN IMMEDIATE, so lock contention is handled
+  up front (never half-way through a batch)
+- busy_timeout plus retry with exponential backoff when Mylar3 holds the
+  write lock, and batches are capped so we never hold it for long
+"""
+import os
+import time
+import random
+import sqlite3
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+# Issue statuses Mylar3 counts towards a series' 'Have' total
+HAVE_STATUSES = ('Downloaded', 'Archived')
+
+
+@dataclass
+class UpdateResult:
+    """Outcome of a flush()"""
+    issues_updated: int = 0
+    issues_unmatched: int = 0
+    series_updated: int = 0
+    transactions: int = 0
+    retries: int = 0
+
+
+def normalize_issue_number(issue: str) -> str:
+    """
+    Issue number as Mylar3 stores it in issues.Issue_Number.
+
+    Filenames zero-pad issue numbers ('001', '001.5'); Mylar3 does not.
+    """
+    text = str(issue).strip()
+    digits = len(text) - len(text.lstrip('0123456789'))
+    if digits:
+        text = (text[:digits].lstrip('0') or '0') + text[digits:]
+    return text
+
+
+class Mylar3DatabaseUpdater:
+    """Collects issue/series changes and applies them to mylar.db in batches"""
+
+    def __init__(self, db_path: str, batch_size: int = 5000, busy_timeout: float = 30.0,
+                 max_retries: int = 8, retry_backoff: float = 0.05, auto_flush: bool = False):
+        """
+        Args:
+            db_path: Path to Mylar3's mylar.db
+            batch_size: Maximum rows written per transaction
+            busy_timeout: Seconds SQLite itself waits on a locked database
+            max_retries: Retries (with exponential backoff) after the busy
+                timeout expires
+            retry_backoff: Initial retry delay in seconds
+            auto_flush: Flush automatically whenever batch_size changes are queued
+        """
+        if not os.path.exists(db_path):
+            raise FileNotFoundError(f"Mylar3 database not found: {db_path}")
+        self.db_path = db_path
+        self.batch_size = max(1, batch_size)
+        self.busy_timeout = busy_timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.auto_flush = auto_flush
+        # Keyed so a file touched twice (convert, then move) is written once
+        self._issues_by_id: Dict[str, Tuple] = {}
+        self._issues_by_number: Dict[Tuple[str, str], Tuple] = {}
+        self._series: Dict[str, str] = {}
+        # Queueing (import workers) and flushing (timer) may run on different threads
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_path, timeout=busy_timeout, isolation_level=None,
+                                     check_same_thread=False)
+        self._configure()
+
+    def _configure(self) -> None:
+        try:
+            mode = self._conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+            if mode.lower() != 'wal':
+                logger.warning(f"Could not switch {self.db_path} to WAL mode (mode: {mode})")
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Could not switch {self.db_path} to WAL mode: {e}")
+        self._conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout * 1000)}")
+        # Durable at checkpoints and safe against corruption in WAL mode
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+
+    def close(self) -> None:
+        try:
+            self._conn.close()
+        except Exception:
+            pass
+
+    def __enter__(self) -> "Mylar3DatabaseUpdater":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.flush()
+        self.close()
+
+    @property
+    def pending(self) -> int:
+        return len(self._issues_by_id) + len(self._issues_by_number) + len(self._series)
+
+    def queue_issue(self, location: str, comic_id: Optional[str] = None, issue_number: Optional[str] = None,
+                    issue_id: Optional[str] = None, size: Optional[int] = None,
+                    status: Optional[str] = None) -> None:
+        """
+        Queue an issue's new location.
+
+        Issues are matched by IssueID when known, otherwise by
+        (ComicID, Issue_Number).
+
+        Args:
+            location: Full path of the issue file (Mylar3 stores the filename)
+            comic_id: Mylar3/ComicVine series id (from series.json)
+            issue_number: Issue number as parsed from the filename
+            issue_id: Mylar3 IssueID, if known
+            size: File size in bytes (stat'ed if None)
+            status: New issue status; None keeps the current one (a moved
+                Archived issue stays Archived)
+        """
+        if size is None:
+            try:
+                size = os.path.getsize(location)
+            except OSError:
+                size = None
+        filename = os.path.basename(location)
+        size_text = str(size) if size is not None else None
+        with self._lock:
+            self._queue_issue(location, filename, size_text, status, comic_id, issue_number, issue_id)
+            self._maybe_flush()
+
+    def _queue_issue(self, location, filename, size_text, status, comic_id, issue_number, issue_id) -> None:
+        if issue_id is not None:
+            self._issues_by_id[str(issue_id)] = (filename, size_text, status, str(issue_id))
+        elif comic_id is not None and issue_number is not None:
+            number = normalize_issue_number(issue_number)
+            self._issues_by_number[(str(comic_id), number)] = (filename, size_text, status, str(comic_id), number)
+        else:
+            raise ValueError(f"Need issue_id or comic_id + issue_number to update {location}")
+        if comic_id is not None:
+            self._series.setdefault(str(comic_id), os.path.dirname(location))
+
+    def queue_series(self, comic_id: str, location: str) -> None:
+        """Queue a series' new folder (comics.ComicLocation)"""
+        with self._lock:
+            self._series[str(comic_id)] = location
+            self._maybe_flush()
+
+    def _maybe_flush(self) -> None:
+        if self.auto_flush and self.pending >= self.batch_size:
+            self.flush()
+
+    def __call__(self, item) -> None:
+        """Import daemon update-stage hook: queue an imported ImportItem"""
+        series = item.series
+        if series is None or series.comicid is None:
+            return
+        self.queue_issue(item.path, comic_id=series.comicid, issue_number=item.fields.get('issue'),
+                         status='Downloaded')
+
+    def flush(self) -> UpdateResult:
+        """
+        Apply every queued change.
+
+        Rows are written with executemany() in transactions of at most
+        batch_size rows; each series' 'Have' count is refreshed in the same
+        transaction as its issues.
+        """
+        with self._lock:
+            return self._flush()
+
+    def _flush(self) -> UpdateResult:
+        # Rows leave the queue only once their transaction has committed, so
+        # a chunk that still fails after its retries is kept for the next flush
+        result = UpdateResult()
+
+        for chunk in _chunks(list(self._issues_by_id.items()), self.batch_size):
+            rows = [row for _, row in chunk]
+            updated = self._transaction(result, [(
+                "UPDATE issues SET Location = ?, ComicSize = COALESCE(?, ComicSize), "
+                "Status = COALESCE(?, Status) WHERE IssueID = ?",
+                rows
+            )])
+            _discard(self._issues_by_id, chunk)
+            result.issues_updated += updated
+            result.issues_unmatched += len(rows) - updated
+
+        for chunk in _chunks(list(self._issues_by_number.items()), self.batch_size):
+            rows = [row for _, row in chunk]
+            comic_ids = sorted({(row[3],) for row in rows})
+            updated = self._transaction(result, [
+                ("UPDATE issues SET Location = ?, ComicSize = COALESCE(?, ComicSize), Status = COALESCE(?, Status) "
+                 "WHERE ComicID = ? AND Issue_Number = ?", rows),
+                (f"UPDATE comics SET Have = (SELECT COUNT(*) FROM issues WHERE issues.ComicID = comics.ComicID "
+                 f"AND Status IN ({', '.join('?' * len(HAVE_STATUSES))})) WHERE ComicID = ?",
+                 [HAVE_STATUSES + cid for cid in comic_ids]),
+            ])
+            _discard(self._issues_by_number, chunk)
+            result.issues_updated += updated
+            result.issues_unmatched += len(rows) - updated
+
+        for chunk in _chunks(list(self._series.items()), self.batch_size):
+            result.series_updated += self._transaction(result, [
+                ("UPDATE comics SET ComicLocation = ? WHERE ComicID = ?",
+                 [(location, comic_id) for comic_id, location in chunk])
+            ])
+            _discard(self._series, chunk)
+
+        if result.transactions:
+            logger.info(f"mylar.db: {result.issues_updated} issues, {result.series_updated} series updated "
+                        f"in {result.transactions} transactions ({result.issues_unmatched} unmatched)")
+        return result
+
+    def _transaction(self, result: UpdateResult, statements: List[Tuple[str, List[Tuple]]]) -> int:
+        """
+        Run statements in one BEGIN IMMEDIATE transaction, retrying while
+        Mylar3 holds the write lock.
+
+        Returns:
+            Rows changed by the first statement
+        """
+        delay = self.retry_backoff
+        for attempt in range(self.max_retries + 1):
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+            except sqlite3.OperationalError as e:
+                if not _is_busy(e) or attempt == self.max_retries:
+                    raise
+                result.retries += 1
+                logger.debug(f"mylar.db busy ({e}); retrying in {delay:.2f}s")
+                time.sleep(delay * (1 + random.random()))
+                delay *= 2
+                continue
+            try:
+                changed = None
+                for sql, rows in statements:
+                    cursor = self._conn.executemany(sql, rows)
+                    if changed is None:
+                        changed = cursor.rowcount
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            result.transactions += 1
+            return changed or 0
+        return 0
+
+
+def queue_rename_plan(updater: Mylar3DatabaseUpdater, plan) -> int:
+    """
+    Queue the Mylar3 changes for an executed RenamePlan.
+
+    Only operations whose target now exists are queued. Issue statuses are
+    left as they are: a move does not change whether an issue is Archived.
+
+    Returns:
+        Number of issues queued
+    """
+    queued = 0
+    for op in plan.operations:
+        if op.comicid is None or not os.path.exists(op.dst):
+            continue
+        if op.issue is not None:
+            updater.queue_issue(op.dst, comic_id=op.comicid, issue_number=op.issue)
+            queued += 1
+        updater.queue_series(op.comicid, os.path.dirname(op.dst))
+    return queued
+
+
+def default_database_path(config_path: str) -> str:
+    """mylar.db normally lives next to config.ini"""
+    return os.path.join(os.path.dirname(os.path.abspath(config_path)), 'mylar.db')
+
+
+def _chunks(rows: List, size: int) -> Iterable[List]:
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def _discard(pending: Dict, chunk: List[Tuple]) -> None:
+    """Drop committed (key, row) pairs from a pending dict"""
+    for key, _ in chunk:
+        pending.pop(key, None)
+
+
+def _is_busy(error: sqlite3.OperationalError) -> bool:
+    message = str(error).lower()
+    return 'locked' in message or 'busy' in message
+
+
+if __name__ == "__main__":
+    import sys
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+
+    if len(sys.argv) < 2:
+        print("Usage: python3 -m comic_file_organizer.mylar3_db /path/to/mylar.db")
+        sys.exit(1)
+
+    with Mylar3DatabaseUpdater(sys.argv[1]) as updater:
+        conn = updater._conn
+        print(f"journal_mode: {conn.execute('PRAGMA journal_mode').fetchone()[0]}")
+        print(f"comics: {conn.execute('SELECT COUNT(*) FROM comics').fetchone()[0]}")
+        print(f"issues: {conn.execute('SELECT COUNT(*) FROM issues').fetchone()[0]}")
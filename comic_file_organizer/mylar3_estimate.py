@@ -0,0 +1,239 @@
+"""
+Sampling-based estimates of Mylar3 collection totals.
+
+Answers "how big is the library" without a full scan: the series
+directories of every publisher are listed (one directory read per
+publisher), a random fraction of them is scanned, and totals are
+extrapolated per publisher (stratified random sampling) with normal
+confidence intervals:
+
+    total   = sum(N_h * mean_h)
+    var     = sum(N_h^2 * (1 - n_h / N_h) * s_h^2 / n_h)
+
+where N_h is the number of series directories of publisher h, n_h the
+number sampled and mean_h/s_h^2 the sample mean and variance. Completion
+(issues owned / issues expected) is a ratio estimate with a linearized
+variance. Publishers with few series are scanned completely, so their
+share of the estimate is exact.
+
+Usage:
+    python3 -m comic_file_organizer.mylar3_cli /path/to/config.ini --estimate
+    python3 -m comic_file_organizer.mylar3_cli /path/to/config.ini --estimate 0.02 --seed 7
+"""
+import math
+import os
+import time
+import random
+import logging
+from dataclasses import dataclass, field
+from statistics import NormalDist
+from typing import Callable, Dict, List, Optional
+try:
+    from comic_file_organizer.mylar3_scanner import Mylar3Scanner, SeriesInfo
+except ModuleNotFoundError:
+    from mylar3_scanner import Mylar3Scanner, SeriesInfo
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FRACTION = 0.05
+# Publishers with at most this many series are scanned completely; larger
+# ones get at least this many samples (two are needed for a variance)
+DEFAULT_MIN_SAMPLES = 5
+
+
+@dataclass(frozen=True)
+class Estimate:
+    """Point estimate with a confidence interval"""
+    value: float
+    low: float
+    high: float
+
+    @property
+    def margin(self) -> float:
+        """Half-width of the confidence interval"""
+        return (self.high - self.low) / 2
+
+
+@dataclass
+class Stratum:
+    """Sampled series of one publisher"""
+    publisher: str
+    population: int  # series directories
+    samples: List[Optional[SeriesInfo]] = field(default_factory=list)  # None: no usable series.json
+
+    @property
+    def sampled(self) -> int:
+        return len(self.samples)
+
+
+@dataclass
+class CollectionEstimate:
+    """Estimated collection totals (see module docstring for the method)"""
+    destination_dir: str
+    confidence: float
+    fraction: float
+    strata: List[Stratum]
+    series: Estimate
+    series_with_issues: Estimate
+    complete_series: Estimate
+    issues_owned: Estimate
+    missing_issues: Estimate
+    size_bytes: Estimate
+    completion_percentage: Estimate
+    size_by_file_type: Dict[str, Estimate] = field(default_factory=dict)
+    count_by_file_type: Dict[str, Estimate] = field(default_factory=dict)
+    elapsed_seconds: float = 0.0
+
+    @property
+    def population(self) -> int:
+        """Series directories in the (scoped) collection"""
+        return sum(s.population for s in self.strata)
+
+    @property
+    def sampled(self) -> int:
+        """Series directories actually scanned"""
+        return sum(s.sampled for s in self.strata)
+
+
+def _z(confidence: float) -> float:
+    return NormalDist().inv_cdf((1 + confidence) / 2)
+
+
+def _stratum_moments(values: List[float]):
+    """(mean, sample variance) of one stratum's values"""
+    n = len(values)
+    mean = sum(values) / n
+    variance = sum((v - mean) ** 2 for v in values) / (n - 1) if n > 1 else 0.0
+    return mean, variance
+
+
+def _total_variance(strata: List[Stratum], value: Callable[[Optional[SeriesInfo]], float]):
+    """Stratified estimate of sum(value) over the population, and its variance"""
+    total = variance = 0.0
+    for stratum in strata:
+        if not stratum.samples:
+            continue
+        n, N = stratum.sampled, stratum.population
+        mean, s2 = _stratum_moments([value(s) for s in stratum.samples])
+        total += N * mean
+        variance += N * N * (1 - n / N) * s2 / n
+    return total, variance
+
+
+def stratified_total(strata: List[Stratum], value: Callable[[Optional[SeriesInfo]], float],
+                     confidence: float = 0.95) -> Estimate:
+    """Estimate sum(value) over every series directory with a confidence interval"""
+    total, variance = _total_variance(strata, value)
+    margin = _z(confidence) * math.sqrt(variance)
+    return Estimate(total, max(total - margin, 0.0), total + margin)
+
+
+def ratio_estimate(strata: List[Stratum], numerator: Callable[[Optional[SeriesInfo]], float],
+                   denominator: Callable[[Optional[SeriesInfo]], float],
+                   confidence: float = 0.95) -> Estimate:
+    """Estimate sum(numerator) / sum(denominator) (linearized variance)"""
+    top, _ = _total_variance(strata, numerator)
+    bottom, _ = _total_variance(strata, denominator)
+    if bottom <= 0:
+        return Estimate(0.0, 0.0, 0.0)
+    ratio = top / bottom
+    _, variance = _total_variance(strata, lambda s: numerator(s) - ratio * denominator(s))
+    margin = _z(confidence) * math.sqrt(variance) / bottom
+    return Estimate(ratio, max(ratio - margin, 0.0), ratio + margin)
+
+
+def estimate_collection(scanner: Mylar3Scanner, fraction: float = DEFAULT_FRACTION,
+                        min_samples: int = DEFAULT_MIN_SAMPLES, confidence: float = 0.95,
+                        seed: Optional[int] = None) -> CollectionEstimate:
+    """
+    Estimate collection totals from a stratified random sample of series.
+
+    Honours the scanner's publisher/series scope and field projection.
+
+    Args:
+        scanner: Configured scanner (its destination_dir and scope are used)
+        fraction: Share of each publisher's series directories to scan
+        min_samples: Lower bound on the samples per publisher
+        confidence: Confidence level of the intervals
+        seed: Random seed, for repeatable estimates
+
+    Raises:
+        ValueError: If fraction or confidence is not in (0, 1]
+        FileNotFoundError: If destination_dir does not exist
+    """
+    if not 0 < fraction <= 1:
+        raise ValueError(f"Sample fraction must be in (0, 1], got {fraction}")
+    if not 0 < confidence < 1:
+        raise ValueError(f"Confidence must be in (0, 1), got {confidence}")
+    if not os.path.isdir(scanner.destination_dir):
+        raise FileNotFoundError(f"destination_dir does not exist: {scanner.destination_dir}")
+
+    start = time.perf_counter()
+    rng = random.Random(seed)
+    strata: List[Stratum] = []
+    for publisher in sorted(scanner._publisher_entries()):
+        publisher_path = os.path.join(scanner.destination_dir, publisher)
+        if publisher.startswith('.') or not os.path.isdir(publisher_path):
+            continue
+        try:
+            names = sorted(scanner.series_directories(publisher))
+        except OSError as e:
+            logger.warning(f"Cannot list publisher {publisher}: {e}")
+            continue
+        if not names:
+            continue
+
+        sample_size = min(len(names), max(min_samples, math.ceil(fraction * len(names))))
+        stratum = Stratum(publisher, len(names))
+        # Scan in listing order: neighbouring directories tend to be cached together
+        for i in sorted(rng.sample(range(len(names)), sample_size)):
+            stratum.samples.append(
+                scanner._scan_series(publisher, names[i], os.path.join(publisher_path, names[i]))
+            )
+        strata.append(stratum)
+
+    file_types = sorted({t for stratum in strata for s in stratum.samples if s for t in s.file_type_counts})
+
+    def total(value):
+        return stratified_total(strata, lambda s: value(s) if s is not None else 0, confidence)
+
+    completion = ratio_estimate(
+        strata,
+        lambda s: s.issues_owned if s is not None else 0,
+        lambda s: s.total_issues if s is not None else 0,
+        confidence
+    )
+    estimate = CollectionEstimate(
+        destination_dir=scanner.destination_dir,
+        confidence=confidence,
+        fraction=fraction,
+        strata=strata,
+        series=total(lambda s: 1),
+        series_with_issues=total(lambda s: s.issues_owned > 0),
+        complete_series=total(lambda s: s.is_complete),
+        issues_owned=total(lambda s: s.issues_owned),
+        missing_issues=total(lambda s: s.missing_issues),
+        size_bytes=total(lambda s: s.total_size_bytes),
+        completion_percentage=Estimate(completion.value * 100, completion.low * 100, completion.high * 100),
+        size_by_file_type={t: total(lambda s, t=t: s.file_type_sizes.get(t, 0)) for t in file_types},
+        count_by_file_type={t: total(lambda s, t=t: s.file_type_counts.get(t, 0)) for t in file_types},
+    )
+    estimate.elapsed_seconds = time.perf_counter() - start
+    logger.info(f"Estimated from {estimate.sampled} of {estimate.population} series directories "
+                f"in {estimate.elapsed_seconds:.2f}s")
+    return estimate
+
+
+if __name__ == "__main__":
+    import sys
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+
+    destination = sys.argv[1] if len(sys.argv) > 1 else "."
+    result = estimate_collection(Mylar3Scanner(destination), fraction=0.1, seed=1)
+    print(f"Sampled {result.sampled}/{result.population} series directories "
+          f"({result.confidence:.0%} confidence):")
+    for name in ('series', 'issues_owned', 'missing_issues', 'size_bytes', 'completion_percentage'):
+        value = getattr(result, name)
+        print(f"  {name:<22} {value.value:>14,.1f}  [{value.low:,.1f} .. {value.high:,.1f}]")
@@ -0,0 +1,247 @@
+"""
+SQLite history of Mylar3 collection statistics.
+
+Each recorded run stores one compact row of collection aggregates and one
+row per publisher, never the series themselves, so trend reports over
+weeks or months are answered from the history alone without rescanning.
+
+Runs are kept apart by library (destination_dir) and scope: a run narrowed
+to some publishers, series or a --where filter covers only part of the
+collection and is only compared with runs of the same scope.
+
+Usage:
+    history = StatsHistory("./stats_history.db")
+    history.record(stats)
+    for point in history.trend(period='month'):
+        print(point.period, point.issues_owned)
+"""
+import time
+import sqlite3
+import logging
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+try:
+    from comic_file_organizer.mylar3_stats import CollectionStatistics
+except ModuleNotFoundError:
+    from mylar3_stats import CollectionStatistics
+
+
+logger = logging.getLogger(__name__)
+
+# SQLite strftime() formats bucketing runs into trend periods
+PERIODS = {
+    'day': '%Y-%m-%d',
+    'week': '%Y-W%W',
+    'month': '%Y-%m',
+}
+
+# Scope of runs over the whole collection
+FULL_SCOPE = ''
+
+# Columns shared by the collection and publisher tables
+AGGREGATE_COLUMNS = (
+    'total_series', 'series_with_issues', 'complete_series',
+    'issues_owned', 'issues_expected', 'missing_issues', 'total_bytes',
+)
+
+
+@dataclass
+class TrendPoint:
+    """Aggregates as of the last run recorded in a period"""
+    period: str
+    recorded_at: int
+    total_series: int
+    series_with_issues: int
+    complete_series: int
+    issues_owned: int
+    issues_expected: int
+    missing_issues: int
+    total_bytes: int
+
+    @property
+    def completion_percentage(self) -> float:
+        if self.issues_expected == 0:
+            return 0.0
+        return (self.issues_owned / self.issues_expected) * 100.0
+
+
+def run_scope(publishers: Optional[Iterable[str]] = None, series: Optional[Iterable[str]] = None,
+              where: Optional[str] = None) -> str:
+    """
+    Canonical description of the part of the collection a run covered.
+
+    Returns:
+        FULL_SCOPE ('') for the whole collection, otherwise e.g.
+        'publisher=dc,marvel; series=bat*'
+    """
+    parts = []
+    if publishers:
+        parts.append('publisher=' + ','.join(sorted({p.lower() for p in publishers})))
+    if series:
+        parts.append('series=' + ','.join(sorted(set(series))))
+    if where:
+        parts.append(f"where={where}")
+    return '; '.join(parts)
+
+
+class StatsHistory:
+    """Append-only store of per-run collection and publisher aggregates"""
+
+    def __init__(self, db_path: str = ":memory:"):
+        self.db_path = db_path
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._init_db()
+
+    def _init_db(self) -> None:
+        columns = ', '.join(f"{name} INTEGER NOT NULL" for name in AGGREGATE_COLUMNS)
+        cur = self._conn.cursor()
+        cur.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY,
+                recorded_at INTEGER NOT NULL,
+                destination_dir TEXT NOT NULL,
+                scope TEXT NOT NULL DEFAULT '',
+                total_publishers INTEGER NOT NULL,
+                {columns}
+            )
+            """
+        )
+        cur.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS publisher_runs (
+                run_id INTEGER NOT NULL REFERENCES runs(id),
+                recorded_at INTEGER NOT NULL,
+                publisher TEXT NOT NULL,
+                {columns},
+                PRIMARY KEY (run_id, publisher)
+            )
+            """
+        )
+        # Histories written before runs had a scope
+        if 'scope' not in {row[1] for row in cur.execute("PRAGMA table_info(runs)")}:
+            cur.execute("ALTER TABLE runs ADD COLUMN scope TEXT NOT NULL DEFAULT ''")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_runs_recorded_at ON runs(recorded_at)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_runs_library ON runs(destination_dir, scope, recorded_at)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_publisher_runs_publisher "
+                    "ON publisher_runs(publisher, recorded_at)")
+        self._conn.commit()
+
+    def close(self) -> None:
+        try:
+            self._conn.close()
+        except Exception:
+            pass
+
+    def __enter__(self) -> "StatsHistory":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def record(self, stats: CollectionStatistics, recorded_at: Optional[int] = None,
+               scope: str = FULL_SCOPE) -> int:
+        """
+        Append one run's aggregates.
+
+        Args:
+            stats: Statistics to record
+            recorded_at: Unix timestamp of the run (default: now)
+            scope: What the run covered (see run_scope); FULL_SCOPE for the
+                whole collection
+
+        Returns:
+            Run id
+        """
+        recorded_at = int(time.time()) if recorded_at is None else int(recorded_at)
+        accumulator = stats.accumulator
+        placeholders = ', '.join('?' * len(AGGREGATE_COLUMNS))
+        with self._conn:
+            cur = self._conn.execute(
+                f"INSERT INTO runs (recorded_at, destination_dir, scope, total_publishers, "
+                f"{', '.join(AGGREGATE_COLUMNS)}) VALUES (?, ?, ?, ?, {placeholders})",
+                (recorded_at, stats.scan_results.destination_dir, scope, stats.total_publishers)
+                + _aggregate_row(accumulator.totals)
+            )
+            run_id = cur.lastrowid
+            self._conn.executemany(
+                f"INSERT INTO publisher_runs (run_id, recorded_at, publisher, "
+                f"{', '.join(AGGREGATE_COLUMNS)}) VALUES (?, ?, ?, {placeholders})",
+                [(run_id, recorded_at, name) + _aggregate_row(counts)
+                 for name, counts in accumulator.publishers.items()]
+            )
+        logger.info(f"Recorded statistics run {run_id} in {self.db_path}")
+        return run_id
+
+    def trend(self, period: str = 'month', publisher: Optional[str] = None,
+              limit: Optional[int] = None, destination_dir: Optional[str] = None,
+              scope: str = FULL_SCOPE) -> List[TrendPoint]:
+        """
+        Aggregates at the end of each period, oldest first.
+
+        Args:
+            period: 'day', 'week' or 'month'
+            publisher: Trend for a single publisher (case-insensitive)
+                instead of the whole collection
+            limit: Only the most recent `limit` periods
+            destination_dir: Only runs over this library (default: all)
+            scope: Only runs of this scope (see run_scope). A publisher's
+                trend over the whole collection also takes runs scoped to
+                just that publisher, which cover it completely
+
+        Returns:
+            One TrendPoint per period that has a recorded run
+        """
+        if period not in PERIODS:
+            raise ValueError(f"Unknown trend period: {period} (choose from {', '.join(PERIODS)})")
+        scopes = [scope]
+        if publisher is None:
+            source, conditions, params = 'runs AS r', [], []
+        else:
+            source = 'publisher_runs AS t JOIN runs AS r ON r.id = t.run_id'
+            conditions, params = ['t.publisher = ? COLLATE NOCASE'], [publisher]
+            if scope == FULL_SCOPE:
+                scopes.append(run_scope(publishers=[publisher]))
+        conditions.append(f"r.scope IN ({', '.join('?' * len(scopes))})")
+        params.extend(scopes)
+        if destination_dir is not None:
+            conditions.append('r.destination_dir = ?')
+            params.append(destination_dir)
+        # Aggregates come from publisher_runs (t) or the run itself (r)
+        table = 'r' if publisher is None else 't'
+        # Last run of each period (SQLite takes the bare columns from the MAX() row)
+        sql = (
+            f"SELECT strftime('{PERIODS[period]}', {table}.recorded_at, 'unixepoch') AS bucket, "
+            f"MAX({table}.recorded_at), {', '.join(f'{table}.{c}' for c in AGGREGATE_COLUMNS)} "
+            f"FROM {source} WHERE {' AND '.join(conditions)} GROUP BY bucket ORDER BY bucket"
+        )
+        points = [TrendPoint(*row) for row in self._conn.execute(sql, params)]
+        if limit is not None:
+            points = points[-limit:] if limit > 0 else []
+        return points
+
+    def run_count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+
+def _aggregate_row(counts) -> tuple:
+    return (
+        counts.total_series, counts.series_with_issues, counts.complete_series,
+        counts.total_issues_owned, counts.total_issues_expected, counts.total_missing_issues,
+        counts.total_size_bytes,
+    )
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Usage: python3 mylar3_history.py /path/to/history.db [day|week|month]")
+        sys.exit(1)
+
+    with StatsHistory(sys.argv[1]) as history:
+        period = sys.argv[2] if len(sys.argv) > 2 else 'month'
+        print(f"Runs recorded: {history.run_count()}")
+        for point in history.trend(period):
+            print(f"  {point.period}: {point.issues_owned} issues, "
+                  f"{point.completion_percentage:.1f}% complete, {point.total_bytes} bytes")
@@ -0,0 +1,299 @@
+"""
+Indexed series selection for Mylar3 collections.
+
+Filter expressions such as
+
+    status=Continuing and completion<50 and publisher=Marvel and year>=2010
+
+are answered from indexes built once per ScanResults:
+
+- hash indexes (value -> row ids) for categorical fields, for = and !=
+- sorted indexes (bisect) for numeric fields, for range comparisons
+
+Indexed conditions are intersected starting from the narrowest one. Only
+!= and ~ are checked row by row, against the rows left after that.
+Selections can then be grouped (e.g. by decade) into the same counters
+calculate_statistics() uses, summed over SeriesColumns when NumPy is
+installed.
+"""
+import re
+import bisect
+import operator
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+try:
+    from comic_file_organizer.mylar3_scanner import ScanResults, SeriesInfo
+    from comic_file_organizer.mylar3_stats import AggregateCounts, column_counts
+    from comic_file_organizer.mylar3_columnar import SeriesColumns, numpy_available
+except ModuleNotFoundError:
+    from mylar3_scanner import ScanResults, SeriesInfo
+    from mylar3_stats import AggregateCounts, column_counts
+    from mylar3_columnar import SeriesColumns, numpy_available
+
+
+logger = logging.getLogger(__name__)
+
+
+def _decade(series: SeriesInfo) -> Optional[int]:
+    return series.year // 10 * 10 if isinstance(series.year, int) else None
+
+
+def _lower(value: Optional[str]) -> Optional[str]:
+    return value.lower() if isinstance(value, str) else value
+
+
+# Fields answered by hash lookups (compared case-insensitively)
+HASH_FIELDS: Dict[str, Callable[[SeriesInfo], Any]] = {
+    'publisher': lambda s: _lower(s.publisher),
+    'series': lambda s: _lower(s.series_name),
+    'status': lambda s: _lower(s.status),
+    'comicid': lambda s: None if s.comicid is None else str(s.comicid),
+    'decade': _decade,
+}
+
+# Fields answered by range scans over a sorted index
+RANGE_FIELDS: Dict[str, Callable[[SeriesInfo], Any]] = {
+    'year': lambda s: s.year if isinstance(s.year, int) else None,
+    'decade': _decade,
+    'completion': lambda s: s.completion_percentage,
+    'owned': lambda s: s.issues_owned,
+    'total': lambda s: s.total_issues,
+    'missing': lambda s: s.missing_issues,
+    'size': lambda s: s.total_size_bytes,
+}
+
+FIELDS = sorted(set(HASH_FIELDS) | set(RANGE_FIELDS))
+
+# Group keys keep the original spelling (publisher names, statuses) for display
+GROUP_FIELDS: Dict[str, Callable[[SeriesInfo], Any]] = {
+    'publisher': lambda s: s.publisher,
+    'status': lambda s: s.status,
+    'year': lambda s: s.year,
+    'decade': _decade,
+    'type': lambda s: '/'.join(sorted(s.file_type_counts)) or None,
+}
+
+_COMPARE = {
+    '=': operator.eq, '!=': operator.ne,
+    '<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge,
+}
+
+# 'and' separators, or quoted values skipped over so an 'and' inside them stays
+_TERM_SEPARATOR = re.compile(r""""[^"]*"|'[^']*'|\s+and\s+""", re.IGNORECASE)
+
+_CONDITION = re.compile(r"""^\s*(\w+)\s*(<=|>=|!=|==|=|<|>|~)\s*(?:"([^"]*)"|'([^']*)'|(.*?))\s*$""")
+
+
+@dataclass
+class Condition:
+    """One `field op value` term of a filter expression"""
+    field: str
+    op: str
+    value: Any
+
+
+def _split_terms(expression: str) -> List[str]:
+    """Split at 'and' outside quoted values"""
+    terms, start = [], 0
+    for match in _TERM_SEPARATOR.finditer(expression):
+        if match.group(0)[0] not in '"\'':
+            terms.append(expression[start:match.start()])
+            start = match.end()
+    terms.append(expression[start:])
+    return terms
+
+
+def parse_where(expression: str) -> List[Condition]:
+    """
+    Parse a filter expression: conditions joined by 'and'.
+
+    Operators: = != < <= > >= and ~ (case-insensitive substring).
+
+    Raises:
+        ValueError: If the expression is malformed or names an unknown field
+    """
+    conditions = []
+    for term in _split_terms(expression.strip()):
+        match = _CONDITION.match(term)
+        if not match or not term.strip():
+            raise ValueError(f"Cannot parse condition '{term}' (expected field<op>value)")
+        name, op = match.group(1).lower(), match.group(2)
+        raw = next(g for g in match.groups()[2:] if g is not None)
+        op = '=' if op == '==' else op
+        if name not in HASH_FIELDS and name not in RANGE_FIELDS:
+            raise ValueError(f"Unknown field '{name}' (available: {', '.join(FIELDS)})")
+        if op in ('<', '<=', '>', '>=') and name not in RANGE_FIELDS:
+            raise ValueError(f"Field '{name}' does not support '{op}'")
+        if name in RANGE_FIELDS and op != '~':
+            try:
+                value: Any = float(raw.rstrip('%'))
+            except ValueError:
+                raise ValueError(f"Field '{name}' needs a number, got '{raw}'")
+            if name in HASH_FIELDS and value.is_integer():
+                value = int(value)
+        else:
+            value = raw.lower()
+        conditions.append(Condition(name, op, value))
+    return conditions
+
+
+class SeriesQueryIndex:
+    """Hash and sorted indexes over one ScanResults, built lazily per field"""
+
+    def __init__(self, scan_results: ScanResults):
+        self.series: List[SeriesInfo] = scan_results.series
+        self._hash: Dict[str, Dict[Any, List[int]]] = {}
+        self._sorted: Dict[str, Tuple[List[Any], List[int]]] = {}
+        self._all_columns: Optional[SeriesColumns] = None
+
+    def hash_index(self, name: str) -> Dict[Any, List[int]]:
+        index = self._hash.get(name)
+        if index is None:
+            key = HASH_FIELDS[name]
+            index = {}
+            for row, series in enumerate(self.series):
+                index.setdefault(key(series), []).append(row)
+            self._hash[name] = index
+        return index
+
+    def sorted_index(self, name: str) -> Tuple[List[Any], List[int]]:
+        """(sorted values, row ids in the same order); rows without a value are left out"""
+        index = self._sorted.get(name)
+        if index is None:
+            key = RANGE_FIELDS[name]
+            column = [key(s) for s in self.series]
+            rows = [row for row, value in enumerate(column) if value is not None]
+            rows.sort(key=column.__getitem__)
+            index = self._sorted[name] = ([column[row] for row in rows], rows)
+        return index
+
+    def lookup(self, name: str, value: Any) -> List[SeriesInfo]:
+        """Series whose hash field equals value (e.g. lookup('publisher', 'marvel'))"""
+        if isinstance(value, str):
+            value = value.lower()
+        return [self.series[row] for row in self.hash_index(name).get(value, [])]
+
+    def _candidates(self, condition: Condition) -> Optional[Tuple[List[int], int, int]]:
+        """
+        Rows matching an indexable condition as (rows, start, stop), a
+        window of an index list, or None if it must be checked row by row.
+        """
+        name, op, value = condition.field, condition.op, condition.value
+        if op == '=' and name in HASH_FIELDS:
+            rows = self.hash_index(name).get(value, [])
+            return rows, 0, len(rows)
+        if name in RANGE_FIELDS and op in ('=', '<', '<=', '>', '>='):
+            values, rows = self.sorted_index(name)
+            if op == '=':
+                return rows, bisect.bisect_left(values, value), bisect.bisect_right(values, value)
+            if op == '<':
+                return rows, 0, bisect.bisect_left(values, value)
+            if op == '<=':
+                return rows, 0, bisect.bisect_right(values, value)
+            if op == '>':
+                return rows, bisect.bisect_right(values, value), len(rows)
+            return rows, bisect.bisect_left(values, value), len(rows)
+        return None
+
+    @staticmethod
+    def _predicate(condition: Condition) -> Callable[[SeriesInfo], bool]:
+        """Row-by-row test for a condition"""
+        key = HASH_FIELDS.get(condition.field) or RANGE_FIELDS[condition.field]
+        target = condition.value
+        if condition.op == '~':
+            return lambda s: (lambda v: v is not None and target in str(v).lower())(key(s))
+        compare = _COMPARE[condition.op]
+        missing = condition.op == '!='
+        return lambda s: (lambda v: missing if v is None else compare(v, target))(key(s))
+
+    def select(self, where: str) -> List[SeriesInfo]:
+        """
+        Series matching a filter expression, in scan order.
+
+        Raises:
+            ValueError: If the expression cannot be parsed
+        """
+        conditions = parse_where(where)
+        windows: List[Tuple[List[int], int, int]] = []
+        checks: List[Callable[[SeriesInfo], bool]] = []
+        for condition in conditions:
+            window = self._candidates(condition)
+            if window is None:
+                checks.append(self._predicate(condition))
+            else:
+                windows.append(window)
+
+        if windows:
+            # Start from the narrowest window (sizes come from bisect, nothing
+            # is copied) and intersect the others into it
+            windows.sort(key=lambda w: w[2] - w[1])
+            rows, start, stop = windows[0]
+            selected = set(rows[start:stop])
+            for rows, start, stop in windows[1:]:
+                if not selected:
+                    break
+                selected.intersection_update(rows[start:stop])
+            series = self.series
+            candidates = [series[row] for row in sorted(selected)]
+        else:
+            candidates = list(self.series)
+        for check in checks:
+            candidates = [s for s in candidates if check(s)]
+        logger.debug(f"'{where}' matched {len(candidates)} of {len(self.series)} series")
+        return candidates
+
+    def group_by(self, name: str, series: Optional[Sequence[SeriesInfo]] = None) -> Dict[Any, AggregateCounts]:
+        """
+        Aggregate counters per value of a field.
+
+        Args:
+            name: Field to group by (e.g. 'decade', 'publisher', 'status')
+            series: Series to group (default: the whole collection)
+
+        Raises:
+            ValueError: If the field is unknown
+        """
+        key = GROUP_FIELDS.get(name)
+        if key is None:
+            raise ValueError(f"Cannot group by '{name}' (available: {', '.join(sorted(GROUP_FIELDS))})")
+        series = self.series if series is None else series
+        if numpy_available():
+            # Group codes per row, then whole-column sums per group
+            codes: Dict[Any, int] = {}
+            rows = [codes.setdefault(key(s), len(codes)) for s in series]
+            counts = column_counts(self._columns(series), rows, len(codes))
+            return dict(zip(codes, counts))
+        groups: Dict[Any, AggregateCounts] = {}
+        for s in series:
+            value = key(s)
+            counts = groups.get(value)
+            if counts is None:
+                counts = groups[value] = AggregateCounts()
+            counts.add(s)
+        return groups
+
+    def _columns(self, series: Sequence[SeriesInfo]) -> SeriesColumns:
+        """Columnar view of series; the whole collection's is built once"""
+        if series is not self.series:
+            return SeriesColumns(series)
+        if self._all_columns is None:
+            self._all_columns = SeriesColumns(series)
+        return self._all_columns
+
+
+if __name__ == "__main__":
+    # Test query engine
+    import sys
+    from mylar3_config import load_config
+    from mylar3_scanner import Mylar3Scanner
+
+    if len(sys.argv) < 3:
+        print('Usage: python3 mylar3_query.py /path/to/mylar3/config.ini "publisher=Marvel and completion<50"')
+        sys.exit(1)
+
+    config = load_config(sys.argv[1])
+    index = SeriesQueryIndex(Mylar3Scanner(config.destination_dir).scan())
+    for series in index.select(sys.argv[2]):
+        print(f"  {series.publisher}: {series.series_name} ({series.year}) "
+              f"{series.issues_owned}/{series.total_issues}")
@@ -0,0 +1,448 @@
+"""
+Distributed Mylar3 scans through a shared SQLite work queue.
+
+A coordinator lists the publisher and series directories once and puts
+them into a queue file as chunks of series. Any number of worker
+processes, on this host or others that mount the library, claim chunks,
+scan them and store their partial ScanResults back in the queue. The
+coordinator then merges the partial results (ScanResults.merge is
+associative, so chunk results combine in any grouping) in chunk order,
+which gives exactly the results of a serial scan.
+
+Claims are leases: a chunk whose worker died is handed out again once its
+lease expires, and fails for good after MAX_ATTEMPTS.
+
+Workers on other hosts may mount the library elsewhere (--root); chunks
+name directories relative to destination_dir and results are reported
+under the coordinator's paths. The queue file must live on a filesystem
+with working file locks (SQLite over some NFS setups has none).
+
+Usage:
+    python3 -m comic_file_organizer queue enqueue scan.db /path/to/config.ini
+    python3 -m comic_file_organizer queue work scan.db [--root /mnt/comics]
+    python3 -m comic_file_organizer queue status scan.db
+    python3 -m comic_file_organizer queue collect scan.db --format json
+"""
+import os
+import sys
+import json
+import time
+import socket
+import sqlite3
+import logging
+import argparse
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Sequence
+try:
+    from comic_file_organizer.mylar3_scanner import Mylar3Scanner, ScanResults, SeriesInfo
+    from comic_file_organizer.mylar3_history import StatsHistory, run_scope
+except ModuleNotFoundError:
+    from mylar3_scanner import Mylar3Scanner, ScanResults, SeriesInfo
+    from mylar3_history import StatsHistory, run_scope
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 200  # series per chunk
+DEFAULT_LEASE = 600.0  # seconds before a claimed chunk is handed out again
+MAX_ATTEMPTS = 3
+
+STATES = ('pending', 'claimed', 'done', 'failed')
+
+
+@dataclass
+class Chunk:
+    """Series directories of one publisher, scanned as a unit"""
+    id: int
+    publisher: str
+    series: List[str]
+    attempts: int
+
+
+def results_to_json(results: ScanResults) -> str:
+    return json.dumps({
+        'destination_dir': results.destination_dir,
+        'publishers': results.publishers,
+        'series': [asdict(series) for series in results.series],
+        'errors': results.errors,
+    })
+
+
+def results_from_json(text: str) -> ScanResults:
+    data = json.loads(text)
+    return ScanResults(
+        destination_dir=data['destination_dir'],
+        publishers=data['publishers'],
+        series=[SeriesInfo(**series) for series in data['series']],
+        errors=data['errors']
+    )
+
+
+def merge_results(parts: List[ScanResults], destination_dir: str) -> ScanResults:
+    """
+    Merge partial results in order. Merging pairwise keeps the copying at
+    O(n log k) for k parts; merge is associative, so the grouping does
+    not change the result.
+    """
+    if not parts:
+        return ScanResults(destination_dir=destination_dir)
+    while len(parts) > 1:
+        parts = [parts[i].merge(parts[i + 1]) if i + 1 < len(parts) else parts[i]
+                 for i in range(0, len(parts), 2)]
+    return parts[0]
+
+
+class ScanQueue:
+    """SQLite-backed queue of scan chunks and their partial results"""
+
+    def __init__(self, db_path: str, timeout: float = 30.0):
+        self.db_path = db_path
+        # Autocommit mode: transactions are opened explicitly with BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(str(db_path), timeout=timeout, isolation_level=None)
+        self._init_db()
+
+    def _init_db(self) -> None:
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS chunks (
+                id INTEGER PRIMARY KEY,
+                publisher TEXT NOT NULL,
+                series TEXT NOT NULL,
+                state TEXT NOT NULL DEFAULT 'pending',
+                worker TEXT,
+                claimed_at REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                result TEXT,
+                error TEXT
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_chunks_state ON chunks(state, id)")
+
+    def close(self) -> None:
+        try:
+            self._conn.close()
+        except Exception:
+            pass
+
+    def __enter__(self) -> "ScanQueue":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _transaction(self):
+        """Write transaction that takes the database lock up front"""
+        self._conn.execute("BEGIN IMMEDIATE")
+        return self._conn
+
+    # -- coordinator --------------------------------------------------------
+
+    def meta(self) -> Dict[str, object]:
+        return {key: json.loads(value) for key, value in self._conn.execute("SELECT key, value FROM meta")}
+
+    def enqueue(self, scanner: Mylar3Scanner, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+        """
+        Split a collection scan into chunks (publisher listing order, then
+        series listing order, as a serial scan visits them).
+
+        Returns:
+            Number of chunks queued
+
+        Raises:
+            ValueError: If the queue already holds a scan
+        """
+        if self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]:
+            raise ValueError(f"Queue {self.db_path} already holds a scan")
+        if not os.path.isdir(scanner.destination_dir):
+            raise FileNotFoundError(f"destination_dir does not exist: {scanner.destination_dir}")
+
+        rows = []
+        for publisher in scanner._publisher_entries():
+            if publisher.startswith('.') or not os.path.isdir(os.path.join(scanner.destination_dir, publisher)):
+                continue
+            names = scanner.series_directories(publisher)
+            for start in range(0, len(names), chunk_size):
+                rows.append((publisher, json.dumps(names[start:start + chunk_size])))
+
+        meta = {
+            'destination_dir': scanner.destination_dir,
+            'series_globs': scanner.series_patterns is not None,
+            'fields': sorted(scanner.fields),
+            # What the scan covers, for history records (see mylar3_history.run_scope)
+            'scope': run_scope(scanner.publishers, scanner.series_patterns),
+            'created_at': time.time(),
+        }
+        conn = self._transaction()
+        try:
+            conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                             [(key, json.dumps(value)) for key, value in meta.items()])
+            conn.executemany("INSERT INTO chunks (publisher, series) VALUES (?, ?)", rows)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        logger.info(f"Queued {len(rows)} chunks of up to {chunk_size} series in {self.db_path}")
+        return len(rows)
+
+    def status(self) -> Dict[str, int]:
+        """Chunks per state"""
+        counts = dict.fromkeys(STATES, 0)
+        counts.update(self._conn.execute("SELECT state, COUNT(*) FROM chunks GROUP BY state"))
+        return counts
+
+    def results(self) -> ScanResults:
+        """
+        Merge the partial results of every finished chunk, in chunk order.
+
+        Chunks that failed or are not finished yet are reported in errors.
+        """
+        destination_dir = self.meta().get('destination_dir', '')
+        parts, errors = [], []
+        for state, publisher, result, error in self._conn.execute(
+                "SELECT state, publisher, result, error FROM chunks ORDER BY id"):
+            if state == 'done':
+                parts.append(results_from_json(result))
+            elif state == 'failed':
+                errors.append(f"Error scanning publisher {publisher}: {error}")
+            else:
+                errors.append(f"Chunk of publisher {publisher} not scanned yet ({state})")
+        merged = merge_results(parts, destination_dir)
+        merged.errors.extend(errors)
+        return merged
+
+    # -- workers ------------------------------------------------------------
+
+    def claim(self, worker: str, lease: float = DEFAULT_LEASE) -> Optional[Chunk]:
+        """Take the next pending chunk (or one whose lease expired), or None if there is none"""
+        now = time.time()
+        conn = self._transaction()
+        try:
+            # Chunks whose workers died on every attempt are not handed out again
+            conn.execute(
+                "UPDATE chunks SET state = 'failed', error = 'lease expired ' || attempts || ' times' "
+                "WHERE state = 'claimed' AND claimed_at < ? AND attempts >= ?",
+                (now - lease, MAX_ATTEMPTS)
+            )
+            row = conn.execute(
+                "SELECT id, publisher, series, attempts FROM chunks "
+                "WHERE state = 'pending' OR (state = 'claimed' AND claimed_at < ?) "
+                "ORDER BY id LIMIT 1",
+                (now - lease,)
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE chunks SET state = 'claimed', worker = ?, claimed_at = ?, attempts = attempts + 1 "
+                    "WHERE id = ?",
+                    (worker, now, row[0])
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        if row is None:
+            return None
+        return Chunk(row[0], row[1], json.loads(row[2]), row[3] + 1)
+
+    def complete(self, chunk: Chunk, worker: str, results: ScanResults) -> bool:
+        """Store a chunk's results; False if the lease was lost to another worker"""
+        cur = self._conn.execute(
+            "UPDATE chunks SET state = 'done', result = ?, error = NULL "
+            "WHERE id = ? AND worker = ? AND state = 'claimed'",
+            (results_to_json(results), chunk.id, worker)
+        )
+        return cur.rowcount == 1
+
+    def fail(self, chunk: Chunk, worker: str, error: str) -> None:
+        """Give a chunk back after an error (failed for good after MAX_ATTEMPTS)"""
+        state = 'failed' if chunk.attempts >= MAX_ATTEMPTS else 'pending'
+        self._conn.execute(
+            "UPDATE chunks SET state = ?, error = ? WHERE id = ? AND worker = ? AND state = 'claimed'",
+            (state, error, chunk.id, worker)
+        )
+
+
+def scan_chunk(chunk: Chunk, destination_dir: str, root: Optional[str] = None,
+               fields: Optional[Sequence[str]] = None, series_globs: bool = False) -> ScanResults:
+    """
+    Scan one chunk's series directories.
+
+    Args:
+        destination_dir: The coordinator's destination_dir (used in the results)
+        root: Where this host mounts destination_dir (default: the same path)
+
+    Raises:
+        FileNotFoundError: If the publisher directory is missing on this host
+    """
+    scanner = Mylar3Scanner(root or destination_dir, fields=fields)
+    publisher_path = os.path.join(scanner.destination_dir, chunk.publisher)
+    if not os.path.isdir(publisher_path):
+        raise FileNotFoundError(f"Publisher directory not found: {publisher_path}")
+
+    results = ScanResults(destination_dir=destination_dir)
+    for name in chunk.series:
+        series_info = scanner._scan_series(chunk.publisher, name, os.path.join(publisher_path, name))
+        if series_info:
+            series_info.series_path = os.path.join(destination_dir, chunk.publisher, name)
+            results.series.append(series_info)
+    # As in a serial scan: with series globs a publisher counts only if a series matched
+    if results.series or not series_globs:
+        results.publishers.append(chunk.publisher)
+    return results
+
+
+def run_worker(db_path: str, root: Optional[str] = None, worker: Optional[str] = None,
+               lease: float = DEFAULT_LEASE) -> int:
+    """
+    Claim and scan chunks until the queue has none left.
+
+    Returns:
+        Number of chunks this worker completed
+    """
+    worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+    done = 0
+    with ScanQueue(db_path) as queue:
+        meta = queue.meta()
+        if 'destination_dir' not in meta:
+            raise ValueError(f"Queue {db_path} holds no scan (run 'queue enqueue' first)")
+        while True:
+            chunk = queue.claim(worker, lease)
+            if chunk is None:
+                break
+            start = time.perf_counter()
+            try:
+                results = scan_chunk(chunk, meta['destination_dir'], root, meta['fields'], meta['series_globs'])
+            except Exception as e:
+                logger.error(f"Chunk {chunk.id} ({chunk.publisher}) failed: {e}")
+                queue.fail(chunk, worker, str(e))
+                continue
+            if queue.complete(chunk, worker, results):
+                done += 1
+                logger.info(f"Chunk {chunk.id} ({chunk.publisher}, {len(chunk.series)} series) "
+                            f"in {time.perf_counter() - start:.2f}s")
+            else:
+                logger.warning(f"Chunk {chunk.id} was reassigned before it finished; result dropped")
+    return done
+
+
+def main(argv=None) -> int:
+    """Queue command line: enqueue, work, status, collect"""
+    parser = argparse.ArgumentParser(
+        description="Distributed Mylar3 scans through a shared SQLite work queue",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s enqueue scan.db /path/to/mylar3/config.ini --chunk-size 500
+  %(prog)s work scan.db                      # on every host, as many times as wanted
+  %(prog)s work scan.db --root /mnt/comics   # library mounted elsewhere on this host
+  %(prog)s status scan.db
+  %(prog)s collect scan.db --format ndjson > collection.ndjson
+        """
+    )
+    parser.add_argument('-v', '--verbose', action='store_true', help='Enable verbose logging')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    enqueue = commands.add_parser('enqueue', help='List the collection and queue its series in chunks')
+    enqueue.add_argument('queue', help='Queue database file')
+    enqueue.add_argument('config_path', help='Path to Mylar3 config.ini file')
+    enqueue.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                         help=f'Series per chunk (default: {DEFAULT_CHUNK_SIZE})')
+    enqueue.add_argument('--publisher', action='append', help='Only queue this publisher (repeatable)')
+    enqueue.add_argument('--series', metavar='GLOB', action='append',
+                         help='Only queue series whose directory name matches this glob (repeatable)')
+
+    work = commands.add_parser('work', help='Scan chunks until the queue is drained')
+    work.add_argument('queue', help='Queue database file')
+    work.add_argument('--root', help="Where this host mounts the collection (default: the coordinator's path)")
+    work.add_argument('--lease', type=float, default=DEFAULT_LEASE,
+                      help=f'Seconds before an unfinished chunk is handed to another worker (default: {DEFAULT_LEASE:g})')
+
+    status = commands.add_parser('status', help='Show chunks per state')
+    status.add_argument('queue', help='Queue database file')
+
+    collect = commands.add_parser('collect', help='Merge the chunk results into a statistics report')
+    collect.add_argument('queue', help='Queue database file')
+    collect.add_argument('--format', choices=('text', 'json', 'ndjson', 'csv'), default='text',
+                         help='Output format (default: text)')
+    collect.add_argument('--history', metavar='DB', help='Also record the statistics in this history database')
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING,
+                        format='%(levelname)s: %(message)s')
+
+    try:
+        if args.command == 'enqueue':
+            try:
+                from comic_file_organizer.mylar3_config import load_config
+            except ModuleNotFoundError:
+                from mylar3_config import load_config
+            config = load_config(args.config_path)
+            scanner = Mylar3Scanner(config.destination_dir, publishers=args.publisher, series_patterns=args.series)
+            with ScanQueue(args.queue) as queue:
+                count = queue.enqueue(scanner, max(1, args.chunk_size))
+            print(f"Queued {count} chunks in {args.queue}")
+            return 0
+
+        if args.command == 'work':
+            done = run_worker(args.queue, root=args.root, lease=args.lease)
+            print(f"Scanned {done} chunks")
+            return 0
+
+        if args.command == 'status':
+            with ScanQueue(args.queue) as queue:
+                counts = queue.status()
+            print(", ".join(f"{state}: {count}" for state, count in counts.items()))
+            return 0
+
+        # collect: report through the stats command's renderers
+        try:
+            from comic_file_organizer.mylar3_cli import emit_report, print_errors, print_full_report
+            from comic_file_organizer.mylar3_query import SeriesQueryIndex
+            from comic_file_organizer.mylar3_stats import calculate_statistics
+            from comic_file_organizer.report_output import TextReport, make_emitter
+        except ModuleNotFoundError:
+            from mylar3_cli import emit_report, print_errors, print_full_report
+            from mylar3_query import SeriesQueryIndex
+            from mylar3_stats import calculate_statistics
+            from report_output import TextReport, make_emitter
+        with ScanQueue(args.queue) as queue:
+            scan_results = queue.results()
+            counts = queue.status()
+            scope = queue.meta().get('scope', '')
+        complete = counts['done'] == sum(counts.values())
+        stats = calculate_statistics(scan_results)
+        if args.format == 'text':
+            with TextReport() as report:
+                print_full_report(stats, SeriesQueryIndex(scan_results), report=report)
+                if scan_results.errors:
+                    print_errors(scan_results.errors, report=report)
+        else:
+            with make_emitter(args.format, sys.stdout) as emitter:
+                emit_report(emitter, stats)
+                if scan_results.errors:
+                    emitter.emit('errors', ({'error': error} for error in scan_results.errors))
+        if args.history:
+            if complete:
+                with StatsHistory(args.history) as history:
+                    history.record(stats, scope=scope)
+            else:
+                # A partial collection would show up as a drop in the trend
+                print(f"Not recording history: only {counts['done']} of {sum(counts.values())} chunks done",
+                      file=sys.stderr)
+        return 1 if scan_results.errors else 0
+
+    except (FileNotFoundError, ValueError, sqlite3.Error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,648 @@
+"""
+Bulk rename/move planner and executor for Mylar3 collections.
+
+Planning computes the target layout for every series and issue from the
+Mylar3 folder_format/file_format templates and checks it for conflicts
+before anything is touched. Execution:
+- creates all target directories in one pass
+- uses rename(2) when source and target share a filesystem
+- uses copy_file_range(2)/sendfile(2) across devices (no userspace copy loop;
+  a move fails rather than falling back to one)
+- batches fsync calls and only unlinks sources once their copies are durable
+- logs every move in a write-ahead journal, replaying or rolling back
+  interrupted moves on the next run
+
+Usage:
+    python3 -m comic_file_organizer.mylar3_rename /path/to/config.ini
+    python3 -m comic_file_organizer.mylar3_rename /path/to/config.ini --apply
+"""
+import os
+import re
+import sys
+import shutil
+import sqlite3
+import logging
+import argparse
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+try:
+    from comic_file_organizer.mylar3_config import load_config
+    from comic_file_organizer.mylar3_scanner import Mylar3Scanner, ScanResults, SeriesInfo
+    from comic_file_organizer.mylar3_templates import NamingTemplates, series_fields
+    from comic_file_organizer.journal import Journal
+    from comic_file_organizer.mylar3_db import Mylar3DatabaseUpdater, default_database_path, queue_rename_plan
+except ModuleNotFoundError:
+    from mylar3_config import load_config
+    from mylar3_scanner import Mylar3Scanner, ScanResults, SeriesInfo
+    from mylar3_templates import NamingTemplates, series_fields
+    from journal import Journal
+    from mylar3_db import Mylar3DatabaseUpdater, default_database_path, queue_rename_plan
+
+
+logger = logging.getLogger(__name__)
+
+# Fallback issue number detection for files that don't follow file_format
+_ISSUE_FALLBACK = re.compile(r'#\s*([^\s()#]+)')
+_YEAR_FALLBACK = re.compile(r'\((?:[A-Za-z]+\s+)?(\d{4})\)')
+
+# Default journal file, kept at the collection root (dotfiles are skipped by the scanner)
+JOURNAL_NAME = '.comic-file-organizer.journal'
+
+# Copy chunk handed to the kernel per copy_file_range/sendfile call
+COPY_CHUNK = 64 * 1024 * 1024
+
+
+def parse_issue_filename(templates: NamingTemplates, filename: str) -> Optional[Dict]:
+    """
+    Fields for an issue file, parsed from its name.
+
+    Uses the file_format matcher first, then a loose
+    '<series> #<issue> (<year>)' fallback.
+
+    Returns:
+        Dict with at least 'issue' (and 'series' when it can be guessed),
+        or None when no issue number can be found
+    """
+    fields = templates.match_file(filename)
+    if fields is not None and 'issue' in fields:
+        return fields
+    stem = os.path.splitext(filename)[0]
+    issue_match = _ISSUE_FALLBACK.search(stem)
+    if not issue_match:
+        return None
+    fields = {'issue': issue_match.group(1)}
+    series_guess = stem[:issue_match.start()].strip(' -_')
+    if series_guess:
+        fields['series'] = series_guess
+    year_match = _YEAR_FALLBACK.search(stem)
+    if year_match:
+        fields['year'] = int(year_match.group(1))
+    return fields
+
+
+@dataclass
+class RenameOperation:
+    """A single planned file move"""
+    src: str
+    dst: str
+    series_path: str = ""
+    comicid: Optional[int] = None
+    issue: Optional[str] = None
+
+
+@dataclass
+class RenameConflict:
+    """A planned move that cannot be executed safely"""
+    src: str
+    dst: str
+    reason: str
+
+
+@dataclass
+class RenamePlan:
+    """Full target layout for a collection, checked for conflicts"""
+    destination_dir: str
+    operations: List[RenameOperation] = field(default_factory=list)
+    conflicts: List[RenameConflict] = field(default_factory=list)
+    unchanged: int = 0
+
+    @property
+    def is_clean(self) -> bool:
+        return not self.conflicts
+
+    @property
+    def target_directories(self) -> List[str]:
+        """Unique target directories, parents before children"""
+        return sorted({os.path.dirname(op.dst) for op in self.operations})
+
+
+@dataclass
+class RenameResult:
+    """Outcome of executing a RenamePlan"""
+    renamed: int = 0
+    copied: int = 0
+    bytes_copied: int = 0
+    directories_created: int = 0
+    directories_removed: int = 0
+    errors: List[str] = field(default_factory=list)
+
+
+class RenamePlanner:
+    """Computes the Mylar3 target layout for scanned series"""
+
+    def __init__(self, destination_dir: str, templates: NamingTemplates):
+        self.destination_dir = destination_dir
+        self.templates = templates
+
+    def issue_fields(self, series: SeriesInfo, filename: str) -> Optional[Dict]:
+        """
+        Template fields for an existing issue file of a known series.
+
+        Returns None when no issue number can be found.
+        """
+        fields = parse_issue_filename(self.templates, filename)
+        if fields is None:
+            return None
+        fields['series'] = series.series_name
+        return fields
+
+    def folder_fields(self, series: SeriesInfo) -> Dict:
+        """
+        Template fields for a series folder.
+
+        Imprint, volume and book type missing from series.json are recovered
+        from the current folder name when it already matches folder_format,
+        so a TPB or HC series is not planned onto its print series' folder.
+        """
+        fields = series_fields(series)
+        missing = [name for name in ('imprint', 'volume', 'booktype') if fields[name] is None]
+        if missing:
+            relative_dir = os.path.relpath(series.series_path, self.destination_dir).replace(os.sep, '/')
+            matched = None if relative_dir.startswith('..') else self.templates.match_folder(relative_dir)
+            for name in missing:
+                if matched and matched.get(name) is not None:
+                    fields[name] = matched[name]
+        return fields
+
+    def plan_series(self, series: SeriesInfo) -> Tuple[List[RenameOperation], int]:
+        """Planned moves for one series directory, plus the count of files already in place"""
+        target_dir = os.path.join(self.destination_dir, self.templates.render_folder(self.folder_fields(series)))
+        operations: List[RenameOperation] = []
+        unchanged = 0
+        try:
+            entries = [e for e in os.scandir(series.series_path) if e.is_file(follow_symlinks=False)]
+        except OSError as e:
+            logger.error(f"Cannot list {series.series_path}: {e}")
+            return operations, unchanged
+
+        for entry in entries:
+            name = entry.name
+            extension = os.path.splitext(name)[1]
+            issue = None
+            if name in Mylar3Scanner.METADATA_FILES:
+                target_name = name
+            elif extension.lower() in Mylar3Scanner.COMIC_EXTENSIONS:
+                fields = self.issue_fields(series, name)
+                if fields is None:
+                    logger.warning(f"Cannot determine issue number, keeping filename: {entry.path}")
+                    target_name = name
+                else:
+                    target_name = self.templates.render_file(fields, extension.lower())
+                    issue = fields['issue']
+            else:
+                continue
+
+            dst = os.path.join(target_dir, target_name)
+            if dst == entry.path:
+                unchanged += 1
+            else:
+                operations.append(RenameOperation(src=entry.path, dst=dst, series_path=series.series_path,
+                                                  comicid=series.comicid, issue=issue))
+        return operations, unchanged
+
+    def plan(self, series_list: Iterable[SeriesInfo]) -> RenamePlan:
+        """
+        Plan moves for every series and check them for conflicts.
+
+        Args:
+            series_list: SeriesInfo objects, usually ScanResults.series
+
+        Returns:
+            RenamePlan with ordered operations and any conflicts
+        """
+        plan = RenamePlan(destination_dir=self.destination_dir)
+        operations: List[RenameOperation] = []
+        for series in series_list:
+            series_ops, unchanged = self.plan_series(series)
+            operations.extend(series_ops)
+            plan.unchanged += unchanged
+        plan.operations, plan.conflicts = check_conflicts(operations)
+        return plan
+
+
+def check_conflicts(operations: List[RenameOperation]) -> Tuple[List[RenameOperation], List[RenameConflict]]:
+    """
+    Validate planned moves and order them so no move clobbers a pending source.
+
+    Conflicts:
+    - two sources mapping to the same target (compared case-insensitively,
+      so the plan is safe on case-insensitive filesystems too)
+    - a target that already exists and is not itself being moved away
+    - cycles (A -> B, B -> A), which would need temporary names
+
+    Returns:
+        Tuple of (ordered conflict-free operations, conflicts)
+    """
+    conflicts: List[RenameConflict] = []
+    by_target: Dict[str, List[RenameOperation]] = {}
+    for op in operations:
+        by_target.setdefault(op.dst.lower(), []).append(op)
+
+    candidates: List[RenameOperation] = []
+    for ops in by_target.values():
+        if len(ops) > 1:
+            for op in ops:
+                conflicts.append(RenameConflict(op.src, op.dst, f"{len(ops)} files map to the same target"))
+        else:
+            candidates.append(ops[0])
+
+    sources = {op.src: op for op in candidates}
+    for op in candidates:
+        if op.dst not in sources and os.path.lexists(op.dst) and not _same_file(op.src, op.dst):
+            conflicts.append(RenameConflict(op.src, op.dst, "target already exists"))
+
+    # A move whose target is another pending source must run after that source
+    # moves away. Each op has at most one blocker, so dependencies form chains.
+    state: Dict[str, str] = {c.src: 'bad' for c in conflicts}
+    ordered: List[RenameOperation] = []
+    for op in candidates:
+        chain: List[RenameOperation] = []
+        current: Optional[RenameOperation] = op
+        while current is not None and current.src not in state:
+            state[current.src] = 'visiting'
+            chain.append(current)
+            current = sources.get(current.dst)
+
+        reason = None
+        if current is not None and state[current.src] == 'visiting':
+            reason = "circular rename"
+        elif current is not None and state[current.src] == 'bad':
+            reason = "blocked by a conflicting move"
+
+        cycle_start = chain.index(current) if reason == "circular rename" else len(chain)
+        for index in range(len(chain) - 1, -1, -1):
+            link = chain[index]
+            if reason:
+                state[link.src] = 'bad'
+                why = reason if index >= cycle_start else "blocked by a conflicting move"
+                conflicts.append(RenameConflict(link.src, link.dst, why))
+            else:
+                state[link.src] = 'done'
+                ordered.append(link)
+    return ordered, conflicts
+
+
+def _same_file(a: str, b: str) -> bool:
+    try:
+        return os.path.samefile(a, b)
+    except OSError:
+        return False
+
+
+class RenameExecutor:
+    """Executes a RenamePlan with kernel-side copies, batched fsync and an optional journal"""
+
+    def __init__(self, fsync_batch: int = 256, fsync: bool = True, journal: Optional[Journal] = None):
+        """
+        Args:
+            fsync_batch: Number of moved files per durability batch
+            fsync: Disable to skip fsync entirely (tests, throwaway trees)
+            journal: Write-ahead journal; each batch's intents are logged
+                with one group commit before any file in it is touched
+        """
+        self.fsync_batch = max(1, fsync_batch)
+        self.fsync = fsync
+        self.journal = journal
+        self._dev_cache: Dict[str, int] = {}
+        # Pending cross-device copies: (tmp_path, dst, src)
+        self._pending_copies: List[Tuple[str, str, str]] = []
+        self._pending_sources: Set[str] = set()
+        self._dirty_dirs: Set[str] = set()
+        # Sources whose copy could not be placed by flush(); journalled as aborted
+        self._failed_copies: Set[str] = set()
+
+    def execute(self, plan: RenamePlan, result: Optional[RenameResult] = None) -> RenameResult:
+        """
+        Execute every operation in a conflict-free plan.
+
+        Raises:
+            ValueError: If the plan still contains conflicts
+        """
+        if not plan.is_clean:
+            raise ValueError(f"Refusing to execute plan with {len(plan.conflicts)} conflicts")
+        result = result or RenameResult()
+
+        result.directories_created = self.create_directories(plan.target_directories)
+
+        operations = plan.operations
+        for start in range(0, len(operations), self.fsync_batch):
+            self._execute_batch(operations[start:start + self.fsync_batch], result)
+
+        if self.journal:
+            self.journal.sync()
+            self.journal.checkpoint()
+
+        result.directories_removed = self.remove_empty_directories({op.series_path for op in plan.operations if op.series_path})
+        return result
+
+    def _execute_batch(self, batch: List[RenameOperation], result: RenameResult) -> None:
+        ids: Dict[str, int] = {}
+        if self.journal:
+            for op in batch:
+                kind = 'rename' if os.path.dirname(op.src) == os.path.dirname(op.dst) else 'move'
+                ids[op.src] = self.journal.begin(kind, op.src, op.dst, tmp=partial_path(op.dst))
+            self.journal.sync()
+
+        moved: List[RenameOperation] = []
+        failed: List[int] = []
+        for op in batch:
+            try:
+                self.move(op.src, op.dst, result)
+                moved.append(op)
+            except OSError as e:
+                result.errors.append(f"{op.src} -> {op.dst}: {e}")
+                logger.error(f"Failed to move {op.src} -> {op.dst}: {e}")
+                failed.append(ids.get(op.src))
+        self.flush(result)
+
+        done = [ids.get(op.src) for op in moved if op.src not in self._failed_copies]
+        failed.extend(ids.get(op.src) for op in moved if op.src in self._failed_copies)
+        self._failed_copies = set()
+
+        if self.journal:
+            # Durable with the next batch's group commit; recovery is idempotent if lost
+            self.journal.commit(done)
+            self.journal.abort(failed)
+
+    def create_directories(self, directories: Iterable[str]) -> int:
+        """Create all target directories in a single sorted pass"""
+        created = 0
+        for directory in sorted(set(directories)):
+            if os.path.isdir(directory):
+                continue
+            os.makedirs(directory, exist_ok=True)
+            self._dirty_dirs.add(os.path.dirname(directory))
+            created += 1
+        return created
+
+    def _device(self, directory: str) -> int:
+        dev = self._dev_cache.get(directory)
+        if dev is None:
+            dev = os.stat(directory).st_dev
+            self._dev_cache[directory] = dev
+        return dev
+
+    def move(self, src: str, dst: str, result: RenameResult) -> None:
+        """Move one file: rename(2) on the same device, kernel copy otherwise"""
+        if dst in self._pending_sources:
+            # dst is still occupied by a copied-but-not-yet-unlinked source
+            self.flush(result)
+        if os.path.lexists(dst):
+            raise FileExistsError(f"Target appeared after planning: {dst}")
+        src_dir, dst_dir = os.path.dirname(src), os.path.dirname(dst)
+        if self._device(src_dir) == self._device(dst_dir):
+            os.rename(src, dst)
+            self._dirty_dirs.update((src_dir, dst_dir))
+            result.renamed += 1
+            return
+
+        tmp = partial_path(dst)
+        try:
+            result.bytes_copied += copy_file_kernel(src, tmp)
+            shutil.copystat(src, tmp)
+        except OSError:
+            if os.path.lexists(tmp):
+                os.unlink(tmp)
+            raise
+        self._pending_copies.append((tmp, dst, src))
+        self._pending_sources.add(src)
+        result.copied += 1
+
+    def flush(self, result: RenameResult) -> None:
+        """
+        Make the current batch durable.
+
+        Copies are fsynced, renamed into place and their directories synced
+        before any source is unlinked, so a crash never loses both copies.
+        A copy that cannot be placed is reported in result.errors, its
+        temporary file removed and its source kept.
+        """
+        try:
+            placed: List[str] = []
+            for tmp, dst, src in self._pending_copies:
+                try:
+                    if self.fsync:
+                        _fsync_path(tmp)
+                    os.rename(tmp, dst)
+                except OSError as e:
+                    # Keep the source; a copy that never reached dst is only a stray .partial
+                    result.errors.append(f"{src} -> {dst}: {e}")
+                    logger.error(f"Failed to place copy {tmp} -> {dst}: {e}")
+                    result.copied -= 1
+                    self._failed_copies.add(src)
+                    try:
+                        os.unlink(tmp)
+                    except OSError:
+                        pass
+                    continue
+                self._dirty_dirs.add(os.path.dirname(dst))
+                placed.append(src)
+            if self.fsync:
+                for directory in self._dirty_dirs:
+                    _fsync_path(directory, directory=True)
+            source_dirs: Set[str] = set()
+            for src in placed:
+                try:
+                    os.unlink(src)
+                    source_dirs.add(os.path.dirname(src))
+                except OSError as e:
+                    result.errors.append(f"Copied but could not remove source {src}: {e}")
+            if self.fsync:
+                for directory in source_dirs:
+                    _fsync_path(directory, directory=True)
+        finally:
+            self._pending_copies = []
+            self._pending_sources = set()
+            self._dirty_dirs = set()
+
+    def remove_empty_directories(self, directories: Iterable[str]) -> int:
+        """Remove source series directories left empty by the moves"""
+        removed = 0
+        for directory in sorted(set(directories), key=len, reverse=True):
+            try:
+                os.rmdir(directory)
+                removed += 1
+            except OSError:
+                logger.debug(f"Leaving non-empty directory: {directory}")
+        return removed
+
+
+def partial_path(dst: str) -> str:
+    """Temporary name a cross-device copy is written to before its atomic rename"""
+    return os.path.join(os.path.dirname(dst), f".{os.path.basename(dst)}.partial")
+
+
+def copy_file_kernel(src: str, dst: str) -> int:
+    """
+    Copy a file without a userspace read/write loop.
+
+    Uses copy_file_range(2) where available (reflinks/server-side copy on
+    filesystems that support it), then sendfile(2). There is deliberately
+    no read/write fallback: if neither primitive works the copy fails and
+    the move is reported as an error.
+
+    Returns:
+        Number of bytes copied
+
+    Raises:
+        OSError: If neither kernel copy primitive can copy the file, or the
+            copy ends short of the source size
+    """
+    with open(src, 'rb') as fsrc:
+        size = os.fstat(fsrc.fileno()).st_size
+        fd_out = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        try:
+            failures = []
+            for copier in (_copy_file_range, _sendfile):
+                try:
+                    copied = copier(fsrc.fileno(), fd_out, size, 0)
+                except (AttributeError, NotImplementedError, OSError) as e:
+                    if os.fstat(fd_out).st_size:
+                        raise
+                    logger.debug(f"Kernel copy primitive unavailable ({e}); trying next")
+                    failures.append(f"{copier.__name__.lstrip('_')}: {e}")
+                    continue
+                if copied != size:
+                    raise OSError(f"Short copy of {src}: {copied} of {size} bytes")
+                return copied
+        finally:
+            os.close(fd_out)
+    raise OSError(f"No kernel copy primitive could copy {src} ({'; '.join(failures)})")
+
+
+def _copy_file_range(fd_in: int, fd_out: int, size: int, offset: int) -> int:
+    copy_range = os.copy_file_range
+    while offset < size:
+        n = copy_range(fd_in, fd_out, min(COPY_CHUNK, size - offset), offset, offset)
+        if n == 0:
+            break
+        offset += n
+    return offset
+
+
+def _sendfile(fd_in: int, fd_out: int, size: int, offset: int) -> int:
+    sendfile = os.sendfile
+    while offset < size:
+        n = sendfile(fd_out, fd_in, offset, min(COPY_CHUNK, size - offset))
+        if n == 0:
+            break
+        offset += n
+    return offset
+
+
+def _fsync_path(path: str, directory: bool = False) -> None:
+    flags = os.O_RDONLY | (getattr(os, 'O_DIRECTORY', 0) if directory else 0)
+    try:
+        fd = os.open(path, flags)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError as e:
+        logger.debug(f"fsync failed for {path}: {e}")
+    finally:
+        os.close(fd)
+
+
+def plan_collection(config, scan_results: ScanResults, issue_padding: int = 3) -> RenamePlan:
+    """Build a RenamePlan for a scanned collection using the config's templates"""
+    templates = NamingTemplates.from_config(config, issue_padding=issue_padding)
+    planner = RenamePlanner(config.destination_dir, templates)
+    return planner.plan(scan_results.series)
+
+
+def print_plan(plan: RenamePlan, out=None) -> None:
+    """Print the plan in a reviewable 'src -> dst' form"""
+    out = out or sys.stdout
+    root = plan.destination_dir.rstrip(os.sep) + os.sep
+    lines = []
+    for op in plan.operations:
+        lines.append(f"  {op.src.replace(root, '', 1)} -> {op.dst.replace(root, '', 1)}\n")
+    lines.append(f"\n{len(plan.operations)} moves, {plan.unchanged} files already in place, "
+                 f"{len(plan.target_directories)} target directories\n")
+    if plan.conflicts:
+        lines.append(f"\nCONFLICTS ({len(plan.conflicts)})\n")
+        for conflict in plan.conflicts:
+            lines.append(f"  {conflict.src} -> {conflict.dst}: {conflict.reason}\n")
+    out.write(''.join(lines))
+
+
+def main(argv=None):
+    """CLI entry point for the rename command"""
+    parser = argparse.ArgumentParser(
+        description="Plan (and optionally apply) renames/moves to match Mylar3 naming templates",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s /path/to/mylar3/config.ini
+  %(prog)s /path/to/mylar3/config.ini --apply
+  %(prog)s /path/to/mylar3/config.ini --apply --skip-conflicts
+        """
+    )
+    parser.add_argument('config_path', help='Path to Mylar3 config.ini file')
+    parser.add_argument('--apply', action='store_true', help='Execute the plan (default: only print it)')
+    parser.add_argument('--skip-conflicts', action='store_true',
+                        help='Apply the conflict-free part of the plan instead of refusing')
+    parser.add_argument('--issue-padding', type=int, default=3,
+                        help='Minimum digits for $Issue (default: 3)')
+    parser.add_argument('--fsync-batch', type=int, default=256,
+                        help='Files moved per fsync batch (default: 256)')
+    parser.add_argument('--journal', type=str,
+                        help=f'Write-ahead journal path (default: <destination_dir>/{JOURNAL_NAME})')
+    parser.add_argument('--mylar-db', type=str,
+                        help='Mylar3 database to update after applying (default: mylar.db next to config.ini, if present)')
+    parser.add_argument('--no-db-update', action='store_true', help='Do not update the Mylar3 database')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Enable verbose logging')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.WARNING,
+        format='%(levelname)s: %(message)s'
+    )
+
+    try:
+        config = load_config(args.config_path)
+        journal = None
+        if args.apply:
+            journal = Journal(args.journal or os.path.join(config.destination_dir, JOURNAL_NAME))
+            report = journal.recover()
+            if report.total:
+                print(f"Recovered interrupted run: {len(report.replayed)} replayed, "
+                      f"{len(report.rolled_back)} rolled back")
+            for problem in report.unresolved:
+                print(f"  - unresolved: {problem}", file=sys.stderr)
+
+        scan_results = Mylar3Scanner(config.destination_dir).scan()
+        plan = plan_collection(config, scan_results, issue_padding=args.issue_padding)
+        print_plan(plan)
+
+        if not args.apply:
+            return 1 if plan.conflicts else 0
+        if plan.conflicts and not args.skip_conflicts:
+            print("Refusing to apply a plan with conflicts (use --skip-conflicts)", file=sys.stderr)
+            journal.close()
+            return 1
+        plan.conflicts = []
+
+        result = RenameExecutor(fsync_batch=args.fsync_batch, journal=journal).execute(plan)
+        journal.close()
+        print(f"Renamed {result.renamed}, copied {result.copied} across devices, "
+              f"created {result.directories_created} directories, removed {result.directories_removed}")
+
+        db_path = args.mylar_db or default_database_path(args.config_path)
+        if not args.no_db_update and (args.mylar_db or os.path.exists(db_path)):
+            with Mylar3DatabaseUpdater(db_path) as updater:
+                queue_rename_plan(updater, plan)
+                db_result = updater.flush()
+            print(f"Updated mylar.db: {db_result.issues_updated} issues, {db_result.series_updated} series")
+        for error in result.errors:
+            print(f"  - {error}", file=sys.stderr)
+        return 1 if result.errors else 0
+
+    except (FileNotFoundError, ValueError, sqlite3.Error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
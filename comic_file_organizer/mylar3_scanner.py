@@ -9,15 +9,28 @@ Scans the destination_dir hierarchy:
 Collects data for statistical analysis.
 """
 import os
+import re
 import json
+import fnmatch
 import logging
+import threading
+from contextlib import nullcontext
 from pathlib import Path
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Tuple
+from typing import Iterable, List, Dict, Optional, Sequence, Tuple
 
 
 logger = logging.getLogger(__name__)
 
+# SeriesInfo fields a scan can be limited to (publisher and series_path are
+# always filled). Metadata fields cost one series.json parse per series,
+# issues_owned/file_type_counts a directory listing, file_type_sizes a stat
+# per comic file.
+METADATA_FIELDS = frozenset({'series_name', 'year', 'total_issues', 'comicid', 'status', 'publication_run',
+                             'booktype', 'volume', 'imprint'})
+FILE_FIELDS = frozenset({'issues_owned', 'file_type_counts', 'file_type_sizes'})
+SERIES_FIELDS = METADATA_FIELDS | FILE_FIELDS
+
 
 @dataclass
 class SeriesInfo:
@@ -31,6 +44,9 @@ class SeriesInfo:
     comicid: Optional[int] = None
     status: Optional[str] = None  # "Continuing" or "Ended"
     publication_run: Optional[str] = None
+    booktype: Optional[str] = None  # "Print", "TPB", "HC", "One-Shot", ...
+    volume: Optional[int] = None
+    imprint: Optional[str] = None
     file_type_counts: Dict[str, int] = field(default_factory=dict)  # e.g., {'CBR': 14, 'CBZ': 122}
     file_type_sizes: Dict[str, int] = field(default_factory=dict)  # e.g., {'CBR': 262144000, 'CBZ': 3006477107}
     
@@ -97,6 +113,25 @@ class ScanResults:
     @property
     def total_missing_issues(self) -> int:
         return sum(s.missing_issues for s in self.series)
+    
+    def merge(self, other: "ScanResults") -> "ScanResults":
+        """
+        Combine partial results of the same collection (e.g. scans of
+        separate chunks). Associative: publishers keep first-seen order
+        without duplicates, series and errors are concatenated.
+        
+        Raises:
+            ValueError: If the results are of different destination_dirs
+        """
+        if other.destination_dir != self.destination_dir:
+            raise ValueError(f"Cannot merge scans of {self.destination_dir} and {other.destination_dir}")
+        known = set(self.publishers)
+        return ScanResults(
+            destination_dir=self.destination_dir,
+            publishers=self.publishers + [p for p in other.publishers if p not in known],
+            series=self.series + other.series,
+            errors=self.errors + other.errors
+        )
 
 
 class Mylar3Scanner:
@@ -105,8 +140,100 @@ class Mylar3Scanner:
     COMIC_EXTENSIONS = {'.cbz', '.cbr'}
     METADATA_FILES = {'series.json', 'cvinfo'}
     
-    def __init__(self, destination_dir: str):
+    def __init__(self, destination_dir: str, distributions=None,
+                 publishers: Optional[Sequence[str]] = None,
+                 series_patterns: Optional[Sequence[str]] = None,
+                 progress=None, fields: Optional[Iterable[str]] = None, scheduler=None):
+        """
+        Args:
+            destination_dir: Mylar3 destination_dir to scan
+            distributions: Optional sink for streaming distribution stats
+                (e.g. mylar3_stats.DistributionStats); gets add_file(publisher,
+                size) for every comic file and add_series(series) per series
+            publishers: Only walk these publisher directories (matched
+                case-insensitively against the top-level listing)
+            series_patterns: Only scan series whose directory name matches
+                one of these globs (case-insensitive, e.g. 'spider-man*')
+            progress: Optional progress reporter (e.g. progress.ProgressReporter);
+                gets start(total, 'series') with the series count estimated
+                from the publisher listings, update(units, files, size_bytes)
+                per series and finish()
+            fields: Only fill these SeriesInfo fields (see SERIES_FIELDS;
+                default: all). Fields left out keep their defaults
+                (series_name falls back to the directory name), and the I/O
+                behind them is skipped: no series.json parse without
+                metadata fields, no listing of the series directory without
+                file fields, no file stat without file_type_sizes. Series
+                without series.json are still left out. A distributions sink
+                needs every field.
+            scheduler: Optional scan_scheduler.DeviceScheduler; series
+                directories are then scanned concurrently on per-device
+                worker pools (grouped by the device of their publisher
+                directory). Results keep the serial scan order.
+        
+        Raises:
+            ValueError: If fields names an unknown SeriesInfo field
+        """
         self.destination_dir = destination_dir
+        self.distributions = distributions
+        self.publishers = list(publishers) if publishers else None
+        self.series_patterns = list(series_patterns) if series_patterns else None
+        self.progress = progress
+        self.fields = SERIES_FIELDS if fields is None else frozenset(fields)
+        unknown = self.fields - SERIES_FIELDS
+        if unknown:
+            raise ValueError(f"Unknown series field(s): {', '.join(sorted(unknown))} "
+                             f"(choose from {', '.join(sorted(SERIES_FIELDS))})")
+        if distributions is not None:
+            self.fields = SERIES_FIELDS
+        self._read_metadata = bool(self.fields & METADATA_FIELDS)
+        self._list_files = bool(self.fields & FILE_FIELDS)
+        self._stat_files = 'file_type_sizes' in self.fields
+        self.scheduler = scheduler
+        # Worker threads share the distributions sink
+        self._sink_lock = threading.Lock() if scheduler is not None else nullcontext()
+        self._series_match = None
+        if self.series_patterns:
+            self._series_match = re.compile(
+                '|'.join(fnmatch.translate(pattern) for pattern in self.series_patterns),
+                re.IGNORECASE
+            ).match
+    
+    def publisher_directories(self) -> List[str]:
+        """
+        Publisher directory names at the top of destination_dir, without
+        walking into them.
+        """
+        return [
+            entry for entry in os.listdir(self.destination_dir)
+            if not entry.startswith('.') and os.path.isdir(os.path.join(self.destination_dir, entry))
+        ]
+    
+    def series_directories(self, publisher: str) -> List[str]:
+        """
+        Series directory names of a publisher that the scan would visit
+        (series globs applied), in listing order. Uses the directory
+        listing's file types, so there is no stat per entry.
+        """
+        with os.scandir(os.path.join(self.destination_dir, publisher)) as entries:
+            names = [entry.name for entry in entries if entry.is_dir()]
+        if self._series_match is not None:
+            names = [name for name in names if self._series_match(name)]
+        return names
+    
+    def _publisher_entries(self) -> List[str]:
+        """Top-level entries to scan: all of them, or only the requested publishers"""
+        entries = os.listdir(self.destination_dir)
+        if self.publishers is None:
+            return entries
+        
+        wanted = {name.lower(): name for name in self.publishers}
+        selected = [entry for entry in entries if entry.lower() in wanted and not entry.startswith('.')]
+        found = {entry.lower() for entry in selected}
+        for key, name in wanted.items():
+            if key not in found:
+                logger.warning(f"Publisher not found in {self.destination_dir}: {name}")
+        return selected
         
     def scan(self) -> ScanResults:
         """
@@ -123,43 +250,148 @@ class Mylar3Scanner:
         
         # Scan publisher directories
         try:
-            for entry in os.listdir(self.destination_dir):
-                # Skip .zzz_check and other files
-                if entry.startswith('.'):
-                    continue
-                
-                publisher_path = os.path.join(self.destination_dir, entry)
-                
-                # Only process directories
-                if not os.path.isdir(publisher_path):
-                    logger.warning(f"Unexpected file at publisher level: {entry}")
-                    continue
-                
-                # Check if publisher has any series subdirectories
-                has_series = False
-                for series_entry in os.listdir(publisher_path):
-                    series_path = os.path.join(publisher_path, series_entry)
-                    if os.path.isdir(series_path):
-                        has_series = True
-                        break
-                
-                # Skip publishers with no series
-                if not has_series:
-                    logger.debug(f"Skipping publisher with no series: {entry}")
-                    continue
-                
-                # Add publisher
-                results.publishers.append(entry)
-                
-                # Scan series in this publisher
-                self._scan_publisher(entry, publisher_path, results)
+            entries = self._publisher_entries()
+            if self.scheduler is not None:
+                self._scan_scheduled(entries, results)
+            else:
+                self._scan_serial(entries, results)
                 
         except Exception as e:
             results.errors.append(f"Error scanning destination_dir: {e}")
             logger.error(f"Error scanning {self.destination_dir}: {e}")
         
+        if self.progress is not None:
+            self.progress.finish()
         return results
     
+    def _scan_serial(self, entries: List[str], results: ScanResults):
+        """Scan publisher directories one after another"""
+        if self.progress is not None:
+            self.progress.start(self._estimate_series(entries), 'series')
+        
+        for entry in entries:
+            # Skip .zzz_check and other files
+            if entry.startswith('.'):
+                continue
+            
+            publisher_path = os.path.join(self.destination_dir, entry)
+            
+            # Only process directories
+            if not os.path.isdir(publisher_path):
+                logger.warning(f"Unexpected file at publisher level: {entry}")
+                continue
+            
+            # Check if publisher has any series subdirectories
+            has_series = False
+            for series_entry in os.listdir(publisher_path):
+                series_path = os.path.join(publisher_path, series_entry)
+                if os.path.isdir(series_path):
+                    has_series = True
+                    break
+            
+            # Skip publishers with no series
+            if not has_series:
+                logger.debug(f"Skipping publisher with no series: {entry}")
+                continue
+            
+            # Scan series in this publisher
+            series_before = len(results.series)
+            self._scan_publisher(entry, publisher_path, results)
+            
+            # Add publisher (with series globs, only if any series matched)
+            if self._series_match is None or len(results.series) > series_before:
+                results.publishers.append(entry)
+    
+    def _scan_scheduled(self, entries: List[str], results: ScanResults):
+        """
+        Scan every series directory on the scheduler's per-device pools,
+        then collect the results in the order a serial scan produces them.
+        Progress is reported as each series finishes, on whichever device.
+        """
+        progress = self.progress
+        if progress is not None:
+            progress.start(self._estimate_series(entries), 'series')
+            progress_lock = threading.Lock()
+            reported = threading.Semaphore(0)
+            
+            def report(future):
+                try:
+                    series_info = None if future.cancelled() or future.exception() else future.result()
+                    with progress_lock:
+                        if series_info:
+                            progress.update(1, series_info.issues_owned, series_info.total_size_bytes)
+                        else:
+                            progress.update(1)
+                finally:
+                    reported.release()
+        
+        queued = []  # (publisher, futures of its series)
+        for entry in entries:
+            if entry.startswith('.'):
+                continue
+            publisher_path = os.path.join(self.destination_dir, entry)
+            if not os.path.isdir(publisher_path):
+                logger.warning(f"Unexpected file at publisher level: {entry}")
+                continue
+            
+            try:
+                device = self.scheduler.device_for(publisher_path)
+                with os.scandir(publisher_path) as listing:
+                    series_entries = []
+                    for series in listing:
+                        if series.is_dir():
+                            series_entries.append(series)
+                        else:
+                            logger.warning(f"Unexpected file in publisher directory: {series.name}")
+            except OSError as e:
+                results.errors.append(f"Error scanning publisher {entry}: {e}")
+                logger.error(f"Error scanning publisher {entry}: {e}")
+                continue
+            if not series_entries:
+                logger.debug(f"Skipping publisher with no series: {entry}")
+                continue
+            
+            futures = [
+                self.scheduler.submit(device, self._scan_series, entry, series.name, series.path)
+                for series in series_entries
+                if self._series_match is None or self._series_match(series.name)
+            ]
+            if progress is not None:
+                for future in futures:
+                    future.add_done_callback(report)
+            queued.append((entry, futures))
+        
+        for entry, futures in queued:
+            series_before = len(results.series)
+            for future in futures:
+                try:
+                    series_info = future.result()
+                except Exception as e:
+                    results.errors.append(f"Error scanning publisher {entry}: {e}")
+                    logger.error(f"Error scanning publisher {entry}: {e}")
+                    continue
+                if series_info:
+                    results.series.append(series_info)
+            if self._series_match is None or len(results.series) > series_before:
+                results.publishers.append(entry)
+        
+        if progress is not None:
+            # result() can return before a future's callbacks have run
+            for _ in range(sum(len(futures) for _, futures in queued)):
+                reported.acquire()
+    
+    def _estimate_series(self, entries: List[str]) -> int:
+        """Series directories to scan, counted from the publisher listings alone"""
+        total = 0
+        for entry in entries:
+            if entry.startswith('.'):
+                continue
+            try:
+                total += len(self.series_directories(entry))
+            except OSError:
+                continue
+        return total
+    
     def _scan_publisher(self, publisher_name: str, publisher_path: str, results: ScanResults):
         """Scan all series under a publisher directory"""
         try:
@@ -171,10 +403,18 @@ class Mylar3Scanner:
                     logger.warning(f"Unexpected file in publisher directory: {series_entry}")
                     continue
                 
+                if self._series_match is not None and not self._series_match(series_entry):
+                    continue
+                
                 # Process the series
                 series_info = self._scan_series(publisher_name, series_entry, series_path)
                 if series_info:
                     results.series.append(series_info)
+                if self.progress is not None:
+                    if series_info:
+                        self.progress.update(1, series_info.issues_owned, series_info.total_size_bytes)
+                    else:
+                        self.progress.update(1)
                     
         except Exception as e:
             results.errors.append(f"Error scanning publisher {publisher_name}: {e}")
@@ -195,8 +435,11 @@ class Mylar3Scanner:
         
         # Parse series.json
         try:
-            with open(series_json_path, 'r', encoding='utf-8') as f:
-                series_data = json.load(f)
+            if self._read_metadata:
+                with open(series_json_path, 'r', encoding='utf-8') as f:
+                    series_data = json.load(f)
+            else:
+                series_data = {}
             
             metadata = series_data.get('metadata', {})
             series_name = metadata.get('name', series_dirname)
@@ -205,16 +448,22 @@ class Mylar3Scanner:
             comicid = metadata.get('comicid')
             status = metadata.get('status')
             publication_run = metadata.get('publication_run')
+            booktype = metadata.get('booktype')
+            volume = metadata.get('volume')
+            imprint = metadata.get('imprint')
             
         except Exception as e:
             logger.error(f"Error parsing series.json in {series_path}: {e}")
             return None
         
         # Count comic files and collect file type information
-        file_counts, file_sizes = self._analyze_comic_files(series_path)
+        if self._list_files:
+            file_counts, file_sizes = self._analyze_comic_files(series_path, publisher_name)
+        else:
+            file_counts, file_sizes = {}, {}
         issues_owned = sum(file_counts.values())
         
-        return SeriesInfo(
+        series_info = SeriesInfo(
             publisher=publisher_name,
             series_name=series_name,
             series_path=series_path,
@@ -224,11 +473,19 @@ class Mylar3Scanner:
             comicid=comicid,
             status=status,
             publication_run=publication_run,
+            booktype=booktype,
+            volume=volume,
+            imprint=imprint,
             file_type_counts=file_counts,
             file_type_sizes=file_sizes
         )
+        if self.distributions is not None:
+            with self._sink_lock:
+                self.distributions.add_series(series_info)
+        return series_info
     
-    def _analyze_comic_files(self, series_path: str) -> Tuple[Dict[str, int], Dict[str, int]]:
+    def _analyze_comic_files(self, series_path: str,
+                             publisher_name: Optional[str] = None) -> Tuple[Dict[str, int], Dict[str, int]]:
         """
         Analyze comic files in series directory, returning counts and sizes by file type.
         
@@ -240,23 +497,33 @@ class Mylar3Scanner:
         file_sizes: Dict[str, int] = {}
         
         try:
-            for entry in os.listdir(series_path):
+            with os.scandir(series_path) as listing:
+                entries = list(listing)
+            for dir_entry in entries:
+                entry = dir_entry.name
                 # Skip metadata files
                 if entry in self.METADATA_FILES:
                     continue
                 
-                # Check if it's a comic file
-                file_path = os.path.join(series_path, entry)
-                if os.path.isfile(file_path):
+                # Check if it's a comic file (the directory listing's file
+                # type usually answers this without a stat)
+                file_path = dir_entry.path
+                if dir_entry.is_file():
                     _, ext = os.path.splitext(entry)
                     ext_upper = ext.upper()
                     if ext.lower() in self.COMIC_EXTENSIONS:
+                        if not self._stat_files:
+                            file_counts[ext_upper] = file_counts.get(ext_upper, 0) + 1
+                            continue
                         # Get file size
                         try:
-                            size = os.path.getsize(file_path)
+                            size = dir_entry.stat().st_size
                             # Track by uppercase extension (CBR, CBZ, etc.)
                             file_counts[ext_upper] = file_counts.get(ext_upper, 0) + 1
                             file_sizes[ext_upper] = file_sizes.get(ext_upper, 0) + size
+                            if self.distributions is not None:
+                                with self._sink_lock:
+                                    self.distributions.add_file(publisher_name, size)
                         except OSError as e:
                             logger.warning(f"Could not get size for {file_path}: {e}")
                             # Still count the file even if we can't get size
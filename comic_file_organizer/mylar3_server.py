@@ -0,0 +1,305 @@
+"""
+Local HTTP server for Mylar3 collection statistics.
+
+Keeps the latest ScanResults, CollectionStatistics and query index in
+memory and answers JSON requests from them, so a dashboard polling every
+minute no longer triggers a scan per poll.
+
+Refreshing is double buffered: a background thread scans into a new
+Snapshot while requests keep reading the current one, then swaps the
+reference in a single assignment. Readers never take a lock and never
+see a half-built snapshot.
+
+Endpoints:
+    GET /summary                     collection summary
+    GET /publishers                  per-publisher breakdown
+    GET /publishers/<name>           publisher detail (series by file type, totals)
+    GET /series?where=EXPR&limit=N   series matching a filter expression
+    GET /status                      snapshot age and refresh timings
+
+Usage:
+    python3 -m comic_file_organizer.mylar3_cli serve /path/to/config.ini --port 8765 --refresh 60
+"""
+import io
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+from dataclasses import dataclass, replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import parse_qs, unquote, urlsplit
+try:
+    from comic_file_organizer.mylar3_config import load_config
+    from comic_file_organizer.mylar3_scanner import Mylar3Scanner, ScanResults
+    from comic_file_organizer.mylar3_stats import CollectionStatistics, calculate_statistics, scan_delta
+    from comic_file_organizer.mylar3_query import SeriesQueryIndex
+    from comic_file_organizer.mylar3_cli import (
+        emit_publisher_detail_report, publisher_record, series_record, summary_record,
+    )
+    from comic_file_organizer.report_output import make_emitter
+except ModuleNotFoundError:
+    from mylar3_config import load_config
+    from mylar3_scanner import Mylar3Scanner, ScanResults
+    from mylar3_stats import CollectionStatistics, calculate_statistics, scan_delta
+    from mylar3_query import SeriesQueryIndex
+    from mylar3_cli import emit_publisher_detail_report, publisher_record, series_record, summary_record
+    from report_output import make_emitter
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """One consistent view of the collection; never modified once published"""
+    scan_results: ScanResults
+    stats: CollectionStatistics
+    index: SeriesQueryIndex
+    scanned_at: float
+    scan_seconds: float
+    generation: int = 1
+
+
+class StatsService:
+    """
+    Current statistics snapshot plus an optional background refresher.
+
+    Args:
+        scan: Callable returning fresh ScanResults (e.g. Mylar3Scanner(...).scan)
+        refresh_interval: Seconds between background rescans
+    """
+
+    def __init__(self, scan: Callable[[], ScanResults], refresh_interval: float = 60.0):
+        self.scan = scan
+        self.refresh_interval = refresh_interval
+        self.refresh_errors = 0
+        self._snapshot: Optional[Snapshot] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def snapshot(self) -> Snapshot:
+        """The current snapshot (a plain reference read; scans the first time)"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self.refresh()
+        return snapshot
+
+    def refresh(self) -> Snapshot:
+        """
+        Scan into a new snapshot and publish it. If nothing changed since
+        the current snapshot, that one is republished with a new timestamp
+        instead of rebuilding statistics and indexes.
+        """
+        start = time.perf_counter()
+        scan_results = self.scan()
+        scan_seconds = time.perf_counter() - start
+        current = self._snapshot
+
+        if current is not None:
+            added, removed, changed = scan_delta(current.scan_results, scan_results)
+            unchanged = (
+                not (added or removed or changed)
+                and scan_results.publishers == current.scan_results.publishers
+                and scan_results.errors == current.scan_results.errors
+            )
+            if unchanged:
+                self._snapshot = replace(current, scanned_at=time.time(), scan_seconds=scan_seconds)
+                logger.debug("Collection unchanged, snapshot kept")
+                return self._snapshot
+            logger.info(f"Collection changed: {len(added)} added, {len(removed)} removed, {len(changed)} changed")
+
+        # Back buffer: built completely before readers can see it
+        snapshot = Snapshot(
+            scan_results=scan_results,
+            stats=calculate_statistics(scan_results),
+            index=SeriesQueryIndex(scan_results),
+            scanned_at=time.time(),
+            scan_seconds=scan_seconds,
+            generation=current.generation + 1 if current is not None else 1,
+        )
+        self._snapshot = snapshot  # swap
+        logger.info(f"Snapshot {snapshot.generation}: {snapshot.stats.total_series} series "
+                    f"scanned in {scan_seconds:.1f}s")
+        return snapshot
+
+    def start(self) -> None:
+        """Start refreshing in a background thread"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._refresh_loop, name="stats-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _refresh_loop(self) -> None:
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                # Keep serving the last good snapshot
+                self.refresh_errors += 1
+                logger.error(f"Statistics refresh failed: {e}")
+
+
+class HTTPError(Exception):
+    """Error response with an HTTP status"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+# -- endpoints ---------------------------------------------------------
+
+def summary_endpoint(snapshot: Snapshot, query: Dict[str, str]) -> Any:
+    return dict(summary_record(snapshot.stats), scanned_at=int(snapshot.scanned_at))
+
+
+def publishers_endpoint(snapshot: Snapshot, query: Dict[str, str]) -> Any:
+    stats = snapshot.stats
+    return [publisher_record(stats.publishers[name]) for name in sorted(stats.publishers)]
+
+
+def series_endpoint(snapshot: Snapshot, query: Dict[str, str]) -> Any:
+    try:
+        limit = int(query['limit']) if 'limit' in query else None
+        series = snapshot.index.select(query['where']) if query.get('where') else snapshot.stats.get_series_by_name()
+    except ValueError as e:
+        raise HTTPError(400, str(e))
+    return [series_record(s) for s in series[:limit]]
+
+
+def publisher_detail_endpoint(snapshot: Snapshot, name: str) -> Any:
+    if name.lower() not in {p.lower() for p in snapshot.scan_results.publishers}:
+        raise HTTPError(404, f"Publisher '{name}' not found in collection")
+    buffer = io.StringIO()
+    with make_emitter('json', buffer) as emitter:
+        emit_publisher_detail_report(emitter, snapshot.scan_results, name, snapshot.index)
+    return json.loads(buffer.getvalue())
+
+
+def status_endpoint(service: StatsService, snapshot: Snapshot) -> Any:
+    return {
+        'generation': snapshot.generation,
+        'scanned_at': int(snapshot.scanned_at),
+        'age_seconds': round(time.time() - snapshot.scanned_at, 1),
+        'scan_seconds': round(snapshot.scan_seconds, 3),
+        'refresh_interval': service.refresh_interval,
+        'refresh_errors': service.refresh_errors,
+        'scan_errors': len(snapshot.scan_results.errors),
+    }
+
+
+ENDPOINTS = {
+    '/summary': summary_endpoint,
+    '/publishers': publishers_endpoint,
+    '/series': series_endpoint,
+}
+
+
+def make_handler(service: StatsService):
+    """Request handler class bound to a StatsService"""
+
+    class StatsRequestHandler(BaseHTTPRequestHandler):
+        server_version = "comic-file-organizer"
+
+        def do_GET(self):
+            try:
+                status, body = 200, self._route()
+            except HTTPError as e:
+                status, body = e.status, {'error': str(e)}
+            except Exception as e:
+                logger.error(f"Error serving {self.path}: {e}")
+                status, body = 500, {'error': str(e)}
+            payload = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _route(self) -> Any:
+            url = urlsplit(self.path)
+            path = url.path.rstrip('/') or '/'
+            query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            snapshot = service.snapshot()  # one snapshot per request
+            if path == '/status':
+                return status_endpoint(service, snapshot)
+            if path.startswith('/publishers/'):
+                return publisher_detail_endpoint(snapshot, unquote(path[len('/publishers/'):]))
+            endpoint = ENDPOINTS.get(path)
+            if endpoint is None:
+                raise HTTPError(404, f"Unknown endpoint {path} (available: {', '.join(ENDPOINTS)}, "
+                                     f"/publishers/<name>, /status)")
+            return endpoint(snapshot, query)
+
+        def log_message(self, format, *args):
+            logger.debug(f"{self.address_string()} {format % args}")
+
+    return StatsRequestHandler
+
+
+def make_server(service: StatsService, host: str = '127.0.0.1', port: int = 8765) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    """CLI entry point for `mylar3_cli serve`"""
+    parser = argparse.ArgumentParser(
+        prog='mylar3_cli serve',
+        description="Serve Mylar3 collection statistics as JSON over HTTP, refreshed in the background",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s /path/to/mylar3/config.ini
+  %(prog)s /path/to/mylar3/config.ini --port 9000 --refresh 300
+  curl 'http://127.0.0.1:8765/series?where=publisher=Marvel%%20and%%20completion<50'
+        """
+    )
+    parser.add_argument('config_path', help='Path to Mylar3 config.ini file')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on (default: 8765)')
+    parser.add_argument('--refresh', type=float, default=60.0,
+                        help='Seconds between background rescans (default: 60)')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Enable verbose logging')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format='%(levelname)s: %(message)s'
+    )
+
+    try:
+        config = load_config(args.config_path)
+        service = StatsService(Mylar3Scanner(config.destination_dir).scan, refresh_interval=args.refresh)
+        service.refresh()  # first snapshot before accepting requests
+        server = make_server(service, args.host, args.port)
+    except (FileNotFoundError, ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    service.start()
+    host, port = server.server_address[:2]
+    logger.info(f"Serving statistics on http://{host}:{port}/ (refresh every {args.refresh:g}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
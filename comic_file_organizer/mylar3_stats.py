@@ -2,14 +2,36 @@
 Statistical analysis for Mylar3 comic collections.
 
 Provides detailed breakdowns and insights from scan results.
+
+All publisher- and collection-level aggregates are computed in a single
+pass over the series list by StatsAccumulator, or as whole-column
+operations over SeriesColumns when NumPy is installed. Accumulators are
+mergeable, so partial results (per publisher, per worker) can be combined
+without revisiting series.
+
+Top-N queries are answered by RankedIndex: heapq partial selection the
+first time, then slices of the cached ranking for every later query that
+shares the same ordering.
+
+Dashboards computing many group-bys and histograms should use columns(),
+a columnar view that is vectorized with NumPy when it is installed.
+
+Distributions (median/p90/p99 and histograms of file sizes, series sizes
+and completion) come from DistributionStats, a set of fixed-memory
+sketches fed by the scanner while it walks the collection.
 """
-from typing import List, Dict, Tuple
-from dataclasses import dataclass
-from collections import defaultdict
+import heapq
+import threading
+from typing import Any, Callable, Iterable, List, Dict, Optional, Tuple
+from dataclasses import dataclass, field
 try:
     from comic_file_organizer.mylar3_scanner import ScanResults, SeriesInfo
+    from comic_file_organizer.mylar3_columnar import SeriesColumns, numpy_available
+    from comic_file_organizer.sketches import LinearHistogramSketch, LogHistogramSketch
 except ModuleNotFoundError:
     from mylar3_scanner import ScanResults, SeriesInfo
+    from mylar3_columnar import SeriesColumns, numpy_available
+    from sketches import LinearHistogramSketch, LogHistogramSketch
 
 
 @dataclass
@@ -32,11 +54,289 @@ class PublisherStats:
         return getattr(self, '_avg_completion', 0.0)
 
 
+@dataclass
+class AggregateCounts:
+    """Running totals for a group of series (a publisher or the whole collection)"""
+    total_series: int = 0
+    series_with_issues: int = 0
+    series_followed_only: int = 0
+    complete_series: int = 0
+    total_issues_owned: int = 0
+    total_issues_expected: int = 0
+    total_missing_issues: int = 0
+    total_size_bytes: int = 0
+    completion_sum: float = 0.0  # sum of completion % over series with issues
+    
+    def add(self, series: SeriesInfo, sign: int = 1) -> None:
+        """Fold one series into the totals (sign=-1 takes it back out)"""
+        owned = series.issues_owned
+        total = series.total_issues
+        self.total_series += sign
+        self.total_issues_owned += sign * owned
+        self.total_issues_expected += sign * total
+        self.total_size_bytes += sign * sum(series.file_type_sizes.values())
+        if owned > 0:
+            self.series_with_issues += sign
+            if total:
+                self.completion_sum += sign * (owned / total * 100.0)
+            if self.series_with_issues == 0:
+                self.completion_sum = 0.0  # drop float residue of add/remove pairs
+        else:
+            self.series_followed_only += sign
+        if owned >= total:
+            self.complete_series += sign
+        else:
+            self.total_missing_issues += sign * (total - owned)
+    
+    def remove(self, series: SeriesInfo) -> None:
+        """Take a previously added series back out of the totals"""
+        self.add(series, -1)
+    
+    def merge(self, other: "AggregateCounts") -> "AggregateCounts":
+        """Add another group's totals into this one"""
+        self.total_series += other.total_series
+        self.series_with_issues += other.series_with_issues
+        self.series_followed_only += other.series_followed_only
+        self.complete_series += other.complete_series
+        self.total_issues_owned += other.total_issues_owned
+        self.total_issues_expected += other.total_issues_expected
+        self.total_missing_issues += other.total_missing_issues
+        self.total_size_bytes += other.total_size_bytes
+        self.completion_sum += other.completion_sum
+        return self
+    
+    @property
+    def average_completion(self) -> float:
+        """Average completion percentage over series with issues"""
+        if self.series_with_issues == 0:
+            return 0.0
+        return self.completion_sum / self.series_with_issues
+    
+    @property
+    def average_issues_per_series(self) -> float:
+        """Average issues owned per series with issues"""
+        if self.series_with_issues == 0:
+            return 0.0
+        return self.total_issues_owned / self.series_with_issues
+    
+    @property
+    def completion_percentage(self) -> float:
+        """Issues owned as a percentage of issues expected"""
+        if self.total_issues_expected == 0:
+            return 0.0
+        return (self.total_issues_owned / self.total_issues_expected) * 100.0
+    
+    def to_publisher_stats(self, name: str) -> PublisherStats:
+        stats = PublisherStats(
+            name=name,
+            total_series=self.total_series,
+            series_with_issues=self.series_with_issues,
+            series_followed_only=self.series_followed_only,
+            complete_series=self.complete_series,
+            total_issues_owned=self.total_issues_owned,
+            total_missing_issues=self.total_missing_issues
+        )
+        stats._avg_completion = self.average_completion
+        return stats
+
+
+def column_counts(columns: SeriesColumns, codes=None, groups: int = 1) -> List[AggregateCounts]:
+    """AggregateCounts per group of a columnar view (see SeriesColumns.group_totals)"""
+    return [AggregateCounts(**totals) for totals in columns.group_totals(codes, groups)]
+
+
+@dataclass
+class StatsAccumulator:
+    """Single-pass, mergeable accumulator of collection and per-publisher totals"""
+    totals: AggregateCounts = field(default_factory=AggregateCounts)
+    publishers: Dict[str, AggregateCounts] = field(default_factory=dict)
+    
+    def add(self, series: SeriesInfo) -> None:
+        counts = self.publishers.get(series.publisher)
+        if counts is None:
+            counts = self.publishers[series.publisher] = AggregateCounts()
+        counts.add(series)
+        self.totals.add(series)
+    
+    def remove(self, series: SeriesInfo) -> None:
+        counts = self.publishers[series.publisher]
+        counts.remove(series)
+        if counts.total_series == 0:
+            del self.publishers[series.publisher]
+        self.totals.remove(series)
+    
+    def add_all(self, series_list: Iterable[SeriesInfo]) -> "StatsAccumulator":
+        for series in series_list:
+            self.add(series)
+        return self
+    
+    @classmethod
+    def from_columns(cls, columns: SeriesColumns) -> "StatsAccumulator":
+        """Totals computed as whole-column operations over a columnar view"""
+        totals = column_counts(columns)[0]
+        groups = column_counts(columns, columns.publisher_codes, len(columns.publishers))
+        return cls(totals, dict(zip(columns.publishers, groups)))
+    
+    def merge(self, other: "StatsAccumulator") -> "StatsAccumulator":
+        """Combine another accumulator's results (e.g. from another worker) into this one"""
+        for name, counts in other.publishers.items():
+            self.publishers.setdefault(name, AggregateCounts()).merge(counts)
+        self.totals.merge(other.totals)
+        return self
+    
+    def publisher_stats(self) -> Dict[str, PublisherStats]:
+        return {name: counts.to_publisher_stats(name) for name, counts in self.publishers.items()}
+
+
+class RankedIndex:
+    """
+    Lazily ranked view of the series matching a predicate.
+    
+    The first top(k) costs O(n log k) (heapq partial selection); later
+    queries for k or fewer rows are O(k) slices. Asking for more rows than
+    have been ranked extends the ranking, switching to a full sort when the
+    request covers a large share of the candidates.
+    """
+    
+    # Beyond this fraction of the candidates a full sort beats heap selection
+    FULL_SORT_FRACTION = 0.25
+    
+    def __init__(self, series: Iterable[SeriesInfo], key: Callable[[SeriesInfo], Any],
+                 predicate: Optional[Callable[[SeriesInfo], bool]] = None, reverse: bool = False):
+        self.key = key
+        self.reverse = reverse
+        self._candidates = [s for s in series if predicate(s)] if predicate else list(series)
+        self._ranked: List[SeriesInfo] = []
+        self._complete = False
+        # Reports render concurrently: a heap selection must not replace a full sort
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._candidates)
+    
+    def top(self, limit: Optional[int] = None) -> List[SeriesInfo]:
+        """
+        First `limit` series in ranked order (all of them if limit is None).
+        
+        Ties keep scan order, exactly as sorted() would. Safe to call from
+        several threads.
+        """
+        with self._lock:
+            if limit is None or limit >= len(self._candidates) * self.FULL_SORT_FRACTION:
+                if not self._complete:
+                    self._ranked = sorted(self._candidates, key=self.key, reverse=self.reverse)
+                    self._complete = True
+                return self._ranked if limit is None else self._ranked[:limit]
+            if self._complete or limit <= len(self._ranked):
+                return self._ranked[:limit]
+            select = heapq.nlargest if self.reverse else heapq.nsmallest
+            self._ranked = select(limit, self._candidates, key=self.key)
+            return self._ranked[:limit]
+
+
 @dataclass
 class CollectionStatistics:
     """Comprehensive statistics for entire collection"""
     scan_results: ScanResults
     publishers: Dict[str, PublisherStats]
+    accumulator: Optional[StatsAccumulator] = field(default=None, repr=False)
+    _indexes: Dict[str, RankedIndex] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _columns: Optional[SeriesColumns] = field(default=None, init=False, repr=False, compare=False)
+    _indexes_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+    
+    # Orderings served by ranked(): name -> (sort key, filter, descending)
+    INDEXES = {
+        'most_complete': (lambda s: s.completion_percentage,
+                          lambda s: not s.is_complete and s.issues_owned > 0, True),
+        'most_incomplete': (lambda s: s.missing_issues, lambda s: s.issues_owned > 0, True),
+        'recently_started': (lambda s: s.issues_owned, lambda s: s.issues_owned > 0, False),
+        'by_name': (lambda s: (s.publisher, s.series_name), None, False),
+    }
+    
+    _positions: Optional[Dict[str, int]] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        if self.accumulator is None:
+            self.accumulator = StatsAccumulator().add_all(self.scan_results.series)
+    
+    @property
+    def totals(self) -> AggregateCounts:
+        return self.accumulator.totals
+    
+    def apply_delta(self, added: Iterable[SeriesInfo] = (), removed: Iterable[SeriesInfo] = (),
+                    changed: Iterable[SeriesInfo] = ()) -> None:
+        """
+        Update the statistics in place for a handful of changed series.
+        
+        Series are identified by series_path. Counters and averages are
+        adjusted in O(changed); ranked indexes and the columnar view are
+        dropped and rebuilt on next use.
+        
+        Args:
+            added: Series new to the collection
+            removed: Series no longer in the collection
+            changed: New versions of series already in the collection
+        
+        Raises:
+            KeyError: If a removed or changed series is not in the collection
+        """
+        series_list = self.scan_results.series
+        if self._positions is None:
+            self._positions = {s.series_path: i for i, s in enumerate(series_list)}
+        positions = self._positions
+        touched = set()
+        
+        for series in removed:
+            index = positions.pop(series.series_path)
+            self.accumulator.remove(series_list[index])
+            touched.add(series_list[index].publisher)
+            # Swap-remove keeps removal O(1)
+            last = series_list.pop()
+            if index < len(series_list):
+                series_list[index] = last
+                positions[last.series_path] = index
+        
+        for series in changed:
+            index = positions[series.series_path]
+            self.accumulator.remove(series_list[index])
+            touched.add(series_list[index].publisher)
+            series_list[index] = series
+            self.accumulator.add(series)
+            touched.add(series.publisher)
+        
+        for series in added:
+            if series.series_path in positions:
+                raise ValueError(f"Series already in the collection: {series.series_path}")
+            positions[series.series_path] = len(series_list)
+            series_list.append(series)
+            self.accumulator.add(series)
+            touched.add(series.publisher)
+            if series.publisher not in self.scan_results.publishers:
+                self.scan_results.publishers.append(series.publisher)
+        
+        for name in touched:
+            counts = self.accumulator.publishers.get(name)
+            if counts is None:
+                self.publishers.pop(name, None)
+            else:
+                self.publishers[name] = counts.to_publisher_stats(name)
+        self._indexes.clear()
+        self._columns = None
+    
+    def ranked(self, name: str) -> RankedIndex:
+        """Shared ranked index for one of the orderings in INDEXES (built on first use)"""
+        with self._indexes_lock:
+            index = self._indexes.get(name)
+            if index is None:
+                key, predicate, reverse = self.INDEXES[name]
+                index = self._indexes[name] = RankedIndex(self.scan_results.series, key, predicate, reverse)
+            return index
+    
+    def columns(self) -> SeriesColumns:
+        """Columnar view of the series for vectorized aggregates (built on first use)"""
+        if self._columns is None:
+            self._columns = SeriesColumns(self.scan_results.series)
+        return self._columns
     
     @property
     def total_publishers(self) -> int:
@@ -48,120 +348,167 @@ class CollectionStatistics:
     
     @property
     def total_series(self) -> int:
-        return self.scan_results.total_series
+        return self.totals.total_series
     
     @property
     def series_with_issues(self) -> int:
-        return self.scan_results.series_with_issues
+        return self.totals.series_with_issues
     
     @property
     def series_followed_only(self) -> int:
-        return self.scan_results.series_followed_only
+        return self.totals.series_followed_only
     
     @property
     def complete_series(self) -> int:
-        return self.scan_results.complete_series_count
+        return self.totals.complete_series
     
     @property
     def total_issues_owned(self) -> int:
-        return self.scan_results.total_issues_owned
+        return self.totals.total_issues_owned
     
     @property
     def total_missing_issues(self) -> int:
-        return self.scan_results.total_missing_issues
+        return self.totals.total_missing_issues
     
     @property
     def average_issues_per_series(self) -> float:
         """Average number of issues owned per series (excluding followed-only)"""
-        series_with_issues = [s for s in self.scan_results.series if s.issues_owned > 0]
-        if not series_with_issues:
-            return 0.0
-        return sum(s.issues_owned for s in series_with_issues) / len(series_with_issues)
+        return self.totals.average_issues_per_series
     
     @property
     def overall_completion_percentage(self) -> float:
         """Overall completion percentage across all series"""
-        total_expected = sum(s.total_issues for s in self.scan_results.series)
-        if total_expected == 0:
-            return 0.0
-        return (self.total_issues_owned / total_expected) * 100.0
+        return self.totals.completion_percentage
     
     def get_largest_publishers(self, limit: int = 5) -> List[Tuple[str, int]]:
         """Get publishers with most series"""
-        sorted_publishers = sorted(
-            self.publishers.items(),
-            key=lambda x: x[1].total_series,
-            reverse=True
-        )
-        return [(name, stats.total_series) for name, stats in sorted_publishers[:limit]]
+        largest = heapq.nlargest(limit, self.publishers.items(), key=lambda x: x[1].total_series)
+        return [(name, stats.total_series) for name, stats in largest]
     
     def get_most_complete_series(self, limit: int = 10) -> List[SeriesInfo]:
         """Get series closest to completion (but not 100%)"""
-        incomplete = [s for s in self.scan_results.series if not s.is_complete and s.issues_owned > 0]
-        sorted_series = sorted(incomplete, key=lambda s: s.completion_percentage, reverse=True)
-        return sorted_series[:limit]
+        return self.ranked('most_complete').top(limit)
     
     def get_most_incomplete_series(self, limit: int = 10) -> List[SeriesInfo]:
         """Get series with most missing issues"""
-        with_issues = [s for s in self.scan_results.series if s.issues_owned > 0]
-        sorted_series = sorted(with_issues, key=lambda s: s.missing_issues, reverse=True)
-        return sorted_series[:limit]
+        return self.ranked('most_incomplete').top(limit)
     
     def get_recently_started_series(self, limit: int = 10) -> List[SeriesInfo]:
         """Get series with fewest issues owned (but at least one)"""
-        with_issues = [s for s in self.scan_results.series if s.issues_owned > 0]
-        sorted_series = sorted(with_issues, key=lambda s: s.issues_owned)
-        return sorted_series[:limit]
+        return self.ranked('recently_started').top(limit)
+    
+    def get_series_by_name(self, limit: Optional[int] = None) -> List[SeriesInfo]:
+        """Get series ordered by publisher, then series name"""
+        return self.ranked('by_name').top(limit)
+
+
+class DistributionSet:
+    """Size and completion sketches for one publisher (or the whole collection)"""
+    
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.file_size = LogHistogramSketch(relative_accuracy)
+        self.series_size = LogHistogramSketch(relative_accuracy)
+        self.completion = LinearHistogramSketch(0.0, 100.0, 100)
+    
+    def merge(self, other: "DistributionSet") -> "DistributionSet":
+        self.file_size.merge(other.file_size)
+        self.series_size.merge(other.series_size)
+        self.completion.merge(other.completion)
+        return self
+
+
+class DistributionStats:
+    """
+    Streaming distribution statistics, fed by Mylar3Scanner(distributions=...).
+    
+    File sizes go straight into per-publisher sketches and are never kept;
+    the collection-wide view is a merge of the publisher sketches.
+    """
+    
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self.publishers: Dict[str, DistributionSet] = {}
+    
+    def _for(self, publisher: str) -> DistributionSet:
+        sketches = self.publishers.get(publisher)
+        if sketches is None:
+            sketches = self.publishers[publisher] = DistributionSet(self.relative_accuracy)
+        return sketches
+    
+    def add_file(self, publisher: str, size: int) -> None:
+        self._for(publisher).file_size.add(size)
+    
+    def add_series(self, series: SeriesInfo) -> None:
+        """Series size and completion, for series with issues"""
+        sketches = self._for(series.publisher)
+        if series.issues_owned > 0:
+            sketches.series_size.add(series.total_size_bytes)
+            sketches.completion.add(min(series.completion_percentage, 100.0))
+    
+    def add_scan(self, scan_results: ScanResults) -> "DistributionStats":
+        """Feed series-level sketches from existing scan results (no file sizes)"""
+        for series in scan_results.series:
+            self.add_series(series)
+        return self
+    
+    def collection(self) -> DistributionSet:
+        """Collection-wide sketches (merged from the publishers)"""
+        merged = DistributionSet(self.relative_accuracy)
+        for sketches in self.publishers.values():
+            merged.merge(sketches)
+        return merged
+    
+    def merge(self, other: "DistributionStats") -> "DistributionStats":
+        for name, sketches in other.publishers.items():
+            self._for(name).merge(sketches)
+        return self
+
+
+def scan_delta(old: ScanResults, new: ScanResults) -> Tuple[List[SeriesInfo], List[SeriesInfo], List[SeriesInfo]]:
+    """
+    Compare two scans of the same collection by series_path.
+    
+    Returns:
+        (added, removed, changed) ready for CollectionStatistics.apply_delta()
+    """
+    before = {s.series_path: s for s in old.series}
+    added: List[SeriesInfo] = []
+    changed: List[SeriesInfo] = []
+    for series in new.series:
+        previous = before.pop(series.series_path, None)
+        if previous is None:
+            added.append(series)
+        elif previous != series:
+            changed.append(series)
+    return added, list(before.values()), changed
 
 
 def calculate_statistics(scan_results: ScanResults) -> CollectionStatistics:
     """
     Calculate comprehensive statistics from scan results.
     
+    Every aggregate is computed in one pass over the series list, as
+    whole-column operations over columns() when NumPy is installed.
+    
     Args:
         scan_results: Results from Mylar3Scanner.scan()
         
     Returns:
         CollectionStatistics object with all calculated stats
     """
-    # Group series by publisher
-    publisher_series: Dict[str, List[SeriesInfo]] = defaultdict(list)
-    for series in scan_results.series:
-        publisher_series[series.publisher].append(series)
-    
-    # Calculate per-publisher statistics
-    publisher_stats: Dict[str, PublisherStats] = {}
-    for publisher_name, series_list in publisher_series.items():
-        total_series = len(series_list)
-        series_with_issues = sum(1 for s in series_list if s.issues_owned > 0)
-        series_followed = sum(1 for s in series_list if s.is_followed_only)
-        complete = sum(1 for s in series_list if s.is_complete)
-        issues_owned = sum(s.issues_owned for s in series_list)
-        missing = sum(s.missing_issues for s in series_list)
-        
-        # Calculate average completion
-        if series_with_issues > 0:
-            avg_completion = sum(s.completion_percentage for s in series_list if s.issues_owned > 0) / series_with_issues
-        else:
-            avg_completion = 0.0
-        
-        stats = PublisherStats(
-            name=publisher_name,
-            total_series=total_series,
-            series_with_issues=series_with_issues,
-            series_followed_only=series_followed,
-            complete_series=complete,
-            total_issues_owned=issues_owned,
-            total_missing_issues=missing
-        )
-        # Store average as private attribute
-        stats._avg_completion = avg_completion
-        publisher_stats[publisher_name] = stats
-    
-    return CollectionStatistics(
+    columns = None
+    if numpy_available():
+        columns = SeriesColumns(scan_results.series)
+        accumulator = StatsAccumulator.from_columns(columns)
+    else:
+        accumulator = StatsAccumulator().add_all(scan_results.series)
+    stats = CollectionStatistics(
         scan_results=scan_results,
-        publishers=publisher_stats
+        publishers=accumulator.publisher_stats(),
+        accumulator=accumulator
     )
+    stats._columns = columns
+    return stats
 
 
 if __name__ == "__main__":
@@ -0,0 +1,367 @@
+"""
+Mylar3 naming template engine for comic-file-organizer.
+
+Compiles Mylar3's folder_format and file_format strings (e.g.
+'$Publisher/$Series $Type ($Year)') into:
+- renderers: fields -> relative path, memoized per distinct field values
+- matchers: existing path -> fields, via a single precompiled regex
+
+Templates are compiled once per format string and shared process-wide.
+"""
+import calendar
+import re
+import logging
+from functools import lru_cache
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+
+logger = logging.getLogger(__name__)
+
+
+MONTH_NAMES = [calendar.month_name[i] for i in range(1, 13)]
+
+# Book types Mylar3 writes for $Type ('Print' renders as empty)
+BOOK_TYPES = ['One-Shot', 'Digital', 'TPB', 'GN', 'HC']
+
+# Characters that are not safe in a single path component
+_UNSAFE_CHARS = re.compile(r'[*?"<>|]')
+_EMPTY_BRACKETS = re.compile(r'\(\s*\)|\[\s*\]|\{\s*\}')
+_MULTI_SPACE = re.compile(r'\s{2,}')
+_BRACKET_INNER_SPACE = re.compile(r'(?<=[(\[{])\s+|\s+(?=[)\]}])')
+
+
+def _format_year(value: Any) -> str:
+    return str(value) if value else ''
+
+
+def _format_volume_year(value: Any) -> str:
+    return f"V{value}" if value else ''
+
+
+def _format_volume_number(value: Any) -> str:
+    return f"v{value}" if value else ''
+
+
+def _format_annual(value: Any) -> str:
+    return 'Annual' if value else ''
+
+
+def _format_booktype(value: Any) -> str:
+    if not value or str(value).lower() == 'print':
+        return ''
+    return str(value)
+
+
+def _format_month(value: Any) -> str:
+    return f"{int(value):02d}" if value else ''
+
+
+def _format_monthname(value: Any) -> str:
+    return MONTH_NAMES[int(value) - 1] if value else ''
+
+
+def _format_text(value: Any) -> str:
+    if value is None:
+        return ''
+    text = str(value).replace('/', '-').replace('\\', '-').replace(':', ' -')
+    return _UNSAFE_CHARS.sub('', text)
+
+
+def _parse_int(text: str) -> int:
+    return int(text)
+
+
+def _parse_prefixed_int(text: str) -> int:
+    return int(text[1:])
+
+
+def _parse_monthname(text: str) -> int:
+    return MONTH_NAMES.index(text) + 1
+
+
+def _parse_annual(text: str) -> bool:
+    return True
+
+
+@dataclass(frozen=True)
+class TemplateToken:
+    """A single $Token understood by the template engine"""
+    name: str
+    field: str
+    render: Callable[[Any], str]
+    pattern: str
+    parse: Callable[[str], Any] = str
+    optional: bool = False
+
+
+# Issue numbers are zero-padded by the renderer; padding is applied in _render_issue
+TOKENS: Dict[str, TemplateToken] = {t.name: t for t in [
+    TemplateToken('Publisher', 'publisher', _format_text, r'[^/]+?'),
+    TemplateToken('Imprint', 'imprint', _format_text, r'[^/]+?', optional=True),
+    TemplateToken('Series', 'series', _format_text, r'[^/]+?'),
+    TemplateToken('Year', 'year', _format_year, r'\d{4}', _parse_int, optional=True),
+    TemplateToken('VolumeY', 'year', _format_volume_year, r'V\d{4}', _parse_prefixed_int, optional=True),
+    TemplateToken('VolumeN', 'volume', _format_volume_number, r'v\d+', _parse_prefixed_int, optional=True),
+    TemplateToken('Annual', 'annual', _format_annual, r'Annual', _parse_annual, optional=True),
+    TemplateToken('Type', 'booktype', _format_booktype, '|'.join(re.escape(t) for t in BOOK_TYPES), optional=True),
+    TemplateToken('Issue', 'issue', _format_text, r'[^\s/()#]+'),
+    TemplateToken('monthname', 'month', _format_monthname, '|'.join(MONTH_NAMES), _parse_monthname, optional=True),
+    TemplateToken('month', 'month', _format_month, r'\d{2}', _parse_int, optional=True),
+]}
+
+# Longest names first so $VolumeY wins over a hypothetical $Volume, $monthname over $month
+_TOKEN_RE = re.compile(r'\$(' + '|'.join(sorted(TOKENS, key=len, reverse=True)) + r')')
+
+
+def tidy_path(text: str) -> str:
+    """
+    Clean up a rendered path the way Mylar3 does when tokens render empty.
+
+    Removes empty brackets, collapses repeated whitespace, trims whitespace
+    just inside brackets and strips whitespace and trailing dots from each
+    path component.
+    """
+    components = []
+    for component in text.split('/'):
+        component = _EMPTY_BRACKETS.sub('', component)
+        component = _BRACKET_INNER_SPACE.sub('', _MULTI_SPACE.sub(' ', component))
+        component = component.strip().rstrip('.').strip()
+        if component:
+            components.append(component)
+    return '/'.join(components)
+
+
+class CompiledTemplate:
+    """
+    A Mylar3 naming template compiled for repeated rendering and matching.
+
+    Use compile_template() rather than constructing directly so compiled
+    templates are shared across callers.
+    """
+
+    def __init__(self, template: str, issue_padding: int = 3, cache_size: int = 65536):
+        self.template = template
+        self.issue_padding = issue_padding
+        self.parts: List[Union[str, TemplateToken]] = []
+
+        position = 0
+        for match in _TOKEN_RE.finditer(template):
+            if match.start() > position:
+                self.parts.append(template[position:match.start()])
+            self.parts.append(TOKENS[match.group(1)])
+            position = match.end()
+        if position < len(template):
+            self.parts.append(template[position:])
+
+        self.tokens: Tuple[TemplateToken, ...] = tuple(p for p in self.parts if isinstance(p, TemplateToken))
+        # Fields the template depends on, in a stable order (used as the memo key)
+        self.fields: Tuple[str, ...] = tuple(dict.fromkeys(t.field for t in self.tokens))
+
+        self._format_string = ''.join(
+            '{%d}' % i if isinstance(p, TemplateToken) else p.replace('{', '{{').replace('}', '}}')
+            for i, p in enumerate(self.parts)
+        )
+        self._renderers = [
+            (i, self._render_issue if p.field == 'issue' else p.render)
+            for i, p in enumerate(self.parts) if isinstance(p, TemplateToken)
+        ]
+        self._render_cached = lru_cache(maxsize=cache_size)(self._render_key)
+        self._regex = re.compile(self._build_pattern())
+
+    def _render_issue(self, value: Any) -> str:
+        if value is None or value == '':
+            return ''
+        text = _format_text(value)
+        # Pad only the leading integer part: 1 -> 001, 1.5 -> 001.5, 1AU -> 001AU
+        digits = len(text) - len(text.lstrip('0123456789'))
+        if digits and self.issue_padding:
+            text = text[:digits].zfill(self.issue_padding) + text[digits:]
+        return text
+
+    def _render_key(self, key: Tuple[Any, ...]) -> str:
+        values = dict(zip(self.fields, key))
+        rendered = [''] * len(self.parts)
+        for index, render in self._renderers:
+            rendered[index] = render(values[self.parts[index].field])
+        return tidy_path(self._format_string.format(*rendered))
+
+    def render(self, fields: Dict[str, Any]) -> str:
+        """
+        Render the template for a set of fields.
+
+        Args:
+            fields: Mapping of field name (publisher, series, year, volume,
+                issue, month, booktype, annual, imprint) to value. Missing
+                fields render as empty and are tidied away.
+
+        Returns:
+            Relative path (folder_format) or filename stem (file_format)
+        """
+        return self._render_cached(tuple(fields.get(f) for f in self.fields))
+
+    def _build_pattern(self) -> str:
+        # Stack of (elements, optional-only) per open bracket; index 0 is the top level
+        stack: List[Tuple[List[str], bool]] = [([], True)]
+        seen_groups = set()
+        for part in self.parts:
+            if isinstance(part, TemplateToken):
+                group = part.name if part.name not in seen_groups else None
+                seen_groups.add(part.name)
+                body = f"(?P<{group}>{part.pattern})" if group else f"(?:{part.pattern})"
+                elements, optional_only = stack[-1]
+                elements.append(body + ('?' if part.optional else ''))
+                stack[-1] = (elements, optional_only and part.optional)
+                continue
+            for chunk in re.split(r'(\s+|[()])', part):
+                if not chunk:
+                    continue
+                if chunk == '(':
+                    stack.append(([], True))
+                elif chunk == ')' and len(stack) > 1:
+                    elements, optional_only = stack.pop()
+                    # Brackets holding only optional tokens vanish when those tokens are empty
+                    group = r'\(' + ''.join(elements) + r'\)'
+                    stack[-1][0].append(f"(?:{group})?" if optional_only else group)
+                elif chunk.isspace():
+                    # Rendered output collapses whitespace, so literal runs may shrink or vanish
+                    stack[-1][0].append(r'\s*')
+                else:
+                    elements, _ = stack[-1]
+                    elements.append(re.escape(chunk))
+                    stack[-1] = (elements, False)
+        # Unbalanced '(' in the template: treat as literal text
+        while len(stack) > 1:
+            elements, _ = stack.pop()
+            stack[-1][0].append(r'\(' + ''.join(elements))
+        return '^' + ''.join(stack[0][0]) + '$'
+
+    def match(self, path: str) -> Optional[Dict[str, Any]]:
+        """
+        Parse a rendered path back into fields.
+
+        Args:
+            path: Relative path (folder_format) or filename without
+                extension (file_format)
+
+        Returns:
+            Dict of field name to parsed value, or None if the path does not
+            follow the template
+        """
+        m = self._regex.match(path)
+        if not m:
+            return None
+        fields: Dict[str, Any] = {}
+        for name, text in m.groupdict().items():
+            if text is None:
+                continue
+            token = TOKENS[name]
+            fields[token.field] = token.parse(text)
+        return fields
+
+
+@lru_cache(maxsize=None)
+def compile_template(template: str, issue_padding: int = 3) -> CompiledTemplate:
+    """
+    Compile (or fetch the already compiled) template for a format string.
+
+    Args:
+        template: Mylar3 folder_format or file_format string
+        issue_padding: Minimum digits for $Issue (Mylar3 zero_level_n)
+
+    Returns:
+        Shared CompiledTemplate instance
+    """
+    logger.debug(f"Compiling naming template: {template!r}")
+    return CompiledTemplate(template, issue_padding=issue_padding)
+
+
+class NamingTemplates:
+    """Folder and file templates for one Mylar3 configuration"""
+
+    def __init__(self, folder_format: str, file_format: str, issue_padding: int = 3):
+        self.folder = compile_template(folder_format, issue_padding)
+        self.file = compile_template(file_format, issue_padding)
+        self._match_folder = lru_cache(maxsize=65536)(self.folder.match)
+
+    @classmethod
+    def from_config(cls, config, issue_padding: int = 3) -> "NamingTemplates":
+        """Build templates from a Mylar3Config"""
+        return cls(config.folder_format, config.file_format, issue_padding)
+
+    def render_folder(self, fields: Dict[str, Any]) -> str:
+        """Relative series folder for the given series fields"""
+        return self.folder.render(fields)
+
+    def render_file(self, fields: Dict[str, Any], extension: str = '') -> str:
+        """Issue filename (with extension, if given) for the given issue fields"""
+        return self.folder_safe(self.file.render(fields)) + extension
+
+    @staticmethod
+    def folder_safe(name: str) -> str:
+        """file_format output must stay within a single directory"""
+        return name.replace('/', '-')
+
+    def match_folder(self, relative_dir: str) -> Optional[Dict[str, Any]]:
+        """Parse a relative series folder (memoized, many files share one folder)"""
+        return self._match_folder(relative_dir)
+
+    def match_file(self, filename: str) -> Optional[Dict[str, Any]]:
+        """Parse an issue filename (extension is ignored)"""
+        stem, dot, extension = filename.rpartition('.')
+        if not dot or '/' in extension or ' ' in extension:
+            stem = filename
+        return self.file.match(stem)
+
+
+def series_fields(series) -> Dict[str, Any]:
+    """
+    Template fields for a scanned SeriesInfo.
+
+    Args:
+        series: SeriesInfo from Mylar3Scanner
+
+    Returns:
+        Dict usable with NamingTemplates.render_folder(); imprint, volume
+        and booktype are None when series.json does not give them
+    """
+    return {
+        'publisher': series.publisher,
+        'imprint': series.imprint or None,
+        'series': series.series_name,
+        'year': series.year,
+        'volume': _series_volume(series.volume),
+        'booktype': _series_booktype(series.booktype),
+    }
+
+
+def _series_booktype(value: Any) -> Optional[str]:
+    # Anything other than a known $Type (or Print) is treated as unknown
+    if not value:
+        return None
+    text = str(value).strip()
+    for booktype in BOOK_TYPES + ['Print']:
+        if text.lower() == booktype.lower():
+            return booktype
+    return None
+
+
+def _series_volume(value: Any) -> Optional[int]:
+    # series.json stores the volume as 2, "2" or "v2"
+    text = str(value or '').strip().lstrip('vV')
+    return int(text) if text.isdigit() else None
+
+
+if __name__ == "__main__":
+    import sys
+
+    folder_format = sys.argv[1] if len(sys.argv) > 1 else '$Publisher/$Series $Type ($Year)'
+    file_format = sys.argv[2] if len(sys.argv) > 2 else '$Series $VolumeN $Annual #$Issue ($monthname $Year)'
+    templates = NamingTemplates(folder_format, file_format)
+
+    folder = templates.render_folder({'publisher': 'Marvel', 'series': 'Spider-Man', 'year': 2025})
+    filename = templates.render_file({'series': 'Spider-Man', 'issue': 1, 'month': 1, 'year': 2025}, '.cbz')
+    print(f"Folder: {folder}")
+    print(f"File:   {filename}")
+    print(f"Parsed folder: {templates.match_folder(folder)}")
+    print(f"Parsed file:   {templates.match_file(filename)}")
@@ -0,0 +1,321 @@
+"""
+Profiling of CLI runs on real data, without patching the code.
+
+Profiler records one run in one of two modes:
+
+- cprofile: deterministic cProfile data (exact call counts, noticeable
+  overhead; sees only the thread that started it)
+- sample: a background thread samples the Python stacks of every thread
+  at a fixed interval (low overhead, sees --parallel scan workers; idle
+  pool workers are skipped)
+
+Code marks its phases (scan, stats, render) with profiler.phase(name);
+every stack is attributed to the phase that was active, and time spent
+outside any phase goes to 'other'. write(prefix) produces:
+
+- <prefix>.pstats: for `python -m pstats` or snakeviz. Sampled profiles
+  have one pseudo-function per phase at the root ({phase:scan}); each
+  sample counts for the time since the previous one, since the sampler
+  thread can be held up by the GIL
+- <prefix>.collapsed: "phase;frame;frame count" lines for flamegraph.pl,
+  speedscope or inferno. Counts are samples in sample mode; in cprofile
+  mode they are microseconds of own time, split by immediate caller
+  (cProfile keeps no full stacks)
+
+    profiler = Profiler('sample')
+    profiler.start()
+    with profiler.phase('scan'):
+        results = scanner.scan()
+    profiler.stop()
+    profiler.write('run')
+"""
+import os
+import sys
+import time
+import marshal
+import pstats
+import cProfile
+import logging
+import threading
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ('cprofile', 'sample')
+DEFAULT_INTERVAL = 0.005  # seconds between stack samples
+OTHER_PHASE = 'other'
+
+# Leaf frames of threads waiting for work; not worth a sample
+IDLE_FRAMES = {
+    ('threading.py', 'wait'),
+    ('queue.py', 'get'),
+    ('thread.py', '_worker'),
+}
+
+FuncKey = Tuple[str, int, str]  # pstats function key: (filename, first line, name)
+
+
+def frame_label(func: FuncKey) -> str:
+    """Flamegraph frame name: name (file:line), with ';' kept out of it"""
+    filename, line, name = func
+    if filename == '~':  # builtins
+        label = name
+    else:
+        label = f"{name} ({os.path.basename(filename)}:{line})"
+    return label.replace(';', ',')
+
+
+def phase_key(phase: str) -> FuncKey:
+    """Pseudo-function standing for a phase in sampled pstats"""
+    return ('~', 0, f"{{phase:{phase}}}")
+
+
+class Profiler:
+    """
+    cProfile or stack-sampling profiler with named phases.
+
+    Args:
+        mode: 'cprofile' or 'sample'
+        interval: Seconds between stack samples in sample mode
+    """
+
+    def __init__(self, mode: str = 'cprofile', interval: float = DEFAULT_INTERVAL):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode '{mode}' (choose from {', '.join(PROFILE_MODES)})")
+        if interval <= 0:
+            raise ValueError(f"Sample interval must be positive, got {interval}")
+        self.mode = mode
+        self.interval = interval
+        self.phase_times: Dict[str, float] = {}
+        self.samples: Counter = Counter()  # (phase, stack root first) -> samples
+        self.sample_seconds: Counter = Counter()  # same keys -> seconds they stand for
+        self._phases: List[str] = [OTHER_PHASE]
+        self._phase_start = 0.0
+        self._profiles: Dict[str, cProfile.Profile] = {}
+        self._running = False
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._thread_id: Optional[int] = None
+
+    @property
+    def current_phase(self) -> str:
+        return self._phases[-1]
+
+    def start(self) -> None:
+        """Start recording (in the thread to profile, for cprofile mode)"""
+        if self._running:
+            return
+        self._running = True
+        self._thread_id = threading.get_ident()
+        self._phase_start = time.perf_counter()
+        if self.mode == 'cprofile':
+            self._profile(self.current_phase).enable()
+        else:
+            self._stop.clear()
+            self._sampler = threading.Thread(target=self._sample_loop, name='profile-sampler', daemon=True)
+            self._sampler.start()
+
+    def stop(self) -> None:
+        """Stop recording; data is kept for write()"""
+        if not self._running:
+            return
+        self._account_phase()
+        if self.mode == 'cprofile':
+            self._profile(self.current_phase).disable()
+        else:
+            self._stop.set()
+            self._sampler.join()
+            self._sampler = None
+        self._running = False
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Attribute everything inside the block to phase name.
+
+        Phases do not nest in the output: an inner phase suspends the outer
+        one until it ends.
+        """
+        self._switch(name)
+        try:
+            yield self
+        finally:
+            self._switch(None)
+
+    def _switch(self, name: Optional[str]) -> None:
+        """Enter phase name, or return to the previous phase if None"""
+        if self._running:
+            self._account_phase()
+            if self.mode == 'cprofile':
+                self._profile(self.current_phase).disable()
+        if name is None:
+            self._phases.pop()
+        else:
+            self._phases.append(name)
+        if self._running and self.mode == 'cprofile':
+            self._profile(self.current_phase).enable()
+
+    def _account_phase(self) -> None:
+        now = time.perf_counter()
+        phase = self.current_phase
+        self.phase_times[phase] = self.phase_times.get(phase, 0.0) + now - self._phase_start
+        self._phase_start = now
+
+    def _profile(self, phase: str) -> cProfile.Profile:
+        profile = self._profiles.get(phase)
+        if profile is None:
+            profile = self._profiles[phase] = cProfile.Profile()
+        return profile
+
+    def _sample_loop(self) -> None:
+        sampler_id = threading.get_ident()
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            self._sample(sampler_id, now - last)
+            last = now
+
+    def _sample(self, sampler_id: int, seconds: float) -> None:
+        phase = self.current_phase
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == sampler_id:
+                continue
+            code = frame.f_code
+            if (thread_id != self._thread_id
+                    and (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES):
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            stack.reverse()
+            key = (phase, tuple(stack))
+            self.samples[key] += 1
+            self.sample_seconds[key] += seconds
+
+    def _sampled_stats(self) -> Dict[FuncKey, tuple]:
+        """Samples as a pstats stats mapping (call counts are sample counts)"""
+        own: Counter = Counter()
+        total: Counter = Counter()
+        counts: Counter = Counter()
+        edges: Dict[FuncKey, Dict[FuncKey, list]] = {}
+        for (phase, stack), count in self.samples.items():
+            seconds = self.sample_seconds[(phase, stack)]
+            stack = (phase_key(phase),) + stack
+            own[stack[-1]] += seconds
+            for func in set(stack):  # recursion counts once
+                total[func] += seconds
+                counts[func] += count
+            for caller, callee in set(zip(stack, stack[1:])):
+                edge = edges.setdefault(callee, {}).setdefault(caller, [0, 0.0])
+                edge[0] += count
+                edge[1] += seconds
+        stats = {}
+        for func, seconds in total.items():
+            callers = {caller: (n, n, t, t) for caller, (n, t) in edges.get(func, {}).items()}
+            stats[func] = (counts[func], counts[func], own[func], seconds, callers)
+        return stats
+
+    def collapsed(self) -> List[str]:
+        """Collapsed-stack lines ("frame;frame count"), sorted"""
+        weights: Counter = Counter()
+        if self.mode == 'sample':
+            for (phase, stack), count in self.samples.items():
+                weights[';'.join([phase] + [frame_label(f) for f in stack])] += count
+        else:
+            for phase, profile in self._profiles.items():
+                profile.create_stats()
+                for func, (_, _, own, _, callers) in profile.stats.items():
+                    if callers:
+                        for caller, caller_stats in callers.items():
+                            weights[f"{phase};{frame_label(caller)};{frame_label(func)}"] += \
+                                int(caller_stats[2] * 1_000_000)
+                    else:
+                        weights[f"{phase};{frame_label(func)}"] += int(own * 1_000_000)
+        return [f"{stack} {count}" for stack, count in sorted(weights.items()) if count > 0]
+
+    def write(self, prefix: str) -> Tuple[str, str]:
+        """
+        Write <prefix>.pstats and <prefix>.collapsed.
+
+        Returns:
+            (pstats path, collapsed path)
+        """
+        self.stop()
+        pstats_path = f"{prefix}.pstats"
+        collapsed_path = f"{prefix}.collapsed"
+
+        tmp_path = pstats_path + '.tmp'
+        if self.mode == 'sample':
+            if not self.samples:
+                logger.warning("No stack samples taken; the run was shorter than the sample interval")
+            with open(tmp_path, 'wb') as f:
+                marshal.dump(self._sampled_stats(), f)
+        else:
+            profiles = [p for p in self._profiles.values() if p.getstats()]
+            if profiles:
+                stats = pstats.Stats(profiles[0])
+                for profile in profiles[1:]:
+                    stats.add(profile)
+                stats.dump_stats(tmp_path)
+            else:
+                with open(tmp_path, 'wb') as f:
+                    marshal.dump({}, f)
+        os.replace(tmp_path, pstats_path)
+
+        tmp_path = collapsed_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for line in self.collapsed():
+                f.write(line + '\n')
+        os.replace(tmp_path, collapsed_path)
+
+        return pstats_path, collapsed_path
+
+    def summary(self) -> str:
+        """One line of wall time per phase, in order of first use"""
+        parts = [f"{phase} {seconds:.2f}s" for phase, seconds in self.phase_times.items()]
+        if self.mode == 'sample':
+            parts.append(f"{sum(self.samples.values())} samples")
+        return f"Profile ({self.mode}): " + ', '.join(parts)
+
+
+def write_profile(profiler: Profiler, prefix: str, stream=None) -> bool:
+    """
+    Stop profiler, write its files and report them with the phase times
+    on stream (default: stderr). A failed write is reported, not raised,
+    so it cannot mask the outcome of the profiled run.
+    """
+    stream = sys.stderr if stream is None else stream
+    try:
+        pstats_path, collapsed_path = profiler.write(prefix)
+    except OSError as e:
+        print(f"Error: Cannot write profile {prefix}: {e}", file=stream)
+        return False
+    print(profiler.summary(), file=stream)
+    print(f"Profile written to {pstats_path} and {collapsed_path}", file=stream)
+    return True
+
+
+def profile_phase(profiler: Optional[Profiler], name: str):
+    """profiler.phase(name), or a no-op context when not profiling"""
+    return profiler.phase(name) if profiler is not None else nullcontext()
+
+
+if __name__ == "__main__":
+    mode = sys.argv[1] if len(sys.argv) > 1 else 'sample'
+    prefix = sys.argv[2] if len(sys.argv) > 2 else 'profile-demo'
+
+    profiler = Profiler(mode)
+    profiler.start()
+    with profiler.phase('scan'):
+        entries = [entry for root, _, files in os.walk('.') for entry in files]
+    with profiler.phase('stats'):
+        counts = Counter(os.path.splitext(entry)[1] for entry in entries)
+    with profiler.phase('render'):
+        for extension, count in counts.most_common(5):
+            print(f"{extension or '<none>':<10} {count}")
+    write_profile(profiler, prefix, sys.stdout)
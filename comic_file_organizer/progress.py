@@ -0,0 +1,139 @@
+"""
+Progress reporting with rates and ETA for long scans.
+
+Scanners take any object with start(total, unit), update(units, files,
+size_bytes) and finish() (duck-typed, so the standalone DFA scanner needs no
+import from this package). ProgressReporter is the standard one:
+
+- on a terminal it redraws one status line in place
+- otherwise it logs a structured key=value line per interval
+
+    Scanning: 1,204/5,310 series (22.7%) | 40.1 series/s, 612 files/s, 18.3 MB/s | ETA 1m42s
+
+update() only counts and compares a clock reading; output happens at
+most once per interval (default 0.5s on a terminal, 30s in logs), so
+reporting adds negligible overhead to a scan.
+"""
+import sys
+import time
+import logging
+from typing import Optional, TextIO
+
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+
+def format_duration(seconds: float) -> str:
+    """Compact duration: 42s, 3m05s, 1h12m"""
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+
+
+class ProgressReporter:
+    """
+    Rate and ETA reporter for scans.
+
+    Args:
+        stream: Where terminal output goes (default: stderr)
+        interval: Seconds between updates (default: 0.5 on a terminal, 30 otherwise)
+        tty: Force terminal (True) or log (False) output; detected from stream by default
+        label: Prefix of the status line
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None, interval: Optional[float] = None,
+                 tty: Optional[bool] = None, label: str = "Scanning"):
+        self.stream = sys.stderr if stream is None else stream
+        if tty is None:
+            isatty = getattr(self.stream, 'isatty', None)
+            tty = bool(isatty and isatty())
+        self.tty = tty
+        self.interval = interval if interval is not None else (0.5 if tty else 30.0)
+        self.label = label
+        self.total: Optional[int] = None
+        self.unit = 'items'
+        self.units = 0
+        self.files = 0
+        self.size_bytes = 0
+        self._start = 0.0
+        self._next = 0.0
+        self._width = 0
+
+    def start(self, total: Optional[int] = None, unit: str = 'items') -> None:
+        """Begin timing; total is the estimated number of units (None if unknown)"""
+        self.total = total
+        self.unit = unit
+        self.units = self.files = self.size_bytes = 0
+        self._start = time.monotonic()
+        self._next = self._start + self.interval
+
+    def update(self, units: int = 0, files: int = 0, size_bytes: int = 0) -> None:
+        """Count finished work; reports when the interval has passed"""
+        self.units += units
+        self.files += files
+        self.size_bytes += size_bytes
+        now = time.monotonic()
+        if now >= self._next:
+            self._next = now + self.interval
+            self._report(now)
+
+    def finish(self) -> None:
+        """Report the final totals"""
+        self._report(time.monotonic(), final=True)
+
+    # -- rendering ---------------------------------------------------------
+
+    def eta(self, now: Optional[float] = None) -> Optional[float]:
+        """Seconds left at the current unit rate, or None if unknown"""
+        elapsed = (time.monotonic() if now is None else now) - self._start
+        if not self.total or not self.units or elapsed <= 0:
+            return None
+        return max(self.total - self.units, 0) * elapsed / self.units
+
+    def status(self, now: Optional[float] = None, final: bool = False) -> str:
+        """The human-readable status line"""
+        now = time.monotonic() if now is None else now
+        elapsed = max(now - self._start, 1e-9)
+        if self.total:
+            done = f"{self.units:,}/{self.total:,} {self.unit} ({min(self.units / self.total, 1.0) * 100:.1f}%)"
+        else:
+            done = f"{self.units:,} {self.unit}"
+        rates = (f"{self.units / elapsed:.1f} {self.unit}/s, {self.files / elapsed:,.0f} files/s, "
+                 f"{self.size_bytes / MB / elapsed:.1f} MB/s")
+        if final:
+            tail = f"done in {format_duration(elapsed)}"
+        else:
+            eta = self.eta(now)
+            tail = f"ETA {format_duration(eta)}" if eta is not None else "ETA ?"
+        return f"{self.label}: {done} | {rates} | {tail}"
+
+    def _report(self, now: float, final: bool = False) -> None:
+        if self.tty:
+            line = self.status(now, final)
+            padding = " " * max(self._width - len(line), 0)
+            self._width = len(line)
+            self.stream.write(f"\r{line}{padding}" + ("\n" if final else ""))
+            self.stream.flush()
+            return
+        elapsed = max(now - self._start, 1e-9)
+        eta = self.eta(now)
+        logger.info(
+            f"progress{' done' if final else ''} unit={self.unit} done={self.units} total={self.total} "
+            f"files={self.files} bytes={self.size_bytes} elapsed_s={elapsed:.1f} "
+            f"{self.unit}_per_s={self.units / elapsed:.2f} files_per_s={self.files / elapsed:.1f} "
+            f"mb_per_s={self.size_bytes / MB / elapsed:.2f} eta_s={'-' if eta is None else f'{eta:.0f}'}"
+        )
+
+
+if __name__ == "__main__":
+    reporter = ProgressReporter(interval=0.1)
+    reporter.start(total=50, unit='series')
+    for _ in range(50):
+        time.sleep(0.02)
+        reporter.update(units=1, files=12, size_bytes=12 * 30 * MB)
+    reporter.finish()
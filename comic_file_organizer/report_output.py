@@ -0,0 +1,269 @@
+"""
+Buffered, streaming output for comic-file-organizer reports.
+
+ChunkedWriter collects small writes and hands them to the underlying
+stream in large chunks, so a report of 100k rows costs a few dozen write
+calls instead of one per line.
+
+Text reports are rendered through TextReport (banners, lines and
+TextTable rows whose layout is computed once per table) on top of a
+ChunkedWriter.
+
+The emitters turn report sections into machine-readable output for BI
+tooling, one row at a time (constant memory however many rows):
+
+- json:   one object, {"summary": {...}, "series": [{...}, ...], ...}
+- ndjson: one object per line, tagged with "section"
+- csv:    one table per section, each with a header row and a leading
+          "section" column, separated by blank lines
+"""
+import io
+import sys
+import csv
+import json
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO
+
+
+FORMATS = ('text', 'json', 'ndjson', 'csv')
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+class ChunkedWriter:
+    """File-like writer that forwards output in chunks of about chunk_size characters"""
+
+    def __init__(self, stream: TextIO, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self._parts: List[str] = []
+        self._pending = 0
+
+    def write(self, text: str) -> int:
+        self._parts.append(text)
+        self._pending += len(text)
+        if self._pending >= self.chunk_size:
+            self._drain()
+        return len(text)
+
+    def writelines(self, lines: Iterable[str]) -> None:
+        for line in lines:
+            self.write(line)
+
+    def _drain(self) -> None:
+        if self._parts:
+            self.stream.write(''.join(self._parts))
+            self._parts = []
+            self._pending = 0
+
+    def flush(self) -> None:
+        self._drain()
+        self.stream.flush()
+
+    def __enter__(self) -> "ChunkedWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.flush()
+
+
+class TextTable:
+    """
+    Fixed-width table layout, turned into a format string once so each
+    row costs a single str.format() call.
+
+    Args:
+        widths: Column widths (values longer than a column are not truncated)
+        align: One of '<', '>' or '^' per column (default: all left)
+        indent: Prefix for every row
+    """
+
+    def __init__(self, widths: Sequence[int], align: Optional[str] = None, indent: str = ''):
+        align = align or '<' * len(widths)
+        self.widths = list(widths)
+        self._format = indent + ' | '.join(f"{{!s:{a}{w}}}" for a, w in zip(align, widths))
+        self.rule = indent + '-+-'.join('-' * w for w in widths)
+
+    def row(self, values: Sequence[Any]) -> str:
+        return self._format.format(*values)
+
+
+class TextReport:
+    """Text report written line by line into a ChunkedWriter"""
+
+    WIDTH = 70
+
+    def __init__(self, stream: Optional[TextIO] = None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.writer = ChunkedWriter(sys.stdout if stream is None else stream, chunk_size)
+        self.write = self.writer.write
+
+    def line(self, text: str = '') -> None:
+        self.write(text + '\n')
+
+    def lines(self, texts: Iterable[str]) -> None:
+        write = self.write
+        for text in texts:
+            write(text + '\n')
+
+    def banner(self, title: str) -> None:
+        """Section heading: title between two rules of '=' and a blank line"""
+        rule = '=' * self.WIDTH
+        self.write(f"{rule}\n{title}\n{rule}\n\n")
+
+    def table(self, table: TextTable, headers: Sequence[Any], rows: Iterable[Sequence[Any]] = ()) -> None:
+        """Header row, rule, then one line per row"""
+        self.line(table.row(headers))
+        self.line(table.rule)
+        self.lines(table.row(row) for row in rows)
+
+    def flush(self) -> None:
+        self.writer.flush()
+
+    def __enter__(self) -> "TextReport":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.flush()
+
+
+@contextmanager
+def text_report(report: Optional[TextReport] = None) -> Iterator[TextReport]:
+    """The caller's report, or a new one on stdout that is flushed on exit"""
+    if report is not None:
+        yield report
+        return
+    report = TextReport()
+    try:
+        yield report
+    finally:
+        report.flush()
+
+
+class Emitter:
+    """Writes named report sections; subclasses choose the format"""
+
+    def __init__(self, writer: ChunkedWriter):
+        self.writer = writer
+
+    def emit_object(self, section: str, record: Dict[str, Any]) -> None:
+        """A section holding a single record (e.g. the summary)"""
+        raise NotImplementedError
+
+    def emit(self, section: str, rows: Iterable[Dict[str, Any]]) -> None:
+        """A section holding a list of records, consumed lazily"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        self.writer.flush()
+
+    def __enter__(self) -> "Emitter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+class JsonEmitter(Emitter):
+    """One JSON object with a key per section, streamed as it is written"""
+
+    def __init__(self, writer: ChunkedWriter):
+        super().__init__(writer)
+        self._sections = 0
+        self.writer.write('{')
+
+    def _key(self, section: str) -> None:
+        self.writer.write(('\n' if self._sections == 0 else ',\n') + f'  {json.dumps(section)}: ')
+        self._sections += 1
+
+    def emit_object(self, section: str, record: Dict[str, Any]) -> None:
+        self._key(section)
+        self.writer.write(json.dumps(record))
+
+    def emit(self, section: str, rows: Iterable[Dict[str, Any]]) -> None:
+        self._key(section)
+        write = self.writer.write
+        separator = '[\n    '
+        for row in rows:
+            write(separator)
+            write(json.dumps(row))
+            separator = ',\n    '
+        write('[]' if separator.startswith('[') else '\n  ]')
+
+    def close(self) -> None:
+        self.writer.write('\n}\n')
+        super().close()
+
+
+class NdjsonEmitter(Emitter):
+    """One JSON object per line, each tagged with its section"""
+
+    def emit_object(self, section: str, record: Dict[str, Any]) -> None:
+        self.emit(section, [record])
+
+    def emit(self, section: str, rows: Iterable[Dict[str, Any]]) -> None:
+        write = self.writer.write
+        for row in rows:
+            write(json.dumps({'section': section, **row}))
+            write('\n')
+
+
+class CsvEmitter(Emitter):
+    """One CSV table per section (columns taken from its first row)"""
+
+    def __init__(self, writer: ChunkedWriter):
+        super().__init__(writer)
+        self._csv = csv.writer(writer, lineterminator='\n')
+        self._sections = 0
+
+    def emit_object(self, section: str, record: Dict[str, Any]) -> None:
+        self.emit(section, [record])
+
+    def emit(self, section: str, rows: Iterable[Dict[str, Any]]) -> None:
+        columns: Optional[List[str]] = None
+        for row in rows:
+            if columns is None:
+                if self._sections:
+                    self.writer.write('\n')
+                self._sections += 1
+                columns = list(row)
+                self._csv.writerow(['section'] + columns)
+            self._csv.writerow([section] + [_csv_value(row.get(c)) for c in columns])
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    return '' if value is None else value
+
+
+EMITTERS = {
+    'json': JsonEmitter,
+    'ndjson': NdjsonEmitter,
+    'csv': CsvEmitter,
+}
+
+
+def make_emitter(output_format: str, stream: TextIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Emitter:
+    """
+    Emitter for a structured output format writing to stream.
+
+    Raises:
+        ValueError: If the format is not json, ndjson or csv
+    """
+    emitter = EMITTERS.get(output_format)
+    if emitter is None:
+        raise ValueError(f"Unknown output format: {output_format} (choose from {', '.join(EMITTERS)})")
+    return emitter(ChunkedWriter(stream, chunk_size))
+
+
+if __name__ == "__main__":
+    import sys
+
+    rows = [{'name': f"Series {i}", 'owned': i} for i in range(3)]
+    for output_format in EMITTERS:
+        buffer = io.StringIO()
+        with make_emitter(output_format, buffer) as emitter:
+            emitter.emit_object('summary', {'series': len(rows)})
+            emitter.emit('series', rows)
+        print(f"--- {output_format} ---")
+        sys.stdout.write(buffer.getvalue())
@@ -0,0 +1,230 @@
+"""
+Device-aware scheduling for parallel scans.
+
+A library mounted as one tree can span several physical disks. Scanning it
+with one shared pool lets a slow spinning disk hold most workers while
+fast devices sit idle, or floods the spinning disk with seeks. The
+DeviceScheduler groups work by st_dev and gives every device its own
+worker pool, sized by the kind of device:
+
+- rotational: spinning disks, few concurrent readers (seeks dominate)
+- ssd: non-rotational block devices and in-memory filesystems
+- network: NFS/SMB and similar mounts, where latency hides behind concurrency
+- unknown: anything that could not be classified
+
+Device kinds come from /proc/mounts (filesystem type) and
+/sys/dev/block/<major>:<minor>/queue/rotational; on systems without
+them every device is 'unknown'.
+"""
+import os
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+PROC_MOUNTS = '/proc/mounts'
+SYS_DEV_BLOCK = '/sys/dev/block'
+
+DEVICE_KINDS = ('rotational', 'ssd', 'network', 'unknown')
+
+# Concurrent readers per device
+DEFAULT_DEVICE_LIMITS = {
+    'rotational': 2,
+    'ssd': 8,
+    'network': 8,
+    'unknown': 4,
+}
+
+NETWORK_FILESYSTEMS = {
+    'nfs', 'nfs4', 'cifs', 'smb3', 'smbfs', 'afs', 'ceph', 'glusterfs', 'lustre', '9p',
+    'fuse.sshfs', 'fuse.rclone', 'fuse.glusterfs',
+}
+MEMORY_FILESYSTEMS = {'tmpfs', 'ramfs'}
+
+
+@dataclass(frozen=True)
+class DeviceInfo:
+    """A device work is grouped by"""
+    device: int  # st_dev
+    kind: str
+    mount_point: Optional[str] = None
+    fstype: Optional[str] = None
+
+
+def _unescape_mount(field: str) -> str:
+    """/proc/mounts escapes spaces, tabs, newlines and backslashes as octal"""
+    return (field.replace('\\040', ' ').replace('\\011', '\t')
+            .replace('\\012', '\n').replace('\\134', '\\'))
+
+
+def read_mounts(mounts_path: str = PROC_MOUNTS) -> List[Tuple[str, str]]:
+    """(mount point, filesystem type) for every mount, or [] if unavailable"""
+    try:
+        with open(mounts_path, 'r', encoding='utf-8', errors='replace') as f:
+            lines = f.readlines()
+    except OSError:
+        return []
+    mounts = []
+    for line in lines:
+        fields = line.split()
+        if len(fields) >= 3:
+            mounts.append((_unescape_mount(fields[1]), fields[2]))
+    return mounts
+
+
+def find_mount(path: str, mounts: List[Tuple[str, str]]) -> Optional[Tuple[str, str]]:
+    """The mount (point, fstype) path lives on: the longest mount point containing it"""
+    path = os.path.realpath(path)
+    best = None
+    for mount_point, fstype in mounts:
+        prefix = mount_point.rstrip('/') + '/'
+        if path == mount_point or path.startswith(prefix):
+            if best is None or len(mount_point) >= len(best[0]):
+                best = (mount_point, fstype)
+    return best
+
+
+def is_rotational(device: int, sys_root: str = SYS_DEV_BLOCK) -> Optional[bool]:
+    """
+    Whether the block device behind st_dev spins, from sysfs.
+
+    Partitions have no queue of their own, so the parent disk is checked
+    too. None if sysfs does not know the device.
+    """
+    block_dir = os.path.join(sys_root, f"{os.major(device)}:{os.minor(device)}")
+    if not os.path.exists(block_dir):
+        return None
+    real_dir = os.path.realpath(block_dir)
+    for candidate in (real_dir, os.path.dirname(real_dir)):
+        try:
+            with open(os.path.join(candidate, 'queue', 'rotational'), 'r') as f:
+                return f.read().strip() == '1'
+        except OSError:
+            continue
+    return None
+
+
+def classify_device(path: str, device: int, mounts: List[Tuple[str, str]],
+                    sys_root: str = SYS_DEV_BLOCK) -> DeviceInfo:
+    """Work out the kind of device path (with st_dev device) is on"""
+    mount = find_mount(path, mounts)
+    mount_point, fstype = mount if mount else (None, None)
+    base_type = fstype.split('.')[0] if fstype else None
+    if fstype in NETWORK_FILESYSTEMS or base_type in NETWORK_FILESYSTEMS:
+        kind = 'network'
+    elif fstype in MEMORY_FILESYSTEMS:
+        kind = 'ssd'
+    else:
+        rotational = is_rotational(device, sys_root)
+        kind = 'unknown' if rotational is None else ('rotational' if rotational else 'ssd')
+    return DeviceInfo(device, kind, mount_point, fstype)
+
+
+class DeviceScheduler:
+    """
+    Runs tasks with a separate worker pool per device (st_dev).
+
+    Each device gets as many workers as its kind allows, so a slow disk
+    only ever ties up its own workers while the others keep going.
+    Pools are created when a device is first seen.
+
+    Args:
+        limits: Workers per device kind (merged over DEFAULT_DEVICE_LIMITS)
+        mounts_path: Mount table to classify devices with
+        sys_root: sysfs block device directory
+
+    Example:
+        with DeviceScheduler() as scheduler:
+            futures = [scheduler.submit(path, scan, path) for path in paths]
+            results = [f.result() for f in futures]
+    """
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None, mounts_path: str = PROC_MOUNTS,
+                 sys_root: str = SYS_DEV_BLOCK):
+        self.limits = dict(DEFAULT_DEVICE_LIMITS, **(limits or {}))
+        unknown = set(self.limits) - set(DEVICE_KINDS)
+        if unknown:
+            raise ValueError(f"Unknown device kind(s): {', '.join(sorted(unknown))} "
+                             f"(choose from {', '.join(DEVICE_KINDS)})")
+        self.sys_root = sys_root
+        self._mounts = read_mounts(mounts_path)
+        self._devices: Dict[int, DeviceInfo] = {}
+        self._pools: Dict[int, ThreadPoolExecutor] = {}
+        self._submitted: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def device_for(self, path: str) -> DeviceInfo:
+        """The (cached) DeviceInfo for the device path is on"""
+        device = os.stat(path).st_dev
+        info = self._devices.get(device)
+        if info is None:
+            info = classify_device(path, device, self._mounts, self.sys_root)
+            self._devices[device] = info
+            logger.debug(f"Device {os.major(device)}:{os.minor(device)} ({info.mount_point}, "
+                         f"{info.fstype}): {info.kind}, {self.limits[info.kind]} workers")
+        return info
+
+    def submit(self, path, fn: Callable, *args, **kwargs) -> Future:
+        """
+        Run fn(*args, **kwargs) on the pool of the device path is on.
+
+        path may also be a DeviceInfo already looked up for a group of
+        tasks, which saves a stat per task.
+        """
+        info = path if isinstance(path, DeviceInfo) else self.device_for(path)
+        with self._lock:
+            pool = self._pools.get(info.device)
+            if pool is None:
+                pool = self._pools[info.device] = ThreadPoolExecutor(
+                    max_workers=max(1, self.limits[info.kind]),
+                    thread_name_prefix=f"scan-{info.kind}-{os.major(info.device)}:{os.minor(info.device)}"
+                )
+            self._submitted[info.device] = self._submitted.get(info.device, 0) + 1
+        return pool.submit(fn, *args, **kwargs)
+
+    def summary(self) -> List[dict]:
+        """Per device: kind, mount, worker limit and tasks submitted"""
+        return [
+            {'device': f"{os.major(d)}:{os.minor(d)}", 'kind': info.kind, 'mount_point': info.mount_point,
+             'fstype': info.fstype, 'workers': self.limits[info.kind], 'tasks': self._submitted.get(d, 0)}
+            for d, info in self._devices.items()
+        ]
+
+    def shutdown(self, wait: bool = True) -> None:
+        for pool in self._pools.values():
+            pool.shutdown(wait=wait)
+        self._pools.clear()
+
+    def __enter__(self) -> "DeviceScheduler":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.shutdown()
+
+
+def parse_device_limits(values: List[str]) -> Dict[str, int]:
+    """Parse ['rotational=1', 'network=16'] into a device limit mapping"""
+    limits: Dict[str, int] = {}
+    for value in values or []:
+        kind, _, count = value.partition('=')
+        if kind not in DEVICE_KINDS or not count.isdigit() or int(count) < 1:
+            raise ValueError(f"Invalid --device-limit value '{value}' "
+                             f"(expected KIND=N, KIND one of {', '.join(DEVICE_KINDS)})")
+        limits[kind] = int(count)
+    return limits
+
+
+if __name__ == "__main__":
+    import sys
+
+    logging.basicConfig(level=logging.DEBUG, format='%(levelname)s: %(message)s')
+
+    with DeviceScheduler() as scheduler:
+        for path in sys.argv[1:] or ["."]:
+            info = scheduler.device_for(path)
+            print(f"{path}: {info.kind} ({info.fstype} on {info.mount_point}), "
+                  f"{scheduler.limits[info.kind]} workers")
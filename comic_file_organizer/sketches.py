@@ -0,0 +1,191 @@
+"""
+Fixed-memory streaming sketches for distribution statistics.
+
+Values are folded in one at a time and never stored, so quantiles and
+histograms over millions of file sizes cost a few kilobytes per sketch.
+Sketches of the same shape merge, so per-publisher sketches combine into
+collection-wide ones.
+
+- LogHistogramSketch: logarithmic buckets with a bounded relative error,
+  for values spanning orders of magnitude (file and series sizes)
+- LinearHistogramSketch: equal-width buckets over a fixed range, for
+  bounded values (completion percentages)
+"""
+import math
+import bisect
+from typing import Dict, List, Optional, Sequence
+
+
+class _Sketch:
+    """Count, sum and exact extremes shared by every sketch"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def _observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def _merge_summary(self, other: "_Sketch") -> None:
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def _clamp(self, value: float) -> float:
+        return min(max(value, self.min), self.max)
+
+    def quantile(self, q: float) -> Optional[float]:
+        raise NotImplementedError
+
+    def quantiles(self, qs: Sequence[float] = (0.5, 0.9, 0.99)) -> Dict[float, Optional[float]]:
+        return {q: self.quantile(q) for q in qs}
+
+    @property
+    def median(self) -> Optional[float]:
+        return self.quantile(0.5)
+
+
+class LogHistogramSketch(_Sketch):
+    """
+    Quantile sketch over logarithmic buckets (DDSketch style).
+
+    Any quantile is within relative_accuracy of a value actually observed
+    at that rank. Memory is capped at max_buckets; beyond it the lowest
+    buckets are collapsed, so only the smallest quantiles lose accuracy.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        super().__init__()
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._buckets: Dict[int, int] = {}
+        self._zero_count = 0  # values <= 0 (e.g. empty files)
+
+    def add(self, value: float) -> None:
+        self._observe(value)
+        if value <= 0:
+            self._zero_count += 1
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self._buckets[index] = self._buckets.get(index, 0) + 1
+        if len(self._buckets) > self.max_buckets:
+            self._collapse()
+
+    def _collapse(self) -> None:
+        keys = sorted(self._buckets)
+        excess = len(keys) - self.max_buckets
+        target = keys[excess]
+        for key in keys[:excess]:
+            self._buckets[target] += self._buckets.pop(key)
+
+    def merge(self, other: "LogHistogramSketch") -> "LogHistogramSketch":
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        self._merge_summary(other)
+        self._zero_count += other._zero_count
+        for index, count in other._buckets.items():
+            self._buckets[index] = self._buckets.get(index, 0) + count
+        if len(self._buckets) > self.max_buckets:
+            self._collapse()
+        return self
+
+    def _value(self, index: int) -> float:
+        """Representative value of a bucket: (gamma^(i-1), gamma^i]"""
+        return 2 * self._gamma ** index / (self._gamma + 1)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+        rank = max(math.ceil(q * self.count) - 1, 0)  # nearest-rank
+        seen = self._zero_count
+        if rank < seen:
+            return self._clamp(0.0)
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if rank < seen:
+                return self._clamp(self._value(index))
+        return self.max
+
+    def histogram(self, edges: Sequence[float]) -> List[int]:
+        """
+        Counts per range: [< edges[0], edges[0]..edges[1], ..., >= edges[-1]].
+
+        Values are binned by bucket, so counts near an edge are accurate
+        to within relative_accuracy of the edge.
+        """
+        counts = [0] * (len(edges) + 1)
+        if self._zero_count:
+            counts[bisect.bisect_right(edges, 0.0)] += self._zero_count
+        for index, count in self._buckets.items():
+            counts[bisect.bisect_right(edges, self._value(index))] += count
+        return counts
+
+
+class LinearHistogramSketch(_Sketch):
+    """
+    Equal-width histogram over [low, high], with quantiles interpolated
+    within a bucket. Values outside the range land in the edge buckets.
+    """
+
+    def __init__(self, low: float = 0.0, high: float = 100.0, bins: int = 100):
+        super().__init__()
+        if high <= low or bins < 1:
+            raise ValueError("LinearHistogramSketch needs high > low and at least one bin")
+        self.low = low
+        self.high = high
+        self.bins = bins
+        self._width = (high - low) / bins
+        self.counts = [0] * bins
+
+    def _bin(self, value: float) -> int:
+        return min(max(int((value - self.low) / self._width), 0), self.bins - 1)
+
+    def add(self, value: float) -> None:
+        self._observe(value)
+        self.counts[self._bin(value)] += 1
+
+    def merge(self, other: "LinearHistogramSketch") -> "LinearHistogramSketch":
+        if (other.low, other.high, other.bins) != (self.low, self.high, self.bins):
+            raise ValueError("Cannot merge histograms with different bins")
+        self._merge_summary(other)
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        return self
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and rank < seen + count:
+                fraction = (rank - seen + 0.5) / count
+                return self._clamp(self.low + (i + fraction) * self._width)
+            seen += count
+        return self.max
+
+    def histogram(self, bins: Optional[int] = None) -> List[int]:
+        """Counts per bucket, optionally coarsened to `bins` buckets (must divide evenly)"""
+        if bins is None or bins == self.bins:
+            return list(self.counts)
+        if self.bins % bins:
+            raise ValueError(f"Cannot coarsen {self.bins} bins into {bins}")
+        step = self.bins // bins
+        return [sum(self.counts[i:i + step]) for i in range(0, self.bins, step)]
@@ -0,0 +1,56 @@
+"""
+Unit tests for DirectoryScanner progress reporting.
+
+The scanner estimates work from the top-level listing and reports each
+finished top-level directory with the files and bytes found in it.
+
+Run with: pytest -q
+"""
+from pathlib import Path
+
+from comic_file_organizer.dfa.scanner import DirectoryScanner
+
+
+class RecordingProgress:
+    def __init__(self):
+        self.total = None
+        self.units = 0
+        self.files = 0
+        self.size_bytes = 0
+        self.finished = False
+
+    def start(self, total=None, unit='items'):
+        self.total = total
+        self.unit = unit
+
+    def update(self, units=0, files=0, size_bytes=0):
+        self.units += units
+        self.files += files
+        self.size_bytes += size_bytes
+
+    def finish(self):
+        self.finished = True
+
+
+def test_progress_counts_top_level_directories(tmp_path: Path):
+    for name in ("a", "b", "c"):
+        sub = tmp_path / name / "nested"
+        sub.mkdir(parents=True)
+        (sub / "file.bin").write_bytes(b"x" * 10)
+    (tmp_path / ".hidden").mkdir()
+    (tmp_path / "top.txt").write_bytes(b"y" * 5)
+
+    progress = RecordingProgress()
+    scanner = DirectoryScanner(exclude_hidden=True, progress=progress)
+    files = list(scanner.scan_directory(str(tmp_path)))
+
+    assert len(files) == 4
+    assert (progress.total, progress.unit) == (3, 'directories')
+    assert progress.units == 3
+    assert (progress.files, progress.size_bytes) == (4, 35)
+    assert progress.finished
+
+
+def test_scan_without_progress(tmp_path: Path):
+    (tmp_path / "file.txt").write_bytes(b"z")
+    assert len(list(DirectoryScanner().scan_directory(str(tmp_path)))) == 1
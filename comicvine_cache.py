@@ -7,6 +7,7 @@ Usage:
 
 The fetcher_callable should be a function taking issue_id and returning a dict (the data to cache).
 """
+import sys
 import sqlite3
 import json
 import time
@@ -85,13 +86,52 @@ class ComicVineCache:
         self.upsert_issue(issue_id, data)
         return data
 
+    def stats(self) -> Dict[str, int]:
+        """Number of cached issues and how many of them are stale"""
+        cutoff = int(time.time()) - self.ttl
+        cur = self._conn.cursor()
+        cur.execute("SELECT COUNT(*), COALESCE(SUM(updated_at < ?), 0) FROM issues", (cutoff,))
+        issues, stale = cur.fetchone()
+        return {"issues": int(issues), "stale": int(stale)}
+
 
 def _example_fetcher(issue_id: str) -> Dict[str, Any]:
     # Placeholder example: replace with real ComicVine API fetch
     return {"id": issue_id, "title": f"Issue {issue_id}", "fetched_at": int(time.time())}
 
 
+def main(argv=None) -> int:
+    """CLI entry point: inspect a cache database"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect the ComicVine metadata cache")
+    parser.add_argument("db_path", help="Cache database (e.g. ./comicvine_cache.db)")
+    parser.add_argument("issue_id", nargs="?", help="Print the cached data for this issue")
+    parser.add_argument("--ttl", type=int, default=86400, help="Staleness threshold in seconds (default: 86400)")
+    args = parser.parse_args(argv)
+
+    if not Path(args.db_path).exists():
+        print(f"Error: cache database not found: {args.db_path}", file=sys.stderr)
+        return 1
+    cache = ComicVineCache(db_path=args.db_path, ttl_seconds=args.ttl)
+    try:
+        if args.issue_id is None:
+            stats = cache.stats()
+            print(f"{args.db_path}: {stats['issues']} issues cached, {stats['stale']} stale")
+            return 0
+        row = cache.get_issue(args.issue_id)
+        if row is None:
+            print(f"Issue {args.issue_id} is not cached", file=sys.stderr)
+            return 1
+        print(json.dumps(row, indent=2))
+        return 0
+    finally:
+        cache.close()
+
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(main())
     cache = ComicVineCache(db_path=":memory:")
     print(cache.fetch_or_get("12345", _example_fetcher))
     cache.close()
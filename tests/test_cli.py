@@ -0,0 +1,88 @@
+"""
+Tests for the unified, lazily importing command dispatcher.
+"""
+import os
+import sys
+import subprocess
+
+from comicvine_cache import ComicVineCache
+from comic_file_organizer import cli
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+class TestDispatcher:
+    """Command dispatch in comic_file_organizer.cli"""
+
+    def test_help_lists_commands(self, capsys):
+        assert cli.main(['--help']) == 0
+        out = capsys.readouterr().out
+        for command in cli.COMMANDS:
+            assert f"  {command} " in out
+
+    def test_non_command_arguments_run_stats(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(cli, 'run', lambda command, args: calls.append((command, args)) or 0)
+        assert cli.main(['-v', 'config.ini']) == 0
+        assert cli.main(['/etc/mylar/mylar.conf']) == 0
+        assert calls == [('stats', ['-v', 'config.ini']), ('stats', ['/etc/mylar/mylar.conf'])]
+
+    def test_missing_config_reported_by_stats(self, tmp_path, capsys, monkeypatch):
+        monkeypatch.setattr(sys, 'argv', list(sys.argv))
+        assert cli.main([str(tmp_path / "mylar.conf")]) == 1
+        assert "mylar.conf" in capsys.readouterr().err
+
+    def test_dispatches_with_arguments(self, tmp_path, capsys, monkeypatch):
+        monkeypatch.setattr(sys, 'argv', list(sys.argv))
+        db_path = str(tmp_path / "cache.db")
+        cache = ComicVineCache(db_path=db_path)
+        cache.upsert_issue("42", {"title": "Answer"})
+        cache.close()
+
+        assert cli.main(['cache', db_path]) == 0
+        assert "1 issues cached, 0 stale" in capsys.readouterr().out
+        assert cli.main(['cache', db_path, '42']) == 0
+        assert '"Answer"' in capsys.readouterr().out
+
+    def test_bare_config_path_runs_stats(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(cli, 'run', lambda command, args: calls.append((command, args)) or 0)
+        assert cli.main(['/path/to/config.ini', '--no-details']) == 0
+        assert calls == [('stats', ['/path/to/config.ini', '--no-details'])]
+
+    def test_help_imports_no_command_modules(self):
+        code = (
+            "import sys, io, contextlib\n"
+            "from comic_file_organizer import cli\n"
+            "with contextlib.redirect_stdout(io.StringIO()):\n"
+            "    cli.main(['--help'])\n"
+            "print(sorted(m for m in sys.modules if m.startswith('comic_file_organizer')))\n"
+        )
+        out = subprocess.run([sys.executable, '-c', code], cwd=REPO_ROOT,
+                             capture_output=True, text=True, check=True).stdout
+        assert out.strip() == "['comic_file_organizer', 'comic_file_organizer.cli']"
+
+    def test_stats_help_skips_feature_modules(self):
+        code = (
+            "import sys, io, contextlib\n"
+            "from comic_file_organizer import cli\n"
+            "with contextlib.redirect_stdout(io.StringIO()):\n"
+            "    try:\n"
+            "        cli.main(['stats', '--help'])\n"
+            "    except SystemExit:\n"
+            "        pass\n"
+            "print(sorted(m for m in sys.modules if m.startswith('comic_file_organizer')))\n"
+        )
+        out = subprocess.run([sys.executable, '-c', code], cwd=REPO_ROOT,
+                             capture_output=True, text=True, check=True).stdout
+        assert 'comic_file_organizer.mylar3_cli' in out
+        for module in ('mylar3_history', 'mylar3_estimate', 'scan_scheduler', 'progress', 'profiling'):
+            assert f"comic_file_organizer.{module}'" not in out
+
+    def test_stats_option_values_match_feature_modules(self):
+        from comic_file_organizer import mylar3_cli, mylar3_estimate, mylar3_history, profiling, scan_scheduler
+
+        assert sorted(mylar3_cli.TREND_PERIODS) == sorted(mylar3_history.PERIODS)
+        assert mylar3_cli.DEVICE_KINDS == scan_scheduler.DEVICE_KINDS
+        assert mylar3_cli.DEFAULT_FRACTION == mylar3_estimate.DEFAULT_FRACTION
+        assert mylar3_cli.PROFILE_MODES == profiling.PROFILE_MODES
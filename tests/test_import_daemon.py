@@ -0,0 +1,180 @@
+"""
+Tests for archive conversion and the staged import daemon.
+"""
+import os
+import json
+import zipfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import pytest
+
+from comic_file_organizer.convert import convert_to_cbz, main as convert_main, sniff_archive
+from comic_file_organizer.import_daemon import ImportDaemon, ImportItem, SeriesIndex, parse_worker_counts
+from comic_file_organizer.journal import Journal
+from comic_file_organizer.mylar3_scanner import Mylar3Scanner, SeriesInfo
+from comic_file_organizer.mylar3_templates import NamingTemplates
+
+
+def write_zip(path, pages=2):
+    with zipfile.ZipFile(path, 'w') as zf:
+        for i in range(pages):
+            zf.writestr(f"page{i:02d}.jpg", b"\xff\xd8" + bytes(100))
+
+
+class TestConvert:
+    """Tests for sniffing and conversion"""
+
+    def test_sniff_archive(self, tmp_path):
+        zip_path = tmp_path / "a.cbr"
+        write_zip(zip_path)
+        rar_path = tmp_path / "b.cbr"
+        rar_path.write_bytes(b"Rar!\x1a\x07\x01\x00" + bytes(20))
+        junk = tmp_path / "c.cbz"
+        junk.write_bytes(b"<html>")
+        assert sniff_archive(str(zip_path)) == 'zip'
+        assert sniff_archive(str(rar_path)) == 'rar'
+        assert sniff_archive(str(junk)) == 'unknown'
+
+    def test_mislabelled_zip_is_renamed(self, tmp_path):
+        src = tmp_path / "Saga #001.cbr"
+        write_zip(src)
+        dst = convert_to_cbz(str(src))
+        assert dst == str(tmp_path / "Saga #001.cbz")
+        assert zipfile.is_zipfile(dst)
+        assert not src.exists()
+
+    def test_conversion_is_journaled(self, tmp_path):
+        src = tmp_path / "Saga #001.cbr"
+        write_zip(src)
+        with Journal(str(tmp_path / "j"), fsync=False) as journal:
+            convert_to_cbz(str(src), journal=journal, fsync=False)
+            assert journal.incomplete() == []
+
+    def test_existing_target_not_replaced(self, tmp_path):
+        src = tmp_path / "Saga #001.cbr"
+        write_zip(src)
+        existing = tmp_path / "Saga #001.cbz"
+        existing.write_bytes(b"keep me")
+        with pytest.raises(FileExistsError):
+            convert_to_cbz(str(src))
+        assert existing.read_bytes() == b"keep me"
+        assert src.exists()
+
+    def test_cli_reports_missing_file(self, tmp_path, capsys):
+        src = tmp_path / "Saga #001.cbr"
+        write_zip(src)
+        missing = tmp_path / "missing.cbr"
+        assert convert_main([str(missing), str(src)]) == 1
+        out = capsys.readouterr().out
+        assert f"{missing}: error:" in out
+        assert (tmp_path / "Saga #001.cbz").exists()
+
+    def test_unsupported_kind_rejected(self, tmp_path):
+        src = tmp_path / "x.cbz"
+        src.write_bytes(b"%PDF-1.4")
+        with pytest.raises(ValueError):
+            convert_to_cbz(str(src))
+
+
+class TestSeriesIndex:
+    """Tests for matching incoming files to library series"""
+
+    def test_find_prefers_series_started_before_issue_year(self):
+        old = SeriesInfo("Marvel", "X-Men", "/l/x1", 1963, 66, 0)
+        new = SeriesInfo("Marvel", "X-Men", "/l/x2", 2019, 21, 0)
+        index = SeriesIndex([old, new])
+        assert index.find("x men", 1970) is old
+        assert index.find("X-Men", 2020) is new
+        assert index.find("X-Men") is new
+        assert index.find("Avengers") is None
+
+
+class TestImportDaemon:
+    """Tests for the staged pipeline"""
+
+    @pytest.fixture
+    def setup(self, tmp_path):
+        library = tmp_path / "library"
+        series_dir = library / "Image" / "Saga (2012)"
+        series_dir.mkdir(parents=True)
+        with open(series_dir / "series.json", "w") as f:
+            json.dump({"metadata": {"name": "Saga", "year": 2012, "total_issues": 54}}, f)
+        incoming = tmp_path / "incoming"
+        incoming.mkdir()
+        return library, series_dir, incoming
+
+    def make_daemon(self, library, incoming, **kwargs):
+        results = Mylar3Scanner(str(library)).scan()
+        templates = NamingTemplates('$Publisher/$Series ($Year)', '$Series #$Issue ($Year)')
+        return ImportDaemon(str(incoming), results, templates, fsync=False, **kwargs)
+
+    def test_once_imports_matching_files(self, setup, tmp_path):
+        library, series_dir, incoming = setup
+        write_zip(incoming / "Saga #1 (2012).cbr")
+        write_zip(incoming / "Saga 002 (2012).cbz")     # no issue marker: left in place
+        write_zip(incoming / "Unknown #1 (2020).cbz")   # not in library: left in place
+        (incoming / "notes.cbz").write_bytes(b"not an archive")
+
+        journal = Journal(str(tmp_path / "journal"), fsync=False)
+        imported = []
+        daemon = self.make_daemon(library, incoming, journal=journal, updaters=[imported.append],
+                                  workers={'convert': 2, 'move': 2}, queue_size=1)
+        daemon.run(once=True, metrics_interval=60)
+        journal.close()
+
+        assert (series_dir / "Saga #001 (2012).cbz").exists()
+        assert [os.path.basename(i.path) for i in imported] == ["Saga #001 (2012).cbz"]
+        assert (incoming / "Unknown #1 (2020).cbz").exists()
+
+        metrics = daemon.metrics()
+        assert metrics['detect']['processed'] == 4
+        assert metrics['sniff']['dropped'] == 1
+        assert metrics['tag']['dropped'] == 2
+        assert metrics['update']['processed'] == 1
+        assert all(m.get('queue_depth', 0) == 0 for m in metrics.values())
+
+    def test_parallel_moves_to_one_target(self, setup):
+        library, series_dir, incoming = setup
+        daemon = self.make_daemon(library, incoming)
+        target = str(series_dir / "Saga #001 (2012).cbz")
+        items = []
+        for i in range(8):
+            path = incoming / f"copy{i}.cbz"
+            write_zip(path)
+            items.append(ImportItem(str(path), target=target))
+
+        barrier = threading.Barrier(len(items))
+
+        def move(item):
+            barrier.wait()
+            return daemon.move(item)
+
+        with ThreadPoolExecutor(len(items)) as pool:
+            moved = [r for r in pool.map(move, items) if r is not None]
+
+        assert len(moved) == 1
+        assert moved[0].path == target
+        assert len(os.listdir(incoming)) == 7  # the others are left in place
+
+    def test_detect_waits_for_stable_files(self, setup):
+        library, _, incoming = setup
+        write_zip(incoming / "Saga #2 (2012).cbz")
+        daemon = self.make_daemon(library, incoming)
+        assert daemon.detect() == 0   # first sighting
+        assert daemon.detect() == 1   # unchanged since last poll
+        assert daemon.detect() == 0   # already queued
+
+    def test_metrics_file_written(self, setup, tmp_path):
+        library, _, incoming = setup
+        metrics_file = tmp_path / "metrics.json"
+        daemon = self.make_daemon(library, incoming)
+        daemon.run(once=True, metrics_file=str(metrics_file))
+        data = json.loads(metrics_file.read_text())
+        assert set(data) == {'detect', 'sniff', 'convert', 'tag', 'move', 'update'}
+        assert data['move']['queue_capacity'] == 64
+
+    def test_parse_worker_counts(self):
+        assert parse_worker_counts(['convert=8', 'move=2']) == {'convert': 8, 'move': 2}
+        with pytest.raises(ValueError):
+            parse_worker_counts(['detect=3'])
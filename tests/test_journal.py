@@ -0,0 +1,166 @@
+"""
+Tests for the write-ahead journal and crash recovery.
+"""
+import os
+import json
+import threading
+from pathlib import Path
+import pytest
+
+from comic_file_organizer.journal import Journal
+from comic_file_organizer.mylar3_rename import (
+    RenameExecutor,
+    RenameOperation,
+    RenamePlan,
+    partial_path,
+)
+
+
+@pytest.fixture
+def journal(tmp_path):
+    j = Journal(str(tmp_path / "ops.journal"), fsync=False)
+    yield j
+    j.close()
+
+
+def read_records(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+class TestJournal:
+    """Tests for logging and group commit"""
+
+    def test_begin_is_buffered_until_sync(self, journal):
+        journal.begin('move', '/a', '/b')
+        assert read_records(journal.path) == []
+        journal.sync()
+        assert read_records(journal.path)[0]['kind'] == 'move'
+
+    def test_incomplete_excludes_committed_and_aborted(self, journal):
+        a = journal.begin('move', '/a', '/b')
+        b = journal.begin('delete', '/c')
+        c = journal.begin('rename', '/d', '/e')
+        journal.commit([a])
+        journal.abort([b])
+        assert [e.id for e in journal.incomplete()] == [c]
+
+    def test_unknown_kind_rejected(self, journal):
+        with pytest.raises(ValueError):
+            journal.begin('chmod', '/a')
+
+    def test_ids_continue_after_reopen(self, tmp_path):
+        path = str(tmp_path / "ops.journal")
+        with Journal(path, fsync=False) as j:
+            first = j.begin('move', '/a', '/b')
+        with Journal(path, fsync=False) as j:
+            assert j.begin('move', '/c', '/d') == first + 1
+
+    def test_torn_last_record_ignored(self, tmp_path):
+        path = str(tmp_path / "ops.journal")
+        with Journal(path, fsync=False) as j:
+            j.begin('move', '/a', '/b')
+        with open(path, 'a') as f:
+            f.write('{"type": "begin", "id": 2, "ki')
+        with Journal(path, fsync=False) as j:
+            assert len(j.incomplete()) == 1
+
+    def test_concurrent_writers_group_commit(self, journal):
+        def worker():
+            for _ in range(50):
+                journal.begin('delete', '/x')
+                journal.sync()
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(read_records(journal.path)) == 200
+
+
+class TestRecovery:
+    """Tests for replaying or rolling back interrupted operations"""
+
+    def test_completed_move_missing_commit_is_replayed(self, journal, tmp_path):
+        dst = tmp_path / "dst.cbz"
+        dst.write_bytes(b"data")
+        journal.begin('move', str(tmp_path / "src.cbz"), str(dst))
+        report = journal.recover()
+        assert len(report.replayed) == 1
+        assert journal.incomplete() == []
+
+    def test_copied_but_source_left_is_replayed(self, journal, tmp_path):
+        src, dst = tmp_path / "src.cbz", tmp_path / "dst.cbz"
+        src.write_bytes(b"data")
+        dst.write_bytes(b"data")
+        journal.begin('move', str(src), str(dst), tmp=partial_path(str(dst)))
+        report = journal.recover()
+        assert len(report.replayed) == 1
+        assert not src.exists()
+        assert dst.exists()
+
+    def test_partial_copy_is_rolled_back(self, journal, tmp_path):
+        src, dst = tmp_path / "src.cbz", tmp_path / "dst.cbz"
+        src.write_bytes(b"data")
+        tmp = Path(partial_path(str(dst)))
+        tmp.write_bytes(b"da")
+        journal.begin('move', str(src), str(dst), tmp=str(tmp))
+        report = journal.recover()
+        assert len(report.rolled_back) == 1
+        assert src.exists()
+        assert not tmp.exists()
+        assert not dst.exists()
+
+    def test_case_only_rename_keeps_file(self, journal, tmp_path):
+        # On a case-insensitive filesystem both names open the same file;
+        # a hard link gives the same situation on any filesystem
+        src, dst = tmp_path / "thor 001.cbz", tmp_path / "Thor 001.cbz"
+        src.write_bytes(b"data")
+        os.link(src, dst)
+        journal.begin('move', str(src), str(dst))
+        report = journal.recover()
+        assert len(report.replayed) == 1
+        assert src.exists()
+        assert dst.read_bytes() == b"data"
+        assert journal.incomplete() == []
+
+    def test_interrupted_delete_is_replayed(self, journal, tmp_path):
+        victim = tmp_path / "old.cbr"
+        victim.write_bytes(b"rar")
+        journal.begin('delete', str(victim))
+        journal.recover()
+        assert not victim.exists()
+
+    def test_size_mismatch_left_unresolved(self, journal, tmp_path):
+        src, dst = tmp_path / "src.cbz", tmp_path / "dst.cbz"
+        src.write_bytes(b"data")
+        dst.write_bytes(b"other data")
+        journal.begin('move', str(src), str(dst))
+        report = journal.recover()
+        assert len(report.unresolved) == 1
+        assert src.exists()
+        assert len(journal.incomplete()) == 1
+
+    def test_recovery_checkpoints_journal(self, journal, tmp_path):
+        journal.begin('delete', str(tmp_path / "gone"))
+        journal.recover()
+        assert os.path.getsize(journal.path) == 0
+
+
+class TestExecutorJournaling:
+    """Tests for the rename executor writing through the journal"""
+
+    def test_execute_leaves_clean_journal(self, journal, tmp_path):
+        (tmp_path / "src").mkdir()
+        ops = []
+        for i in range(5):
+            src = tmp_path / "src" / f"{i}.cbz"
+            src.write_bytes(b"x")
+            ops.append(RenameOperation(str(src), str(tmp_path / "dst" / f"{i}.cbz")))
+        plan = RenamePlan(destination_dir=str(tmp_path), operations=ops)
+
+        result = RenameExecutor(fsync_batch=2, fsync=False, journal=journal).execute(plan)
+        assert result.renamed == 5
+        assert journal.incomplete() == []
+        assert os.path.getsize(journal.path) == 0
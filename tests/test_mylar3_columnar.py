@@ -0,0 +1,89 @@
+"""
+Tests for the columnar statistics view.
+
+The pure-Python backend always runs; NumPy parity tests run when NumPy is installed.
+"""
+import pytest
+
+from comic_file_organizer.mylar3_scanner import ScanResults, SeriesInfo
+from comic_file_organizer.mylar3_columnar import SeriesColumns
+from comic_file_organizer.mylar3_stats import AggregateCounts, StatsAccumulator, calculate_statistics
+from comic_file_organizer.mylar3_query import SeriesQueryIndex
+
+
+def make_series():
+    return [
+        SeriesInfo("Marvel", "A", "/x", 1984, 10, 10, file_type_counts={'CBZ': 10}, file_type_sizes={'CBZ': 1000}),
+        SeriesInfo("Marvel", "B", "/x", 1989, 10, 3, file_type_counts={'CBR': 3}, file_type_sizes={'CBR': 300}),
+        SeriesInfo("Marvel", "C", "/x", 2021, 20, 0),
+        SeriesInfo("DC Comics", "D", "/x", None, 8, 6,
+                   file_type_counts={'CBZ': 4, 'CBR': 2}, file_type_sizes={'CBZ': 400, 'CBR': 200}),
+        SeriesInfo("DC Comics", "E", "/x", 2020, 0, 2, file_type_counts={'CBZ': 2}, file_type_sizes={'CBZ': 50}),
+    ]
+
+
+class TestSeriesColumns:
+    """Tests for the pure-Python backend"""
+
+    def test_columns(self):
+        columns = SeriesColumns(make_series(), use_numpy=False)
+        assert columns.backend == 'python'
+        assert len(columns) == 5
+        assert columns.publishers == ["Marvel", "DC Comics"]
+        assert columns.file_types == ['CBR', 'CBZ']
+        assert columns.sizes['CBR'] == [0, 300, 0, 200, 0]
+
+    def test_aggregates(self):
+        columns = SeriesColumns(make_series(), use_numpy=False)
+        assert columns.totals() == {'owned': 21, 'expected': 48, 'missing': 29}
+        assert columns.size_by_decade() == {1980: 1300, None: 600, 2020: 50}
+        assert columns.size_by_file_type() == {'CBR': 500, 'CBZ': 1450}
+        assert columns.file_type_ratio() == {'CBR': 5 / 21, 'CBZ': 16 / 21}
+        # 100%, 30%, 75% and 0% (unknown total)
+        assert columns.completion_histogram(10) == [1, 0, 0, 1, 0, 0, 0, 1, 0, 1]
+
+    def test_matches_publisher_stats(self):
+        series = make_series()
+        stats = calculate_statistics(ScanResults(destination_dir="/x", series=series))
+        by_publisher = stats.columns().completion_by_publisher()
+        for name, publisher in stats.publishers.items():
+            assert abs(by_publisher[name] - publisher.average_completion) < 1e-9
+        assert stats.columns() is stats.columns()
+
+    def test_accumulator_from_columns(self):
+        series = make_series()
+        expected = StatsAccumulator().add_all(series)
+        assert StatsAccumulator.from_columns(SeriesColumns(series, use_numpy=False)) == expected
+
+
+class TestNumpyBackend:
+    """The NumPy backend must agree with the pure-Python one"""
+
+    def test_parity(self):
+        pytest.importorskip("numpy")
+        series = make_series()
+        python = SeriesColumns(series, use_numpy=False)
+        vectorized = SeriesColumns(series, use_numpy=True)
+        assert vectorized.backend == 'numpy'
+        assert vectorized.totals() == python.totals()
+        assert vectorized.size_by_decade() == python.size_by_decade()
+        assert vectorized.size_by_file_type() == python.size_by_file_type()
+        assert vectorized.file_type_ratio() == python.file_type_ratio()
+        assert vectorized.completion_histogram() == python.completion_histogram()
+        for name, pct in python.completion_by_publisher().items():
+            assert abs(vectorized.completion_by_publisher()[name] - pct) < 1e-9
+        assert (StatsAccumulator.from_columns(vectorized)
+                == StatsAccumulator.from_columns(python)
+                == StatsAccumulator().add_all(series))
+
+    def test_group_by_matches_per_series_counts(self):
+        pytest.importorskip("numpy")
+        series = make_series()
+        index = SeriesQueryIndex(ScanResults(destination_dir="/x", series=series))
+        for field in ('publisher', 'decade', 'type'):
+            expected = {}
+            for s in series:
+                key = {'publisher': s.publisher, 'decade': None if s.year is None else s.year // 10 * 10,
+                       'type': '/'.join(sorted(s.file_type_counts)) or None}[field]
+                expected.setdefault(key, AggregateCounts()).add(s)
+            assert index.group_by(field) == expected
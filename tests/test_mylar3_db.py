@@ -0,0 +1,182 @@
+"""
+Tests for batched Mylar3 database updates.
+
+Uses a local SQLite file with the columns of Mylar3's comics/issues tables.
+"""
+import os
+import sqlite3
+import threading
+import time
+import pytest
+
+from comic_file_organizer.mylar3_db import Mylar3DatabaseUpdater, normalize_issue_number, queue_rename_plan
+from comic_file_organizer.mylar3_rename import RenameOperation, RenamePlan
+
+
+MYLAR3_SCHEMA = """
+CREATE TABLE comics (
+    ComicID TEXT UNIQUE, ComicName TEXT, ComicSortName TEXT, ComicYear TEXT, DateAdded TEXT,
+    Status TEXT, IncludeExtras INTEGER, Have INTEGER, Total INTEGER, ComicImage TEXT,
+    FirstImageSize INTEGER, ComicPublisher TEXT, PublisherImprint TEXT, ComicLocation TEXT,
+    ComicPublished TEXT, NewPublish TEXT, LatestIssue TEXT, intLatestIssue INT, LatestDate TEXT,
+    Description TEXT, DescriptionEdit TEXT, QUALalt_vers TEXT, QUALtype TEXT, QUALscanner TEXT,
+    QUALquality TEXT, LastUpdated TEXT, AlternateSearch TEXT, UseFuzzy TEXT, ComicVersion TEXT,
+    SortOrder INTEGER, DetailURL TEXT, ForceContinuing INTEGER, ComicName_Filesafe TEXT,
+    AlternateFileName TEXT, ComicImageURL TEXT, ComicImageALTURL TEXT, DynamicComicName TEXT,
+    AllowPacks TEXT, Type TEXT, Corrected_SeriesYear TEXT, Corrected_Type TEXT, TorrentID_32P TEXT,
+    LatestIssueID TEXT, Collects CLOB, IgnoreType INTEGER, AgeRating TEXT, FilesUpdated TEXT,
+    seriesjsonPresent INT, dirlocked INTEGER, cv_removed INT
+);
+CREATE TABLE issues (
+    IssueID TEXT, ComicName TEXT, IssueName TEXT, Issue_Number TEXT, DateAdded TEXT, Status TEXT,
+    Type TEXT, ComicID TEXT, ArtworkURL Text, ReleaseDate TEXT, Location TEXT, IssueDate TEXT,
+    DigitalDate TEXT, Int_IssueNumber INT, ComicSize TEXT, AltIssueNumber TEXT, IssueDate_Edit TEXT,
+    ImageURL TEXT, ImageURL_ALT TEXT
+);
+"""
+
+
+@pytest.fixture
+def mylar_db(tmp_path):
+    path = str(tmp_path / "mylar.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(MYLAR3_SCHEMA)
+    conn.execute("INSERT INTO comics (ComicID, ComicName, Have, Total, ComicLocation) "
+                 "VALUES ('100', 'Saga', 0, 3, '/old/Saga')")
+    conn.executemany(
+        "INSERT INTO issues (IssueID, ComicID, Issue_Number, Status, Location) VALUES (?, '100', ?, 'Wanted', NULL)",
+        [('1001', '1'), ('1002', '2'), ('1003', '3')]
+    )
+    conn.commit()
+    conn.close()
+    return path
+
+
+def fetch(path, sql, *params):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+class TestMylar3DatabaseUpdater:
+    """Tests for queueing and flushing changes"""
+
+    def test_normalize_issue_number(self):
+        assert normalize_issue_number('001') == '1'
+        assert normalize_issue_number('001.5') == '1.5'
+        assert normalize_issue_number('000') == '0'
+        assert normalize_issue_number('12AU') == '12AU'
+
+    def test_updates_by_comic_and_issue_number(self, mylar_db, tmp_path):
+        issue = tmp_path / "Saga #001 (2012).cbz"
+        issue.write_bytes(b"x" * 42)
+        with Mylar3DatabaseUpdater(mylar_db) as updater:
+            updater.queue_issue(str(issue), comic_id=100, issue_number='001', status='Downloaded')
+            result = updater.flush()
+
+        assert result.issues_updated == 1
+        assert result.transactions == 2  # issues (+ Have refresh), then series location
+        assert fetch(mylar_db, "SELECT Location, ComicSize, Status FROM issues WHERE IssueID = '1001'") == [
+            ("Saga #001 (2012).cbz", "42", "Downloaded")
+        ]
+        assert fetch(mylar_db, "SELECT Have, ComicLocation FROM comics") == [(1, str(tmp_path))]
+
+    def test_updates_by_issue_id(self, mylar_db):
+        with Mylar3DatabaseUpdater(mylar_db) as updater:
+            updater.queue_issue("/lib/Saga/Saga #003.cbz", issue_id='1003', size=7)
+            result = updater.flush()
+        assert result.issues_updated == 1
+        assert fetch(mylar_db, "SELECT Location, ComicSize FROM issues WHERE IssueID = '1003'") == [
+            ("Saga #003.cbz", "7")
+        ]
+
+    def test_unmatched_rows_reported(self, mylar_db):
+        with Mylar3DatabaseUpdater(mylar_db) as updater:
+            updater.queue_issue("/lib/x.cbz", comic_id=999, issue_number='1', size=1)
+            result = updater.flush()
+        assert result.issues_updated == 0
+        assert result.issues_unmatched == 1
+
+    def test_batches_split_into_transactions(self, mylar_db):
+        with Mylar3DatabaseUpdater(mylar_db, batch_size=2) as updater:
+            for i, issue_id in enumerate(('1001', '1002', '1003')):
+                updater.queue_issue(f"/lib/Saga #{i}.cbz", issue_id=issue_id, size=1)
+            result = updater.flush()
+        assert result.issues_updated == 3
+        assert result.transactions == 2
+
+    def test_enables_wal_mode(self, mylar_db):
+        Mylar3DatabaseUpdater(mylar_db).close()
+        assert fetch(mylar_db, "PRAGMA journal_mode") == [("wal",)]
+
+    def test_waits_for_competing_writer(self, mylar_db):
+        """A Mylar3-style writer holding the lock delays, but doesn't fail, the flush"""
+        updater = Mylar3DatabaseUpdater(mylar_db, busy_timeout=0.05, retry_backoff=0.05)
+        blocker = sqlite3.connect(mylar_db, isolation_level=None, check_same_thread=False)
+        blocker.execute("BEGIN IMMEDIATE")
+        released = threading.Timer(0.3, lambda: blocker.execute("COMMIT"))
+        released.start()
+        try:
+            updater.queue_issue("/lib/Saga #002.cbz", issue_id='1002', size=1)
+            result = updater.flush()
+        finally:
+            released.join()
+            blocker.close()
+            updater.close()
+        assert result.issues_updated == 1
+        assert result.retries >= 1
+
+    def test_queue_rename_plan(self, mylar_db, tmp_path):
+        dst = tmp_path / "Saga (2012)" / "Saga #002 (2012).cbz"
+        dst.parent.mkdir()
+        dst.write_bytes(b"abc")
+        plan = RenamePlan(destination_dir=str(tmp_path), operations=[
+            RenameOperation("/old/Saga/saga 2.cbz", str(dst), comicid=100, issue='002'),
+            RenameOperation("/old/Saga/gone.cbz", str(tmp_path / "missing.cbz"), comicid=100, issue='003'),
+        ])
+        with Mylar3DatabaseUpdater(mylar_db) as updater:
+            assert queue_rename_plan(updater, plan) == 1
+            updater.flush()
+        assert fetch(mylar_db, "SELECT Location FROM issues WHERE IssueID = '1002'") == [("Saga #002 (2012).cbz",)]
+        assert fetch(mylar_db, "SELECT ComicLocation FROM comics") == [(str(dst.parent),)]
+
+    def test_rename_keeps_issue_status(self, mylar_db, tmp_path):
+        conn = sqlite3.connect(mylar_db)
+        conn.execute("UPDATE issues SET Status = 'Archived' WHERE IssueID = '1002'")
+        conn.commit()
+        conn.close()
+        dst = tmp_path / "Saga #002 (2012).cbz"
+        dst.write_bytes(b"abc")
+        plan = RenamePlan(destination_dir=str(tmp_path), operations=[
+            RenameOperation("/old/Saga/saga 2.cbz", str(dst), comicid=100, issue='002'),
+        ])
+        with Mylar3DatabaseUpdater(mylar_db) as updater:
+            queue_rename_plan(updater, plan)
+            updater.queue_issue("/lib/Saga #003.cbz", issue_id='1003', size=1)
+            updater.flush()
+        assert fetch(mylar_db, "SELECT IssueID, Location, Status FROM issues WHERE IssueID != '1001'") == [
+            ('1002', "Saga #002 (2012).cbz", 'Archived'),
+            ('1003', "Saga #003.cbz", 'Wanted'),
+        ]
+
+    def test_failed_flush_keeps_queued_changes(self, mylar_db):
+        updater = Mylar3DatabaseUpdater(mylar_db, busy_timeout=0.01, max_retries=0)
+        blocker = sqlite3.connect(mylar_db, isolation_level=None)
+        try:
+            updater.queue_issue("/lib/Saga #002.cbz", issue_id='1002', size=1)
+            updater.queue_issue("/lib/Saga #003.cbz", comic_id=100, issue_number='3', size=1)
+            blocker.execute("BEGIN IMMEDIATE")
+            with pytest.raises(sqlite3.OperationalError):
+                updater.flush()
+            assert updater.pending == 3  # two issues and the series folder
+            blocker.execute("COMMIT")
+
+            result = updater.flush()
+        finally:
+            blocker.close()
+            updater.close()
+        assert result.issues_updated == 2
+        assert result.series_updated == 1
+        assert updater.pending == 0
@@ -0,0 +1,105 @@
+"""
+Tests for sampling-based collection estimates.
+"""
+import json
+import random
+
+import pytest
+
+from comic_file_organizer import mylar3_cli
+from comic_file_organizer.mylar3_estimate import Stratum, estimate_collection, ratio_estimate, stratified_total
+from comic_file_organizer.mylar3_scanner import Mylar3Scanner, SeriesInfo
+from comic_file_organizer.mylar3_stats import calculate_statistics
+
+
+def make_collection(root, sizes, seed=0):
+    """Publishers with the given numbers of series and random issue counts"""
+    rng = random.Random(seed)
+    for publisher, count in sizes.items():
+        for i in range(count):
+            series_dir = root / publisher / f"Series {i:03d}"
+            series_dir.mkdir(parents=True)
+            total = rng.randint(5, 40)
+            (series_dir / "series.json").write_text(json.dumps({
+                "metadata": {"name": f"Series {i:03d}", "year": 2000 + i % 20, "total_issues": total}
+            }))
+            for issue in range(rng.randint(0, total)):
+                (series_dir / f"Series {i:03d} #{issue:03d}.cbz").write_bytes(b"x" * rng.randint(1, 50))
+    return str(root)
+
+
+def series(owned, total):
+    return SeriesInfo("P", "S", "/p/s", None, total, owned)
+
+
+class TestEstimators:
+    """Stratified totals and ratio estimates"""
+
+    def test_complete_stratum_is_exact(self):
+        strata = [Stratum("P", 3, [series(1, 2), series(2, 2), None])]
+        estimate = stratified_total(strata, lambda s: s.issues_owned if s else 0)
+        assert (estimate.value, estimate.low, estimate.high) == (3, 3, 3)
+
+    def test_extrapolates_sample_mean(self):
+        strata = [Stratum("P", 100, [series(1, 4), series(3, 4)]), Stratum("Q", 2, [series(5, 5), series(5, 5)])]
+        estimate = stratified_total(strata, lambda s: s.issues_owned)
+        assert estimate.value == 100 * 2 + 10
+        assert estimate.low < estimate.value < estimate.high
+        assert estimate.margin > 0
+
+    def test_ratio(self):
+        strata = [Stratum("P", 2, [series(1, 4), series(3, 4)])]
+        completion = ratio_estimate(strata, lambda s: s.issues_owned, lambda s: s.total_issues)
+        assert completion.value == 0.5 and completion.margin == 0
+
+
+class TestEstimateCollection:
+    """Estimates against a full scan of a generated collection"""
+
+    def test_full_fraction_matches_scan(self, tmp_path):
+        root = make_collection(tmp_path, {"Marvel": 12, "DC": 7})
+        stats = calculate_statistics(Mylar3Scanner(root).scan())
+
+        estimate = estimate_collection(Mylar3Scanner(root), fraction=1.0)
+        assert (estimate.sampled, estimate.population) == (19, 19)
+        assert estimate.series.value == stats.total_series
+        assert estimate.issues_owned.value == stats.total_issues_owned
+        assert estimate.missing_issues.value == stats.total_missing_issues
+        assert estimate.issues_owned.margin == 0
+        assert estimate.completion_percentage.value == pytest.approx(stats.overall_completion_percentage)
+
+    def test_sample_interval(self, tmp_path):
+        root = make_collection(tmp_path, {"Marvel": 150, "DC": 60, "Image": 3})
+        results = Mylar3Scanner(root).scan()
+
+        estimate = estimate_collection(Mylar3Scanner(root), fraction=0.2, seed=3)
+        strata = {s.publisher: s for s in estimate.strata}
+        assert (strata["Marvel"].sampled, strata["DC"].sampled, strata["Image"].sampled) == (30, 12, 3)
+        assert estimate.issues_owned.low <= results.total_issues_owned <= estimate.issues_owned.high
+        size = sum(s.total_size_bytes for s in results.series)
+        assert estimate.size_by_file_type['.CBZ'].low <= size <= estimate.size_by_file_type['.CBZ'].high
+
+        again = estimate_collection(Mylar3Scanner(root), fraction=0.2, seed=3)
+        assert again.issues_owned == estimate.issues_owned
+
+    def test_scope(self, tmp_path):
+        root = make_collection(tmp_path, {"Marvel": 10, "DC": 10})
+        estimate = estimate_collection(Mylar3Scanner(root, publishers=["dc"], series_patterns=["series 00*"]))
+        assert [(s.publisher, s.population) for s in estimate.strata] == [("DC", 10)]
+
+    @pytest.mark.parametrize("fraction", [0, 1.5])
+    def test_invalid_fraction(self, tmp_path, fraction):
+        with pytest.raises(ValueError):
+            estimate_collection(Mylar3Scanner(str(tmp_path)), fraction=fraction)
+
+    def test_cli_estimate_reads_file_sizes(self, tmp_path, capsys):
+        root = make_collection(tmp_path / "lib", {"Marvel": 6})
+        stats = calculate_statistics(Mylar3Scanner(root).scan())
+        config = tmp_path / "config.ini"
+        config.write_text(f"[General]\ndestination_dir = {root}\n")
+
+        assert mylar3_cli.main([str(config), '--estimate', '1', '--no-details', '--no-top-lists',
+                                '--format', 'json']) == 0
+        estimates = {e['metric']: e for e in json.loads(capsys.readouterr().out)['estimates']
+                     if e['file_type'] is None}
+        assert estimates["size_bytes"]["estimate"] == stats.accumulator.totals.total_size_bytes > 0
@@ -0,0 +1,142 @@
+"""
+Tests for the statistics history store.
+"""
+import json
+import calendar
+import sqlite3
+import pytest
+
+from comic_file_organizer import mylar3_cli
+from comic_file_organizer.mylar3_scanner import ScanResults, SeriesInfo
+from comic_file_organizer.mylar3_stats import calculate_statistics
+from comic_file_organizer.mylar3_history import StatsHistory, run_scope
+
+
+def ts(year, month, day):
+    return calendar.timegm((year, month, day, 12, 0, 0))
+
+
+def make_stats(marvel_owned, dc_owned, destination_dir="/lib", publishers=("Marvel", "DC Comics")):
+    series = [
+        SeriesInfo("Marvel", "Saga", "/lib/Marvel/Saga", 2012, 10, marvel_owned,
+                   file_type_sizes={'CBZ': marvel_owned * 100}),
+        SeriesInfo("DC Comics", "Batman", "/lib/DC/Batman", 2016, 20, dc_owned,
+                   file_type_sizes={'CBR': dc_owned * 50}),
+    ]
+    series = [s for s in series if s.publisher in publishers]
+    return calculate_statistics(ScanResults(destination_dir=destination_dir, series=series))
+
+
+class TestStatsHistory:
+    """Tests for recording runs and trend queries"""
+
+    @pytest.fixture
+    def history(self, tmp_path):
+        history = StatsHistory(str(tmp_path / "history.db"))
+        yield history
+        history.close()
+
+    def test_monthly_trend_uses_last_run_of_month(self, history):
+        history.record(make_stats(1, 2), recorded_at=ts(2025, 1, 3))
+        history.record(make_stats(2, 4), recorded_at=ts(2025, 1, 28))
+        history.record(make_stats(5, 4), recorded_at=ts(2025, 2, 10))
+
+        points = history.trend('month')
+        assert [p.period for p in points] == ['2025-01', '2025-02']
+        assert [p.issues_owned for p in points] == [6, 9]
+        assert [p.total_bytes for p in points] == [400, 700]
+        assert points[1].completion_percentage == pytest.approx(9 / 30 * 100)
+
+    def test_publisher_trend(self, history):
+        history.record(make_stats(1, 2), recorded_at=ts(2025, 1, 6))
+        history.record(make_stats(3, 2), recorded_at=ts(2025, 1, 14))
+
+        points = history.trend('week', publisher='marvel')
+        assert [p.issues_owned for p in points] == [1, 3]
+        assert points[-1].missing_issues == 7
+
+    def test_limit_and_persistence(self, tmp_path):
+        path = str(tmp_path / "history.db")
+        with StatsHistory(path) as history:
+            for day in range(1, 6):
+                history.record(make_stats(day, 0), recorded_at=ts(2025, 3, day))
+        with StatsHistory(path) as history:
+            assert history.run_count() == 5
+            assert [p.issues_owned for p in history.trend('day', limit=2)] == [4, 5]
+
+    def test_unknown_period(self, history):
+        with pytest.raises(ValueError):
+            history.trend('fortnight')
+
+    def test_run_scope(self):
+        assert run_scope() == ''
+        assert run_scope(['Marvel', 'DC', 'marvel'], ['bat*'], 'year>2000') == \
+            'publisher=dc,marvel; series=bat*; where=year>2000'
+
+    def test_scoped_runs_kept_apart(self, history):
+        history.record(make_stats(1, 2), recorded_at=ts(2025, 1, 3))
+        scope = run_scope(series=['saga*'])
+        history.record(make_stats(9, 0, publishers=("Marvel",)), recorded_at=ts(2025, 1, 20), scope=scope)
+
+        assert [p.total_series for p in history.trend('month')] == [2]
+        assert [p.total_series for p in history.trend('month', scope=scope)] == [1]
+
+    def test_trend_per_library(self, history):
+        history.record(make_stats(1, 2), recorded_at=ts(2025, 1, 3))
+        history.record(make_stats(7, 7, destination_dir="/other"), recorded_at=ts(2025, 1, 20))
+
+        assert [p.issues_owned for p in history.trend('month', destination_dir="/lib")] == [3]
+        assert [p.issues_owned for p in history.trend('month', destination_dir="/other")] == [14]
+
+    def test_publisher_trend_takes_runs_scoped_to_publisher(self, history):
+        history.record(make_stats(1, 2), recorded_at=ts(2025, 1, 3))
+        history.record(make_stats(4, 0, publishers=("Marvel",)), recorded_at=ts(2025, 2, 3),
+                       scope=run_scope(publishers=["Marvel"]))
+        history.record(make_stats(0, 9, publishers=("DC Comics",)), recorded_at=ts(2025, 3, 3),
+                       scope=run_scope(publishers=["DC Comics"]))
+
+        assert [p.issues_owned for p in history.trend('month', publisher='marvel')] == [1, 4]
+        assert [p.issues_owned for p in history.trend('month')] == [3]
+
+    def test_history_without_scope_column_upgraded(self, tmp_path):
+        path = str(tmp_path / "old.db")
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE runs (id INTEGER PRIMARY KEY, recorded_at INTEGER NOT NULL, "
+                     "destination_dir TEXT NOT NULL, total_publishers INTEGER NOT NULL, "
+                     "total_series INTEGER NOT NULL, series_with_issues INTEGER NOT NULL, "
+                     "complete_series INTEGER NOT NULL, issues_owned INTEGER NOT NULL, "
+                     "issues_expected INTEGER NOT NULL, missing_issues INTEGER NOT NULL, "
+                     "total_bytes INTEGER NOT NULL)")
+        conn.execute("INSERT INTO runs VALUES (1, ?, '/lib', 2, 2, 2, 0, 3, 30, 27, 200)", (ts(2025, 1, 3),))
+        conn.commit()
+        conn.close()
+
+        with StatsHistory(path) as history:
+            history.record(make_stats(5, 5), recorded_at=ts(2025, 2, 3))
+            assert [p.issues_owned for p in history.trend('month', destination_dir="/lib")] == [3, 10]
+
+
+class TestHistoryOption:
+    """mylar3_cli --history records narrowed runs under their own scope"""
+
+    def test_trend_ignores_narrowed_runs(self, tmp_path, capsys):
+        for publisher, name in (("Marvel", "Thor"), ("Marvel", "Hulk"), ("DC", "Batman")):
+            series_dir = tmp_path / "lib" / publisher / name
+            series_dir.mkdir(parents=True)
+            (series_dir / "series.json").write_text(json.dumps({"metadata": {"name": name, "total_issues": 3}}))
+        config = tmp_path / "config.ini"
+        config.write_text(f"[General]\ndestination_dir = {tmp_path / 'lib'}\n")
+        history = str(tmp_path / "history.db")
+
+        assert mylar3_cli.main([str(config), '--history', history]) == 0
+        assert mylar3_cli.main([str(config), '--history', history, '--where', 'publisher=DC']) == 0
+        assert mylar3_cli.main([str(config), '--history', history, '--series', 'thor']) == 0
+        capsys.readouterr()
+
+        assert mylar3_cli.main([str(config), '--history', history, '--trend', 'day', '--format', 'json']) == 0
+        points = json.loads(capsys.readouterr().out)['trend']
+        assert [p['total_series'] for p in points] == [3]
+
+        assert mylar3_cli.main([str(config), '--history', history, '--trend', 'day', '--format', 'json',
+                                '--series', 'thor']) == 0
+        assert [p['total_series'] for p in json.loads(capsys.readouterr().out)['trend']] == [1]
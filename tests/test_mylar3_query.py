@@ -0,0 +1,96 @@
+"""
+Tests for the indexed series query engine.
+"""
+import random
+import pytest
+
+from comic_file_organizer.mylar3_scanner import ScanResults, SeriesInfo
+from comic_file_organizer.mylar3_query import SeriesQueryIndex, parse_where
+
+
+def make_results(count=500, seed=3):
+    rng = random.Random(seed)
+    series = []
+    for i in range(count):
+        total = rng.randint(0, 60)
+        owned = rng.randint(0, total + 2)
+        series.append(SeriesInfo(
+            publisher=rng.choice(["Marvel", "DC Comics", "Image"]),
+            series_name=f"Series {i}",
+            series_path=f"/lib/{i}",
+            year=rng.choice([None, 1975, 1988, 2004, 2012, 2019, 2023]),
+            total_issues=total,
+            issues_owned=owned,
+            comicid=i,
+            status=rng.choice(["Continuing", "Ended", None]),
+            file_type_sizes={'CBZ': owned * 10},
+        ))
+    return ScanResults(destination_dir="/lib", series=series)
+
+
+class TestParseWhere:
+    """Tests for filter expression parsing"""
+
+    def test_parses_conditions(self):
+        conditions = parse_where('status=Continuing and completion<50% AND publisher="DC Comics" and year>=2010')
+        assert [(c.field, c.op, c.value) for c in conditions] == [
+            ("status", "=", "continuing"),
+            ("completion", "<", 50.0),
+            ("publisher", "=", "dc comics"),
+            ("year", ">=", 2010.0),
+        ]
+
+    def test_and_inside_quoted_value(self):
+        conditions = parse_where('series="Batman and Robin" and year>=2009')
+        assert [(c.field, c.op, c.value) for c in conditions] == [
+            ("series", "=", "batman and robin"),
+            ("year", ">=", 2009.0),
+        ]
+        assert parse_where("series~'Sand AND Sea'")[0].value == "sand and sea"
+
+    def test_rejects_bad_expressions(self):
+        with pytest.raises(ValueError):
+            parse_where("colour=red")
+        with pytest.raises(ValueError):
+            parse_where("publisher>Marvel")
+        with pytest.raises(ValueError):
+            parse_where("year>=recent")
+        with pytest.raises(ValueError):
+            parse_where("completion")
+
+
+class TestSeriesQueryIndex:
+    """Indexed selection must match a plain scan"""
+
+    @pytest.mark.parametrize("where, predicate", [
+        ("publisher=marvel", lambda s: s.publisher == "Marvel"),
+        ("status=Continuing and completion<50 and publisher=Marvel and year>=2010",
+         lambda s: s.status == "Continuing" and s.completion_percentage < 50
+         and s.publisher == "Marvel" and s.year is not None and s.year >= 2010),
+        ("decade=1980", lambda s: s.year == 1988),
+        ("year<2000 and missing>=10", lambda s: s.year is not None and s.year < 2000 and s.missing_issues >= 10),
+        ("owned=0", lambda s: s.issues_owned == 0),
+        ("status!=ended and series~9", lambda s: s.status != "Ended" and "9" in s.series_name),
+        ("size>200 and total<=30", lambda s: s.total_size_bytes > 200 and s.total_issues <= 30),
+    ])
+    def test_matches_scan(self, where, predicate):
+        results = make_results()
+        expected = [s for s in results.series if predicate(s)]
+        assert expected  # the fixture exercises every query
+        assert SeriesQueryIndex(results).select(where) == expected
+
+    def test_no_match(self):
+        index = SeriesQueryIndex(make_results())
+        assert index.select("publisher=Dark Horse and year>2000") == []
+        assert index.lookup("publisher", "IMAGE") == [s for s in index.series if s.publisher == "Image"]
+
+    def test_group_by(self):
+        results = make_results()
+        index = SeriesQueryIndex(results)
+        groups = index.group_by("decade", index.select("publisher=Image"))
+        image = [s for s in results.series if s.publisher == "Image"]
+        assert sum(c.total_series for c in groups.values()) == len(image)
+        assert groups[2010].total_issues_owned == sum(
+            s.issues_owned for s in image if s.year in (2012, 2019))
+        with pytest.raises(ValueError):
+            index.group_by("colour")
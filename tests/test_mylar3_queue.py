@@ -0,0 +1,163 @@
+"""
+Tests for distributed scans through the SQLite work queue.
+"""
+import os
+import json
+import multiprocessing
+
+import pytest
+
+from comic_file_organizer.mylar3_history import StatsHistory
+from comic_file_organizer.mylar3_queue import MAX_ATTEMPTS, ScanQueue, main, merge_results, run_worker
+from comic_file_organizer.mylar3_scanner import Mylar3Scanner, ScanResults, SeriesInfo
+
+
+def make_collection(root):
+    for publisher, count in (("Marvel", 9), ("DC", 4), ("Image", 1)):
+        for i in range(count):
+            series_dir = root / publisher / f"Series {i}"
+            series_dir.mkdir(parents=True)
+            if publisher == "DC" and i == 2:
+                continue  # no series.json
+            (series_dir / "series.json").write_text(json.dumps({"metadata": {"name": f"{publisher} {i}",
+                                                                             "total_issues": 6}}))
+            for issue in range(i % 3):
+                (series_dir / f"#{issue}.cbz").write_bytes(b"x" * 10)
+    (root / "Empty").mkdir()
+    return str(root)
+
+
+def part(publisher, *names, errors=()):
+    return ScanResults("/lib", [publisher], [SeriesInfo(publisher, n, f"/lib/{n}", None, 1, 1) for n in names],
+                       list(errors))
+
+
+class TestMerge:
+    """ScanResults.merge"""
+
+    def test_associative(self):
+        a, b, c = part("Marvel", "A"), part("Marvel", "B", errors=["oops"]), part("DC", "C")
+        assert a.merge(b).merge(c) == a.merge(b.merge(c))
+        merged = a.merge(b).merge(c)
+        assert merged.publishers == ["Marvel", "DC"]
+        assert [s.series_name for s in merged.series] == ["A", "B", "C"]
+        assert merged.errors == ["oops"]
+
+    def test_merge_results(self):
+        parts = [part("P", str(i)) for i in range(7)]
+        assert [s.series_name for s in merge_results(parts, "/lib").series] == [str(i) for i in range(7)]
+        assert merge_results([], "/lib") == ScanResults("/lib")
+
+    def test_different_collections(self):
+        with pytest.raises(ValueError):
+            part("P").merge(ScanResults("/other"))
+
+
+class TestScanQueue:
+    """Chunks, leases and merged results"""
+
+    def test_worker_processes_match_serial_scan(self, tmp_path):
+        root = make_collection(tmp_path / "lib")
+        db_path = str(tmp_path / "queue.db")
+        with ScanQueue(db_path) as queue:
+            assert queue.enqueue(Mylar3Scanner(root), chunk_size=2) == 8
+
+        context = multiprocessing.get_context('spawn')
+        workers = [context.Process(target=run_worker, args=(db_path,)) for _ in range(3)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(60)
+            assert worker.exitcode == 0
+
+        with ScanQueue(db_path) as queue:
+            assert queue.status() == {'pending': 0, 'claimed': 0, 'done': 8, 'failed': 0}
+            assert queue.results() == Mylar3Scanner(root).scan()
+
+    def test_root_remap(self, tmp_path):
+        root = make_collection(tmp_path / "lib")
+        os.symlink(root, tmp_path / "mounted")
+        db_path = str(tmp_path / "queue.db")
+        with ScanQueue(db_path) as queue:
+            queue.enqueue(Mylar3Scanner(root, series_patterns=["series 0"]))
+        assert run_worker(db_path, root=str(tmp_path / "mounted")) == 3
+
+        with ScanQueue(db_path) as queue:
+            results = queue.results()
+        assert sorted(results.publishers) == ["DC", "Image", "Marvel"]
+        assert all(s.series_path.startswith(root) for s in results.series)
+        assert results == Mylar3Scanner(root, series_patterns=["series 0"]).scan()
+
+    def test_expired_lease_is_reassigned(self, tmp_path):
+        root = make_collection(tmp_path / "lib")
+        with ScanQueue(str(tmp_path / "queue.db")) as queue:
+            queue.enqueue(Mylar3Scanner(root, publishers=["Image"]))
+            first = queue.claim("w1")
+            assert queue.claim("w2") is None
+            second = queue.claim("w2", lease=0)
+            assert second.id == first.id and second.attempts == 2
+            assert not queue.complete(first, "w1", ScanResults(root))
+            assert queue.complete(second, "w2", ScanResults(root, ["Image"]))
+            assert queue.status()['done'] == 1
+
+    def test_failed_chunk(self, tmp_path):
+        root = make_collection(tmp_path / "lib")
+        with ScanQueue(str(tmp_path / "queue.db")) as queue:
+            queue.enqueue(Mylar3Scanner(root, publishers=["Image"]))
+            for attempt in range(MAX_ATTEMPTS):
+                chunk = queue.claim("w1")
+                queue.fail(chunk, "w1", "disk on fire")
+            assert queue.claim("w1") is None
+            assert queue.status()['failed'] == 1
+            assert queue.results().errors == ["Error scanning publisher Image: disk on fire"]
+
+    def test_abandoned_chunk_fails_after_max_attempts(self, tmp_path):
+        root = make_collection(tmp_path / "lib")
+        with ScanQueue(str(tmp_path / "queue.db")) as queue:
+            queue.enqueue(Mylar3Scanner(root, publishers=["Image"]))
+            # Each worker dies without calling complete() or fail()
+            claims = [queue.claim(f"w{attempt}", lease=0) for attempt in range(MAX_ATTEMPTS)]
+            assert [chunk.attempts for chunk in claims] == list(range(1, MAX_ATTEMPTS + 1))
+            assert queue.claim("w9", lease=0) is None
+            assert queue.status()['failed'] == 1
+            assert queue.results().errors == [
+                f"Error scanning publisher Image: lease expired {MAX_ATTEMPTS} times"
+            ]
+
+    def test_enqueue_twice(self, tmp_path):
+        root = make_collection(tmp_path / "lib")
+        with ScanQueue(str(tmp_path / "queue.db")) as queue:
+            queue.enqueue(Mylar3Scanner(root))
+            with pytest.raises(ValueError):
+                queue.enqueue(Mylar3Scanner(root))
+
+    def test_collect_records_only_complete_scans(self, tmp_path, capsys):
+        root = make_collection(tmp_path / "lib")
+        queue_path = str(tmp_path / "queue.db")
+        history_path = str(tmp_path / "history.db")
+        with ScanQueue(queue_path) as queue:
+            queue.enqueue(Mylar3Scanner(root), chunk_size=4)
+            queue.fail(queue.claim("w1"), "w1", "worker lost the mount")  # back to pending
+
+        assert main(['collect', queue_path, '--history', history_path, '--format', 'json']) == 1
+        assert "Not recording history" in capsys.readouterr().err
+        with StatsHistory(history_path) as history:
+            assert history.run_count() == 0
+
+        run_worker(queue_path, worker="w1")
+        assert main(['collect', queue_path, '--history', history_path, '--format', 'json']) == 0
+        with StatsHistory(history_path) as history:
+            assert [p.total_series for p in history.trend('day', destination_dir=root)] == [13]
+
+    def test_collect_records_scope(self, tmp_path):
+        root = make_collection(tmp_path / "lib")
+        queue_path = str(tmp_path / "queue.db")
+        history_path = str(tmp_path / "history.db")
+        with ScanQueue(queue_path) as queue:
+            queue.enqueue(Mylar3Scanner(root, publishers=["DC"]))
+        run_worker(queue_path, worker="w1")
+
+        assert main(['collect', queue_path, '--history', history_path, '--format', 'json']) == 0
+        with StatsHistory(history_path) as history:
+            assert history.trend('day') == []
+            assert [p.total_series for p in history.trend('day', scope='publisher=dc')] == [3]
@@ -0,0 +1,222 @@
+"""
+Tests for the Mylar3 rename/move planner and executor.
+"""
+import os
+import errno
+import json
+import tempfile
+import shutil
+from pathlib import Path
+import pytest
+
+from comic_file_organizer.mylar3_scanner import Mylar3Scanner
+from comic_file_organizer.mylar3_templates import NamingTemplates
+from comic_file_organizer.mylar3_rename import (
+    RenameExecutor,
+    RenameOperation,
+    RenamePlanner,
+    check_conflicts,
+    copy_file_kernel,
+)
+
+
+FOLDER_FORMAT = '$Publisher/$Series ($Year)'
+FILE_FORMAT = '$Series #$Issue ($monthname $Year)'
+DEFAULT_FOLDER_FORMAT = '$Publisher/$Series $Type ($Year)'
+
+
+class TestRenamePlanner:
+    """Tests for planning and conflict checks"""
+
+    @pytest.fixture
+    def temp_collection(self):
+        """Create a temporary collection directory"""
+        tmpdir = tempfile.mkdtemp()
+        yield tmpdir
+        shutil.rmtree(tmpdir)
+
+    def create_series(self, base_dir, publisher, dirname, name, year, files, **metadata):
+        """Helper to create a series directory with series.json and issue files"""
+        series_dir = os.path.join(base_dir, publisher, dirname)
+        os.makedirs(series_dir)
+        with open(os.path.join(series_dir, "series.json"), "w") as f:
+            json.dump({"metadata": {"name": name, "year": year, "total_issues": 10, **metadata}}, f)
+        for filename in files:
+            Path(os.path.join(series_dir, filename)).write_bytes(b"x" * 10)
+        return series_dir
+
+    def plan(self, base_dir, folder_format=FOLDER_FORMAT):
+        results = Mylar3Scanner(base_dir).scan()
+        planner = RenamePlanner(base_dir, NamingTemplates(folder_format, FILE_FORMAT))
+        return planner.plan(results.series)
+
+    def test_already_organized(self, temp_collection):
+        self.create_series(temp_collection, "Marvel", "Spider-Man (2025)", "Spider-Man", 2025,
+                           ["Spider-Man #001 (January 2025).cbz"])
+        plan = self.plan(temp_collection)
+        assert plan.operations == []
+        assert plan.unchanged == 2  # issue + series.json
+
+    def test_plans_folder_and_file_renames(self, temp_collection):
+        self.create_series(temp_collection, "Marvel", "spidey", "Spider-Man", 2025,
+                           ["spidey #1 (2025).CBZ"])
+        plan = self.plan(temp_collection)
+        targets = sorted(os.path.relpath(op.dst, temp_collection) for op in plan.operations)
+        assert targets == [
+            os.path.join("Marvel", "Spider-Man (2025)", "Spider-Man #001 (2025).cbz"),
+            os.path.join("Marvel", "Spider-Man (2025)", "series.json"),
+        ]
+        assert plan.is_clean
+
+    def test_unparseable_issue_keeps_filename(self, temp_collection):
+        self.create_series(temp_collection, "Marvel", "spidey", "Spider-Man", 2025, ["scan.cbz"])
+        plan = self.plan(temp_collection)
+        assert any(op.dst.endswith(os.path.join("Spider-Man (2025)", "scan.cbz")) for op in plan.operations)
+
+    def test_type_recovered_from_folder_name(self, temp_collection):
+        self.create_series(temp_collection, "Marvel", "Spider-Man (2025)", "Spider-Man", 2025,
+                           ["Spider-Man #001 (January 2025).cbz"])
+        self.create_series(temp_collection, "Marvel", "Spider-Man TPB (2025)", "Spider-Man", 2025,
+                           ["Spider-Man #001 (January 2025).cbz"])
+        plan = self.plan(temp_collection, DEFAULT_FOLDER_FORMAT)
+        assert plan.operations == []
+        assert plan.is_clean
+        assert plan.unchanged == 4
+
+    def test_type_and_volume_from_series_json(self, temp_collection):
+        self.create_series(temp_collection, "Marvel", "Spider-Man (2025)", "Spider-Man", 2025,
+                           ["Spider-Man #001 (January 2025).cbz"], booktype="Print")
+        self.create_series(temp_collection, "Marvel", "spidey tpb", "Spider-Man", 2025,
+                           ["spidey #1 (2025).cbz"], booktype="TPB", volume="v2")
+        plan = self.plan(temp_collection, '$Publisher/$Series $VolumeN $Type ($Year)')
+        targets = sorted(os.path.relpath(op.dst, temp_collection) for op in plan.operations)
+        assert targets == [
+            os.path.join("Marvel", "Spider-Man v2 TPB (2025)", "Spider-Man #001 (2025).cbz"),
+            os.path.join("Marvel", "Spider-Man v2 TPB (2025)", "series.json"),
+        ]
+        assert plan.is_clean
+
+    def test_duplicate_targets_conflict(self, temp_collection):
+        self.create_series(temp_collection, "Marvel", "spidey", "Spider-Man", 2025,
+                           ["spidey #1.cbz", "spidey #001.cbz"])
+        plan = self.plan(temp_collection)
+        reasons = [c.reason for c in plan.conflicts]
+        assert len(reasons) == 2
+        assert all("same target" in r for r in reasons)
+
+    def test_existing_target_conflict(self, temp_collection):
+        a = os.path.join(temp_collection, "a.cbz")
+        b = os.path.join(temp_collection, "b.cbz")
+        Path(a).touch()
+        Path(b).touch()
+        ordered, conflicts = check_conflicts([RenameOperation(a, b)])
+        assert ordered == []
+        assert conflicts[0].reason == "target already exists"
+
+    def test_chain_is_ordered_and_cycle_rejected(self, temp_collection):
+        a, b, c = (os.path.join(temp_collection, n) for n in ("a.cbz", "b.cbz", "c.cbz"))
+        Path(a).touch()
+        Path(b).touch()
+        ordered, conflicts = check_conflicts([RenameOperation(a, b), RenameOperation(b, c)])
+        assert [(op.src, op.dst) for op in ordered] == [(b, c), (a, b)]
+        assert conflicts == []
+
+        ordered, conflicts = check_conflicts([RenameOperation(a, b), RenameOperation(b, a)])
+        assert ordered == []
+        assert {c.reason for c in conflicts} == {"circular rename"}
+
+
+class TestRenameExecutor:
+    """Tests for executing plans"""
+
+    @pytest.fixture
+    def temp_collection(self):
+        tmpdir = tempfile.mkdtemp()
+        yield tmpdir
+        shutil.rmtree(tmpdir)
+
+    def make_plan(self, base_dir):
+        series_dir = os.path.join(base_dir, "Marvel", "spidey")
+        os.makedirs(series_dir)
+        with open(os.path.join(series_dir, "series.json"), "w") as f:
+            json.dump({"metadata": {"name": "Spider-Man", "year": 2025, "total_issues": 3}}, f)
+        for i in range(1, 4):
+            Path(os.path.join(series_dir, f"spidey #{i}.cbz")).write_bytes(b"data" * i)
+        results = Mylar3Scanner(base_dir).scan()
+        planner = RenamePlanner(base_dir, NamingTemplates(FOLDER_FORMAT, FILE_FORMAT))
+        return planner.plan(results.series), series_dir
+
+    def test_execute_same_device(self, temp_collection):
+        plan, old_dir = self.make_plan(temp_collection)
+        result = RenameExecutor(fsync_batch=2).execute(plan)
+
+        new_dir = os.path.join(temp_collection, "Marvel", "Spider-Man (2025)")
+        assert result.renamed == 4
+        assert result.copied == 0
+        assert result.errors == []
+        assert sorted(os.listdir(new_dir)) == [
+            "Spider-Man #001.cbz", "Spider-Man #002.cbz", "Spider-Man #003.cbz", "series.json"
+        ]
+        assert not os.path.exists(old_dir)
+
+    def test_execute_cross_device_copies(self, temp_collection, monkeypatch):
+        plan, old_dir = self.make_plan(temp_collection)
+        executor = RenameExecutor(fsync_batch=2)
+        # Pretend target directories live on another device
+        monkeypatch.setattr(executor, "_device", lambda d: 1 if d == old_dir else 2)
+        result = executor.execute(plan)
+
+        new_dir = os.path.join(temp_collection, "Marvel", "Spider-Man (2025)")
+        assert result.copied == 4
+        assert result.errors == []
+        assert Path(new_dir, "Spider-Man #003.cbz").read_bytes() == b"data" * 3
+        assert not any(name.endswith(".partial") for name in os.listdir(new_dir))
+        assert not os.path.exists(old_dir)
+
+    def test_failed_copy_placement_keeps_source(self, temp_collection, monkeypatch):
+        plan, old_dir = self.make_plan(temp_collection)
+        executor = RenameExecutor(fsync_batch=2)
+        monkeypatch.setattr(executor, "_device", lambda d: 1 if d == old_dir else 2)
+        real_rename = os.rename
+
+        def flaky_rename(src, dst):
+            if dst.endswith("Spider-Man #002.cbz"):
+                raise OSError(errno.EIO, "I/O error")
+            real_rename(src, dst)
+
+        monkeypatch.setattr(os, "rename", flaky_rename)
+        result = executor.execute(plan)
+
+        new_dir = os.path.join(temp_collection, "Marvel", "Spider-Man (2025)")
+        assert result.copied == 3
+        assert len(result.errors) == 1 and "I/O error" in result.errors[0]
+        assert Path(old_dir, "spidey #2.cbz").read_bytes() == b"data" * 2
+        assert sorted(os.listdir(new_dir)) == ["Spider-Man #001.cbz", "Spider-Man #003.cbz", "series.json"]
+        assert executor._pending_copies == [] and executor._pending_sources == set()
+
+    def test_refuses_plan_with_conflicts(self, temp_collection):
+        plan, _ = self.make_plan(temp_collection)
+        plan.conflicts.append(object())
+        with pytest.raises(ValueError):
+            RenameExecutor().execute(plan)
+
+    def test_copy_file_kernel(self, temp_collection):
+        src = os.path.join(temp_collection, "src.cbz")
+        dst = os.path.join(temp_collection, "dst.cbz")
+        Path(src).write_bytes(os.urandom(300000))
+        assert copy_file_kernel(src, dst) == 300000
+        assert Path(src).read_bytes() == Path(dst).read_bytes()
+
+    def test_copy_file_kernel_fails_without_primitives(self, temp_collection, monkeypatch):
+        src = os.path.join(temp_collection, "src.cbz")
+        dst = os.path.join(temp_collection, "dst.cbz")
+        Path(src).write_bytes(b"x" * 1000)
+
+        def unsupported(*args):
+            raise OSError(errno.EXDEV, "not supported")
+
+        monkeypatch.setattr(os, 'copy_file_range', unsupported, raising=False)
+        monkeypatch.setattr(os, 'sendfile', unsupported, raising=False)
+        with pytest.raises(OSError, match="No kernel copy primitive"):
+            copy_file_kernel(src, dst)
+        assert Path(src).read_bytes() == b"x" * 1000
@@ -0,0 +1,122 @@
+"""
+Tests for the statistics HTTP server and its double-buffered refresh.
+"""
+import json
+import threading
+import urllib.error
+import urllib.request
+import pytest
+
+from comic_file_organizer.mylar3_scanner import ScanResults, SeriesInfo
+from comic_file_organizer.mylar3_server import StatsService, make_server
+
+
+def make_results(extra=0):
+    series = [
+        SeriesInfo("Marvel", "Spider-Man", "/lib/Marvel/Spider-Man", 1963, 10, 4, status="Ended",
+                   file_type_counts={'.CBZ': 4}, file_type_sizes={'.CBZ': 400}),
+        SeriesInfo("Image", "Saga", "/lib/Image/Saga", 2012, 60, 30, status="Continuing",
+                   file_type_counts={'.CBZ': 30}, file_type_sizes={'.CBZ': 3000}),
+    ]
+    series += [SeriesInfo("Image", f"New {i}", f"/lib/Image/New {i}", 2024, 5, 1) for i in range(extra)]
+    return ScanResults(destination_dir="/lib", publishers=["Marvel", "Image"], series=series)
+
+
+class FakeScanner:
+    """Returns queued scan results, counting scans"""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.scans = 0
+
+    def scan(self):
+        self.scans += 1
+        return self.results[min(self.scans, len(self.results)) - 1]
+
+
+class TestStatsService:
+    """Snapshots are swapped whole and only rebuilt on change"""
+
+    def test_swaps_snapshot(self):
+        scanner = FakeScanner(make_results(), make_results(extra=2))
+        service = StatsService(scanner.scan)
+        first = service.snapshot()
+        assert first.stats.total_series == 2
+
+        second = service.refresh()
+        assert service.snapshot() is second
+        assert second.generation == 2
+        assert second.stats.total_series == 4
+        # Readers holding the old snapshot still see a consistent view
+        assert first.stats.total_series == 2
+        assert len(first.index.lookup('publisher', 'image')) == 1
+
+    def test_unchanged_scan_keeps_statistics(self):
+        scanner = FakeScanner(make_results(), make_results())
+        service = StatsService(scanner.scan)
+        first = service.snapshot()
+        second = service.refresh()
+        assert scanner.scans == 2
+        assert second.generation == 1
+        assert second.stats is first.stats
+
+    def test_background_refresh(self):
+        scanner = FakeScanner(make_results(), make_results(extra=1))
+        service = StatsService(scanner.scan, refresh_interval=0.01)
+        service.refresh()
+        service.start()
+        try:
+            for _ in range(200):
+                if service.snapshot().generation > 1:
+                    break
+                threading.Event().wait(0.01)
+        finally:
+            service.stop()
+        assert service.snapshot().stats.total_series == 3
+
+
+class TestStatsServer:
+    """JSON endpoints"""
+
+    @pytest.fixture
+    def base_url(self):
+        service = StatsService(FakeScanner(make_results()).scan)
+        server = make_server(service, port=0)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+        server.shutdown()
+        server.server_close()
+
+    def get(self, url):
+        with urllib.request.urlopen(url) as response:
+            return json.loads(response.read())
+
+    def test_summary_and_publishers(self, base_url):
+        summary = self.get(f"{base_url}/summary")
+        assert summary['total_series'] == 2
+        assert summary['total_issues_owned'] == 34
+        assert [p['publisher'] for p in self.get(f"{base_url}/publishers")] == ["Image", "Marvel"]
+        assert self.get(f"{base_url}/status")['generation'] == 1
+
+    def test_series_query(self, base_url):
+        rows = self.get(f"{base_url}/series?where=completion%3C=50%20and%20status=Continuing")
+        assert [r['series'] for r in rows] == ["Saga"]
+        assert len(self.get(f"{base_url}/series?limit=1")) == 1
+
+    def test_publisher_detail(self, base_url):
+        detail = self.get(f"{base_url}/publishers/marvel")
+        assert detail['publisher_totals'] == [
+            {'publisher': 'Marvel', 'file_type': '.CBZ', 'count': 4, 'size_bytes': 400}
+        ]
+
+    @pytest.mark.parametrize("path, status", [
+        ("/publishers/Dark%20Horse", 404),
+        ("/series?where=colour=red", 400),
+        ("/nope", 404),
+    ])
+    def test_errors(self, base_url, path, status):
+        with pytest.raises(urllib.error.HTTPError) as excinfo:
+            self.get(base_url + path)
+        assert excinfo.value.code == status
+        assert 'error' in json.loads(excinfo.value.read())
@@ -7,11 +7,13 @@ import os
 import json
 import tempfile
 import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import pytest
 
-from comic_file_organizer.mylar3_scanner import Mylar3Scanner, SeriesInfo
-from comic_file_organizer.mylar3_stats import calculate_statistics
+from comic_file_organizer.mylar3_scanner import Mylar3Scanner, ScanResults, SeriesInfo
+from comic_file_organizer.mylar3_stats import RankedIndex, StatsAccumulator, calculate_statistics, scan_delta
 
 
 class TestMylar3Scanner:
@@ -202,6 +204,65 @@ class TestMylar3Scanner:
         
         assert results.total_issues_owned == 2
 
+    def test_publisher_scoped_scan(self, temp_collection, monkeypatch):
+        """Only the requested publisher directories are walked (case-insensitive)"""
+        for name in ("Marvel", "DC Comics", "Image"):
+            pub_dir = self.create_publisher(temp_collection, name)
+            self.create_series(pub_dir, f"{name} Series", 2020, 5)
+
+        walked = []
+        real_listdir = os.listdir
+        monkeypatch.setattr(os, "listdir", lambda path: walked.append(path) or real_listdir(path))
+
+        scanner = Mylar3Scanner(temp_collection, publishers=["marvel", "IMAGE", "Dark Horse"])
+        results = scanner.scan()
+
+        assert sorted(results.publishers) == ["Image", "Marvel"]
+        assert sorted(s.publisher for s in results.series) == ["Image", "Marvel"]
+        assert not any("DC Comics" in path for path in walked)
+        assert sorted(scanner.publisher_directories()) == ["DC Comics", "Image", "Marvel"]
+
+    def test_series_glob_scan(self, temp_collection):
+        """Series globs match directory names case-insensitively"""
+        marvel_dir = self.create_publisher(temp_collection, "Marvel")
+        self.create_series(marvel_dir, "Spider-Man", 1963, 10)
+        self.create_series(marvel_dir, "Spider-Woman", 1978, 10)
+        self.create_series(marvel_dir, "X-Men", 1991, 10)
+        dc_dir = self.create_publisher(temp_collection, "DC Comics")
+        self.create_series(dc_dir, "Batman", 1940, 10)
+
+        results = Mylar3Scanner(temp_collection, series_patterns=["spider-*", "x-men (1991)"]).scan()
+
+        assert sorted(s.series_name for s in results.series) == ["Spider-Man", "Spider-Woman", "X-Men"]
+        assert results.publishers == ["Marvel"]
+
+    def test_field_projection(self, temp_collection, monkeypatch):
+        """Only the I/O behind the requested fields is done"""
+        marvel_dir = self.create_publisher(temp_collection, "Marvel")
+        series_dir = self.create_series(marvel_dir, "Thor", 1966, 5, status="Continuing")
+        Path(os.path.join(series_dir, "Thor 001.cbz")).write_bytes(b"x" * 100)
+        Path(os.path.join(series_dir, "Thor 002.cbr")).write_bytes(b"x" * 50)
+
+        counts = Mylar3Scanner(temp_collection, fields=["total_issues", "issues_owned"]).scan().series[0]
+        assert (counts.total_issues, counts.issues_owned, counts.status) == (5, 2, "Continuing")
+        assert counts.file_type_counts == {'.CBZ': 1, '.CBR': 1}
+        assert counts.file_type_sizes == {}
+
+        scandirs = []
+        real_scandir = os.scandir
+        monkeypatch.setattr(os, "scandir", lambda path: scandirs.append(path) or real_scandir(path))
+        bare = Mylar3Scanner(temp_collection, fields=()).scan().series[0]
+        assert (bare.series_name, bare.total_issues, bare.issues_owned) == ("Thor (1966)", 0, 0)
+        assert scandirs == []
+
+        full = Mylar3Scanner(temp_collection).scan().series[0]
+        assert full.file_type_sizes == {'.CBZ': 100, '.CBR': 50}
+        assert full.series_name == "Thor"
+
+    def test_unknown_projection_field(self, temp_collection):
+        with pytest.raises(ValueError):
+            Mylar3Scanner(temp_collection, fields=["issues_owned", "colour"])
+
 
 class TestMylar3Statistics:
     """Tests for statistical calculations"""
@@ -346,5 +407,161 @@ class TestMylar3Statistics:
         assert abs(near_complete[0].completion_percentage - 75.0) < 0.1
 
 
+class TestStatsAccumulator:
+    """Tests for the single-pass accumulator"""
+    
+    def make_series(self, publisher, owned, total):
+        return SeriesInfo(publisher=publisher, series_name=f"{publisher} {owned}/{total}",
+                          series_path="/x", year=2020, total_issues=total, issues_owned=owned)
+    
+    def sample(self):
+        return [
+            self.make_series("Marvel", 5, 5),
+            self.make_series("Marvel", 3, 10),
+            self.make_series("Marvel", 0, 20),
+            self.make_series("DC Comics", 6, 8),
+            self.make_series("DC Comics", 4, 0),  # more owned than Mylar3 knows about
+        ]
+    
+    def test_matches_per_series_properties(self):
+        series = self.sample()
+        stats = calculate_statistics(ScanResults(destination_dir="/x", series=series))
+        
+        assert stats.total_series == 5
+        assert stats.series_with_issues == 4
+        assert stats.series_followed_only == 1
+        assert stats.complete_series == sum(1 for s in series if s.is_complete)
+        assert stats.total_missing_issues == sum(s.missing_issues for s in series)
+        assert stats.average_issues_per_series == 18 / 4
+        assert abs(stats.overall_completion_percentage - 18 / 43 * 100) < 1e-9
+        assert abs(stats.publishers["Marvel"].average_completion - (100 + 30) / 2) < 1e-9
+        assert abs(stats.publishers["DC Comics"].average_completion - 75 / 2) < 1e-9
+    
+    def test_merge_equals_single_pass(self):
+        series = self.sample()
+        whole = StatsAccumulator().add_all(series)
+        merged = StatsAccumulator().add_all(series[:2]).merge(StatsAccumulator().add_all(series[2:]))
+        
+        assert merged.totals == whole.totals
+        assert merged.publishers == whole.publishers
+
+
+class TestApplyDelta:
+    """Incremental updates must match a full recompute"""
+    
+    def make_series(self, path, publisher, owned, total):
+        return SeriesInfo(publisher=publisher, series_name=path, series_path=f"/lib/{publisher}/{path}",
+                          year=2020, total_issues=total, issues_owned=owned)
+    
+    def assert_matches_recompute(self, stats):
+        fresh = calculate_statistics(ScanResults(destination_dir="/lib", series=list(stats.scan_results.series)))
+        assert stats.publishers.keys() == fresh.publishers.keys()
+        for name, publisher in fresh.publishers.items():
+            updated = stats.publishers[name]
+            assert updated == publisher
+            assert updated.average_completion == pytest.approx(publisher.average_completion)
+        for attr in ("total_series", "series_with_issues", "series_followed_only", "complete_series",
+                     "total_issues_owned", "total_missing_issues"):
+            assert getattr(stats, attr) == getattr(fresh, attr), attr
+        assert stats.overall_completion_percentage == pytest.approx(fresh.overall_completion_percentage)
+        assert stats.average_issues_per_series == pytest.approx(fresh.average_issues_per_series)
+        assert stats.get_most_incomplete_series(3) == fresh.get_most_incomplete_series(3)
+    
+    def test_add_remove_change(self):
+        series = [self.make_series(f"s{i}", "Marvel" if i % 2 else "DC", i % 5, 6) for i in range(10)]
+        stats = calculate_statistics(ScanResults(destination_dir="/lib", series=list(series)))
+        stats.get_most_incomplete_series(3)  # build an index the delta must invalidate
+        
+        stats.apply_delta(
+            added=[self.make_series("new", "Image", 2, 12)],
+            removed=[series[0], series[3]],
+            changed=[self.make_series("s4", "DC", 6, 6), self.make_series("s5", "Marvel", 0, 6)],
+        )
+        
+        assert stats.total_series == 9
+        assert "Image" in stats.publishers
+        self.assert_matches_recompute(stats)
+    
+    def test_publisher_disappears(self):
+        only = self.make_series("solo", "Dark Horse", 1, 3)
+        stats = calculate_statistics(ScanResults(destination_dir="/lib", series=[only]))
+        stats.apply_delta(removed=[only])
+        assert stats.publishers == {}
+        assert stats.total_series == 0
+        self.assert_matches_recompute(stats)
+    
+    def test_scan_delta(self):
+        old = ScanResults(destination_dir="/lib", series=[
+            self.make_series("a", "DC", 1, 3), self.make_series("b", "DC", 2, 3)])
+        new = ScanResults(destination_dir="/lib", series=[
+            self.make_series("b", "DC", 3, 3), self.make_series("c", "DC", 0, 3)])
+        added, removed, changed = scan_delta(old, new)
+        assert [s.series_name for s in added] == ["c"]
+        assert [s.series_name for s in removed] == ["a"]
+        assert [s.issues_owned for s in changed] == [3]
+        
+        stats = calculate_statistics(old)
+        stats.apply_delta(added, removed, changed)
+        self.assert_matches_recompute(stats)
+
+
+class TestRankedIndex:
+    """Tests for heap-selected top-N queries"""
+    
+    def make_collection(self, count=200):
+        series = [
+            SeriesInfo(publisher=f"P{i % 7}", series_name=f"S{(i * 37) % count}", series_path="/x",
+                       year=2000, total_issues=(i * 13) % 50 + 1, issues_owned=(i * 7) % 40)
+            for i in range(count)
+        ]
+        return ScanResults(destination_dir="/x", series=series)
+    
+    def test_matches_full_sort(self):
+        results = self.make_collection()
+        stats = calculate_statistics(results)
+        with_issues = [s for s in results.series if s.issues_owned > 0]
+        
+        assert stats.get_most_incomplete_series(10) == sorted(
+            with_issues, key=lambda s: s.missing_issues, reverse=True)[:10]
+        assert stats.get_recently_started_series(10) == sorted(with_issues, key=lambda s: s.issues_owned)[:10]
+        assert stats.get_most_complete_series(10) == sorted(
+            [s for s in with_issues if not s.is_complete], key=lambda s: s.completion_percentage, reverse=True)[:10]
+        assert stats.get_series_by_name(20) == sorted(results.series, key=lambda s: (s.publisher, s.series_name))[:20]
+    
+    def test_index_shared_and_extended(self):
+        stats = calculate_statistics(self.make_collection())
+        first = stats.get_most_incomplete_series(10)
+        index = stats.ranked('most_incomplete')
+        assert stats.get_most_incomplete_series(5) == first[:5]
+        assert stats.ranked('most_incomplete') is index
+        
+        everything = stats.get_most_incomplete_series(1000)
+        assert everything[:10] == first
+        assert len(everything) == len(index)
+    
+    def test_concurrent_top(self):
+        candidates = list(range(5000, 0, -1))
+        expected = sorted(candidates)
+        for _ in range(20):
+            index = RankedIndex(candidates, key=lambda x: x)
+            limits = [None, 10, 2000, 5, None, 100, 3000, 1] * 2
+            barrier = threading.Barrier(len(limits))
+
+            def top(limit):
+                barrier.wait()
+                return index.top(limit)
+
+            with ThreadPoolExecutor(len(limits)) as pool:
+                results = list(pool.map(top, limits))
+            for limit, result in zip(limits, results):
+                assert result == expected[:limit]
+            assert index.top() == expected
+
+    def test_full_ranking(self):
+        index = RankedIndex([3, 1, 2], key=lambda x: x)
+        assert index.top() == [1, 2, 3]
+        assert index.top(2) == [1, 2]
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,103 @@
+"""
+Tests for the Mylar3 naming template engine.
+"""
+import pytest
+
+from comic_file_organizer.mylar3_templates import (
+    NamingTemplates,
+    compile_template,
+    tidy_path,
+)
+
+
+FOLDER_FORMAT = '$Publisher/$Series $Type ($Year)'
+FILE_FORMAT = '$Series $VolumeN $Annual #$Issue ($monthname $Year)'
+
+
+class TestTemplateRendering:
+    """Tests for rendering fields into paths"""
+
+    @pytest.fixture
+    def templates(self):
+        return NamingTemplates(FOLDER_FORMAT, FILE_FORMAT)
+
+    def test_render_folder(self, templates):
+        folder = templates.render_folder({'publisher': 'Marvel', 'series': 'Spider-Man', 'year': 2025})
+        assert folder == 'Marvel/Spider-Man (2025)'
+
+    def test_render_folder_with_type(self, templates):
+        folder = templates.render_folder({'publisher': 'DC Comics', 'series': 'Batman', 'year': 1987, 'booktype': 'TPB'})
+        assert folder == 'DC Comics/Batman TPB (1987)'
+
+    def test_print_type_renders_empty(self, templates):
+        folder = templates.render_folder({'publisher': 'DC Comics', 'series': 'Batman', 'year': 1987, 'booktype': 'Print'})
+        assert folder == 'DC Comics/Batman (1987)'
+
+    def test_render_file_matches_scanner_fixture_naming(self, templates):
+        filename = templates.render_file({'series': 'Spider-Man', 'issue': 1, 'month': 1, 'year': 2025}, '.cbz')
+        assert filename == 'Spider-Man #001 (January 2025).cbz'
+
+    def test_empty_tokens_are_tidied(self, templates):
+        filename = templates.render_file({'series': 'Saga', 'issue': '12'})
+        assert filename == 'Saga #012'
+
+    def test_volume_and_annual(self, templates):
+        filename = templates.render_file(
+            {'series': 'Batman', 'volume': 2, 'annual': True, 'issue': '1.5', 'month': 6, 'year': 2020}
+        )
+        assert filename == 'Batman v2 Annual #001.5 (June 2020)'
+
+    def test_unsafe_characters_replaced(self, templates):
+        folder = templates.render_folder({'publisher': 'DC', 'series': 'Batman: Year One?', 'year': 1987})
+        assert folder == 'DC/Batman - Year One (1987)'
+
+    def test_compile_is_shared(self):
+        assert compile_template(FOLDER_FORMAT) is compile_template(FOLDER_FORMAT)
+
+    def test_render_is_memoized(self, templates):
+        fields = {'publisher': 'Marvel', 'series': 'X-Men', 'year': 1991}
+        templates.render_folder(fields)
+        before = templates.folder._render_cached.cache_info().hits
+        templates.render_folder(dict(fields, issue=5))  # unused fields don't affect the key
+        assert templates.folder._render_cached.cache_info().hits == before + 1
+
+    def test_tidy_path(self):
+        assert tidy_path('Marvel/Spider-Man  ( 2025)') == 'Marvel/Spider-Man (2025)'
+        assert tidy_path('Marvel/Spider-Man ()') == 'Marvel/Spider-Man'
+
+
+class TestTemplateMatching:
+    """Tests for parsing paths back into fields"""
+
+    @pytest.fixture
+    def templates(self):
+        return NamingTemplates(FOLDER_FORMAT, FILE_FORMAT)
+
+    def test_match_folder(self, templates):
+        fields = templates.match_folder('Marvel/Spider-Man 2099 (1992)')
+        assert fields == {'publisher': 'Marvel', 'series': 'Spider-Man 2099', 'year': 1992}
+
+    def test_match_folder_with_type(self, templates):
+        fields = templates.match_folder('DC Comics/Batman TPB (1987)')
+        assert fields['series'] == 'Batman'
+        assert fields['booktype'] == 'TPB'
+
+    def test_match_file(self, templates):
+        fields = templates.match_file('Spider-Man #001 (January 2025).cbz')
+        assert fields == {'series': 'Spider-Man', 'issue': '001', 'month': 1, 'year': 2025}
+
+    def test_match_file_without_optional_tokens(self, templates):
+        fields = templates.match_file('Saga #012 (2014).cbr')
+        assert fields == {'series': 'Saga', 'issue': '012', 'year': 2014}
+
+    def test_non_matching_path(self, templates):
+        assert templates.match_file('random scan 01.cbz') is None
+        assert templates.match_folder('just-a-folder') is None
+
+    @pytest.mark.parametrize('fields', [
+        {'series': 'Batman', 'volume': 3, 'issue': '050', 'month': 12, 'year': 2018},
+        {'series': 'X-Men', 'annual': True, 'issue': '001', 'year': 1992},
+        {'series': 'Saga', 'issue': '054', 'month': 3, 'year': 2018},
+    ])
+    def test_round_trip(self, templates, fields):
+        assert templates.match_file(templates.render_file(fields, '.cbz')) == fields
@@ -0,0 +1,140 @@
+"""
+Tests for --profile: cProfile and sampled profiles with phases.
+"""
+import io
+import json
+import pstats
+import time
+
+import pytest
+
+from comic_file_organizer import mylar3_cli
+from comic_file_organizer.profiling import Profiler, frame_label, phase_key, profile_phase, write_profile
+
+
+def busy(seconds):
+    """Spin in Python code so the sampler has frames to see"""
+    end = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < end:
+        total += sum(range(100))
+    return total
+
+
+def phases_of(collapsed_path):
+    with open(collapsed_path, encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    for line in lines:
+        stack, _, count = line.rpartition(' ')
+        assert stack and int(count) > 0
+    return {line.split(';', 1)[0] for line in lines}, lines
+
+
+class TestProfiler:
+    """Profiler modes, phases and output files"""
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            Profiler('perf')
+        with pytest.raises(ValueError):
+            Profiler('sample', interval=0)
+
+    def test_cprofile_phases(self, tmp_path):
+        profiler = Profiler('cprofile')
+        profiler.start()
+        with profiler.phase('scan'):
+            busy(0.01)
+        with profiler.phase('render'):
+            with profiler.phase('stats'):
+                sorted(range(1000), key=lambda x: -x)
+            assert profiler.current_phase == 'render'
+        profiler.stop()
+
+        pstats_path, collapsed_path = profiler.write(str(tmp_path / "run"))
+        functions = {name for _, _, name in pstats.Stats(pstats_path).stats}
+        assert 'busy' in functions
+
+        phases, lines = phases_of(collapsed_path)
+        assert {'scan', 'stats', 'render'} <= phases
+        assert any(line.startswith('scan;') and 'busy (test_profiling.py:' in line for line in lines)
+        assert set(profiler.phase_times) >= {'other', 'scan', 'stats', 'render'}
+
+    def test_sampled_stacks(self, tmp_path):
+        profiler = Profiler('sample', interval=0.001)
+        profiler.start()
+        with profiler.phase('scan'):
+            busy(0.2)
+        profiler.stop()
+        assert profiler.samples
+
+        pstats_path, collapsed_path = profiler.write(str(tmp_path / "run"))
+        stats = pstats.Stats(pstats_path).stats
+        assert phase_key('scan') in stats
+        busy_key = next(key for key in stats if key[2] == 'busy')
+        calls, _, own, cumulative, callers = stats[busy_key]
+        assert calls > 0 and cumulative >= own
+        assert any(caller[2] == 'test_sampled_stacks' for caller in callers)
+
+        phases, lines = phases_of(collapsed_path)
+        assert 'scan' in phases
+        assert any('busy (test_profiling.py:' in line for line in lines)
+
+    def test_phases_before_start(self):
+        profiler = Profiler('cprofile')
+        with profiler.phase('scan'):
+            assert profiler.current_phase == 'scan'
+        assert profiler.current_phase == 'other'
+        assert profiler.phase_times == {}
+
+    def test_frame_label(self):
+        assert frame_label(('/src/scanner.py', 12, 'scan')) == 'scan (scanner.py:12)'
+        assert frame_label(('~', 0, "<built-in method posix.scandir>")) == '<built-in method posix.scandir>'
+        assert ';' not in frame_label(('/src/a;b.py', 1, 'f'))
+
+    def test_profile_phase_without_profiler(self):
+        with profile_phase(None, 'scan'):
+            pass
+
+    def test_write_failure_reported(self, tmp_path):
+        profiler = Profiler('cprofile')
+        profiler.start()
+        profiler.stop()
+        stream = io.StringIO()
+        assert not write_profile(profiler, str(tmp_path / "missing" / "run"), stream)
+        assert "Cannot write profile" in stream.getvalue()
+
+
+class TestProfileOption:
+    """mylar3_cli --profile writes both files and keeps the report intact"""
+
+    def make_collection(self, tmp_path):
+        series_dir = tmp_path / "lib" / "Marvel" / "Thor"
+        series_dir.mkdir(parents=True)
+        (series_dir / "series.json").write_text(json.dumps({"metadata": {"name": "Thor", "total_issues": 2}}))
+        (series_dir / "Thor 001.cbz").write_bytes(b"x" * 100)
+        config = tmp_path / "config.ini"
+        config.write_text(f"[General]\ndestination_dir = {tmp_path / 'lib'}\n")
+        return str(config)
+
+    def test_profile_run(self, tmp_path, capsys):
+        config = self.make_collection(tmp_path)
+        assert mylar3_cli.main([config]) == 0
+        plain = capsys.readouterr().out
+
+        prefix = str(tmp_path / "profile")
+        assert mylar3_cli.main([config, '--profile', prefix]) == 0
+        captured = capsys.readouterr()
+        assert captured.out == plain
+        assert "Profile written to" in captured.err
+
+        phases, _ = phases_of(prefix + ".collapsed")
+        assert {'scan', 'stats', 'render'} <= phases
+        assert pstats.Stats(prefix + ".pstats").total_calls > 0
+
+    def test_sample_mode(self, tmp_path, capsys):
+        config = self.make_collection(tmp_path)
+        prefix = str(tmp_path / "profile")
+        assert mylar3_cli.main([config, '--profile', prefix, '--profile-mode', 'sample']) == 0
+        assert "Profile (sample)" in capsys.readouterr().err
+        assert (tmp_path / "profile.pstats").exists()
+        assert (tmp_path / "profile.collapsed").exists()
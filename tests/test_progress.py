@@ -0,0 +1,146 @@
+"""
+Tests for scan progress reporting.
+"""
+import io
+import json
+import logging
+import threading
+import time
+
+from comic_file_organizer.mylar3_scanner import Mylar3Scanner
+from comic_file_organizer.progress import ProgressReporter, format_duration
+from comic_file_organizer.scan_scheduler import DEVICE_KINDS, DeviceScheduler
+
+
+class RecordingProgress:
+    """Duck-typed reporter that records calls"""
+
+    def __init__(self):
+        self.calls = []
+
+    def start(self, total=None, unit='items'):
+        self.calls.append(('start', total, unit))
+
+    def update(self, units=0, files=0, size_bytes=0):
+        self.calls.append(('update', units, files, size_bytes))
+
+    def finish(self):
+        self.calls.append(('finish',))
+
+
+class TestProgressReporter:
+    """Rendering and rate limiting"""
+
+    def test_format_duration(self):
+        assert format_duration(42) == "42s"
+        assert format_duration(185) == "3m05s"
+        assert format_duration(4320) == "1h12m"
+
+    def test_terminal_output(self):
+        stream = io.StringIO()
+        reporter = ProgressReporter(stream, interval=0, tty=True)
+        reporter.start(total=4, unit='series')
+        reporter.update(1, files=10, size_bytes=10 * 1024 * 1024)
+        reporter.update(1, files=10, size_bytes=10 * 1024 * 1024)
+        reporter.finish()
+
+        lines = stream.getvalue().split('\r')[1:]
+        assert len(lines) == 3
+        assert lines[0].startswith("Scanning: 1/4 series (25.0%) | ")
+        assert "files/s" in lines[0] and "MB/s" in lines[0] and "ETA " in lines[0]
+        assert lines[-1].startswith("Scanning: 2/4 series (50.0%)")
+        assert "done in" in lines[-1] and lines[-1].endswith("\n")
+
+    def test_rate_limited(self):
+        stream = io.StringIO()
+        reporter = ProgressReporter(stream, interval=3600, tty=True)
+        reporter.start(total=1000)
+        for _ in range(1000):
+            reporter.update(1, files=1)
+        assert stream.getvalue() == ""
+        assert reporter.units == 1000 and reporter.files == 1000
+
+    def test_log_output(self, caplog):
+        reporter = ProgressReporter(io.StringIO(), interval=0, tty=False)
+        with caplog.at_level(logging.INFO, logger='comic_file_organizer.progress'):
+            reporter.start(total=2, unit='series')
+            reporter.update(1, files=3, size_bytes=300)
+            reporter.finish()
+        messages = [r.getMessage() for r in caplog.records]
+        assert messages[0].startswith("progress unit=series done=1 total=2 files=3 bytes=300 ")
+        assert "series_per_s=" in messages[0] and "eta_s=" in messages[0]
+        assert messages[-1].startswith("progress done ")
+
+    def test_eta(self):
+        reporter = ProgressReporter(io.StringIO(), tty=False)
+        reporter.start(total=10)
+        assert reporter.eta() is None
+        reporter.units = 5
+        assert reporter.eta(reporter._start + 20) == 20
+
+
+class TestScannerProgress:
+    """Mylar3Scanner estimates series up front and reports each one"""
+
+    def make_series(self, root, publisher, name, files=()):
+        series_dir = root / publisher / name
+        series_dir.mkdir(parents=True)
+        (series_dir / "series.json").write_text(json.dumps({"metadata": {"name": name, "total_issues": 5}}))
+        for filename, size in files:
+            (series_dir / filename).write_bytes(b"x" * size)
+
+    def test_reports_series(self, tmp_path):
+        self.make_series(tmp_path, "Marvel", "Thor", [("Thor 001.cbz", 100), ("Thor 002.cbr", 50)])
+        self.make_series(tmp_path, "Marvel", "Hulk")
+        self.make_series(tmp_path, "Image", "Saga", [("Saga 001.cbz", 10)])
+        (tmp_path / "Image" / "No Metadata").mkdir()
+        (tmp_path / "Marvel" / "cover.jpg").write_bytes(b"x")  # not a series: not counted
+
+        progress = RecordingProgress()
+        Mylar3Scanner(str(tmp_path), progress=progress).scan()
+
+        assert progress.calls[0] == ('start', 4, 'series')
+        updates = [c[1:] for c in progress.calls if c[0] == 'update']
+        assert len(updates) == 4
+        assert sorted(updates) == [(1, 0, 0), (1, 0, 0), (1, 1, 10), (1, 2, 150)]
+        assert progress.calls[-1] == ('finish',)
+
+    def test_estimate_follows_scope(self, tmp_path):
+        for name in ("Spider-Man", "Spider-Woman", "X-Men"):
+            self.make_series(tmp_path, "Marvel", name)
+        self.make_series(tmp_path, "DC", "Batman")
+
+        progress = RecordingProgress()
+        Mylar3Scanner(str(tmp_path), publishers=["marvel"], series_patterns=["spider*"], progress=progress).scan()
+        assert progress.calls[0] == ('start', 2, 'series')
+
+    def test_scheduled_scan_reports_as_series_finish(self, tmp_path):
+        self.make_series(tmp_path, "Archie", "Jughead")  # on a "slow disk"
+        for name in ("Thor", "Hulk", "Loki"):
+            self.make_series(tmp_path, "Marvel", name)
+
+        progress = RecordingProgress()
+        gate = threading.Event()
+        with DeviceScheduler(limits={kind: 4 for kind in DEVICE_KINDS}) as scheduler:
+            scanner = Mylar3Scanner(str(tmp_path), progress=progress, scheduler=scheduler)
+            scan_series = scanner._scan_series
+
+            def slow_archie(publisher, *args):
+                if publisher == "Archie":
+                    gate.wait(10)
+                return scan_series(publisher, *args)
+
+            scanner._scan_series = slow_archie
+            scan = threading.Thread(target=scanner.scan)
+            scan.start()
+            deadline = time.monotonic() + 10
+            while sum(c[0] == 'update' for c in progress.calls) < 3 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            updates_while_blocked = sum(c[0] == 'update' for c in progress.calls)
+            gate.set()
+            scan.join(10)
+
+        assert progress.calls[0] == ('start', 4, 'series')
+        assert updates_while_blocked == 3
+        assert sum(c[0] == 'update' for c in progress.calls) == 4
+        assert progress.calls[-1] == ('finish',)
@@ -0,0 +1,248 @@
+"""
+Tests for the buffered text and streaming json/ndjson/csv report output.
+"""
+import io
+import csv
+import json
+import argparse
+import pytest
+
+from comic_file_organizer.mylar3_scanner import ScanResults, SeriesInfo
+from comic_file_organizer.mylar3_stats import calculate_statistics
+from comic_file_organizer.mylar3_query import SeriesQueryIndex
+from comic_file_organizer.mylar3_cli import (
+    emit_publisher_detail_report, emit_report, format_separator, format_table_row, parse_report_spec,
+    print_full_report, required_fields, print_publisher_detail_report, run_reports,
+)
+from comic_file_organizer.report_output import ChunkedWriter, TextReport, TextTable, make_emitter, text_report
+
+
+class CountingStream(io.StringIO):
+    """StringIO that counts write calls"""
+
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+def make_results():
+    series = [
+        SeriesInfo("Marvel", "Spider-Man", "/lib/Marvel/Spider-Man", 1963, 10, 4, comicid=1,
+                   status="Ended", file_type_counts={'.CBR': 1, '.CBZ': 3},
+                   file_type_sizes={'.CBR': 100, '.CBZ': 300}),
+        SeriesInfo("Marvel", "X-Men, The", "/lib/Marvel/X-Men", 1991, 5, 5, comicid=2,
+                   status="Ended", file_type_counts={'.CBZ': 5}, file_type_sizes={'.CBZ': 500}),
+        SeriesInfo("Image", "Saga", "/lib/Image/Saga", 2012, 60, 0, comicid=3, status="Continuing"),
+    ]
+    return ScanResults(destination_dir="/lib", publishers=["Marvel", "Image"], series=series)
+
+
+class TestChunkedWriter:
+    """Output must reach the stream in chunks, not per write"""
+
+    def test_batches_writes(self):
+        stream = CountingStream()
+        with ChunkedWriter(stream, chunk_size=1000) as writer:
+            for i in range(1000):
+                writer.write(f"line {i}\n")
+        assert stream.getvalue() == "".join(f"line {i}\n" for i in range(1000))
+        assert stream.writes < 20
+
+    def test_unknown_format(self):
+        with pytest.raises(ValueError):
+            make_emitter("xml", io.StringIO())
+
+
+class TestTextReport:
+    """Text rendering layer used by the mylar3_cli printers"""
+
+    def test_table_matches_row_helpers(self):
+        widths = [10, 5, 8]
+        table = TextTable(widths)
+        assert table.row(["Marvel", 12, None]) == format_table_row(["Marvel", 12, None], widths)
+        assert table.row(["A very long publisher", 1, 2]) == format_table_row(["A very long publisher", 1, 2], widths)
+        assert table.rule == format_separator(widths)
+        assert TextTable([3, 4], align='>>', indent='  ').row([1, 2]) == "    1 |    2"
+
+    def test_report_layout(self):
+        stream = io.StringIO()
+        with TextReport(stream) as report:
+            report.banner("TITLE")
+            report.table(TextTable([3, 2]), ["A", "B"], [[1, 2]])
+            report.lines(["x", "y"])
+        rule = "=" * 70
+        assert stream.getvalue() == f"{rule}\nTITLE\n{rule}\n\nA   | B \n----+---\n1   | 2 \nx\ny\n"
+
+    def test_text_report_defaults_to_stdout(self, capsys):
+        with text_report() as report:
+            report.line("hello")
+        assert capsys.readouterr().out == "hello\n"
+
+    def test_publisher_detail_writes_in_chunks(self):
+        stream = CountingStream()
+        with TextReport(stream) as report:
+            print_publisher_detail_report(make_results(), "MARVEL", report=report)
+        output = stream.getvalue()
+        assert "PUBLISHER DETAIL REPORT: Marvel" in output
+        assert "  Spider-Man (1963)\n" in output
+        assert stream.writes == 1
+
+
+class TestEmitters:
+    """Each format must round-trip through its standard parser"""
+
+    rows = [{'name': 'A', 'owned': 1, 'year': None}, {'name': 'B, "two"', 'owned': 2, 'year': 1991}]
+
+    def render(self, output_format):
+        stream = io.StringIO()
+        with make_emitter(output_format, stream) as emitter:
+            emitter.emit_object('summary', {'series': 2})
+            emitter.emit('series', iter(self.rows))
+            emitter.emit('empty', iter([]))
+        return stream.getvalue()
+
+    def test_json(self):
+        assert json.loads(self.render('json')) == {'summary': {'series': 2}, 'series': self.rows, 'empty': []}
+
+    def test_ndjson(self):
+        lines = [json.loads(line) for line in self.render('ndjson').splitlines()]
+        assert lines == [{'section': 'summary', 'series': 2}] + [dict(section='series', **r) for r in self.rows]
+
+    def test_csv(self):
+        summary, series = self.render('csv').split('\n\n')
+        assert list(csv.reader(io.StringIO(summary))) == [['section', 'series'], ['summary', '2']]
+        assert list(csv.reader(io.StringIO(series))) == [
+            ['section', 'name', 'owned', 'year'],
+            ['series', 'A', '1', ''],
+            ['series', 'B, "two"', '2', '1991'],
+        ]
+
+
+class TestStructuredReports:
+    """mylar3_cli report sections in structured formats"""
+
+    def test_statistics_report(self):
+        stream = io.StringIO()
+        with make_emitter('json', stream) as emitter:
+            emit_report(emitter, calculate_statistics(make_results()))
+        report = json.loads(stream.getvalue())
+
+        assert report['summary']['total_series'] == 3
+        assert report['summary']['total_issues_owned'] == 9
+        assert [p['publisher'] for p in report['publishers']] == ["Image", "Marvel"]
+        assert [s['series'] for s in report['series']] == ["Saga", "Spider-Man", "X-Men, The"]
+        assert report['most_incomplete'][0]['series'] == "Spider-Man"
+        assert report['series'][1]['size_bytes'] == 400
+
+    def test_series_limit(self):
+        stream = io.StringIO()
+        with make_emitter('ndjson', stream) as emitter:
+            emit_report(emitter, calculate_statistics(make_results()), series_limit=1, top_lists=False)
+        sections = [json.loads(line)['section'] for line in stream.getvalue().splitlines()]
+        assert sections.count('series') == 1
+        assert 'most_incomplete' not in sections
+
+    def test_publisher_detail(self):
+        stream = io.StringIO()
+        with make_emitter('json', stream) as emitter:
+            assert emit_publisher_detail_report(emitter, make_results(), "marvel")
+        report = json.loads(stream.getvalue())
+
+        assert [(r['series'], r['file_type'], r['count']) for r in report['publisher_series']] == [
+            ("Spider-Man", ".CBR", 1), ("Spider-Man", ".CBZ", 3), ("X-Men, The", ".CBZ", 5),
+        ]
+        assert {r['file_type']: r['size_bytes'] for r in report['publisher_totals']} == {'.CBR': 100, '.CBZ': 800}
+
+    def test_unknown_publisher(self):
+        with make_emitter('csv', io.StringIO()) as emitter:
+            assert not emit_publisher_detail_report(emitter, make_results(), "Dark Horse")
+
+
+def report_options(**overrides):
+    options = dict(series_limit=None, no_details=False, no_top_lists=False, group_by=None,
+                   distributions=False, format='text', where=None, history=None, publisher=None, report=None,
+                   estimate=None)
+    options.update(overrides)
+    return argparse.Namespace(**options)
+
+
+class TestMultiReport:
+    """Several --report outputs rendered from one scan"""
+
+    def test_parse_spec(self):
+        spec = parse_report_spec("publisher:DC Comics=out/dc.CSV")
+        assert (spec.kind, spec.arg, spec.path, spec.format) == ('publisher', "DC Comics", "out/dc.CSV", 'csv')
+        assert parse_report_spec("summary=s.jsonl").format == 'ndjson'
+        assert parse_report_spec("full=nightly.txt").format == 'text'
+        assert parse_report_spec("top=-").format is None
+        assert parse_report_spec("group:decade=g.json").arg == 'decade'
+
+    @pytest.mark.parametrize("value", [
+        "summary", "summary=", "bogus=x.txt", "publisher=x.txt", "summary:x=x.txt", "group:colour=x.txt",
+    ])
+    def test_invalid_spec(self, value):
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_report_spec(value)
+
+    def test_required_fields(self):
+        summary_only = report_options(no_details=True, no_top_lists=True)
+        assert required_fields(summary_only) == {'total_issues', 'issues_owned'}
+        publisher = required_fields(report_options(publisher=["Marvel"]))
+        assert 'file_type_sizes' in publisher and 'status' not in publisher
+        assert required_fields(report_options()) is None
+        assert required_fields(report_options(where="status=Ended", publisher=["Marvel"])) is None
+        assert required_fields(report_options(no_details=True, no_top_lists=True, estimate=1.0)) is None
+        reports = [parse_report_spec("summary=s.json"), parse_report_spec("publisher:DC=dc.csv")]
+        assert required_fields(report_options(report=reports)) == {
+            'total_issues', 'issues_owned', 'series_name', 'year', 'file_type_counts', 'file_type_sizes',
+        }
+
+    def render(self, directory, jobs):
+        results = make_results()
+        specs = [parse_report_spec(value) for value in (
+            f"full={directory}/full.txt", f"summary={directory}/summary.json",
+            f"publisher:marvel={directory}/marvel.csv", f"group:status={directory}/status.ndjson",
+            f"top={directory}/top.txt",
+        )]
+        failed = run_reports(specs, results, calculate_statistics(results), SeriesQueryIndex(results),
+                             report_options(), jobs=jobs)
+        return failed, {path.name: path.read_text() for path in sorted(directory.iterdir())}
+
+    def test_parallel_matches_serial(self, tmp_path):
+        (tmp_path / "serial").mkdir()
+        (tmp_path / "parallel").mkdir()
+        serial = self.render(tmp_path / "serial", jobs=1)
+        parallel = self.render(tmp_path / "parallel", jobs=4)
+        assert serial == parallel
+        failed, outputs = parallel
+        assert failed == 0
+        assert sorted(outputs) == ["full.txt", "marvel.csv", "status.ndjson", "summary.json", "top.txt"]
+
+        results = make_results()
+        stream = io.StringIO()
+        with TextReport(stream) as report:
+            print_full_report(calculate_statistics(results), SeriesQueryIndex(results), report=report)
+        assert outputs["full.txt"] == stream.getvalue()
+        assert json.loads(outputs["summary.json"])['summary']['total_series'] == 3
+        assert "publisher_totals,Marvel,.CBZ,8,800" in outputs["marvel.csv"]
+        assert "MOST INCOMPLETE SERIES" in outputs["top.txt"]
+
+    def test_reports_without_rankings_rank_nothing(self, tmp_path):
+        results = make_results()
+        stats = calculate_statistics(results)
+        specs = [parse_report_spec(f"summary={tmp_path}/summary.json"),
+                 parse_report_spec(f"group:status={tmp_path}/status.csv")]
+        assert run_reports(specs, results, stats, SeriesQueryIndex(results), report_options()) == 0
+        assert stats._indexes == {}
+
+    def test_failed_report_leaves_no_file(self, tmp_path, capsys):
+        results = make_results()
+        specs = [parse_report_spec(f"publisher:Dark Horse={tmp_path}/dh.json"),
+                 parse_report_spec(f"publisher:Image={tmp_path}/image.txt")]
+        assert run_reports(specs, results, None, SeriesQueryIndex(results), report_options()) == 1
+        assert [path.name for path in tmp_path.iterdir()] == ["image.txt"]
+        assert "dh.json" in capsys.readouterr().err
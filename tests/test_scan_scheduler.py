@@ -0,0 +1,140 @@
+"""
+Tests for device-aware scan scheduling.
+"""
+import os
+import json
+import threading
+import time
+
+import pytest
+
+from comic_file_organizer.mylar3_scanner import Mylar3Scanner
+from comic_file_organizer.mylar3_stats import DistributionStats
+from comic_file_organizer.scan_scheduler import (
+    DeviceInfo, DeviceScheduler, classify_device, find_mount, parse_device_limits, read_mounts,
+)
+
+
+def write_mounts(tmp_path, lines):
+    path = tmp_path / "mounts"
+    path.write_text("".join(f"{line}\n" for line in lines))
+    return str(path)
+
+
+def fake_sysfs(tmp_path, device, rotational):
+    """sysfs layout of a partition whose parent disk has queue/rotational"""
+    disk = tmp_path / "sys" / "devices" / "sda"
+    (disk / "queue").mkdir(parents=True)
+    (disk / "queue" / "rotational").write_text("1\n" if rotational else "0\n")
+    (disk / "sda1").mkdir()
+    block = tmp_path / "sys" / "dev" / "block"
+    block.mkdir(parents=True)
+    os.symlink(disk / "sda1", block / f"{os.major(device)}:{os.minor(device)}")
+    return str(block)
+
+
+class TestDeviceClassification:
+    """Mount table and sysfs lookups"""
+
+    def test_read_mounts(self, tmp_path):
+        mounts = read_mounts(write_mounts(tmp_path, [
+            "/dev/sda1 / ext4 rw 0 0",
+            "nas:/comics /mnt/My\\040Comics nfs4 rw 0 0",
+        ]))
+        assert mounts == [("/", "ext4"), ("/mnt/My Comics", "nfs4")]
+        assert read_mounts(str(tmp_path / "missing")) == []
+
+    def test_find_mount_longest_prefix(self):
+        mounts = [("/", "ext4"), ("/mnt", "xfs"), ("/mnt/comics", "nfs4"), ("/mnt/comics2", "ext4")]
+        assert find_mount("/mnt/comics/Marvel", mounts) == ("/mnt/comics", "nfs4")
+        assert find_mount("/mnt/comics2", mounts) == ("/mnt/comics2", "ext4")
+        assert find_mount("/mnt/other", mounts) == ("/mnt", "xfs")
+        assert find_mount("/srv", mounts) == ("/", "ext4")
+
+    def test_network_and_memory(self, tmp_path):
+        device = os.stat(tmp_path).st_dev
+        path = os.path.realpath(tmp_path)
+        assert classify_device(path, device, [(path, "nfs4")]).kind == 'network'
+        assert classify_device(path, device, [(path, "fuse.sshfs")]).kind == 'network'
+        assert classify_device(path, device, [(path, "tmpfs")]).kind == 'ssd'
+
+    @pytest.mark.parametrize("rotational, kind", [(True, 'rotational'), (False, 'ssd')])
+    def test_block_device(self, tmp_path, rotational, kind):
+        device = os.makedev(8, 1)
+        sys_root = fake_sysfs(tmp_path, device, rotational)
+        info = classify_device("/data", device, [("/", "ext4")], sys_root)
+        assert (info.kind, info.mount_point, info.fstype) == (kind, "/", "ext4")
+
+    def test_unknown_device(self, tmp_path):
+        assert classify_device("/data", os.makedev(8, 1), [], str(tmp_path)).kind == 'unknown'
+
+    def test_parse_device_limits(self):
+        assert parse_device_limits(["rotational=1", "network=16"]) == {'rotational': 1, 'network': 16}
+        for value in ("spinning=2", "ssd=0", "ssd=many"):
+            with pytest.raises(ValueError):
+                parse_device_limits([value])
+
+
+class TestDeviceScheduler:
+    """Per-device worker pools"""
+
+    def test_per_device_limit(self, tmp_path):
+        scheduler = DeviceScheduler({'network': 2}, mounts_path=write_mounts(tmp_path, [
+            f"nas:/comics {os.path.realpath(tmp_path)} nfs rw 0 0",
+        ]))
+        running, peak = [0], [0]
+        lock = threading.Lock()
+
+        def task():
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+
+        with scheduler:
+            futures = [scheduler.submit(str(tmp_path), task) for _ in range(10)]
+            for future in futures:
+                future.result()
+        assert peak[0] == 2
+        assert scheduler.summary()[0]['kind'] == 'network'
+        assert scheduler.summary()[0]['tasks'] == 10
+
+    def test_slow_device_does_not_block_others(self):
+        slow, fast = DeviceInfo(1, 'rotational'), DeviceInfo(2, 'ssd')
+        release = threading.Event()
+        with DeviceScheduler({'rotational': 1}) as scheduler:
+            blocked = [scheduler.submit(slow, release.wait, 5) for _ in range(3)]
+            done = [scheduler.submit(fast, lambda i=i: i) for i in range(20)]
+            assert [f.result(timeout=5) for f in done] == list(range(20))
+            assert not any(f.done() for f in blocked[1:])
+            release.set()
+
+    def test_unknown_kind(self):
+        with pytest.raises(ValueError):
+            DeviceScheduler({'floppy': 1})
+
+
+class TestScheduledScan:
+    """Mylar3Scanner on a DeviceScheduler matches the serial scan"""
+
+    def test_same_results(self, tmp_path):
+        for publisher in ("Marvel", "DC", "Image"):
+            for i in range(12):
+                series_dir = tmp_path / publisher / f"Series {i:02d}"
+                series_dir.mkdir(parents=True)
+                if i == 5:
+                    continue  # no series.json
+                (series_dir / "series.json").write_text(json.dumps({"metadata": {"name": f"S{i}", "total_issues": 9}}))
+                for issue in range(i % 4):
+                    (series_dir / f"S{i} #{issue}.cbz").write_bytes(b"x" * (issue + 1))
+        (tmp_path / "Empty").mkdir()
+
+        serial = Mylar3Scanner(str(tmp_path), distributions=DistributionStats()).scan()
+        distributions = DistributionStats()
+        with DeviceScheduler() as scheduler:
+            scheduled = Mylar3Scanner(str(tmp_path), distributions=distributions, scheduler=scheduler).scan()
+
+        assert scheduled == serial
+        assert distributions.collection().file_size.count == sum(s.issues_owned for s in serial.series)
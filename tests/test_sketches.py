@@ -0,0 +1,129 @@
+"""
+Tests for streaming distribution sketches and the scanner feed.
+"""
+import io
+import json
+import math
+import random
+from pathlib import Path
+import pytest
+
+from comic_file_organizer.sketches import LinearHistogramSketch, LogHistogramSketch
+from comic_file_organizer.mylar3_scanner import Mylar3Scanner
+from comic_file_organizer.report_output import TextReport
+from comic_file_organizer.mylar3_stats import DistributionStats
+from comic_file_organizer.mylar3_cli import MB, distribution_records, main, print_distributions
+
+
+def exact_quantile(values, q):
+    """Nearest-rank quantile"""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(q * len(ordered)) - 1, 0)]
+
+
+class TestLogHistogramSketch:
+    """Tests for the relative-error quantile sketch"""
+
+    def test_quantiles_within_relative_accuracy(self):
+        rng = random.Random(7)
+        values = [rng.lognormvariate(17, 1.5) for _ in range(20000)]
+        sketch = LogHistogramSketch(relative_accuracy=0.01)
+        for v in values:
+            sketch.add(v)
+        for q in (0.5, 0.9, 0.99):
+            exact = exact_quantile(values, q)
+            assert abs(sketch.quantile(q) - exact) <= 0.0101 * exact
+        assert sketch.count == 20000
+        assert sketch.max == max(values)
+
+    def test_fixed_memory(self):
+        sketch = LogHistogramSketch(relative_accuracy=0.01, max_buckets=64)
+        for exponent in range(200):
+            sketch.add(1.1 ** exponent)
+        assert len(sketch._buckets) <= 64
+        # High quantiles keep their accuracy when low buckets collapse
+        assert sketch.quantile(1.0) == pytest.approx(1.1 ** 199)
+        assert abs(sketch.quantile(0.9) - 1.1 ** 179) <= 0.0101 * 1.1 ** 179
+
+    def test_merge_and_zero(self):
+        a, b = LogHistogramSketch(), LogHistogramSketch()
+        for v in (0, 100, 200):
+            a.add(v)
+        for v in (300, 400):
+            b.add(v)
+        a.merge(b)
+        assert a.count == 5
+        assert a.min == 0
+        assert a.quantile(0.0) == 0
+        assert a.quantile(0.5) == pytest.approx(200, rel=0.01)
+        assert a.histogram([150, 350]) == [2, 2, 1]
+
+
+class TestLinearHistogramSketch:
+    """Tests for the fixed-range histogram"""
+
+    def test_histogram_and_quantiles(self):
+        sketch = LinearHistogramSketch(0, 100, 100)
+        for v in range(101):
+            sketch.add(v)
+        assert sketch.histogram(10) == [10] * 9 + [11]
+        assert sketch.median == pytest.approx(50, abs=1)
+        assert sketch.quantile(0.99) == pytest.approx(99, abs=1)
+        with pytest.raises(ValueError):
+            sketch.histogram(7)
+
+
+class TestDistributionStats:
+    """The scanner feeds sketches while it walks the collection"""
+
+    def test_scanner_feeds_sketches(self, tmp_path):
+        for publisher, sizes in (("Marvel", [100, 200, 300]), ("DC Comics", [1000])):
+            series_dir = tmp_path / publisher / "Series (2020)"
+            series_dir.mkdir(parents=True)
+            (series_dir / "series.json").write_text(json.dumps({"metadata": {"name": "Series", "total_issues": 4}}))
+            for i, size in enumerate(sizes):
+                Path(series_dir, f"Series #{i:03d}.cbz").write_bytes(b"x" * size)
+
+        distributions = DistributionStats()
+        results = Mylar3Scanner(str(tmp_path), distributions=distributions).scan()
+
+        assert results.total_series == 2
+        marvel = distributions.publishers["Marvel"]
+        assert marvel.file_size.count == 3
+        assert marvel.file_size.median == pytest.approx(200, rel=0.01)
+        assert marvel.series_size.max == 600
+        assert marvel.completion.max == 75.0
+
+        collection = distributions.collection()
+        assert collection.file_size.count == 4
+        assert collection.file_size.max == 1000
+        assert collection.completion.histogram(4) == [0, 1, 0, 1]  # 25% and 75%
+
+    def test_where_rejected_with_distributions(self, capsys):
+        for options in (['--distributions'], ['--report', 'distributions=out.json']):
+            with pytest.raises(SystemExit) as exc:
+                main(['config.ini', '--where', 'publisher=Marvel'] + options)
+            assert exc.value.code == 2
+            assert "--where cannot be combined with distributions" in capsys.readouterr().err
+
+    def test_size_histograms(self):
+        distributions = DistributionStats()
+        for size in (5 * MB, 20 * MB, 200 * MB):
+            distributions.add_file("Marvel", size)
+        distributions.add_file("DC Comics", 30 * MB)
+
+        records = list(distribution_records(distributions))
+        marvel, collection = records[1], records[-1]
+        assert marvel['publisher'] == "Marvel"
+        keys = ("under_10MB", "10MB_25MB", "25MB_50MB", "50MB_100MB", "100MB_up")
+        assert [marvel[f"issue_size_{key}"] for key in keys] == [1, 1, 0, 0, 1]
+        assert collection['publisher'] is None
+        assert collection['issue_size_25MB_50MB'] == 1
+        assert collection['series_size_under_100MB'] == 0
+
+        out = io.StringIO()
+        report = TextReport(out)
+        print_distributions(distributions, report=report)
+        report.flush()
+        text = out.getvalue()
+        assert "Issue Size" in text and "Series Size" in text and "100MB+" in text